@@ -0,0 +1,24 @@
+#!/bin/bash
+# Record this release's asset digests in the checked-in asset history
+# Usage: ./scripts/record-asset-history.sh [version]
+#
+# Run from the repo root once per release, after the version bump, and
+# commit .claude/.asset-history.json. The build only reads that file.
+
+set -e
+
+if [ -z "$1" ]; then
+  VERSION=$(grep '^version' pyproject.toml | head -1 | sed 's/.*= *//' | tr -d '"')
+else
+  VERSION="$1"
+fi
+
+PYTHONPATH=src python3 - "$VERSION" <<'PY'
+import sys
+from pathlib import Path
+
+from claude_pilot.build_hook import record_release_history
+
+path = record_release_history(Path("."), sys.argv[1])
+print(f"Recorded asset digests of {sys.argv[1]} in {path}")
+PY
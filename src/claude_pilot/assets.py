@@ -15,10 +15,30 @@ The manifest is used both at build time (Hatchling hook) and runtime
 from __future__ import annotations
 
 import fnmatch
+import hashlib
+import json
 import shutil
 import stat
 from pathlib import Path
-from typing import Final
+from typing import Any, Final
+
+# Digest index of the generated assets (written next to them at build time)
+ASSET_INDEX_FILE = ".asset-index.json"
+
+# Per-version file digests of recent releases (build-time changelog manifest)
+ASSET_HISTORY_FILE = ".asset-history.json"
+ASSET_HISTORY_KEEP = 10
+ASSET_HISTORY_DIGEST_LEN = 16
+
+# Catalog of the shipped skills, agents and commands (claude_pilot.catalog)
+ASSET_CATALOG_FILE = ".asset-catalog.json"
+
+# Generated metadata files that are not themselves assets
+ASSET_METADATA_FILES: Final[tuple[str, ...]] = (
+    ASSET_INDEX_FILE,
+    ASSET_HISTORY_FILE,
+    ASSET_CATALOG_FILE,
+)
 
 # Special file policies
 POLICY_MERGE_ONLY = "merge-only"
@@ -218,7 +238,8 @@ def generate_assets(
     Generate packaged assets from source directory based on manifest.
 
     This function copies files from source_dir to dest_dir, filtering
-    according to the manifest's include/exclude patterns.
+    according to the manifest's include/exclude patterns, and compiles the
+    catalog of the copied skills, agents and commands (ASSET_CATALOG_FILE).
 
     Args:
         source_dir: Source directory containing .claude/** files.
@@ -264,4 +285,191 @@ def generate_assets(
 
         count += 1
 
+    from claude_pilot.catalog import build_catalog, write_catalog
+
+    write_catalog(dest_dir / ASSET_CATALOG_FILE, build_catalog(dest_dir))
+
     return count
+
+
+def file_digest(path: Path) -> str:
+    """
+    Compute the SHA-256 hex digest of a file.
+
+    Args:
+        path: File to hash.
+
+    Returns:
+        Hex digest string.
+    """
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_asset_index(assets_dir: Path) -> dict[str, dict[str, Any]]:
+    """
+    Compute digests for every generated asset.
+
+    Args:
+        assets_dir: Generated assets directory (contains .claude/**).
+
+    Returns:
+        Mapping of relative path to {"sha256": ..., "size": ...}.
+    """
+    index: dict[str, dict[str, Any]] = {}
+    for item in sorted(assets_dir.rglob("*")):
+        if not item.is_file() or item.name in ASSET_METADATA_FILES:
+            continue
+        rel_path = item.relative_to(assets_dir).as_posix()
+        index[rel_path] = {"sha256": file_digest(item), "size": item.stat().st_size}
+    return index
+
+
+def write_asset_index(assets_dir: Path) -> Path:
+    """
+    Write the asset digest index into the assets directory.
+
+    Args:
+        assets_dir: Generated assets directory.
+
+    Returns:
+        Path to the written index file.
+    """
+    index_path = assets_dir / ASSET_INDEX_FILE
+    payload = {"version": 1, "files": build_asset_index(assets_dir)}
+    index_path.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n")
+    return index_path
+
+
+def load_asset_index(assets_dir: Path | None = None) -> dict[str, dict[str, Any]]:
+    """
+    Load the shipped asset digests, computing them if no index was built.
+
+    Args:
+        assets_dir: Assets directory (defaults to the packaged assets).
+
+    Returns:
+        Mapping of relative path to {"sha256": ..., "size": ...}.
+    """
+    if assets_dir is None:
+        from claude_pilot import config
+
+        assets_dir = Path(str(config.get_templates_path()))
+    try:
+        data = json.loads((assets_dir / ASSET_INDEX_FILE).read_text())
+        files = data["files"]
+        if data.get("version") == 1 and isinstance(files, dict):
+            return files
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    if not assets_dir.is_dir():
+        return {}
+    return build_asset_index(assets_dir)
+
+
+def update_asset_history(
+    history: dict[str, dict[str, str]],
+    version: str,
+    index: dict[str, dict[str, Any]],
+    keep: int = ASSET_HISTORY_KEEP,
+) -> dict[str, dict[str, str]]:
+    """
+    Add (or replace) a version's digests and keep only the newest versions.
+
+    Args:
+        history: Existing history, oldest version first.
+        version: Version being built.
+        index: Asset index of that version.
+        keep: Number of versions to keep.
+
+    Returns:
+        New history mapping version to {relative path: short digest}.
+    """
+    entries = {v: files for v, files in history.items() if v != version}
+    entries[version] = {
+        rel_path: str(entry["sha256"])[:ASSET_HISTORY_DIGEST_LEN]
+        for rel_path, entry in sorted(index.items())
+    }
+    return dict(list(entries.items())[-keep:])
+
+
+def _read_history(path: Path) -> dict[str, dict[str, str]]:
+    try:
+        data = json.loads(path.read_text())
+        versions = data["versions"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return {}
+    if data.get("version") != 1 or not isinstance(versions, dict):
+        return {}
+    return {str(v): dict(files) for v, files in versions.items() if isinstance(files, dict)}
+
+
+def _write_history(path: Path, history: dict[str, dict[str, str]]) -> None:
+    text = json.dumps({"version": 1, "versions": history}, indent=1, sort_keys=False) + "\n"
+    path.write_text(text)
+
+
+def write_asset_history(
+    assets_dir: Path,
+    version: str,
+    source_path: Path | None = None,
+) -> Path:
+    """
+    Write the asset history (prior versions plus this one) into the assets directory.
+
+    Prior versions are read from source_path, which is left untouched; it is
+    only extended by the release step (record_asset_history).
+
+    Args:
+        assets_dir: Generated assets directory (index must be written first).
+        version: Version being built.
+        source_path: Checked-in history file of earlier releases.
+
+    Returns:
+        Path to the written history file.
+    """
+    previous = _read_history(source_path) if source_path is not None else {}
+    history = update_asset_history(previous, version, load_asset_index(assets_dir))
+    history_path = assets_dir / ASSET_HISTORY_FILE
+    _write_history(history_path, history)
+    return history_path
+
+
+def record_asset_history(assets_dir: Path, version: str, source_path: Path) -> Path:
+    """
+    Add a release's digests to the checked-in history (release step, not build).
+
+    Args:
+        assets_dir: Generated assets directory of the release (index written).
+        version: Version being released.
+        source_path: Checked-in history file to extend.
+
+    Returns:
+        source_path.
+    """
+    history = update_asset_history(
+        _read_history(source_path), version, load_asset_index(assets_dir)
+    )
+    source_path.parent.mkdir(parents=True, exist_ok=True)
+    _write_history(source_path, history)
+    return source_path
+
+
+def load_asset_history(assets_dir: Path | None = None) -> dict[str, dict[str, str]]:
+    """
+    Load the shipped per-version digests.
+
+    Args:
+        assets_dir: Assets directory (defaults to the packaged assets).
+
+    Returns:
+        Mapping of version to {relative path: short digest}, oldest first.
+    """
+    if assets_dir is None:
+        from claude_pilot import config
+
+        assets_dir = Path(str(config.get_templates_path()))
+    return _read_history(assets_dir / ASSET_HISTORY_FILE)
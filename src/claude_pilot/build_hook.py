@@ -8,12 +8,19 @@ The build hook:
 2. Filters using AssetManifest (curated subset)
 3. Writes to src/claude_pilot/assets/.claude/** (packaged assets)
 4. Ensures wheel contains only generated assets, not templates
+5. Writes .asset-index.json with per-file SHA-256 digests
+6. Writes .asset-history.json with digests of recent prior versions
+
+The build only reads the checked-in history (config.ASSET_HISTORY_SOURCE).
+Adding a release to it is an explicit release step:
+scripts/record-asset-history.sh calls record_release_history().
 
 This approach eliminates drift between development and packaged assets.
 """
 
 from __future__ import annotations
 
+import tempfile
 from pathlib import Path
 from typing import Any
 
@@ -28,7 +35,14 @@ except ImportError:
     # Use typing.Any for the base class when hatchling is not available
     BuildHookInterface: Any = object  # type: ignore
 
-from claude_pilot.assets import AssetManifest, generate_assets
+from claude_pilot import config
+from claude_pilot.assets import (
+    AssetManifest,
+    generate_assets,
+    record_asset_history,
+    write_asset_history,
+    write_asset_index,
+)
 
 
 class AssetGenerationHook(BuildHookInterface):  # type: ignore
@@ -136,9 +150,38 @@ def generate_packaged_assets(
     # Generate assets
     count = generate_assets(source_dir, assets_path, manifest)
 
+    # Ship digests so `claude-pilot verify` can check installed files
+    write_asset_index(assets_path)
+
+    # Ship recent per-version digests so `update` can diff from older releases
+    write_asset_history(assets_path, config.VERSION, project_path / config.ASSET_HISTORY_SOURCE)
+
     return count
 
 
+def record_release_history(project_dir: Path, version: str = config.VERSION) -> Path:
+    """
+    Add a release's asset digests to the checked-in history.
+
+    Run once per release (scripts/record-asset-history.sh) and commit the
+    result; the build hook only reads this file.
+
+    Args:
+        project_dir: Project root.
+        version: Version being released.
+
+    Returns:
+        Path to the updated history file.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        assets_path = Path(temp_dir)
+        generate_assets(project_dir, assets_path, AssetManifest())
+        write_asset_index(assets_path)
+        return record_asset_history(
+            assets_path, version, project_dir / config.ASSET_HISTORY_SOURCE
+        )
+
+
 # Required paths that must be present in wheel
 REQUIRED_PATHS = [
     ".claude/commands/00_plan.md",
@@ -0,0 +1,282 @@
+"""
+Compiled catalog of skills, agents and commands.
+
+Picking a skill or agent meant opening every SKILL.md, agent and command
+file to read its frontmatter. The catalog collects that frontmatter in one
+small JSON file:
+
+- generate_assets() compiles the catalog of the shipped assets at build
+  time (ASSET_CATALOG_FILE, next to the asset index);
+- init, update and sync_external_skills() write the project catalog
+  (config.CATALOG_FILE) compiled from the files installed under .claude/,
+  so the project's own skills, agents and commands, local edits and the
+  external skills under .claude/skills/external/ are all included. A
+  shipped entry is reused as-is for a file whose SHA-256 still matches the
+  shipped asset index.
+
+Each entry holds kind (skill, agent or command), name, description,
+triggers, token size (context_profile.estimate_tokens of the whole file)
+and path relative to the project root. Triggers come from a `triggers:`
+frontmatter list, or else from the "Use when ..." clause of the description.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any
+
+from claude_pilot import config
+from claude_pilot.assets import ASSET_CATALOG_FILE, file_digest, load_asset_index
+from claude_pilot.context_profile import estimate_tokens, split_frontmatter
+
+CATALOG_FORMAT_VERSION = 1
+
+_KEY_RE = re.compile(r"^([A-Za-z][\w-]*)\s*:\s*(.*)$")
+_TRIGGER_RE = re.compile(
+    r"\b(?:use|invoke|trigger)s?\s+(?:this\s+\w+\s+)?(?:when|for|on|if)\s+([^.]+)",
+    re.IGNORECASE,
+)
+
+
+def _unquote(value: str) -> str:
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"":
+        return value[1:-1]
+    return value
+
+
+def parse_frontmatter(text: str) -> dict[str, str | list[str]]:
+    """
+    Parse the top-level keys of a markdown document's YAML frontmatter.
+
+    Supports the subset the assets use: scalars, quoted strings, folded or
+    literal blocks (`>` / `|`), inline lists and `- item` lists.
+
+    Args:
+        text: Document text.
+
+    Returns:
+        Mapping of key to string or list of strings.
+    """
+    frontmatter, _body = split_frontmatter(text)
+    data: dict[str, str | list[str]] = {}
+    key: str | None = None
+    style = ""
+    block: list[str] = []
+
+    def flush() -> None:
+        if key is None or not block:
+            return
+        if style == "" and all(item.startswith("- ") for item in block):
+            data[key] = [_unquote(item[2:]) for item in block]
+        else:
+            data[key] = ("\n" if style.startswith("|") else " ").join(block)
+
+    for line in frontmatter.splitlines():
+        match = _KEY_RE.match(line)
+        if match and not line[0].isspace():
+            flush()
+            key, value = match.group(1), match.group(2).strip()
+            style, block = "", []
+            if value in (">", "|", ">-", "|-"):
+                style = value
+            elif value.startswith("[") and value.endswith("]"):
+                data[key] = [_unquote(v) for v in value[1:-1].split(",") if v.strip()]
+                key = None
+            elif value:
+                data[key] = _unquote(value)
+                key = None
+        elif key is not None and line.strip():
+            block.append(line.strip())
+    flush()
+    return data
+
+
+def _triggers(meta: dict[str, str | list[str]], description: str) -> list[str]:
+    """Triggers from the frontmatter list, else from the description's "Use when" clause."""
+    listed = meta.get("triggers")
+    if isinstance(listed, list):
+        return listed
+    if isinstance(listed, str) and listed:
+        return [t.strip() for t in listed.split(",") if t.strip()]
+    triggers: list[str] = []
+    for clause in _TRIGGER_RE.findall(description):
+        for part in re.split(r"[,;]", clause):
+            part = re.sub(r"^(?:or|and)\s+", "", part.strip())
+            if part and part not in triggers:
+                triggers.append(part)
+    return triggers
+
+
+def catalog_entry(path: Path, root: Path, kind: str) -> dict[str, Any] | None:
+    """
+    Build the catalog entry of one skill, agent or command file.
+
+    Args:
+        path: SKILL.md, agent or command markdown file.
+        root: Directory the entry path is made relative to.
+        kind: "skill", "agent" or "command".
+
+    Returns:
+        Catalog entry, or None if the file cannot be read.
+    """
+    try:
+        text = path.read_text(encoding="utf-8", errors="replace")
+    except OSError:
+        return None
+    meta = parse_frontmatter(text)
+    default_name = path.parent.name if kind == "skill" else path.stem
+    name = meta.get("name")
+    description = meta.get("description")
+    description = description if isinstance(description, str) else ""
+    return {
+        "kind": kind,
+        "name": name if isinstance(name, str) and name else default_name,
+        "description": description,
+        "triggers": _triggers(meta, description),
+        "tokens": estimate_tokens(text),
+        "path": path.relative_to(root).as_posix(),
+    }
+
+
+def build_catalog(
+    root: Path,
+    external: bool = False,
+    known: dict[str, tuple[str, dict[str, Any]]] | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Compile the catalog of the skills, agents and commands below root/.claude.
+
+    Args:
+        root: Project root or generated assets directory.
+        external: Catalog only the external skills (config.EXTERNAL_SKILLS_DIR)
+            instead of everything else.
+        known: Precompiled entries by relative path, with the SHA-256 of the
+            file they describe; reused when the file still has that digest.
+
+    Returns:
+        Catalog entries ordered by kind and path.
+    """
+    claude_dir = root / ".claude"
+    external_dir = root / config.EXTERNAL_SKILLS_DIR
+    candidates: list[tuple[Path, str]] = []
+    for path in sorted(claude_dir.glob("skills/**/SKILL.md")):
+        if path.is_relative_to(external_dir) == external:
+            candidates.append((path, "skill"))
+    if not external:
+        for kind, pattern in (("agent", "agents/*.md"), ("command", "commands/*.md")):
+            candidates += [
+                (path, kind)
+                for path in sorted(claude_dir.glob(pattern))
+                if path.name != "CONTEXT.md"
+            ]
+
+    entries: list[dict[str, Any]] = []
+    for path, kind in candidates:
+        entry = None
+        cached = (known or {}).get(path.relative_to(root).as_posix())
+        if cached is not None:
+            try:
+                if file_digest(path) == cached[0]:
+                    entry = cached[1]
+            except OSError:
+                continue
+        if entry is None:
+            entry = catalog_entry(path, root, kind)
+        if entry is not None:
+            entries.append(entry)
+    return entries
+
+
+def _read_entries(path: Path) -> list[dict[str, Any]] | None:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        entries = data["entries"]
+        if data.get("version") == CATALOG_FORMAT_VERSION and isinstance(entries, list):
+            return entries
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+
+def write_catalog(path: Path, entries: list[dict[str, Any]]) -> bool:
+    """
+    Write a catalog atomically, unless it already has these entries.
+
+    Args:
+        path: Catalog file.
+        entries: Catalog entries.
+
+    Returns:
+        True if the file was written.
+    """
+    if _read_entries(path) == entries:
+        return False
+    payload = {"version": CATALOG_FORMAT_VERSION, "entries": entries}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    temp_path.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+    os.replace(temp_path, path)
+    return True
+
+
+def load_shipped_catalog(assets_dir: Path | None = None) -> list[dict[str, Any]] | None:
+    """
+    Load the catalog compiled into the packaged assets.
+
+    Args:
+        assets_dir: Assets directory (defaults to the packaged assets).
+
+    Returns:
+        Catalog entries, or None if the assets carry no catalog.
+    """
+    if assets_dir is None:
+        assets_dir = Path(str(config.get_templates_path()))
+    return _read_entries(assets_dir / ASSET_CATALOG_FILE)
+
+
+def load_catalog(target_dir: Path) -> list[dict[str, Any]]:
+    """
+    Load a project's catalog.
+
+    Args:
+        target_dir: Project root.
+
+    Returns:
+        Catalog entries ([] if the project has no readable catalog).
+    """
+    return _read_entries(target_dir / config.CATALOG_FILE) or []
+
+
+def refresh_catalog(target_dir: Path, assets_dir: Path | None = None) -> bool:
+    """
+    Compile the project catalog from the files installed under .claude/.
+
+    Shipped entries are reused for files that still match the shipped asset
+    index; everything else (edited or project-owned files) is compiled.
+
+    Args:
+        target_dir: Project root.
+        assets_dir: Assets directory (defaults to the packaged assets).
+
+    Returns:
+        True if the catalog file changed.
+    """
+    known: dict[str, tuple[str, dict[str, Any]]] = {}
+    shipped = load_shipped_catalog(assets_dir)
+    if shipped:
+        index = load_asset_index(assets_dir)
+        for entry in shipped:
+            rel_path = str(entry.get("path", ""))
+            digest = index.get(rel_path, {}).get("sha256")
+            if isinstance(digest, str):
+                known[rel_path] = (digest, entry)
+    entries = build_catalog(target_dir, known=known)
+    entries += build_catalog(target_dir, external=True)
+    try:
+        return write_catalog(target_dir / config.CATALOG_FILE, entries)
+    except OSError:
+        return False
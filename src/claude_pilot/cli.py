@@ -7,16 +7,17 @@ This module provides the Click command-line interface for the claude-pilot tool.
 from __future__ import annotations
 
 from pathlib import Path
+from typing import IO
 
 import click
 from click import ClickException
 
 from claude_pilot import config
 from claude_pilot.initializer import InitStatus, ProjectInitializer
+from claude_pilot.update_check import get_cached_latest_version
 from claude_pilot.updater import (
     MergeStrategy,
     get_current_version,
-    get_latest_version,
     perform_update,
 )
 
@@ -93,12 +94,18 @@ def version() -> None:
     Show version information.
 
     Displays both the current installed version and the latest available version.
+    The latest version comes from a cache refreshed in the background, so this
+    command never waits on PyPI; before the first check completes it is shown
+    as unknown.
     """
     print_banner()
     current = get_current_version()
-    latest = get_latest_version()
+    latest = get_cached_latest_version()
     click.echo("claude-pilot version information:")
-    click.echo(f"  Latest:  {latest}")
+    if latest is None:
+        click.echo("  Latest:  unknown (checking in background)")
+    else:
+        click.echo(f"  Latest:  {latest}")
     click.echo(f"  Current: {current}")
     click.echo()
     if current == latest:
@@ -163,9 +170,9 @@ def init(path: Path, lang: str | None, force: bool, yes: bool, skip_external_ski
 )
 @click.option(
     "--strategy",
-    type=click.Choice(["auto", "manual"]),
+    type=click.Choice(["auto", "manual", "merge"]),
     default="auto",
-    help="Merge strategy: auto (default) or manual",
+    help="Merge strategy: auto (default), manual, or merge (three-way merge of local edits)",
 )
 @click.option(
     "--skip-pip",
@@ -182,18 +189,30 @@ def init(path: Path, lang: str | None, force: bool, yes: bool, skip_external_ski
     is_flag=True,
     help="Apply statusline configuration to existing settings.json",
 )
+@click.option(
+    "--native-statusline",
+    is_flag=True,
+    help="With --apply-statusline, install the native Python statusline",
+)
 @click.option(
     "--skip-external-skills",
     is_flag=True,
     help="Skip syncing external skills during update",
 )
+@click.option(
+    "--refresh-skills",
+    is_flag=True,
+    help="Check GitHub for newer external skills even if skills.lock verifies",
+)
 def update(
     target_dir: Path | None,
     strategy: str,
     skip_pip: bool,
     check_only: bool,
     apply_statusline: bool,
+    native_statusline: bool,
     skip_external_skills: bool,
+    refresh_skills: bool,
 ) -> None:
     """
     Update claude-pilot to the latest version.
@@ -207,7 +226,7 @@ def update(
     # Handle --apply-statusline flag
     if apply_statusline:
         from claude_pilot.updater import apply_statusline as apply_sl
-        result = apply_sl(target_dir)
+        result = apply_sl(target_dir, native=native_statusline)
         if result:
             click.echo()
             success("statusLine configuration applied successfully!")
@@ -222,7 +241,7 @@ def update(
         from claude_pilot.updater import sync_external_skills
 
         click.echo()
-        sync_status = sync_external_skills(target_dir, skip=False)
+        sync_status = sync_external_skills(target_dir, skip=False, refresh=refresh_skills)
         if sync_status == "success":
             success("External skills synced")
         elif sync_status == "already_current":
@@ -250,6 +269,1100 @@ def update(
             success("Update complete!")
 
 
+@main.command()
+def statusline() -> None:
+    """
+    Print the Claude Code statusline (reads statusline JSON from stdin).
+
+    Same output as the claude-pilot-statusline entry point, which skips
+    the CLI imports and is what --native-statusline installs.
+    """
+    from claude_pilot.statusline import main as statusline_main
+
+    statusline_main()
+
+
+@main.command()
+@click.option("--refresh", is_flag=True, help="Ignore the cached state and probe again")
+@click.option("--json", "as_json", is_flag=True, help="Print capabilities as JSON")
+@click.option("--env", "as_env", is_flag=True, help="Print shell variable assignments")
+def probe(refresh: bool, as_json: bool, as_env: bool) -> None:
+    """
+    Show detected external tools (codex, jq, git, ...) and Codex auth status.
+
+    Results are cached in the user cache directory and reused until PATH,
+    a PATH directory or the Codex auth file changes. Shell scripts can
+    source the generated probe.env instead of re-probing.
+    """
+    import json
+
+    from claude_pilot.probe import PROBE_ENV_FILE, get_capabilities
+
+    caps = get_capabilities(refresh=refresh)
+    if as_json:
+        click.echo(json.dumps({**caps.to_dict(), "cached": caps.cached}, indent=2))
+        return
+    if as_env:
+        click.echo(caps.to_env(), nl=False)
+        return
+
+    for tool, path in caps.tools.items():
+        click.echo(f"  {tool:<10} {path or '-'}")
+    click.echo(f"  {'codex auth':<10} {'yes' if caps.codex_auth else 'no'}")
+    info(f"{'Cached' if caps.cached else 'Probed'}; env file: "
+         f"{config.get_cache_dir() / PROBE_ENV_FILE}")
+
+
+@main.command()
+@click.option(
+    "--target-dir",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    default=None,
+    help="Project whose .claude/skills.lock pins the skill refs (default: none)",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=None,
+    help="Cache directory to fill (default: $CLAUDE_PILOT_CACHE_DIR or ~/.cache/claude-pilot)",
+)
+@click.option("--json", "as_json", is_flag=True, help="Print the report as JSON")
+def prefetch(target_dir: Path | None, cache_dir: Path | None, as_json: bool) -> None:
+    """
+    Warm the cache so init and update can run offline (e.g. in a container image).
+
+    Fetches the latest version metadata and the external skill tarballs
+    (locked refs when --target-dir has a skills.lock). Copy the cache
+    directory into the image and set CLAUDE_PILOT_CACHE_DIR and
+    CLAUDE_PILOT_OFFLINE=1 to run without network access.
+    """
+    import json
+    import os
+
+    from claude_pilot.prefetch import prefetch as run_prefetch
+
+    if cache_dir is not None:
+        os.environ[config.CACHE_DIR_ENV] = str(cache_dir.resolve())
+    report = run_prefetch(target_dir)
+
+    if as_json:
+        click.echo(json.dumps(report.to_dict(), indent=2))
+    else:
+        click.echo(f"  {'latest':<22} {report.latest_version or '-'}")
+        for name, ref in report.skills.items():
+            click.echo(f"  {name:<22} {ref[:7]}")
+        for name in report.failed:
+            warning(f"Could not prefetch {name}")
+        info(f"Cache: {report.cache_dir}")
+        info(f"Run offline with {config.CACHE_DIR_ENV}={report.cache_dir} "
+             f"{config.OFFLINE_ENV}=1")
+    if not report.ok:
+        raise SystemExit(1)
+
+
+@main.command()
+@click.argument("task", required=False)
+@click.option(
+    "--expert",
+    "-e",
+    "experts",
+    multiple=True,
+    help="Expert prompt to use (e.g. architect, code-reviewer); repeatable, run concurrently",
+)
+@click.option(
+    "--batch",
+    type=click.File("r"),
+    default=None,
+    help='JSON array of {"expert", "task", "mode"?} requests ("-" for stdin)',
+)
+@click.option(
+    "--mode",
+    type=click.Choice(list(config.CODEX_SANDBOX_MODES)),
+    default="read-only",
+    show_default=True,
+    help="Codex sandbox mode",
+)
+@click.option("--model", default=None, help="Model (default: $CODEX_MODEL or gpt-5.2)")
+@click.option("--timeout", type=float, default=None, help="Per-request timeout in seconds")
+@click.option(
+    "--max-workers",
+    type=click.IntRange(min=1),
+    default=config.CODEX_MAX_CONCURRENCY,
+    show_default=True,
+    help="Maximum concurrent codex processes",
+)
+@click.option("--no-cache", is_flag=True, help="Do not use the delegation result cache")
+@click.option("--refresh", is_flag=True, help="Ignore cached results but store fresh ones")
+@click.option("--json", "as_json", is_flag=True, help="Print results (with latency) as JSON")
+def delegate(
+    task: str | None,
+    experts: tuple[str, ...],
+    batch: IO[str] | None,
+    mode: str,
+    model: str | None,
+    timeout: float | None,
+    max_workers: int,
+    no_cache: bool,
+    refresh: bool,
+    as_json: bool,
+) -> None:
+    """
+    Delegate TASK to one or more GPT experts via Codex, concurrently.
+
+    TASK "-" reads the task from stdin. Each result reports its latency.
+    Read-only results are cached in .claude/local/delegation-cache/ keyed by
+    expert prompt, model and task, so repeated delegations return instantly.
+    """
+    import json
+    import sys
+
+    from claude_pilot.codex import (
+        CodexBroker,
+        DelegationCache,
+        DelegationRequest,
+        detect_codex_cli,
+    )
+
+    try:
+        if batch is not None:
+            items = json.load(batch)
+            requests = [
+                DelegationRequest(
+                    expert=item["expert"],
+                    task=item["task"],
+                    mode=item.get("mode", mode),
+                    model=item.get("model"),
+                )
+                for item in items
+            ]
+        else:
+            if not task or not experts:
+                raise click.UsageError("Specify TASK and at least one --expert, or --batch")
+            if task == "-":
+                task = sys.stdin.read()
+            requests = [DelegationRequest(expert=e, task=task, mode=mode) for e in experts]
+    except (ValueError, KeyError, TypeError) as e:
+        raise ClickException(f"Invalid delegation request: {e}") from e
+
+    if not detect_codex_cli():
+        raise ClickException("Codex CLI not found in PATH")
+
+    target_dir = config.get_target_dir()
+    cache = None if no_cache else DelegationCache(target_dir / config.DELEGATION_CACHE_DIR)
+    with CodexBroker(
+        target_dir,
+        max_workers=max_workers,
+        model=model,
+        timeout=timeout,
+        cache=cache,
+        refresh_cache=refresh,
+    ) as broker:
+        results = broker.run_all(requests)
+
+    if as_json:
+        click.echo(json.dumps([r.to_dict() for r in results], ensure_ascii=False, indent=2))
+    else:
+        for result in results:
+            status = ("cached" if result.cached else "ok") if result.ok else "failed"
+            click.secho(
+                f"== {result.request.expert} ({status}, {result.latency:.1f}s) ==",
+                fg="green" if result.ok else "red",
+            )
+            click.echo(result.output.rstrip() or result.error or "")
+            click.echo()
+    if not all(result.ok for result in results):
+        raise SystemExit(1)
+
+
+@main.command()
+@click.argument("file", required=False)
+@click.option(
+    "--target-dir",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    default=None,
+    help="Project root (default: $CLAUDE_PROJECT_DIR or current directory)",
+)
+@click.option(
+    "--hook-input",
+    is_flag=True,
+    help="Read the edited file path from hook tool-input JSON on stdin",
+)
+@click.option(
+    "--suffix",
+    "suffixes",
+    multiple=True,
+    help="Only print files with this suffix (e.g. --suffix .py); repeatable",
+)
+@click.option(
+    "--rebuild",
+    is_flag=True,
+    help="Rebuild the import graph cache from scratch",
+)
+@click.option(
+    "--json",
+    "as_json",
+    is_flag=True,
+    help="Print the result as a JSON array",
+)
+def scope(
+    file: str | None,
+    target_dir: Path | None,
+    hook_input: bool,
+    suffixes: tuple[str, ...],
+    rebuild: bool,
+    as_json: bool,
+) -> None:
+    """
+    Print the files affected by an edit (the file and its reverse dependencies).
+
+    Used by the typecheck and lint hooks to check only what an edit can reach.
+    The import graph is cached in .claude/local/import-graph.json.
+    """
+    import json
+    import os
+    import sys
+
+    from claude_pilot.depgraph import affected_files, read_hook_file_path, rebuild_graph
+
+    if hook_input:
+        try:
+            payload = json.load(sys.stdin)
+        except ValueError:
+            payload = {}
+        file = read_hook_file_path(payload) if isinstance(payload, dict) else None
+        if target_dir is None and isinstance(payload, dict) and payload.get("cwd"):
+            target_dir = Path(payload["cwd"])
+
+    if target_dir is None:
+        project_dir = os.environ.get("CLAUDE_PROJECT_DIR")
+        target_dir = Path(project_dir) if project_dir else config.get_target_dir()
+
+    files: list[str] = []
+    if file:
+        files = affected_files(target_dir, file, rebuild=rebuild)
+    elif rebuild:
+        count = rebuild_graph(target_dir)
+        info(f"Import graph rebuilt ({count} source files)")
+
+    if suffixes:
+        files = [f for f in files if f.endswith(suffixes)]
+
+    if as_json:
+        click.echo(json.dumps(files))
+    else:
+        for path in files:
+            click.echo(path)
+
+
+@main.command()
+@click.option(
+    "--target-dir",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    default=None,
+    help="Project root (default: current directory)",
+)
+@click.option("--rehash", is_flag=True, help="Ignore the stat cache and hash every file")
+@click.option("--json", "as_json", is_flag=True, help="Print the report as JSON")
+def verify(target_dir: Path | None, rehash: bool, as_json: bool) -> None:
+    """
+    Check managed .claude/ files against the installed version's digests.
+
+    Lists modified, missing and extra files; exits 1 if any managed file
+    is modified or missing, or if the project's .pilot-version is not the
+    installed version. Unchanged files are answered from a stat cache.
+    """
+    import json
+
+    from claude_pilot.verify import verify_project
+
+    target_dir = target_dir or config.get_target_dir()
+    report = verify_project(target_dir, rehash=rehash)
+
+    if as_json:
+        click.echo(json.dumps(report.to_dict(), indent=2))
+    elif report.outdated:
+        error(
+            f"Project is at version {report.project_version}, installed claude-pilot is "
+            f"{report.package_version}; run `claude-pilot update` before verifying"
+        )
+    else:
+        for label, paths in (
+            ("modified", report.modified),
+            ("missing", report.missing),
+            ("extra", report.extra),
+        ):
+            for path in paths:
+                click.echo(f"  {label:<9} {path}")
+        summary = f"{report.checked} managed files checked ({report.hashed} hashed)"
+        if report.ok:
+            success(f"{summary}; all match version {config.VERSION}")
+        else:
+            warning(f"{summary}; {len(report.modified)} modified, {len(report.missing)} missing")
+    if not report.ok:
+        raise SystemExit(1)
+
+
+@main.command()
+@click.option(
+    "--target-dir",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    default=None,
+    help="Project root (default: current directory)",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Worker processes (default: CPU count; 1 scans in-process)",
+)
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Also write the inventory JSON to this file",
+)
+@click.option("--json", "as_json", is_flag=True, help="Print the inventory as JSON")
+def scan(target_dir: Path | None, workers: int | None, output: Path | None, as_json: bool) -> None:
+    """
+    Inventory a project and draft its 3-Tier documentation skeleton.
+
+    Lists languages, directories, entry points, test locations and
+    manifests, respecting .gitignore, and proposes CLAUDE.md plus a Tier 2
+    or Tier 3 CONTEXT.md per source directory. Used by /92_init.
+    """
+    import json
+
+    from claude_pilot.scan import scan_project
+
+    inventory = scan_project(target_dir or config.get_target_dir(), workers=workers)
+    data = json.dumps(inventory.to_dict(), indent=2)
+    if output is not None:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(data + "\n", encoding="utf-8")
+
+    if as_json:
+        click.echo(data)
+        return
+    for language, totals in inventory.languages.items():
+        click.echo(f"  {language:<12} {totals['files']:>6} files {totals['lines']:>9} lines")
+    click.echo()
+    for entry_point in inventory.entry_points:
+        click.echo(f"  entry      {entry_point['path']} ({entry_point['kind']})")
+    for location in inventory.tests:
+        click.echo(f"  tests      {location['path']} ({location['files']} files)")
+    for manifest in inventory.manifests:
+        click.echo(f"  manifest   {manifest}")
+    click.echo()
+    for doc in inventory.skeleton:
+        status = "exists" if doc["exists"] else "draft"
+        click.echo(f"  Tier {doc['tier']}  {status:<6}  {doc['path']}  - {doc['summary']}")
+    click.echo()
+    success(
+        f"{inventory.files} files, {inventory.lines} lines via {inventory.source} "
+        f"({inventory.workers} worker{'s' if inventory.workers != 1 else ''})"
+    )
+    if output is not None:
+        info(f"Inventory written to {output}")
+
+
+@main.group("index")
+@click.option(
+    "--target-dir",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    default=None,
+    help="Project directory (default: $CLAUDE_PROJECT_DIR or current directory)",
+)
+@click.pass_context
+def index_group(ctx: click.Context, target_dir: Path | None) -> None:
+    """
+    Look up symbol definitions through the persistent symbol index.
+    """
+    import os
+
+    if target_dir is None and os.environ.get("CLAUDE_PROJECT_DIR"):
+        target_dir = Path(os.environ["CLAUDE_PROJECT_DIR"])
+    ctx.obj = target_dir
+
+
+@index_group.command("update")
+@click.argument("files", nargs=-1)
+@click.option(
+    "--hook-input",
+    is_flag=True,
+    help="Read the edited file path from hook tool-input JSON on stdin",
+)
+@click.option("--rebuild", is_flag=True, help="Re-parse every file")
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Worker processes (default: CPU count)",
+)
+@click.option("--json", "as_json", is_flag=True, help="Print the result as JSON")
+@click.pass_obj
+def index_update(
+    target_dir: Path | None,
+    files: tuple[str, ...],
+    hook_input: bool,
+    rebuild: bool,
+    workers: int | None,
+    as_json: bool,
+) -> None:
+    """
+    Update the index: the given files, or every changed file in the project.
+
+    Files are only re-parsed when their content hash changed. With
+    --hook-input this is a PostToolUse hook for Edit/Write; it leaves an
+    index that was never built alone (the first `index find` builds it).
+    """
+    import json
+    import sys
+
+    from claude_pilot.depgraph import read_hook_file_path
+    from claude_pilot.symbols import SymbolIndex
+
+    paths: list[str | Path] = list(files)
+    if hook_input:
+        try:
+            payload = json.load(sys.stdin)
+        except ValueError:
+            payload = {}
+        file = read_hook_file_path(payload) if isinstance(payload, dict) else None
+        if target_dir is None and isinstance(payload, dict) and payload.get("cwd"):
+            target_dir = Path(payload["cwd"])
+        if file is None:
+            if as_json:
+                click.echo(json.dumps({"changed": 0}))
+            return
+        paths.append(file)
+
+    with SymbolIndex(target_dir) as index:
+        if hook_input and not index.built:
+            changed = 0
+        elif paths and index.built and not rebuild:
+            changed = index.update_files(paths)
+        else:
+            changed = index.refresh(full=rebuild, workers=workers)
+        stats = index.stats()
+
+    if as_json:
+        click.echo(json.dumps({"changed": changed, **stats}))
+    elif not hook_input:
+        info(f"Symbol index: {changed} files changed; "
+             f"{stats['symbols']} symbols in {stats['files']} files")
+
+
+@index_group.command("find")
+@click.argument("name")
+@click.option("--prefix", is_flag=True, help="Match names starting with NAME")
+@click.option("--ignore-case", "-i", is_flag=True, help="Match case-insensitively")
+@click.option("--kind", default=None, help="Only this kind (function, class, method, ...)")
+@click.option("--limit", type=int, default=50, help="Maximum number of results")
+@click.option("--refresh", is_flag=True, help="Update the index before the lookup")
+@click.option("--json", "as_json", is_flag=True, help="Print definitions as JSON")
+@click.pass_obj
+def index_find(
+    target_dir: Path | None,
+    name: str,
+    prefix: bool,
+    ignore_case: bool,
+    kind: str | None,
+    limit: int,
+    refresh: bool,
+    as_json: bool,
+) -> None:
+    """
+    Print where NAME is defined (path:line kind name).
+
+    NAME may be dotted (Class.method). The index is built on first use and
+    otherwise not refreshed, so lookups stay fast; hooks keep it current.
+    """
+    import json
+
+    from claude_pilot.symbols import SymbolIndex
+
+    with SymbolIndex(target_dir) as index:
+        symbols = index.find(
+            name, prefix=prefix, ignore_case=ignore_case, kind=kind, limit=limit, refresh=refresh
+        )
+
+    if as_json:
+        click.echo(json.dumps([s.to_dict() for s in symbols]))
+        return
+    if not symbols:
+        raise ClickException(f"No definition found: {name}")
+    for symbol in symbols:
+        click.echo(f"{symbol.path}:{symbol.line}  {symbol.kind:<9} {symbol.qualified_name}")
+
+
+@main.group()
+@click.option(
+    "--target-dir",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    default=None,
+    help="Project directory (default: current directory)",
+)
+@click.pass_context
+def context(ctx: click.Context, target_dir: Path | None) -> None:
+    """
+    Measure the context tokens claude-pilot's assets add to sessions.
+    """
+    ctx.obj = target_dir or config.get_target_dir()
+
+
+@context.command("profile")
+@click.option("--all", "show_all", is_flag=True, help="List every file (default: top 20)")
+@click.option(
+    "--startup-budget",
+    type=int,
+    default=None,
+    help=f"Session-start token budget (default: {config.CONTEXT_STARTUP_BUDGET})",
+)
+@click.option("--strict", is_flag=True, help="Exit 1 if anything is over budget")
+@click.option("--json", "as_json", is_flag=True, help="Print the profile as JSON")
+@click.pass_obj
+def context_profile(
+    target_dir: Path,
+    show_all: bool,
+    startup_budget: int | None,
+    strict: bool,
+    as_json: bool,
+) -> None:
+    """
+    Estimate tokens per file and tier, split into session-start and on-demand.
+
+    CLAUDE.md (and its @-imports), unscoped rules and skill/agent/command
+    frontmatter load into every session; CONTEXT.md tiers, skill bodies and
+    guides load on demand. Files over their budget are flagged.
+    """
+    import json
+
+    from claude_pilot.context_profile import profile_context
+
+    profile = profile_context(target_dir, startup_budget=startup_budget)
+    if as_json:
+        click.echo(json.dumps(profile.to_dict(), indent=2))
+    else:
+        shown = list(profile.files if show_all else profile.files[:20])
+        shown += [f for f in profile.over_budget if f not in shown]
+        click.echo(f"  {'tokens':>7}  {'load':<9}  {'category':<8}  path")
+        for f in shown:
+            flag = f"  (over {f.budget})" if f.over_budget else ""
+            click.echo(f"  {f.tokens:>7}  {f.load:<9}  {f.category:<8}  {f.path}{flag}")
+        if len(shown) < len(profile.files):
+            click.echo(f"  ... {len(profile.files) - len(shown)} more (use --all)")
+        click.echo()
+        for category, totals in profile.by_category().items():
+            click.echo(
+                f"  {category:<8} {totals['files']:>4} files {totals['tokens']:>8} tokens"
+                f" ({totals['startup_tokens']} at session start)"
+            )
+        click.echo()
+        summary = (
+            f"Session start: {profile.startup_tokens} tokens (budget {profile.startup_budget}); "
+            f"on demand: {profile.on_demand_tokens} tokens"
+        )
+        if profile.ok:
+            success(summary)
+        else:
+            warning(summary)
+            if profile.over_budget:
+                warning(f"{len(profile.over_budget)} files over budget")
+    if strict and not profile.ok:
+        raise SystemExit(1)
+
+
+@main.group()
+@click.option(
+    "--target-dir",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    default=None,
+    help="Project directory (default: current directory)",
+)
+@click.pass_context
+def skills(ctx: click.Context, target_dir: Path | None) -> None:
+    """
+    Verify or sync external skills pinned in .claude/skills.lock.
+    """
+    ctx.obj = target_dir or config.get_target_dir()
+
+
+@skills.command("verify")
+@click.option("--json", "as_json", is_flag=True, help="Print the report as JSON")
+@click.pass_obj
+def skills_verify(target_dir: Path, as_json: bool) -> None:
+    """
+    Check installed external skills against skills.lock (no network).
+
+    Exits 1 if a source is not locked or any file differs from the lock.
+    """
+    import json
+
+    from claude_pilot.skills_lock import verify_skills
+
+    report = verify_skills(target_dir)
+    if as_json:
+        click.echo(json.dumps(report.to_dict(), indent=2))
+    else:
+        for label, paths in (
+            ("unlocked", report.unlocked),
+            ("modified", report.modified),
+            ("missing", report.missing),
+            ("extra", report.extra),
+        ):
+            for path in paths:
+                click.echo(f"  {label:<9} {path}")
+        if report.ok:
+            success(f"{report.checked} skill files match skills.lock")
+        else:
+            warning("External skills differ from skills.lock (run `claude-pilot skills sync`)")
+    if not report.ok:
+        raise SystemExit(1)
+
+
+@skills.command("sync")
+@click.option("--refresh", is_flag=True, help="Check GitHub for newer commits and re-lock")
+@click.pass_obj
+def skills_sync(target_dir: Path, refresh: bool) -> None:
+    """
+    Install external skills from skills.lock, or the latest commits with --refresh.
+    """
+    from claude_pilot.updater import sync_external_skills
+
+    status = sync_external_skills(target_dir, refresh=refresh)
+    if status == "failed":
+        raise ClickException("External skills sync failed")
+    if status == "success":
+        success("External skills synced")
+    else:
+        info("External skills already up to date")
+
+
+@main.group()
+@click.option(
+    "--target-dir",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    default=None,
+    help="Project directory (default: current directory)",
+)
+@click.pass_context
+def plans(ctx: click.Context, target_dir: Path | None) -> None:
+    """
+    Query plans in .pilot/plan through the persistent plan index.
+    """
+    ctx.obj = target_dir
+
+
+@plans.command("list")
+@click.option(
+    "--state",
+    type=click.Choice([*config.PLAN_STATES, config.PLAN_ARCHIVED_STATE]),
+    default=None,
+    help="Only list plans in this state",
+)
+@click.option("--limit", type=int, default=None, help="Maximum number of plans")
+@click.option("--json", "as_json", is_flag=True, help="Print plans as JSON")
+@click.pass_obj
+def plans_list(target_dir: Path | None, state: str | None, limit: int | None, as_json: bool) -> None:
+    """List indexed plans."""
+    import json
+
+    from claude_pilot.plans import PlanIndex
+
+    with PlanIndex(target_dir) as index:
+        records = index.list_plans(state=state, limit=limit)
+
+    if as_json:
+        click.echo(json.dumps([r.to_dict() for r in records], ensure_ascii=False, indent=2))
+        return
+    for record in records:
+        click.echo(f"{record.state:<12} {record.plan_id}  {record.title or ''}".rstrip())
+
+
+@plans.command("count")
+@click.option("--json", "as_json", is_flag=True, help="Print counts as JSON")
+@click.pass_obj
+def plans_count(target_dir: Path | None, as_json: bool) -> None:
+    """Count plans per state."""
+    import json
+
+    from claude_pilot.plans import PlanIndex
+
+    with PlanIndex(target_dir) as index:
+        counts = index.count()
+
+    if as_json:
+        click.echo(json.dumps(counts))
+        return
+    for state, count in counts.items():
+        click.echo(f"{state:<12} {count}")
+
+
+@plans.command("show")
+@click.argument("plan_id")
+@click.option("--json", "as_json", is_flag=True, help="Print the plan record as JSON")
+@click.pass_obj
+def plans_show(target_dir: Path | None, plan_id: str, as_json: bool) -> None:
+    """Show a plan's indexed metadata."""
+    import json
+
+    from claude_pilot.plans import PlanIndex
+
+    with PlanIndex(target_dir) as index:
+        record = index.get(plan_id)
+
+    if record is None:
+        raise ClickException(f"Plan not found: {plan_id}")
+
+    if as_json:
+        click.echo(json.dumps(record.to_dict(), ensure_ascii=False, indent=2))
+        return
+    click.echo(f"Plan:     {record.plan_id}")
+    click.echo(f"State:    {record.state}")
+    if record.bundle:
+        click.echo(f"Path:     {config.PLAN_ARCHIVE_DIR}/{record.bundle}:{record.path}")
+    else:
+        click.echo(f"Path:     {config.PLAN_DIR}/{record.path}")
+    click.echo(f"Title:    {record.title or '-'}")
+    click.echo(f"Branch:   {record.branch or '-'}")
+    click.echo(f"Created:  {record.created_at or '-'}")
+    if record.success_criteria:
+        click.echo("Success criteria:")
+        for criterion in record.success_criteria:
+            click.echo(f"  - {criterion['id']}: {criterion['description']}")
+
+
+@plans.command("search")
+@click.argument("query", nargs=-1, required=True)
+@click.option(
+    "--state",
+    type=click.Choice([*config.PLAN_STATES, config.PLAN_ARCHIVED_STATE]),
+    default=None,
+    help="Only search plans in this state",
+)
+@click.option("--limit", type=int, default=20, show_default=True, help="Maximum number of hits")
+@click.option("--json", "as_json", is_flag=True, help="Print hits as JSON")
+@click.pass_obj
+def plans_search(
+    target_dir: Path | None,
+    query: tuple[str, ...],
+    state: str | None,
+    limit: int,
+    as_json: bool,
+) -> None:
+    """
+    Full-text search over plan titles and content, best match first.
+
+    Every word must match; end a word with * to match a prefix.
+    """
+    import json
+
+    from claude_pilot.plans import PlanIndex
+
+    with PlanIndex(target_dir) as index:
+        hits = index.search(" ".join(query), state=state, limit=limit)
+
+    if as_json:
+        click.echo(json.dumps([h.to_dict() for h in hits], ensure_ascii=False, indent=2))
+        return
+    if not hits:
+        info("No matching plans")
+        return
+    for hit in hits:
+        plan = hit.plan
+        click.echo(f"{plan.state:<12} {plan.plan_id}  {plan.title or ''}".rstrip())
+        click.echo(f"    {hit.snippet}")
+
+
+@plans.command("archive")
+@click.option(
+    "--older-than",
+    "older_than",
+    type=click.IntRange(min=0),
+    default=config.PLAN_ARCHIVE_MIN_AGE_DAYS,
+    show_default=True,
+    help="Archive done plans last modified more than this many days ago",
+)
+@click.option("--dry-run", is_flag=True, help="Only list the plans that would be archived")
+@click.pass_obj
+def plans_archive(target_dir: Path | None, older_than: int, dry_run: bool) -> None:
+    """
+    Pack old done plans into monthly bundles in .pilot/plan/archive/.
+
+    Archived plans stay listable, searchable and readable through the
+    plan index; use `plans extract` to restore one.
+    """
+    from claude_pilot.plans import PlanIndex
+
+    with PlanIndex(target_dir) as index:
+        records = index.archive(older_than_days=older_than, dry_run=dry_run)
+
+    if not records:
+        info(f"No done plans older than {older_than} days")
+        return
+    for record in records:
+        click.echo(f"  {record.plan_id}")
+    if dry_run:
+        info(f"{len(records)} plans would be archived")
+    else:
+        success(f"Archived {len(records)} plans to {config.PLAN_ARCHIVE_DIR}/")
+
+
+@plans.command("extract")
+@click.argument("plan_id")
+@click.option(
+    "--dest",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=None,
+    help="Destination directory (default: .pilot/plan/done, restoring the plan)",
+)
+@click.pass_obj
+def plans_extract(target_dir: Path | None, plan_id: str, dest: Path | None) -> None:
+    """Extract an archived plan and its artifacts from its bundle."""
+    from claude_pilot.plans import PlanIndex
+
+    with PlanIndex(target_dir) as index:
+        written = index.extract(plan_id, dest)
+
+    if written is None:
+        raise ClickException(f"Plan is not archived: {plan_id}")
+    success(f"Extracted {len(written)} files")
+
+
+@plans.command("reindex")
+@click.pass_obj
+def plans_reindex(target_dir: Path | None) -> None:
+    """Rebuild the plan index from the plan directories."""
+    from claude_pilot.plans import PlanIndex
+
+    with PlanIndex(target_dir) as index:
+        index.refresh(full=True)
+        total = sum(index.count(refresh=False).values())
+    success(f"Plan index rebuilt ({total} plans)")
+
+
+@main.group()
+@click.option(
+    "--target-dir",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    default=None,
+    help="Project directory (default: current directory)",
+)
+@click.pass_context
+def worktree(ctx: click.Context, target_dir: Path | None) -> None:
+    """
+    Manage git worktrees for parallel plan execution.
+    """
+    ctx.obj = target_dir
+
+
+@worktree.command("create")
+@click.argument("plan", required=False)
+@click.option(
+    "--next", "next_pending", is_flag=True, help="Lock and use the oldest free pending plan"
+)
+@click.option("--main-branch", default=None, help="Base branch (default: current branch)")
+@click.option("--pool", "use_pool", is_flag=True, help="Lease a pre-warmed slot from the pool")
+@click.option(
+    "--sparse",
+    "sparse",
+    multiple=True,
+    help="Directory to check out (sparse cone); repeatable. Default: the plan's Scope",
+)
+@click.option("--full", is_flag=True, help="Check out the full tree even if the plan has a Scope")
+@click.option(
+    "--no-shared-caches",
+    is_flag=True,
+    help="Do not hardlink node_modules from the main checkout",
+)
+@click.option("--json", "as_json", is_flag=True, help="Print the worktree metadata as JSON")
+@click.pass_obj
+def worktree_create(
+    target_dir: Path | None,
+    plan: str | None,
+    next_pending: bool,
+    main_branch: str | None,
+    use_pool: bool,
+    sparse: tuple[str, ...],
+    full: bool,
+    no_shared_caches: bool,
+    as_json: bool,
+) -> None:
+    """
+    Create the worktree for PLAN (lock, branch, metadata, active pointers).
+
+    Only the directories named in the plan's Scope section are checked out
+    unless --sparse or --full is given. Prints the absolute worktree path.
+    """
+    import json
+
+    from claude_pilot.worktree import WorktreeError, WorktreeManager
+
+    manager = WorktreeManager(target_dir)
+    locked = False
+    if next_pending:
+        plan_path = manager.select_and_lock_pending()
+        if plan_path is None:
+            raise ClickException("No unlocked pending plans")
+        plan, locked = str(plan_path), True
+    if not plan:
+        raise click.UsageError("Specify PLAN or --next")
+    if use_pool and (sparse or full):
+        raise click.UsageError("--sparse/--full cannot be combined with --pool")
+
+    try:
+        metadata = manager.create(
+            plan,
+            main_branch=main_branch,
+            use_pool=use_pool,
+            locked=locked,
+            sparse=[] if full else (list(sparse) or None),
+            share_caches=not no_shared_caches,
+        )
+    except WorktreeError as e:
+        raise ClickException(str(e)) from e
+    if as_json:
+        click.echo(json.dumps(metadata.to_dict(), indent=2))
+    else:
+        click.echo(metadata.worktree_path)
+
+
+@worktree.command("info")
+@click.argument("plan")
+@click.option("--json", "as_json", is_flag=True, help="Print the worktree metadata as JSON")
+@click.pass_obj
+def worktree_info(target_dir: Path | None, plan: str, as_json: bool) -> None:
+    """Show the worktree metadata recorded for PLAN."""
+    import json
+
+    from claude_pilot.worktree import WorktreeManager
+
+    metadata = WorktreeManager(target_dir).get_metadata(plan)
+    if metadata is None:
+        raise ClickException(f"No worktree for plan: {plan}")
+    if as_json:
+        click.echo(json.dumps(metadata.to_dict(), indent=2))
+        return
+    click.echo(f"Branch:        {metadata.branch}")
+    click.echo(f"Worktree Path: {metadata.worktree_path}")
+    click.echo(f"Main Branch:   {metadata.main_branch}")
+    click.echo(f"Main Project:  {metadata.main_project}")
+    click.echo(f"Lock File:     {metadata.lock_file or '-'}")
+    click.echo(f"Created At:    {metadata.created_at or '-'}")
+    if metadata.sparse_paths:
+        click.echo(f"Sparse Paths:  {metadata.sparse_paths}")
+
+
+@worktree.command("cleanup")
+@click.argument("plan")
+@click.option("--keep-branch", is_flag=True, help="Keep the plan branch")
+@click.pass_obj
+def worktree_cleanup(target_dir: Path | None, plan: str, keep_branch: bool) -> None:
+    """Remove PLAN's worktree, branch, lock and active pointers."""
+    from claude_pilot.worktree import WorktreeError, WorktreeManager
+
+    try:
+        metadata = WorktreeManager(target_dir).cleanup(plan, delete_branch=not keep_branch)
+    except WorktreeError as e:
+        error(str(e))
+        raise SystemExit(1) from e
+    if metadata is None:
+        raise ClickException(f"No worktree for plan: {plan}")
+    success(f"Removed worktree {metadata.worktree_path}")
+
+
+@worktree.group()
+def pool() -> None:
+    """
+    Pre-warmed worktree pool (sibling {repo}-wt-pool/ directory).
+
+    Slots are created and set up ahead of time, leased to plans and
+    recycled with git reset/clean instead of being deleted.
+    """
+
+
+@pool.command("fill")
+@click.option("--size", type=click.IntRange(min=1), default=None, help="Number of slots to keep")
+@click.option("--main-branch", default=None, help="Branch idle slots are reset to")
+@click.option(
+    "--setup",
+    default=None,
+    help='Command run in each new slot to install dependencies (e.g. "npm ci")',
+)
+@click.pass_obj
+def pool_fill(
+    target_dir: Path | None, size: int | None, main_branch: str | None, setup: str | None
+) -> None:
+    """Create missing slots and reset idle slots to the main branch."""
+    from claude_pilot.worktree import WorktreeError, WorktreePool
+
+    try:
+        created = WorktreePool(target_dir).fill(size=size, main_branch=main_branch, setup=setup)
+    except WorktreeError as e:
+        raise ClickException(str(e)) from e
+    for path in created:
+        info(f"Created {path}")
+    success("Worktree pool ready")
+
+
+@pool.command("lease")
+@click.argument("plan")
+@click.option("--branch", default=None, help="Branch name (default: derived from the plan)")
+@click.pass_obj
+def pool_lease(target_dir: Path | None, plan: str, branch: str | None) -> None:
+    """
+    Lease a slot for PLAN and check out its branch.
+
+    Prints the absolute worktree path.
+    """
+    from claude_pilot.worktree import WorktreeError, WorktreePool
+
+    try:
+        path = WorktreePool(target_dir).lease(plan, branch=branch)
+    except WorktreeError as e:
+        raise ClickException(str(e)) from e
+    click.echo(str(path))
+
+
+@pool.command("release")
+@click.argument("plan_or_path")
+@click.option("--delete-branch", is_flag=True, help="Also delete the plan branch")
+@click.pass_obj
+def pool_release(target_dir: Path | None, plan_or_path: str, delete_branch: bool) -> None:
+    """Reset a leased slot (by plan or worktree path) and return it to the pool."""
+    from claude_pilot.worktree import WorktreeError, WorktreePool
+
+    try:
+        path = WorktreePool(target_dir).release(plan_or_path, delete_branch=delete_branch)
+    except WorktreeError as e:
+        raise ClickException(str(e)) from e
+    if path is None:
+        raise ClickException(f"No leased slot for: {plan_or_path}")
+    success(f"Released {path}")
+
+
+@pool.command("status")
+@click.option("--json", "as_json", is_flag=True, help="Print the pool state as JSON")
+@click.pass_obj
+def pool_status(target_dir: Path | None, as_json: bool) -> None:
+    """Show pool slots and their leases."""
+    import json
+
+    from claude_pilot.worktree import WorktreePool
+
+    state = WorktreePool(target_dir).status()
+    if as_json:
+        click.echo(json.dumps(state, indent=2))
+        return
+    if not state["slots"]:
+        info("Worktree pool is empty (run `claude-pilot worktree pool fill`)")
+        return
+    for slot in state["slots"]:
+        lease = f"  {slot.get('plan')} ({slot.get('branch')})" if slot.get("plan") else ""
+        click.echo(f"{slot['name']:<8} {slot['state']:<9} {slot['path']}{lease}")
+
+
 # =============================================================================
 # MAIN ENTRY POINT
 # =============================================================================
@@ -4,14 +4,37 @@ Codex integration for GPT expert delegation.
 This module provides functionality for detecting Codex CLI installation
 and checking authentication status. GPT delegation is handled via
 codex-sync.sh script using `codex exec` command.
+
+CodexBroker is an in-process delegation client for concurrent expert
+requests (architect, code-reviewer, security-analyst, ...): requests are
+queued and dispatched to `codex exec` with bounded concurrency, expert
+prompts are loaded once per broker, and every result reports its queue
+wait and run latency.
+
+DelegationCache stores successful read-only results keyed by (expert prompt
+template, model, normalized task, git workspace state). The workspace state
+(workspace_state()) fingerprints HEAD, the diff against HEAD and the
+untracked files, so re-running the same review on the same code returns
+instantly instead of spending quota, while a review repeated after the code
+changed runs again. The fingerprint is taken once per run_all() batch.
 """
 
 from __future__ import annotations
 
+import hashlib
 import json
+import os
 import shutil
+import subprocess
+import threading
+import time
+from collections.abc import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, replace
 from pathlib import Path
+from typing import Any
 
+from claude_pilot import config
 from claude_pilot.config import CODEX_AUTH_PATH
 
 
@@ -45,11 +68,449 @@ def check_codex_auth() -> bool:
         return False
 
 
-def is_codex_available() -> bool:
+def is_codex_available(refresh: bool = False) -> bool:
     """
     Check if Codex is fully available (installed and authenticated).
 
+    The answer comes from the memoized environment probe, so repeat calls
+    only stat PATH and the auth file instead of re-parsing it.
+
+    Args:
+        refresh: Re-probe even if the cached result is still valid.
+
     Returns:
         True if Codex CLI is installed and authenticated, False otherwise.
     """
-    return detect_codex_cli() and check_codex_auth()
+    from claude_pilot.probe import get_capabilities
+
+    return get_capabilities(refresh=refresh).codex_available
+
+
+@dataclass
+class DelegationRequest:
+    """A single expert delegation."""
+
+    expert: str
+    task: str
+    mode: str = "read-only"
+    model: str | None = None
+    timeout: float | None = None
+
+    def __post_init__(self) -> None:
+        if self.mode not in config.CODEX_SANDBOX_MODES:
+            raise ValueError(f"Invalid sandbox mode: {self.mode}")
+
+
+@dataclass
+class DelegationResult:
+    """Outcome of a delegation, with timing."""
+
+    request: DelegationRequest
+    output: str
+    returncode: int
+    latency: float
+    queue_wait: float
+    error: str | None = None
+    cached: bool = False
+
+    @property
+    def ok(self) -> bool:
+        """Whether codex exited successfully."""
+        return self.returncode == 0 and self.error is None
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return a JSON-serializable dictionary."""
+        return {
+            "expert": self.request.expert,
+            "mode": self.request.mode,
+            "ok": self.ok,
+            "returncode": self.returncode,
+            "latency": round(self.latency, 3),
+            "queue_wait": round(self.queue_wait, 3),
+            "error": self.error,
+            "cached": self.cached,
+            "output": self.output,
+        }
+
+
+def normalize_task(task: str) -> str:
+    """
+    Normalize delegation input so cosmetic differences share a cache entry.
+
+    Line endings are unified, trailing whitespace is stripped from each line
+    and leading/trailing blank lines are dropped.
+    """
+    lines = [line.rstrip() for line in task.replace("\r\n", "\n").split("\n")]
+    return "\n".join(lines).strip("\n")
+
+
+def workspace_state(target_dir: Path) -> str:
+    """
+    Fingerprint the git working tree a delegation reviews.
+
+    Covers HEAD, the staged and unstaged diff against HEAD, and the names,
+    sizes and mtimes of untracked files, so a "re-review after the fix"
+    with the same task text is not answered from the cache.
+
+    Args:
+        target_dir: Project directory.
+
+    Returns:
+        Hex SHA-256 fingerprint, or "" if git is unavailable.
+    """
+    digest = hashlib.sha256()
+    for args in (
+        ["rev-parse", "HEAD"],
+        ["diff", "HEAD", "--binary"],
+        ["ls-files", "--others", "--exclude-standard", "-z"],
+    ):
+        try:
+            proc = subprocess.run(
+                ["git", *args], cwd=target_dir, capture_output=True, timeout=30
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            return ""
+        digest.update(f"{proc.returncode}\0".encode())
+        digest.update(hashlib.sha256(proc.stdout).digest())
+        if args[0] == "ls-files" and proc.returncode == 0:
+            for name in sorted(proc.stdout.decode("utf-8", "replace").split("\0")):
+                try:
+                    st = (target_dir / name).stat()
+                except OSError:
+                    continue
+                digest.update(f"{name}\0{st.st_size}\0{st.st_mtime_ns}\0".encode())
+    return digest.hexdigest()
+
+
+class DelegationCache:
+    """
+    On-disk cache of delegation outputs with TTL and size-based eviction.
+
+    Each entry is a small JSON file named by its key. Hits refresh the file
+    mtime, so eviction (oldest mtime first) is least-recently-used.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        ttl: float = config.DELEGATION_CACHE_TTL,
+        max_bytes: int = config.DELEGATION_CACHE_MAX_BYTES,
+    ) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding the entries (created on first write).
+            ttl: Seconds an entry stays valid.
+            max_bytes: Total entry size above which least-recently-used
+                entries are evicted.
+        """
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def make_key(prompt_template: str, model: str, task: str, state: str = "") -> str:
+        """
+        Build a cache key from the prompt template, model, normalized task and
+        workspace state (workspace_state()).
+
+        Returns:
+            Hex SHA-256 key.
+        """
+        digest = hashlib.sha256()
+        for part in (prompt_template, model, normalize_task(task), state):
+            digest.update(hashlib.sha256(part.encode("utf-8")).digest())
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> str | None:
+        """
+        Look up a cached output.
+
+        Returns:
+            The cached output, or None if missing or expired.
+        """
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+            created = float(entry["created"])
+            output = entry["output"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        if time.time() - created > self.ttl or not isinstance(output, str):
+            path.unlink(missing_ok=True)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return output
+
+    def put(self, key: str, output: str) -> None:
+        """Store an output, then evict entries if the cache is over its size cap."""
+        path = self._path(key)
+        temp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            temp_path.write_text(
+                json.dumps({"created": time.time(), "output": output}), encoding="utf-8"
+            )
+            os.replace(temp_path, path)
+        except OSError:
+            temp_path.unlink(missing_ok=True)
+            return
+        self.evict()
+
+    def evict(self) -> int:
+        """
+        Remove expired entries, then least-recently-used ones above max_bytes.
+
+        Returns:
+            Number of entries removed.
+        """
+        now = time.time()
+        entries = []
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if entry.name.endswith(".json"):
+                        st = entry.stat()
+                        entries.append((st.st_mtime, st.st_size, Path(entry.path)))
+        except OSError:
+            return 0
+
+        removed = 0
+        total = sum(size for _, size, _ in entries)
+        for mtime, size, path in sorted(entries):
+            # mtime >= created, so an entry untouched for ttl is certainly expired
+            if total <= self.max_bytes and now - mtime <= self.ttl:
+                continue
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self) -> None:
+        """Remove every cache entry."""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+
+class CodexBroker:
+    """
+    Queue and dispatch delegation requests to `codex exec` concurrently.
+
+    Use as a context manager, or call close() when done.
+    """
+
+    def __init__(
+        self,
+        target_dir: Path | None = None,
+        max_workers: int = config.CODEX_MAX_CONCURRENCY,
+        model: str | None = None,
+        timeout: float | None = None,
+        command: list[str] | None = None,
+        cache: DelegationCache | None = None,
+        refresh_cache: bool = False,
+    ) -> None:
+        """
+        Initialize the broker.
+
+        Args:
+            target_dir: Project directory (working directory for codex and base
+                for expert prompts). Defaults to current working directory.
+            max_workers: Maximum concurrent codex processes.
+            model: Model name (default: $CODEX_MODEL or config.CODEX_DEFAULT_MODEL).
+            timeout: Per-request timeout in seconds (default: $CODEX_TIMEOUT or
+                config.CODEX_DEFAULT_TIMEOUT).
+            command: Command prefix (default: ["codex", "exec"]).
+            cache: Result cache for read-only requests (None disables caching).
+            refresh_cache: Skip cache lookups but store fresh results.
+        """
+        self.target_dir = target_dir or config.get_target_dir()
+        self.model = model or os.environ.get("CODEX_MODEL") or config.CODEX_DEFAULT_MODEL
+        self.timeout = timeout or float(
+            os.environ.get("CODEX_TIMEOUT") or config.CODEX_DEFAULT_TIMEOUT
+        )
+        self.command = command or ["codex", "exec"]
+        self.cache = cache
+        self.refresh_cache = refresh_cache
+        self._inflight: dict[str, Future[DelegationResult]] = {}
+        self._inflight_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="codex")
+        self._prompts: dict[str, str] = {}
+        self._prompts_lock = threading.Lock()
+
+    def __enter__(self) -> CodexBroker:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Wait for queued requests and stop the workers."""
+        self._executor.shutdown(wait=True)
+
+    def expert_prompt(self, expert: str) -> str:
+        """
+        Load an expert's system prompt (cached for the broker's lifetime).
+
+        Args:
+            expert: Expert name, e.g. "architect" (file in config.CODEX_PROMPTS_DIR).
+
+        Returns:
+            The prompt text, or a one-line role statement if no prompt file exists.
+        """
+        with self._prompts_lock:
+            if expert not in self._prompts:
+                path = self.target_dir / config.CODEX_PROMPTS_DIR / f"{expert}.md"
+                try:
+                    self._prompts[expert] = path.read_text(encoding="utf-8").strip()
+                except OSError:
+                    self._prompts[expert] = f"You are acting as the {expert} expert."
+            return self._prompts[expert]
+
+    def build_command(self, request: DelegationRequest) -> list[str]:
+        """Build the codex command line; the prompt is passed on stdin."""
+        return [
+            *self.command,
+            "--sandbox",
+            request.mode,
+            "--model",
+            request.model or self.model,
+            "--skip-git-repo-check",
+            "-",
+        ]
+
+    def submit(
+        self, request: DelegationRequest, state: str | None = None
+    ) -> Future[DelegationResult]:
+        """
+        Queue a request.
+
+        Identical cacheable requests already in flight are coalesced: the
+        duplicate resolves with the first request's result instead of
+        starting another codex process.
+
+        Args:
+            request: Delegation request.
+            state: workspace_state() of the target directory for the cache
+                key; computed here when None and the request is cacheable.
+
+        Returns:
+            A future resolving to the DelegationResult (never raising).
+        """
+        queued_at = time.monotonic()
+        key = self._cache_key(request, state)
+        if key is None:
+            return self._executor.submit(self._run, request, None, queued_at)
+
+        with self._inflight_lock:
+            leader = self._inflight.get(key)
+            if leader is None:
+                future = self._executor.submit(self._run, request, key, queued_at)
+                self._inflight[key] = future
+                future.add_done_callback(self._forget_inflight)
+                return future
+
+        follower: Future[DelegationResult] = Future()
+
+        def _share(done: Future[DelegationResult]) -> None:
+            if done.cancelled():
+                follower.cancel()
+                return
+            error = done.exception()
+            if error is not None:
+                follower.set_exception(error)
+                return
+            result = done.result()
+            follower.set_result(replace(result, request=request, cached=result.ok))
+
+        leader.add_done_callback(_share)
+        return follower
+
+    def _forget_inflight(self, future: Future[DelegationResult]) -> None:
+        with self._inflight_lock:
+            for key, inflight in list(self._inflight.items()):
+                if inflight is future:
+                    del self._inflight[key]
+
+    def _cacheable(self, request: DelegationRequest) -> bool:
+        # workspace-write delegations edit files, so only read-only ones are cached
+        return self.cache is not None and request.mode == "read-only"
+
+    def _cache_key(self, request: DelegationRequest, state: str | None = None) -> str | None:
+        """Cache key for a request, or None if it is not cacheable."""
+        if self.cache is None or not self._cacheable(request):
+            return None
+        template = self.expert_prompt(request.expert)
+        return self.cache.make_key(
+            template,
+            request.model or self.model,
+            request.task,
+            workspace_state(self.target_dir) if state is None else state,
+        )
+
+    def run_all(self, requests: Iterable[DelegationRequest]) -> list[DelegationResult]:
+        """
+        Run requests concurrently (bounded by max_workers).
+
+        Returns:
+            Results in request order.
+        """
+        batch = list(requests)
+        # One git fingerprint for the whole batch, not one per request
+        state = (
+            workspace_state(self.target_dir)
+            if any(self._cacheable(request) for request in batch)
+            else None
+        )
+        futures = [self.submit(request, state) for request in batch]
+        return [future.result() for future in futures]
+
+    def _run(
+        self, request: DelegationRequest, key: str | None, queued_at: float
+    ) -> DelegationResult:
+        started = time.monotonic()
+        prompt = f"{self.expert_prompt(request.expert)}\n\n{request.task}\n"
+        timeout = request.timeout or self.timeout
+
+        if key is not None and self.cache is not None and not self.refresh_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return DelegationResult(
+                    request=request,
+                    output=cached,
+                    returncode=0,
+                    latency=time.monotonic() - started,
+                    queue_wait=started - queued_at,
+                    cached=True,
+                )
+
+        try:
+            proc = subprocess.run(
+                self.build_command(request),
+                input=prompt,
+                capture_output=True,
+                text=True,
+                cwd=self.target_dir,
+                timeout=timeout,
+            )
+            output, returncode = proc.stdout, proc.returncode
+            error = (proc.stderr.strip() or None) if proc.returncode != 0 else None
+        except subprocess.TimeoutExpired:
+            output, returncode, error = "", -1, f"Timed out after {timeout:g}s"
+        except OSError as e:
+            output, returncode, error = "", -1, str(e)
+        if key is not None and self.cache is not None and returncode == 0 and error is None:
+            self.cache.put(key, output)
+        return DelegationResult(
+            request=request,
+            output=output,
+            returncode=returncode,
+            latency=time.monotonic() - started,
+            queue_wait=started - queued_at,
+            error=error,
+        )
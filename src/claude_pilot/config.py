@@ -8,6 +8,7 @@ repository URLs, and managed file lists.
 from __future__ import annotations
 
 import importlib.resources
+import os
 from pathlib import Path
 from typing import Any
 
@@ -22,12 +23,52 @@ REPO_RAW = REPO_BASE
 # Request timeout (seconds)
 REQUEST_TIMEOUT = 30
 
+# Shared HTTP client (claude_pilot.network): split timeouts, retries with jittered backoff
+HTTP_CONNECT_TIMEOUT = 5.0
+HTTP_READ_TIMEOUT = float(REQUEST_TIMEOUT)
+HTTP_RETRIES = 3
+HTTP_BACKOFF_FACTOR = 0.5
+HTTP_RETRY_STATUSES: tuple[int, ...] = (429, 500, 502, 503, 504)
+# Longest Retry-After slept on; longer waits return the response to the caller
+HTTP_RETRY_AFTER_MAX = 5.0
+HTTP_POOL_SIZE = 4
+
+# GitHub REST API base URL (external skills sync)
+GITHUB_API_URL = "https://api.github.com"
+
+# Optional GitHub token (first set variable wins); raises the API rate limit
+GITHUB_TOKEN_ENVS: tuple[str, ...] = ("CLAUDE_PILOT_GITHUB_TOKEN", "GITHUB_TOKEN", "GH_TOKEN")
+
+# ETag cache for conditional API requests (under the user cache dir)
+HTTP_ETAG_CACHE_FILE = "etags.json"
+HTTP_ETAG_CACHE_MAX_ENTRIES = 256
+
+# Shared GitHub rate-limit bucket (claude_pilot.ratelimit, under the user cache dir)
+GITHUB_RATE_LIMIT_FILE = "github-ratelimit.json"
+GITHUB_RATE_LIMIT_MAX_WAIT = 30.0
+# Back-off after a rate-limit response that carries no reset time
+GITHUB_RATE_LIMIT_COOLDOWN = 60.0
+
+# Resumable downloads (under the user cache dir); stale partials are pruned
+DOWNLOAD_CACHE_SUBDIR = "downloads"
+DOWNLOAD_PARTIAL_MAX_AGE = 7 * 24 * 60 * 60
+
+# Offline mode: no network requests, answers come from the prefetched user cache
+OFFLINE_ENV = "CLAUDE_PILOT_OFFLINE"
+PREFETCH_MANIFEST_FILE = "prefetch.json"
+
 # PyPI API timeout (seconds)
 PYPI_TIMEOUT = 5
+# The version probe is best effort (callers fall back to the cached version)
+PYPI_RETRIES = 0
 
 # PyPI API endpoint
 PYPI_API_URL = "https://pypi.org/pypi/claude-pilot/json"
 
+# Background update check: cached latest version refreshed at most this often
+UPDATE_CHECK_INTERVAL = 24 * 60 * 60
+UPDATE_CHECK_DISABLE_ENV = "CLAUDE_PILOT_NO_UPDATE_CHECK"
+
 # Managed files - synced with install.sh MANAGED_FILES array
 # Format: (source_path, dest_path)
 MANAGED_FILES: list[tuple[str, str]] = [
@@ -121,10 +162,120 @@ EXTERNAL_SKILLS: dict[str, dict[str, str]] = {
 # External skills directories and files
 EXTERNAL_SKILLS_DIR = ".claude/skills/external"
 EXTERNAL_SKILLS_VERSION_FILE = ".claude/.external-skills-version"
+# Per-source commit and file digests of the installed external skills (commit it)
+EXTERNAL_SKILLS_LOCK_FILE = ".claude/skills.lock"
+# Project catalog of skills, agents and commands (name, description, triggers, tokens)
+CATALOG_FILE = ".claude/catalog.json"
 
 # Codex authentication file path (for CLI availability check)
 CODEX_AUTH_PATH = ".codex/auth.json"
 
+# External tools detected by `claude-pilot probe` (cached per PATH/mtime fingerprint)
+PROBE_TOOLS: tuple[str, ...] = ("codex", "jq", "git", "gh", "node", "npm", "python3")
+
+# User cache directory override (defaults to $XDG_CACHE_HOME/claude-pilot)
+CACHE_DIR_ENV = "CLAUDE_PILOT_CACHE_DIR"
+
+# Codex delegation (same defaults as codex-sync.sh; CODEX_MODEL/CODEX_TIMEOUT override)
+CODEX_DEFAULT_MODEL = "gpt-5.2"
+CODEX_DEFAULT_TIMEOUT = 300
+CODEX_MAX_CONCURRENCY = 3
+CODEX_SANDBOX_MODES: tuple[str, ...] = ("read-only", "workspace-write")
+CODEX_PROMPTS_DIR = ".claude/rules/delegator/prompts"
+
+# Read-only delegation result cache (TTL in seconds, size cap in bytes)
+DELEGATION_CACHE_DIR = ".claude/local/delegation-cache"
+DELEGATION_CACHE_TTL = 24 * 60 * 60
+DELEGATION_CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+# statusLine commands: shell script (default) and native Python entry point
+STATUSLINE_SCRIPT_COMMAND = '"$CLAUDE_PROJECT_DIR"/.claude/scripts/statusline.sh'
+STATUSLINE_NATIVE_COMMAND = "claude-pilot-statusline"
+
+# Plan tracking directories (relative to project root)
+PLAN_DIR = ".pilot/plan"
+PLAN_STATES: tuple[str, ...] = ("pending", "in_progress", "done")
+
+# Archived done plans: monthly zip bundles (YYYY-MM.zip) under the archive dir
+PLAN_ARCHIVE_DIR = ".pilot/plan/archive"
+PLAN_ARCHIVED_STATE = "archived"
+PLAN_ARCHIVE_MIN_AGE_DAYS = 30
+
+# Plan worktrees: metadata store (keyed by plan file name) and plan locks
+WORKTREE_METADATA_FILE = ".pilot/worktrees.json"
+WORKTREE_METADATA_LOCK_FILE = ".pilot/worktrees.lock"
+WORKTREE_DIR_INFIX = "-wt-"
+PLAN_LOCK_DIR = ".pilot/plan/.locks"
+
+# Dependency/build caches hardlinked from the main checkout into new worktrees.
+# Python virtualenvs are never shared: shebangs, bin/activate and editable
+# installs hold absolute paths to the main checkout, so a worktree's tests
+# would import the main branch's code.
+WORKTREE_SHARED_CACHE_DIRS: tuple[str, ...] = ("node_modules",)
+
+# Pre-warmed worktree pool: slots live in a sibling "{repo}-wt-pool/" directory
+WORKTREE_POOL_STATE_FILE = ".pilot/worktree-pool.json"
+WORKTREE_POOL_LOCK_FILE = ".pilot/worktree-pool.lock"
+WORKTREE_POOL_DIR_SUFFIX = "-wt-pool"
+WORKTREE_POOL_DEFAULT_SIZE = 2
+# A slot still marked "creating" after this many seconds belongs to a crashed
+# fill/lease and is removed (generous: the setup command may run `npm ci`)
+WORKTREE_POOL_CREATING_TIMEOUT = 1800
+
+# Plan index database (derived state, safe to delete)
+PLAN_INDEX_FILE = ".pilot/plan/.index.sqlite3"
+
+# Stat cache for `claude-pilot verify` (size/mtime -> digest of managed files)
+VERIFY_CACHE_FILE = ".claude/local/verify-cache.json"
+
+# Last shipped content of managed files (merge base for `update --strategy merge`)
+BASE_STORE_DIR = ".claude/local/base-store"
+
+# Checked-in asset history of earlier releases, read by the build and extended
+# by scripts/record-asset-history.sh at release time (repo-relative)
+ASSET_HISTORY_SOURCE = ".claude/.asset-history.json"
+
+# `claude-pilot context profile`: per-file token budgets by category (tier limits
+# from docs/ai-context/docs-overview.md) and the budget for session-start tokens
+CONTEXT_TOKEN_BUDGETS: dict[str, int] = {
+    "tier1": 3000,
+    "import": 3000,
+    "tier2": 2000,
+    "tier3": 1500,
+    "rule": 1500,
+    "skill": 3000,
+    "agent": 3000,
+    "command": 5000,
+    "guide": 4000,
+}
+CONTEXT_STARTUP_BUDGET = 15000
+
+# Symbol definition index for `claude-pilot index` (derived state, safe to delete)
+SYMBOL_INDEX_FILE = ".claude/local/symbols.sqlite3"
+
+# Import graph cache for changed-file-scoped typecheck/lint hooks
+IMPORT_GRAPH_FILE = ".claude/local/import-graph.json"
+
+# Directories never scanned when building the import graph
+DEPGRAPH_SKIP_DIRS: frozenset[str] = frozenset({
+    "node_modules",
+    "__pycache__",
+    "venv",
+    "dist",
+    "build",
+    "coverage",
+    "target",
+    "site-packages",
+})
+
+# `claude-pilot scan`: files per worker task; smaller projects are scanned in-process
+SCAN_CHUNK_SIZE = 512
+SCAN_PARALLEL_MIN_FILES = 2000
+# Larger files are counted but not read for line counts and entry points
+SCAN_MAX_READ_BYTES = 1 << 20
+# Directories with at least this many source files get a draft CONTEXT.md
+SCAN_DOC_MIN_FILES = 3
+
 
 def get_target_dir() -> Path:
     """
@@ -135,6 +286,33 @@ def get_target_dir() -> Path:
     return Path.cwd()
 
 
+def get_cache_dir() -> Path:
+    """
+    Get the per-user cache directory.
+
+    Returns:
+        $CLAUDE_PILOT_CACHE_DIR, else $XDG_CACHE_HOME/claude-pilot,
+        else ~/.cache/claude-pilot.
+    """
+    override = os.environ.get(CACHE_DIR_ENV)
+    if override:
+        return Path(override)
+    xdg = os.environ.get("XDG_CACHE_HOME")
+    base = Path(xdg) if xdg else Path.home() / ".cache"
+    return base / "claude-pilot"
+
+
+def is_offline() -> bool:
+    """
+    Check whether offline mode is enabled.
+
+    Returns:
+        True if $CLAUDE_PILOT_OFFLINE is set to a true value.
+    """
+    value = os.environ.get(OFFLINE_ENV, "").strip().lower()
+    return value not in ("", "0", "false", "no")
+
+
 def get_version_file_path(target_dir: Path | None = None) -> Path:
     """
     Get the path to the version file.
@@ -0,0 +1,301 @@
+"""
+Context token-budget profile of a project's Claude Code assets.
+
+Every Claude Code session pays for CLAUDE.md, the rules and the frontmatter
+of every skill, agent and command before the first token is generated; the
+rest (CONTEXT.md tiers, skill bodies, guides, path-scoped rules) is read on
+demand. profile_context() estimates the tokens of each of these files with
+a local tokenizer approximation, splits them into session-start and
+on-demand tokens, and flags files over their budget
+(config.CONTEXT_TOKEN_BUDGETS, taken from the 3-Tier documentation limits).
+
+What loads at session start:
+
+- CLAUDE.md, .claude/CLAUDE.md, CLAUDE.local.md and files they @-import
+- .claude/rules/**/*.md without a `paths:` frontmatter key
+- the frontmatter (name/description) of skills, agents and commands
+
+The estimate mimics a BPE tokenizer: a word is one token plus one per
+further eight letters, digits go in groups of three, and a run of the same
+punctuation mark (`---`, `**`, `##`) is one token. It tracks real tokenizers
+within roughly 15% on English prose and markdown, which is enough for
+budgets and trends but not for billing.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from claude_pilot import config
+
+STARTUP = "startup"
+ON_DEMAND = "on-demand"
+
+_TOKEN_RE = re.compile(r"[A-Za-z]+|\d+|([^\sA-Za-z\d])\1{0,3}")
+_FRONTMATTER_RE = re.compile(r"\A---\r?\n(.*?)\r?\n---[ \t]*(?:\r?\n|\Z)", re.DOTALL)
+_TIER_RE = re.compile(r"Tier:?\s*([123])\b")
+_IMPORT_RE = re.compile(r"(?<![\w`])@((?:~/|\.{1,2}/|/)?[\w./-]+\.md)\b")
+
+_MEMORY_FILES = ("CLAUDE.md", ".claude/CLAUDE.md", "CLAUDE.local.md")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in a text.
+
+    Args:
+        text: Text to measure.
+
+    Returns:
+        Approximate token count.
+    """
+    count = 0
+    for match in _TOKEN_RE.finditer(text):
+        piece = match.group()
+        if piece[0].isdigit():
+            count += (len(piece) + 2) // 3
+        elif piece[0].isalpha() and piece.isascii():
+            count += 1 + (len(piece) - 1) // 8
+        else:
+            count += 1
+    return count
+
+
+def split_frontmatter(text: str) -> tuple[str, str]:
+    """
+    Split YAML frontmatter from a markdown document.
+
+    Args:
+        text: Document text.
+
+    Returns:
+        Tuple of (frontmatter, body); frontmatter is "" if there is none.
+    """
+    match = _FRONTMATTER_RE.match(text)
+    if match is None:
+        return "", text
+    return match.group(1), text[match.end():]
+
+
+@dataclass
+class FileProfile:
+    """Token estimate of one context file."""
+
+    path: str
+    category: str
+    tokens: int
+    startup_tokens: int
+    budget: int | None = None
+
+    @property
+    def load(self) -> str:
+        """STARTUP if any part of the file loads at session start, else ON_DEMAND."""
+        return STARTUP if self.startup_tokens else ON_DEMAND
+
+    @property
+    def over_budget(self) -> bool:
+        """Whether the file exceeds its category budget."""
+        return self.budget is not None and self.tokens > self.budget
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return a JSON-serializable dictionary."""
+        return {
+            "path": self.path,
+            "category": self.category,
+            "load": self.load,
+            "tokens": self.tokens,
+            "startup_tokens": self.startup_tokens,
+            "budget": self.budget,
+            "over_budget": self.over_budget,
+        }
+
+
+@dataclass
+class ContextProfile:
+    """Token estimates of all context files in a project."""
+
+    files: list[FileProfile] = field(default_factory=list)
+    startup_budget: int = config.CONTEXT_STARTUP_BUDGET
+
+    @property
+    def startup_tokens(self) -> int:
+        """Tokens loaded into every session before the first prompt."""
+        return sum(f.startup_tokens for f in self.files)
+
+    @property
+    def on_demand_tokens(self) -> int:
+        """Tokens that are only loaded when Claude reads or invokes the file."""
+        return sum(f.tokens - f.startup_tokens for f in self.files)
+
+    @property
+    def over_budget(self) -> list[FileProfile]:
+        """Files exceeding their category budget."""
+        return [f for f in self.files if f.over_budget]
+
+    @property
+    def ok(self) -> bool:
+        """Whether no file and not the session start exceeds its budget."""
+        return not self.over_budget and self.startup_tokens <= self.startup_budget
+
+    def by_category(self) -> dict[str, dict[str, int]]:
+        """
+        Total files, tokens and session-start tokens per category.
+
+        Returns:
+            Mapping of category to {"files", "tokens", "startup_tokens"}.
+        """
+        totals: dict[str, dict[str, int]] = {}
+        for f in self.files:
+            entry = totals.setdefault(f.category, {"files": 0, "tokens": 0, "startup_tokens": 0})
+            entry["files"] += 1
+            entry["tokens"] += f.tokens
+            entry["startup_tokens"] += f.startup_tokens
+        return dict(sorted(totals.items()))
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return a JSON-serializable dictionary."""
+        return {
+            "ok": self.ok,
+            "startup_tokens": self.startup_tokens,
+            "startup_budget": self.startup_budget,
+            "on_demand_tokens": self.on_demand_tokens,
+            "categories": self.by_category(),
+            "files": [f.to_dict() for f in self.files],
+        }
+
+
+def _read(path: Path) -> str | None:
+    try:
+        return path.read_text(encoding="utf-8", errors="replace")
+    except OSError:
+        return None
+
+
+def _context_tier(rel_path: str, text: str) -> str:
+    """Classify a CONTEXT.md as tier2 (component) or tier3 (feature)."""
+    match = _TIER_RE.search("\n".join(text.splitlines()[:5]))
+    if match and match.group(1) in ("2", "3"):
+        return f"tier{match.group(1)}"
+    return "tier2" if rel_path.count("/") <= 2 else "tier3"
+
+
+def _iter_context_docs(target_dir: Path) -> list[Path]:
+    """Find CONTEXT.md files, skipping dependency, build and hidden directories."""
+    found: list[Path] = []
+    for root, dirs, files in os.walk(target_dir):
+        dirs[:] = sorted(
+            d for d in dirs
+            if d not in config.DEPGRAPH_SKIP_DIRS and (not d.startswith(".") or d == ".claude")
+        )
+        root_path = Path(root)
+        if root_path.relative_to(target_dir).parts[:2] == (".claude", "local"):
+            continue
+        if "CONTEXT.md" in files:
+            found.append(root_path / "CONTEXT.md")
+    return found
+
+
+def _imports(path: Path, text: str, target_dir: Path) -> list[Path]:
+    """Resolve @-imports of a memory file that stay inside the project."""
+    imported: list[Path] = []
+    for ref in _IMPORT_RE.findall(text):
+        if ref.startswith("~/"):
+            continue
+        candidate = (target_dir / ref.lstrip("/")) if ref.startswith("/") else path.parent / ref
+        candidate = Path(os.path.normpath(candidate))
+        if candidate.is_file() and candidate.resolve().is_relative_to(target_dir.resolve()):
+            imported.append(candidate)
+    return imported
+
+
+def profile_context(
+    target_dir: Path,
+    budgets: dict[str, int] | None = None,
+    startup_budget: int | None = None,
+) -> ContextProfile:
+    """
+    Estimate the context tokens of a project's Claude Code files.
+
+    Args:
+        target_dir: Project root.
+        budgets: Per-file token budget by category (defaults to
+            config.CONTEXT_TOKEN_BUDGETS).
+        startup_budget: Session-start budget (defaults to
+            config.CONTEXT_STARTUP_BUDGET).
+
+    Returns:
+        ContextProfile with one entry per file, largest first.
+    """
+    budgets = config.CONTEXT_TOKEN_BUDGETS if budgets is None else budgets
+    # Report paths as seen in the project: rules or skills are often symlinks
+    # into a shared dotfiles checkout, so only the dedupe key is resolved
+    target_dir = Path(os.path.abspath(target_dir))
+    profile = ContextProfile(
+        startup_budget=config.CONTEXT_STARTUP_BUDGET if startup_budget is None else startup_budget
+    )
+    seen: set[Path] = set()
+
+    def add(path: Path, category: str, startup: str, text: str | None = None) -> str | None:
+        resolved = path.resolve()
+        if resolved in seen:
+            return None
+        text = _read(path) if text is None else text
+        if text is None:
+            return None
+        seen.add(resolved)
+        tokens = estimate_tokens(text)
+        if startup == "all":
+            startup_tokens = tokens
+        elif startup == "frontmatter":
+            startup_tokens = estimate_tokens(split_frontmatter(text)[0])
+        else:
+            startup_tokens = 0
+        rel_path = path.relative_to(target_dir).as_posix()
+        profile.files.append(
+            FileProfile(rel_path, category, tokens, startup_tokens, budgets.get(category))
+        )
+        return text
+
+    # Tier 1: memory files and their @-imports load into every session
+    pending = [target_dir / name for name in _MEMORY_FILES if (target_dir / name).is_file()]
+    category = "tier1"
+    while pending:
+        imports: list[Path] = []
+        for path in pending:
+            text = add(path, category, "all")
+            if text is not None:
+                imports += _imports(path, text, target_dir)
+        pending, category = imports, "import"
+
+    claude_dir = target_dir / ".claude"
+    for path in sorted(claude_dir.glob("rules/**/*.md")):
+        text = _read(path)
+        if text is not None:
+            scoped = re.search(r"^paths\s*:", split_frontmatter(text)[0], re.MULTILINE)
+            add(path, "rule", "none" if scoped else "all", text)
+
+    for path in sorted(claude_dir.glob("skills/**/*.md")):
+        if path.name != "CONTEXT.md":
+            add(path, "skill", "frontmatter" if path.name == "SKILL.md" else "none")
+    for path in sorted(claude_dir.glob("agents/*.md")):
+        if path.name != "CONTEXT.md":
+            add(path, "agent", "frontmatter")
+    for path in sorted(claude_dir.glob("commands/*.md")):
+        if path.name != "CONTEXT.md":
+            add(path, "command", "frontmatter")
+    for path in sorted(claude_dir.glob("guides/*.md")):
+        if path.name != "CONTEXT.md":
+            add(path, "guide", "none")
+
+    for path in _iter_context_docs(target_dir):
+        text = _read(path)
+        if text is not None:
+            rel_path = path.relative_to(target_dir).as_posix()
+            add(path, _context_tier(rel_path, text), "none", text)
+
+    profile.files.sort(key=lambda f: (-f.tokens, f.path))
+    return profile
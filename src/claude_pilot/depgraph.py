@@ -0,0 +1,550 @@
+"""
+Import graph for changed-file-scoped hook checks.
+
+This module builds a persisted import graph for Python and TypeScript/JavaScript
+sources so that the PreToolUse typecheck and lint hooks can check only the
+edited file and its reverse dependencies instead of the whole project.
+
+The graph is stored under `.claude/local/` and is updated one file at a time:
+the edited file is re-parsed on every hook call, and files reached while
+walking reverse dependencies are re-validated by size/mtime, so the cost of
+a query depends on how far the change reaches rather than on repository size.
+
+Imports that do not resolve yet (a module that has not been written, or one
+that was deleted) are remembered per file, so when a matching module is
+added or removed its would-be importers are re-resolved as well.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+from collections import deque
+from pathlib import Path
+from typing import Any
+
+from claude_pilot import config
+
+# Cache format version (bump when the JSON layout changes)
+GRAPH_FORMAT_VERSION = 2
+
+PYTHON_SUFFIXES = (".py", ".pyi")
+SCRIPT_SUFFIXES = (".ts", ".tsx", ".mts", ".cts", ".js", ".jsx", ".mjs", ".cjs")
+SOURCE_SUFFIXES = PYTHON_SUFFIXES + SCRIPT_SUFFIXES
+
+# Python: "import a.b, c as d" and "from .x import (y, z)"
+_PY_IMPORT_RE = re.compile(r"^[ \t]*import[ \t]+([\w., \t]+)", re.MULTILINE)
+_PY_FROM_RE = re.compile(
+    r"^[ \t]*from[ \t]+(\.*)([\w.]*)[ \t]+import[ \t]+(\([^)]*\)|[^\n#]+)",
+    re.MULTILINE,
+)
+
+# TypeScript/JavaScript: static imports, re-exports, require() and import()
+_SCRIPT_IMPORT_RES = (
+    re.compile(r"""(?:^|[;\s])(?:import|export)\s[^'";]*?\sfrom\s*['"]([^'"]+)['"]"""),
+    re.compile(r"""(?:^|[;\s])import\s*['"]([^'"]+)['"]"""),
+    re.compile(r"""(?:require|import)\s*\(\s*['"]([^'"]+)['"]\s*\)"""),
+)
+
+
+def _stat_key(path: Path) -> tuple[int, int] | None:
+    """Return (mtime_ns, size) for a file, or None if it does not exist."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def read_hook_file_path(payload: dict[str, Any]) -> str | None:
+    """
+    Extract the edited file path from a Claude Code hook payload.
+
+    Args:
+        payload: Parsed hook JSON (as received on stdin).
+
+    Returns:
+        The file path from tool_input, or None if the tool has no file target.
+    """
+    tool_input = payload.get("tool_input")
+    if not isinstance(tool_input, dict):
+        return None
+    for key in ("file_path", "notebook_path", "path"):
+        value = tool_input.get(key)
+        if isinstance(value, str) and value:
+            return value
+    return None
+
+
+class ImportGraph:
+    """
+    Persisted forward/reverse import graph for a project.
+
+    Files are keyed by POSIX paths relative to the project root. Only imports
+    that resolve to files inside the project are recorded.
+    """
+
+    def __init__(self, root: Path, cache_path: Path | None = None) -> None:
+        """
+        Initialize the import graph.
+
+        Args:
+            root: Project root directory.
+            cache_path: Optional cache file path. Defaults to config.IMPORT_GRAPH_FILE.
+        """
+        self.root = root.resolve()
+        self.cache_path = cache_path or self.root / config.IMPORT_GRAPH_FILE
+        self.files: dict[str, dict[str, Any]] = {}
+        self.dependents: dict[str, set[str]] = {}
+        self._modules: dict[str, str] | None = None
+        self._unresolved: dict[str, set[str]] | None = None
+        self._dirty = False
+
+    # -------------------------------------------------------------------------
+    # Persistence
+    # -------------------------------------------------------------------------
+
+    def load(self) -> bool:
+        """
+        Load the graph from the cache file.
+
+        Returns:
+            True if a compatible cache was loaded, False otherwise.
+        """
+        try:
+            data = json.loads(self.cache_path.read_text())
+        except (OSError, json.JSONDecodeError):
+            return False
+        if not isinstance(data, dict) or data.get("version") != GRAPH_FORMAT_VERSION:
+            return False
+
+        self.files = data.get("files", {})
+        self.dependents = {
+            path: set(deps) for path, deps in data.get("dependents", {}).items()
+        }
+        self._modules = None
+        self._unresolved = None
+        self._dirty = False
+        return True
+
+    def save(self) -> None:
+        """Write the graph to the cache file if it changed (atomic replace)."""
+        if not self._dirty:
+            return
+        data = {
+            "version": GRAPH_FORMAT_VERSION,
+            "files": self.files,
+            "dependents": {
+                path: sorted(deps) for path, deps in self.dependents.items() if deps
+            },
+        }
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.cache_path.with_suffix(".json.tmp")
+        temp_path.write_text(json.dumps(data, separators=(",", ":")))
+        temp_path.replace(self.cache_path)
+        self._dirty = False
+
+    # -------------------------------------------------------------------------
+    # Building
+    # -------------------------------------------------------------------------
+
+    def iter_source_files(self) -> list[str]:
+        """
+        List all source files under the project root.
+
+        Returns:
+            Relative POSIX paths of Python and TypeScript/JavaScript files.
+        """
+        found: list[str] = []
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [
+                d for d in dirnames
+                if d not in config.DEPGRAPH_SKIP_DIRS and not d.startswith(".")
+            ]
+            rel_dir = os.path.relpath(dirpath, self.root)
+            for name in filenames:
+                if name.endswith(SOURCE_SUFFIXES):
+                    rel = name if rel_dir == "." else f"{rel_dir}/{name}"
+                    found.append(rel.replace(os.sep, "/"))
+        return found
+
+    def build(self) -> int:
+        """
+        Build the full graph by scanning the project.
+
+        Returns:
+            Number of source files indexed.
+        """
+        self.files = {}
+        self.dependents = {}
+        paths = self.iter_source_files()
+        for rel in paths:
+            self.files[rel] = {"mtime_ns": 0, "size": -1, "imports": [], "unresolved": []}
+        self._modules = None
+        self._unresolved = None
+
+        for rel in paths:
+            self._reparse(rel)
+
+        self._dirty = True
+        return len(paths)
+
+    def ensure_loaded(self, rebuild: bool = False) -> None:
+        """
+        Load the cached graph, building it from scratch if needed.
+
+        Args:
+            rebuild: Force a full rebuild even if a cache exists.
+        """
+        if rebuild or not self.load():
+            self.build()
+
+    # -------------------------------------------------------------------------
+    # Incremental updates
+    # -------------------------------------------------------------------------
+
+    def refresh_file(self, rel: str) -> bool:
+        """
+        Re-parse a single file if it changed since it was indexed.
+
+        Args:
+            rel: Relative POSIX path of the file.
+
+        Returns:
+            True if the graph changed, False otherwise.
+        """
+        key = _stat_key(self.root / rel)
+        entry = self.files.get(rel)
+
+        if key is None:
+            if entry is None:
+                return False
+            importers = self.dependents.get(rel, set()) - {rel}
+            self._set_imports(rel, [], [])
+            del self.files[rel]
+            self._modules = None
+            # Importers may now resolve to another module (e.g. the parent package)
+            for importer in sorted(importers):
+                if importer in self.files:
+                    self._reparse(importer)
+            self._dirty = True
+            return True
+
+        if not rel.endswith(SOURCE_SUFFIXES):
+            return False
+
+        if entry is not None and (entry["mtime_ns"], entry["size"]) == key:
+            return False
+
+        if entry is None:
+            self.files[rel] = {"mtime_ns": 0, "size": -1, "imports": [], "unresolved": []}
+            self._modules = None
+            # Files whose imports failed to resolve to this module now can
+            importers = set()
+            for name in self._provided_names(rel):
+                importers |= self.unresolved_importers.get(name, set())
+            for importer in sorted(importers - {rel}):
+                self._reparse(importer)
+
+        self._reparse(rel)
+        self._dirty = True
+        return True
+
+    def _reparse(self, rel: str) -> None:
+        """Parse a file's imports and update forward and reverse edges."""
+        path = self.root / rel
+        key = _stat_key(path)
+        try:
+            text = path.read_text(encoding="utf-8", errors="replace")
+        except OSError:
+            text = ""
+
+        unresolved: set[str] = set()
+        if rel.endswith(PYTHON_SUFFIXES):
+            imports = self._python_imports(rel, text, unresolved)
+        else:
+            imports = self._script_imports(rel, text, unresolved)
+
+        self._set_imports(rel, sorted(imports - {rel}), sorted(unresolved))
+        mtime_ns, size = key if key is not None else (0, -1)
+        self.files[rel]["mtime_ns"] = mtime_ns
+        self.files[rel]["size"] = size
+
+    def _set_imports(self, rel: str, imports: list[str], unresolved: list[str]) -> None:
+        """Replace the forward edges of a file and keep reverse edges in sync."""
+        entry = self.files.get(rel, {})
+        if self._unresolved is not None:
+            for name in set(entry.get("unresolved", [])) - set(unresolved):
+                waiting = self._unresolved.get(name)
+                if waiting is not None:
+                    waiting.discard(rel)
+                    if not waiting:
+                        del self._unresolved[name]
+            for name in unresolved:
+                self._unresolved.setdefault(name, set()).add(rel)
+
+        old = set(entry.get("imports", []))
+        new = set(imports)
+        for target in old - new:
+            deps = self.dependents.get(target)
+            if deps is not None:
+                deps.discard(rel)
+                if not deps:
+                    del self.dependents[target]
+        for target in new - old:
+            self.dependents.setdefault(target, set()).add(rel)
+        if rel in self.files:
+            self.files[rel]["imports"] = imports
+            self.files[rel]["unresolved"] = unresolved
+
+    @property
+    def unresolved_importers(self) -> dict[str, set[str]]:
+        """Map each unresolved import name to the files waiting for it."""
+        if self._unresolved is None:
+            waiting: dict[str, set[str]] = {}
+            for rel, entry in self.files.items():
+                for name in entry.get("unresolved", []):
+                    waiting.setdefault(name, set()).add(rel)
+            self._unresolved = waiting
+        return self._unresolved
+
+    def _provided_names(self, rel: str) -> set[str]:
+        """
+        Unresolved-import names a file satisfies.
+
+        Dotted Python module names are prefixed "py:"; slash-separated paths
+        (relative Python imports and script specifiers) are prefixed "path:".
+        """
+        stem, ext = os.path.splitext(rel)
+        names = {f"path:{rel}", f"path:{stem}"}
+        if rel.endswith(PYTHON_SUFFIXES):
+            names |= {f"py:{name}" for name, target in self.modules.items() if target == rel}
+            if stem.endswith("/__init__"):
+                names.add(f"path:{stem[: -len('/__init__')]}")
+        else:
+            if ext in (".ts", ".tsx", ".mts", ".cts"):
+                names |= {f"path:{stem}{s}" for s in (".js", ".jsx", ".mjs", ".cjs")}
+            if os.path.basename(stem) == "index":
+                names.add(f"path:{os.path.dirname(stem)}")
+        return names
+
+    # -------------------------------------------------------------------------
+    # Import resolution
+    # -------------------------------------------------------------------------
+
+    @property
+    def modules(self) -> dict[str, str]:
+        """
+        Map dotted Python module names to relative file paths.
+
+        Each module is registered both relative to the project root and
+        relative to its top-level package root (so `src/` layouts resolve).
+        """
+        if self._modules is None:
+            modules: dict[str, str] = {}
+            known = set(self.files)
+            for rel in self.files:
+                if not rel.endswith(PYTHON_SUFFIXES):
+                    continue
+                parts = rel.rsplit(".", 1)[0].split("/")
+                if parts[-1] == "__init__":
+                    parts = parts[:-1]
+                if not parts:
+                    continue
+                modules.setdefault(".".join(parts), rel)
+
+                # Strip leading directories that are not packages
+                start = 0
+                while start < len(parts) - 1:
+                    init = "/".join(parts[: start + 1]) + "/__init__.py"
+                    if init in known:
+                        break
+                    start += 1
+                if start:
+                    modules.setdefault(".".join(parts[start:]), rel)
+            self._modules = modules
+        return self._modules
+
+    def _python_imports(self, rel: str, text: str, unresolved: set[str]) -> set[str]:
+        """Resolve Python imports of a file to project files, noting misses."""
+        found: set[str] = set()
+        modules = self.modules
+
+        def add_module(name: str) -> bool:
+            target = modules.get(name)
+            if target is not None:
+                found.add(target)
+                return True
+            unresolved.add(f"py:{name}")
+            return False
+
+        for match in _PY_IMPORT_RE.finditer(text):
+            for item in match.group(1).split(","):
+                name = item.strip().split(" ")[0]
+                # "import a.b.c" also depends on a.b and a (package __init__)
+                while name and not add_module(name):
+                    name = name.rpartition(".")[0]
+
+        package_parts = rel.split("/")[:-1]
+        for match in _PY_FROM_RE.finditer(text):
+            dots, module, names = match.group(1), match.group(2), match.group(3)
+            names = names.strip().strip("()")
+            imported = [
+                n.strip().split(" ")[0] for n in names.replace("\n", ",").split(",")
+            ]
+            imported = [n for n in imported if n and n != "*" and not n.startswith("#")]
+
+            if dots:
+                if len(dots) - 1 > len(package_parts):
+                    continue
+                base_parts = package_parts[: len(package_parts) - (len(dots) - 1)]
+                base = "/".join(base_parts + (module.split(".") if module else []))
+                for name in imported:
+                    self._add_path_module(found, f"{base}/{name}" if base else name, unresolved)
+                self._add_path_module(found, base, unresolved)
+            else:
+                for name in imported:
+                    add_module(f"{module}.{name}")
+                while module and not add_module(module):
+                    module = module.rpartition(".")[0]
+
+        return found
+
+    def _add_path_module(self, found: set[str], base: str, unresolved: set[str]) -> None:
+        """Resolve a slash-separated module path to a .py file or package."""
+        if not base:
+            return
+        for candidate in (f"{base}.py", f"{base}.pyi", f"{base}/__init__.py"):
+            if candidate in self.files:
+                found.add(candidate)
+                return
+        unresolved.add(f"path:{base}")
+
+    def _script_imports(self, rel: str, text: str, unresolved: set[str]) -> set[str]:
+        """Resolve relative TypeScript/JavaScript imports to project files, noting misses."""
+        found: set[str] = set()
+        base_dir = os.path.dirname(rel)
+        specifiers: set[str] = set()
+        for pattern in _SCRIPT_IMPORT_RES:
+            specifiers.update(pattern.findall(text))
+
+        for spec in specifiers:
+            if not spec.startswith("."):
+                continue
+            target = os.path.normpath(os.path.join(base_dir, spec)).replace(os.sep, "/")
+            if target.startswith("../"):
+                continue
+            candidates = [target]
+            stem, ext = os.path.splitext(target)
+            if ext in (".js", ".jsx", ".mjs", ".cjs"):
+                # ESM-style TypeScript imports reference the emitted .js file
+                candidates.extend(stem + s for s in (".ts", ".tsx", ".mts", ".cts"))
+            candidates.extend(target + s for s in SCRIPT_SUFFIXES)
+            candidates.extend(f"{target}/index{s}" for s in SCRIPT_SUFFIXES)
+            for candidate in candidates:
+                if candidate in self.files:
+                    found.add(candidate)
+                    break
+            else:
+                unresolved.add(f"path:{target}")
+        return found
+
+    # -------------------------------------------------------------------------
+    # Queries
+    # -------------------------------------------------------------------------
+
+    def reverse_dependencies(self, rel: str) -> list[str]:
+        """
+        Find all files that transitively import a file.
+
+        Files reached during the walk are re-validated by size/mtime so edits
+        made outside the hook are picked up without a full rescan.
+
+        Args:
+            rel: Relative POSIX path of the changed file.
+
+        Returns:
+            Sorted list of dependent file paths (excluding the file itself).
+        """
+        seen = {rel}
+        queue = deque([rel])
+        while queue:
+            current = queue.popleft()
+            for dependent in sorted(self.dependents.get(current, ())):
+                if dependent in seen:
+                    continue
+                seen.add(dependent)
+                self.refresh_file(dependent)
+                if dependent in self.files and current in self.files[dependent]["imports"]:
+                    queue.append(dependent)
+                else:
+                    seen.discard(dependent)
+        seen.discard(rel)
+        return sorted(seen)
+
+    def affected_files(self, file_path: str | Path) -> list[str]:
+        """
+        Update the graph for a changed file and return everything to check.
+
+        Args:
+            file_path: Absolute or root-relative path of the changed file.
+
+        Returns:
+            The changed file (if it is a source file) followed by its reverse
+            dependencies, as relative POSIX paths.
+        """
+        path = Path(file_path)
+        if not path.is_absolute():
+            path = self.root / path
+        try:
+            rel = path.resolve().relative_to(self.root).as_posix()
+        except ValueError:
+            return []
+
+        self.refresh_file(rel)
+        if rel not in self.files:
+            return []
+        return [rel] + self.reverse_dependencies(rel)
+
+
+def affected_files(
+    target_dir: Path,
+    file_path: str | Path,
+    rebuild: bool = False,
+) -> list[str]:
+    """
+    Return the files a hook should check after an edit.
+
+    Loads (or builds) the persisted import graph, updates it for the edited
+    file, saves it back and returns the changed file plus reverse dependencies.
+
+    Args:
+        target_dir: Project root directory.
+        file_path: Edited file path (absolute or relative to target_dir).
+        rebuild: Force a full rebuild of the graph.
+
+    Returns:
+        List of relative POSIX paths to check.
+    """
+    graph = ImportGraph(target_dir)
+    graph.ensure_loaded(rebuild=rebuild)
+    result = graph.affected_files(file_path)
+    graph.save()
+    return result
+
+
+def rebuild_graph(target_dir: Path) -> int:
+    """
+    Rebuild and save the import graph for a project.
+
+    Args:
+        target_dir: Project root directory.
+
+    Returns:
+        Number of source files indexed.
+    """
+    graph = ImportGraph(target_dir)
+    count = graph.build()
+    graph.save()
+    return count
@@ -18,6 +18,8 @@ import questionary
 from rich.console import Console
 
 from claude_pilot import config
+from claude_pilot.assets import ASSET_METADATA_FILES
+from claude_pilot.catalog import refresh_catalog
 
 console = Console()
 
@@ -228,9 +230,15 @@ class ProjectInitializer:
         """
         Copy all template files from the bundled package.
 
+        The shipped content is recorded as the merge base for later
+        `update --strategy merge` runs.
+
         Returns:
             Tuple of (success_count, fail_count).
         """
+        from claude_pilot.merge import BaseStore
+
+        store = BaseStore(self.target_dir)
         templates_path = config.get_templates_path()
         success_count = 0
         fail_count = 0
@@ -252,6 +260,9 @@ class ProjectInitializer:
             if not rel_path.parts:
                 continue
 
+            if rel_path.parts[0] in ASSET_METADATA_FILES:
+                continue
+
             if rel_path.parts[0] == "CLAUDE.md.template":
                 dest_path = self.target_dir / "CLAUDE.md"
             else:
@@ -259,10 +270,18 @@ class ProjectInitializer:
                 dest_path = self.target_dir / rel_path
 
             if self.copy_template(src_path, dest_path):
+                rel_dest = dest_path.relative_to(self.target_dir).as_posix()
+                store.record(rel_dest, src_path.read_bytes())
                 success_count += 1
             else:
                 fail_count += 1
 
+        if success_count:
+            try:
+                store.save()
+            except OSError:
+                pass
+
         return success_count, fail_count
 
     def update_settings_language(self, language: str) -> None:
@@ -361,6 +380,7 @@ class ProjectInitializer:
             return InitStatus.FAILED
 
         console.print(f"[green]✓[/green] Copied {success_count} files")
+        refresh_catalog(self.target_dir)
 
         # Update language setting
         self.update_settings_language(language)
@@ -0,0 +1,62 @@
+"""
+Inter-process file locks shared by the worktree, network and rate-limit code.
+
+Both helpers use flock(2) on a separate lock file, so the protected file can
+be replaced atomically while the lock is held, and a crashed holder releases
+its lock with its file descriptors.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import json
+import os
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+
+@contextmanager
+def file_lock(lock_path: Path, blocking: bool = True) -> Iterator[None]:
+    """
+    Hold an exclusive flock on a lock file.
+
+    Args:
+        lock_path: Lock file (created if missing).
+        blocking: Wait for the lock; otherwise raise BlockingIOError if it is held.
+    """
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+@contextmanager
+def locked_json(state_path: Path, lock_path: Path) -> Iterator[dict[str, Any]]:
+    """
+    Hold an exclusive flock and yield a JSON object stored in a file.
+
+    The object is written back atomically on exit if it was modified.
+    Unreadable or missing files yield an empty dict.
+
+    Args:
+        state_path: JSON file.
+        lock_path: Lock file (created if missing).
+    """
+    with file_lock(lock_path):
+        try:
+            state = json.loads(state_path.read_text())
+        except (OSError, ValueError):
+            state = {}
+        if not isinstance(state, dict):
+            state = {}
+        before = json.dumps(state, sort_keys=True)
+        yield state
+        if json.dumps(state, sort_keys=True) != before:
+            temp_path = state_path.with_name(f"{state_path.name}.{os.getpid()}.tmp")
+            temp_path.write_text(json.dumps(state, indent=2) + "\n")
+            os.replace(temp_path, state_path)
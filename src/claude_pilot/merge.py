@@ -0,0 +1,294 @@
+"""
+Three-way merge of managed files during `update --strategy merge`.
+
+Every time claude-pilot writes its templates into a project it records the
+shipped content as the merge *base* in a small content-addressed store
+(`.claude/local/base-store/`). On the next update each managed file has
+three versions:
+
+- base:   what the previous claude-pilot version shipped
+- local:  what is on disk now (possibly edited by the user)
+- theirs: what the new claude-pilot version ships
+
+Unedited files are fast-forwarded, files only the user changed are kept,
+and files changed on both sides are merged line-by-line (diff3). Only
+overlapping edits produce conflict markers.
+
+Projects installed before the base store existed have no base. For those,
+a file whose content matches what some earlier version shipped (the
+per-version digests in the asset history) is unedited and fast-forwarded;
+any other difference keeps the local copy untouched and is reported as
+diverged, since without a base there is no telling which side changed.
+Diverged files and unmergeable binary conflicts keep their old base (or
+none), so they are reported again on every update until resolved.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import stat
+from collections.abc import Collection, Sequence
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Any
+
+from claude_pilot import config
+from claude_pilot.assets import ASSET_HISTORY_DIGEST_LEN
+
+CONFLICT_START = "<<<<<<< local"
+CONFLICT_BASE = "||||||| base"
+CONFLICT_SEP = "======="
+CONFLICT_END = ">>>>>>> claude-pilot"
+
+
+class BaseStore:
+    """Content-addressed store of the last shipped version of each managed file."""
+
+    def __init__(self, target_dir: Path) -> None:
+        """
+        Initialize the store.
+
+        Args:
+            target_dir: Project root.
+        """
+        self.root = target_dir / config.BASE_STORE_DIR
+        self.index_path = self.root / "index.json"
+        self._index: dict[str, str] | None = None
+
+    @property
+    def index(self) -> dict[str, str]:
+        """Mapping of project-relative path to content digest."""
+        if self._index is None:
+            try:
+                data = json.loads(self.index_path.read_text(encoding="utf-8"))
+                files = data["files"]
+                self._index = dict(files) if isinstance(files, dict) else {}
+            except (OSError, ValueError, KeyError, TypeError):
+                self._index = {}
+        return self._index
+
+    def _object_path(self, digest: str) -> Path:
+        return self.root / "objects" / digest[:2] / digest
+
+    def get(self, rel_path: str) -> bytes | None:
+        """
+        Get the recorded base content for a file.
+
+        Args:
+            rel_path: Project-relative path.
+
+        Returns:
+            Base content, or None if none was recorded.
+        """
+        digest = self.index.get(rel_path)
+        if digest is None:
+            return None
+        try:
+            return self._object_path(digest).read_bytes()
+        except OSError:
+            return None
+
+    def record(self, rel_path: str, content: bytes) -> None:
+        """
+        Record shipped content as the base for a file (call save() to persist).
+
+        Args:
+            rel_path: Project-relative path.
+            content: Content shipped by this claude-pilot version.
+        """
+        digest = hashlib.sha256(content).hexdigest()
+        path = self._object_path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(content)
+        self.index[rel_path] = digest
+
+    def save(self) -> None:
+        """Write the index atomically and drop unreferenced objects."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        temp_path = self.index_path.with_name(f"index.json.{os.getpid()}.tmp")
+        payload = {"version": 1, "pilot_version": config.VERSION, "files": self.index}
+        temp_path.write_text(json.dumps(payload, indent=2, sort_keys=True), encoding="utf-8")
+        os.replace(temp_path, self.index_path)
+
+        referenced = set(self.index.values())
+        for obj in (self.root / "objects").glob("*/*"):
+            if obj.name not in referenced:
+                obj.unlink(missing_ok=True)
+
+
+def _sync_regions(
+    base: Sequence[str], a: Sequence[str], b: Sequence[str]
+) -> list[tuple[int, int, int, int, int, int]]:
+    """Find regions of base that are unchanged in both a and b."""
+    ma = SequenceMatcher(None, base, a, autojunk=False).get_matching_blocks()
+    mb = SequenceMatcher(None, base, b, autojunk=False).get_matching_blocks()
+    regions = []
+    ia = ib = 0
+    while ia < len(ma) and ib < len(mb):
+        abase, amatch, alen = ma[ia]
+        bbase, bmatch, blen = mb[ib]
+        start = max(abase, bbase)
+        end = min(abase + alen, bbase + blen)
+        if start < end:
+            asub = amatch + (start - abase)
+            bsub = bmatch + (start - bbase)
+            length = end - start
+            regions.append((start, end, asub, asub + length, bsub, bsub + length))
+        if abase + alen < bbase + blen:
+            ia += 1
+        else:
+            ib += 1
+    regions.append((len(base), len(base), len(a), len(a), len(b), len(b)))
+    return regions
+
+
+def _conflict(
+    local: Sequence[str], base: Sequence[str] | None, theirs: Sequence[str]
+) -> list[str]:
+    """Render one conflict hunk with git-style markers."""
+    lines = [f"{CONFLICT_START}\n", *local]
+    if base is not None:
+        lines += [f"{CONFLICT_BASE}\n", *base]
+    lines += [f"{CONFLICT_SEP}\n", *theirs, f"{CONFLICT_END} {config.VERSION}\n"]
+    return lines
+
+
+def merge3(base: str, local: str, theirs: str) -> tuple[str, int]:
+    """
+    Line-based three-way merge.
+
+    Args:
+        base: Common ancestor (previously shipped content).
+        local: Content on disk.
+        theirs: Newly shipped content.
+
+    Returns:
+        Tuple of (merged text, number of conflict hunks).
+    """
+    base_lines = base.splitlines(keepends=True)
+    a = local.splitlines(keepends=True)
+    b = theirs.splitlines(keepends=True)
+    # A missing final newline must not glue the next marker onto a line
+    for lines in (base_lines, a, b):
+        if lines and not lines[-1].endswith("\n"):
+            lines[-1] += "\n"
+
+    out: list[str] = []
+    conflicts = 0
+    iz = ia = ib = 0
+    for zmatch, zend, amatch, aend, bmatch, bend in _sync_regions(base_lines, a, b):
+        base_chunk = base_lines[iz:zmatch]
+        a_chunk = a[ia:amatch]
+        b_chunk = b[ib:bmatch]
+        if a_chunk == b_chunk or a_chunk == base_chunk:
+            out += b_chunk
+        elif b_chunk == base_chunk:
+            out += a_chunk
+        else:
+            out += _conflict(a_chunk, base_chunk, b_chunk)
+            conflicts += 1
+        out += base_lines[zmatch:zend]
+        iz, ia, ib = zend, aend, bend
+
+    text = "".join(out)
+    if not (theirs.endswith("\n") or local.endswith("\n")) and text.endswith("\n"):
+        text = text[:-1]
+    return text, conflicts
+
+
+@dataclass
+class MergeReport:
+    """Per-file outcome of a merge update."""
+
+    added: list[str] = field(default_factory=list)
+    updated: list[str] = field(default_factory=list)
+    kept: list[str] = field(default_factory=list)
+    merged: list[str] = field(default_factory=list)
+    conflicts: list[str] = field(default_factory=list)
+    diverged: list[str] = field(default_factory=list)
+    unchanged: int = 0
+    failed: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return a JSON-serializable dictionary."""
+        return {
+            "added": self.added,
+            "updated": self.updated,
+            "kept": self.kept,
+            "merged": self.merged,
+            "conflicts": self.conflicts,
+            "diverged": self.diverged,
+            "unchanged": self.unchanged,
+            "failed": self.failed,
+        }
+
+
+def merge_file(
+    dest: Path,
+    rel_path: str,
+    theirs: bytes,
+    store: BaseStore,
+    report: MergeReport,
+    shipped: Collection[str] = (),
+) -> None:
+    """
+    Merge one newly shipped file into the project and record its new base.
+
+    Diverged files and binary conflicts keep their recorded base, because
+    the local copy was not derived from the new content.
+
+    Args:
+        dest: Destination path in the project.
+        rel_path: Project-relative path (store key).
+        theirs: Newly shipped content.
+        store: Base store (updated in memory).
+        report: Report to append the outcome to.
+        shipped: Short digests (asset history) of the contents earlier
+            versions shipped for this file; used when no base is recorded.
+    """
+    try:
+        local = dest.read_bytes() if dest.exists() else None
+        base = store.get(rel_path)
+
+        if local is None:
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            dest.write_bytes(theirs)
+            if dest.suffix == ".sh":
+                dest.chmod(dest.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+            report.added.append(rel_path)
+        elif local == theirs:
+            report.unchanged += 1
+        elif local == base:
+            dest.write_bytes(theirs)
+            report.updated.append(rel_path)
+        elif theirs == base:
+            report.kept.append(rel_path)
+        elif base is None:
+            digest = hashlib.sha256(local).hexdigest()[:ASSET_HISTORY_DIGEST_LEN]
+            if digest in shipped:
+                dest.write_bytes(theirs)
+                report.updated.append(rel_path)
+            else:
+                # Theirs is not an ancestor of the local copy; never record it as the base
+                report.diverged.append(rel_path)
+                return
+        else:
+            try:
+                local_text = local.decode("utf-8")
+                theirs_text = theirs.decode("utf-8")
+                base_text = base.decode("utf-8")
+            except UnicodeDecodeError:
+                # Binary content cannot be merged; keep the user's copy and the
+                # old base, so the conflict is reported again on the next update
+                report.conflicts.append(rel_path)
+                return
+            text, conflicts = merge3(base_text, local_text, theirs_text)
+            dest.write_text(text, encoding="utf-8")
+            (report.conflicts if conflicts else report.merged).append(rel_path)
+        store.record(rel_path, theirs)
+    except OSError:
+        report.failed += 1
@@ -0,0 +1,561 @@
+"""
+Shared HTTP client for updater network calls.
+
+All PyPI and GitHub requests go through one pooled `requests.Session`, so
+repeat calls reuse the TCP/TLS connection. Transient failures (connection
+resets, 429 and 5xx responses) are retried for idempotent methods with
+exponential backoff and full jitter, honouring a short Retry-After; a
+response asking to wait longer than config.HTTP_RETRY_AFTER_MAX is returned
+to the caller instead of being slept on. Connect and read timeouts are
+separate, and best-effort probes (the PyPI version check) can ask for fewer
+retries.
+
+Setting CLAUDE_PILOT_OFFLINE=1 (e.g. in a container image warmed with
+`claude-pilot prefetch`) makes every request fail immediately with
+OfflineError; callers fall back to their caches.
+
+The module-level client is replaceable: tests call set_client() with a
+client of their own (or patch `claude_pilot.network.get`) and point the
+config URLs at a local stub server.
+
+GitHub API calls carry an optional token (github_headers()) and can be made
+conditional: EtagCache remembers the ETag and the extracted value per URL,
+so an unchanged resource is answered with 304 Not Modified, which GitHub does
+not count against the rate limit.
+
+download() is resumable: bytes are streamed into `<dest>.part` and the
+validator (ETag, total length) is kept in `<dest>.part.json`. A later call
+continues with a Range request guarded by If-Range, so an interrupted
+download only refetches the chunk in flight, unless the server content
+changed. Resume and finalize run under an flock on `<dest>.lock`, so two
+processes sharing the user cache never append to the same partial file.
+Downloads ask for `Accept-Encoding: identity` and store the bytes as sent, so
+the partial size always matches the Content-Length/Content-Range offsets; a
+server that encodes anyway is decoded and not resumed.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Any
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import HTTPError as Urllib3HTTPError
+from urllib3.exceptions import MaxRetryError, ResponseError
+from urllib3.util.retry import Retry
+
+from claude_pilot import config
+from claude_pilot.locks import file_lock
+
+
+class JitteredRetry(Retry):
+    """urllib3 Retry with full jitter and a bounded Retry-After."""
+
+    def get_backoff_time(self) -> float:
+        """Return a uniformly random delay in [0, exponential backoff]."""
+        backoff = float(super().get_backoff_time())
+        return random.uniform(0, backoff) if backoff > 0 else 0.0
+
+    def increment(
+        self,
+        method: str | None = None,
+        url: str | None = None,
+        response: Any = None,
+        error: Exception | None = None,
+        _pool: Any = None,
+        _stacktrace: Any = None,
+    ) -> JitteredRetry:
+        """Give up at once when the server asks to wait longer than HTTP_RETRY_AFTER_MAX."""
+        if response is not None and error is None:
+            retry_after = self.get_retry_after(response)
+            if retry_after is not None and retry_after > config.HTTP_RETRY_AFTER_MAX:
+                reason = ResponseError(f"Retry-After {retry_after:.0f}s exceeds the limit")
+                raise MaxRetryError(_pool, url or "", reason)
+        return super().increment(method, url, response, error, _pool, _stacktrace)
+
+
+class HttpClient:
+    """Pooled HTTP session with retries and split connect/read timeouts."""
+
+    def __init__(
+        self,
+        retries: int = config.HTTP_RETRIES,
+        backoff_factor: float = config.HTTP_BACKOFF_FACTOR,
+        connect_timeout: float = config.HTTP_CONNECT_TIMEOUT,
+        read_timeout: float = config.HTTP_READ_TIMEOUT,
+        pool_size: int = config.HTTP_POOL_SIZE,
+    ) -> None:
+        """
+        Initialize the client (the session is created on first use).
+
+        Args:
+            retries: Retries for connection errors and retryable statuses.
+            backoff_factor: Base of the exponential backoff in seconds.
+            connect_timeout: TCP connect timeout in seconds.
+            read_timeout: Socket read timeout in seconds.
+            pool_size: Connections kept alive per host.
+        """
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.pool_size = pool_size
+        self._sessions: dict[int, requests.Session] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        """The underlying session, with the retrying adapter mounted."""
+        return self.session_for(self.retries)
+
+    def session_for(self, retries: int) -> requests.Session:
+        """
+        Get the pooled session that retries a request up to `retries` times.
+
+        Args:
+            retries: Retries for connection errors and retryable statuses.
+
+        Returns:
+            Session with a retrying adapter mounted (created on first use).
+        """
+        with self._lock:
+            session = self._sessions.get(retries)
+            if session is None:
+                retry = JitteredRetry(
+                    total=retries,
+                    connect=retries,
+                    read=retries,
+                    status=retries,
+                    backoff_factor=self.backoff_factor,
+                    status_forcelist=config.HTTP_RETRY_STATUSES,
+                    allowed_methods=frozenset({"GET", "HEAD"}),
+                    respect_retry_after_header=True,
+                    raise_on_status=False,
+                )
+                adapter = HTTPAdapter(
+                    max_retries=retry,
+                    pool_connections=self.pool_size,
+                    pool_maxsize=self.pool_size,
+                )
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers["User-Agent"] = f"claude-pilot/{config.VERSION}"
+                self._sessions[retries] = session
+            return session
+
+    def get(
+        self,
+        url: str,
+        timeout: float | tuple[float, float] | None = None,
+        retries: int | None = None,
+        **kwargs: Any,
+    ) -> requests.Response:
+        """
+        Send a GET request.
+
+        Args:
+            url: Request URL.
+            timeout: Read timeout, or (connect, read); defaults to the client's.
+            retries: Retries for this request; defaults to the client's.
+            **kwargs: Passed to requests.Session.get (headers, stream, ...).
+
+        Returns:
+            The response (after retries); callers check the status.
+        """
+        if timeout is None:
+            timeout = (self.connect_timeout, self.read_timeout)
+        elif not isinstance(timeout, tuple):
+            timeout = (min(self.connect_timeout, timeout), timeout)
+        session = self.session_for(self.retries if retries is None else retries)
+        return session.get(url, timeout=timeout, **kwargs)
+
+    def close(self) -> None:
+        """Close pooled connections."""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+_client: HttpClient | None = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> HttpClient:
+    """
+    Get the shared client, creating it on first use.
+
+    Returns:
+        The process-wide HttpClient.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
+
+
+def set_client(client: HttpClient | None) -> HttpClient | None:
+    """
+    Replace the shared client (None resets to a default client on next use).
+
+    Args:
+        client: Client to install.
+
+    Returns:
+        The previously installed client.
+    """
+    global _client
+    with _client_lock:
+        previous, _client = _client, client
+    return previous
+
+
+class OfflineError(requests.ConnectionError):
+    """A request was attempted in offline mode."""
+
+
+def get(
+    url: str,
+    timeout: float | tuple[float, float] | None = None,
+    retries: int | None = None,
+    **kwargs: Any,
+) -> requests.Response:
+    """
+    Send a GET request through the shared client.
+
+    Args:
+        url: Request URL.
+        timeout: Read timeout, or (connect, read); defaults to the client's.
+        retries: Retries for this request; defaults to the client's.
+        **kwargs: Passed to requests.Session.get.
+
+    Returns:
+        The response.
+
+    Raises:
+        OfflineError: In offline mode.
+    """
+    if config.is_offline():
+        raise OfflineError(f"Offline mode ({config.OFFLINE_ENV}): not fetching {url}")
+    return get_client().get(url, timeout=timeout, retries=retries, **kwargs)
+
+
+def _header(response: requests.Response, name: str) -> str | None:
+    value = response.headers.get(name)
+    return value if isinstance(value, str) else None
+
+
+def github_headers() -> dict[str, str]:
+    """
+    Build headers for GitHub REST API requests.
+
+    The token is read from the first set variable in config.GITHUB_TOKEN_ENVS.
+    requests drops the Authorization header on redirects to another host, so
+    the token is never sent to codeload or object storage.
+
+    Returns:
+        Accept and API version headers, plus Authorization when a token is set.
+    """
+    headers = {
+        "Accept": "application/vnd.github+json",
+        "X-GitHub-Api-Version": "2022-11-28",
+    }
+    for name in config.GITHUB_TOKEN_ENVS:
+        token = os.environ.get(name, "").strip()
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+            break
+    return headers
+
+
+def is_rate_limited(response: requests.Response) -> bool:
+    """
+    Check whether a response is a GitHub rate-limit rejection.
+
+    Args:
+        response: Response to inspect.
+
+    Returns:
+        True for 429, or 403 with X-RateLimit-Remaining: 0.
+    """
+    if response.status_code == 429:
+        return True
+    return response.status_code == 403 and _header(response, "X-RateLimit-Remaining") == "0"
+
+
+class EtagCache:
+    """Per-URL ETag and value store for conditional GET requests."""
+
+    def __init__(self, path: Path | None = None) -> None:
+        """
+        Initialize the cache (loaded lazily).
+
+        Args:
+            path: Cache file (defaults to config.HTTP_ETAG_CACHE_FILE in the user cache dir).
+        """
+        self.path = path or config.get_cache_dir() / config.HTTP_ETAG_CACHE_FILE
+        self._entries: dict[str, dict[str, Any]] | None = None
+
+    @property
+    def entries(self) -> dict[str, dict[str, Any]]:
+        """Mapping of URL to {"etag", "value", "stored_at"}."""
+        if self._entries is None:
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                data = {}
+            self._entries = {
+                url: entry
+                for url, entry in (data.items() if isinstance(data, dict) else [])
+                if isinstance(entry, dict) and isinstance(entry.get("etag"), str)
+            }
+        return self._entries
+
+    def get(self, url: str) -> dict[str, Any] | None:
+        """
+        Get the cached entry for a URL.
+
+        Args:
+            url: Request URL.
+
+        Returns:
+            Entry with "etag" and "value", or None.
+        """
+        return self.entries.get(url)
+
+    def conditional_headers(self, url: str) -> dict[str, str]:
+        """
+        Build If-None-Match for a URL with a cached ETag.
+
+        Args:
+            url: Request URL.
+
+        Returns:
+            {"If-None-Match": etag}, or an empty dict.
+        """
+        entry = self.get(url)
+        return {"If-None-Match": entry["etag"]} if entry else {}
+
+    def put(self, url: str, response: requests.Response, value: Any) -> None:
+        """
+        Store the response ETag with the value extracted from it.
+
+        Responses without an ETag are not cached. Write failures are ignored.
+
+        Args:
+            url: Request URL.
+            response: 200 response carrying the ETag.
+            value: JSON-serializable value to return on a later 304.
+        """
+        etag = _header(response, "ETag")
+        if not etag:
+            return
+        entries = self.entries
+        entries[url] = {"etag": etag, "value": value, "stored_at": time.time()}
+        if len(entries) > config.HTTP_ETAG_CACHE_MAX_ENTRIES:
+            oldest = sorted(entries, key=lambda u: entries[u].get("stored_at", 0))
+            for stale_url in oldest[: len(entries) - config.HTTP_ETAG_CACHE_MAX_ENTRIES]:
+                del entries[stale_url]
+        temp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path.write_text(json.dumps(entries), encoding="utf-8")
+            os.replace(temp_path, self.path)
+        except OSError:
+            temp_path.unlink(missing_ok=True)
+
+
+PARTIAL_SUFFIX = ".part"
+PARTIAL_META_SUFFIX = ".part.json"
+DOWNLOAD_LOCK_SUFFIX = ".lock"
+
+_CONTENT_RANGE_RE = re.compile(r"bytes (\d+)-(\d+)/(\d+|\*)")
+
+
+class IncompleteDownloadError(requests.RequestException):
+    """The server sent fewer bytes than announced; the partial file is kept."""
+
+
+def _read_meta(meta_path: Path, url: str) -> dict[str, Any]:
+    try:
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return meta if isinstance(meta, dict) and meta.get("url") == url else {}
+
+
+def _discard_partial(part: Path, meta_path: Path) -> None:
+    part.unlink(missing_ok=True)
+    meta_path.unlink(missing_ok=True)
+
+
+def _raw_chunks(response: requests.Response, chunk_size: int) -> Iterator[bytes]:
+    """Stream the undecoded body (the bytes Content-Length and ranges count)."""
+    try:
+        yield from response.raw.stream(chunk_size, decode_content=False)
+    except Urllib3HTTPError as e:
+        raise requests.ConnectionError(e) from e
+
+
+def _download_once(
+    url: str,
+    part: Path,
+    meta_path: Path,
+    chunk_size: int,
+    headers: dict[str, str] | None,
+    fetch: Callable[..., requests.Response],
+) -> None:
+    """Fetch (the rest of) url into part; raises if the file is not complete."""
+    meta = _read_meta(meta_path, url)
+    offset = part.stat().st_size if meta and part.exists() else 0
+    request_headers = {"Accept-Encoding": "identity", **(headers or {})}
+    if offset:
+        request_headers["Range"] = f"bytes={offset}-"
+        if meta.get("etag"):
+            request_headers["If-Range"] = str(meta["etag"])
+
+    response = fetch(url, headers=request_headers, stream=True)
+    try:
+        if offset and response.status_code == 416:
+            if meta.get("total") == offset:
+                return
+            _discard_partial(part, meta_path)
+            raise IncompleteDownloadError("Range not satisfiable; restarting download")
+        response.raise_for_status()
+
+        total: int | None = None
+        mode = "wb"
+        content_range = _header(response, "Content-Range")
+        if offset and response.status_code == 206 and content_range:
+            match = _CONTENT_RANGE_RE.fullmatch(content_range.strip())
+            if match is None or int(match.group(1)) != offset:
+                _discard_partial(part, meta_path)
+                raise IncompleteDownloadError(f"Unexpected Content-Range: {content_range}")
+            total = int(match.group(3)) if match.group(3) != "*" else None
+            mode = "ab"
+        else:
+            length = _header(response, "Content-Length")
+            total = int(length) if length and length.isdigit() else None
+
+        encoding = (_header(response, "Content-Encoding") or "identity").strip().lower()
+        if encoding != "identity":
+            # Decoded sizes do not match the wire offsets: fetch whole, never resume
+            if mode == "ab":
+                _discard_partial(part, meta_path)
+                raise IncompleteDownloadError(f"Encoded ({encoding}) range response")
+            meta_path.unlink(missing_ok=True)
+            total = None
+            chunks = response.iter_content(chunk_size=chunk_size)
+        else:
+            etag = _header(response, "ETag")
+            meta = {"url": url, "etag": etag if etag and not etag.startswith("W/") else None}
+            meta["total"] = total
+            meta_path.write_text(json.dumps(meta), encoding="utf-8")
+            chunks = _raw_chunks(response, chunk_size)
+
+        with part.open(mode) as f:
+            for chunk in chunks:
+                if chunk:
+                    f.write(chunk)
+    finally:
+        response.close()
+
+    size = part.stat().st_size
+    if total is not None and size != total:
+        raise IncompleteDownloadError(f"Received {size} of {total} bytes")
+
+
+def download(
+    url: str,
+    dest: Path,
+    attempts: int = config.HTTP_RETRIES + 1,
+    chunk_size: int = 8192,
+    headers: dict[str, str] | None = None,
+    backoff_factor: float = config.HTTP_BACKOFF_FACTOR,
+    fetch: Callable[..., requests.Response] | None = None,
+) -> Path:
+    """
+    Download url to dest, resuming any partial download left by an earlier call.
+
+    The partial file is only touched while holding an flock on
+    `<dest>.lock`. A caller that waited for the lock while another process
+    completed dest gets that file without a request.
+
+    Args:
+        url: URL to fetch.
+        dest: Final file path (written atomically on completion).
+        attempts: Resume attempts within this call before giving up.
+        chunk_size: Streaming chunk size in bytes.
+        headers: Extra request headers.
+        backoff_factor: Base of the jittered exponential delay between attempts.
+        fetch: Sends each GET (default: get), e.g. GitHubScheduler.get so
+            the requests draw from and re-sync the GitHub rate-limit bucket.
+
+    Returns:
+        dest.
+
+    Raises:
+        requests.RequestException: If the download could not be completed;
+            the partial file is kept for the next call.
+    """
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    part = dest.with_name(dest.name + PARTIAL_SUFFIX)
+    meta_path = dest.with_name(dest.name + PARTIAL_META_SUFFIX)
+    existed = dest.exists()
+    error: requests.RequestException | None = None
+    with file_lock(dest.with_name(dest.name + DOWNLOAD_LOCK_SUFFIX)):
+        if not existed and dest.exists():
+            return dest
+        for attempt in range(max(1, attempts)):
+            if attempt and backoff_factor > 0:
+                time.sleep(random.uniform(0, backoff_factor * 2 ** (attempt - 1)))
+            try:
+                _download_once(url, part, meta_path, chunk_size, headers, fetch or get)
+            except requests.RequestException as e:
+                error = e
+                continue
+            os.replace(part, dest)
+            meta_path.unlink(missing_ok=True)
+            return dest
+    assert error is not None
+    raise error
+
+
+def prune_partials(directory: Path, max_age: float) -> int:
+    """
+    Remove partial downloads not touched for max_age seconds.
+
+    Partials whose `<dest>.lock` is held by a running download are skipped.
+
+    Args:
+        directory: Download cache directory.
+        max_age: Age in seconds.
+
+    Returns:
+        Number of partial downloads removed.
+    """
+    removed = 0
+    cutoff = time.time() - max_age
+    for part in directory.glob(f"*{PARTIAL_SUFFIX}"):
+        dest_name = part.name.removesuffix(PARTIAL_SUFFIX)
+        try:
+            if part.stat().st_mtime >= cutoff:
+                continue
+            with file_lock(part.with_name(dest_name + DOWNLOAD_LOCK_SUFFIX), blocking=False):
+                if part.stat().st_mtime < cutoff:
+                    _discard_partial(part, part.with_name(dest_name + PARTIAL_META_SUFFIX))
+                    removed += 1
+        except OSError:
+            # Missing, or locked by a download in progress (BlockingIOError)
+            continue
+    return removed
@@ -0,0 +1,1034 @@
+"""
+Persistent plan index for `.pilot/plan` state queries.
+
+Plans live as markdown files (or plan directories) under
+`.pilot/plan/{pending,in_progress,done}` with branch pointers in
+`.pilot/plan/active/`. This module keeps an incrementally updated SQLite
+index of those plans so list, count and lookup queries do not rescan the
+plan directories, plus a full-text index (SQLite FTS5) of plan content for
+`claude-pilot plans search`.
+
+Old done plans can be packed into monthly zip bundles under
+`.pilot/plan/archive/` (`claude-pilot plans archive`). Archived plans stay in
+the index with state "archived", so they remain listable, searchable and
+readable, and can be extracted back to disk.
+
+Refresh is incremental: a state directory is only relisted when its mtime
+changes (pending/in_progress are small and always listed so in-place edits
+are picked up), and a plan file is only re-parsed when its size/mtime changes.
+Archive bundles are re-read only when their mtime changes.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import shutil
+import sqlite3
+import time
+import zipfile
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from claude_pilot import config
+
+# Bump when the schema changes; older indexes are dropped and rebuilt
+SCHEMA_VERSION = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dirs (
+    state TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS plans (
+    plan_id TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    path TEXT NOT NULL,
+    title TEXT,
+    branch TEXT,
+    created_at TEXT,
+    updated_at REAL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    success_criteria TEXT NOT NULL DEFAULT '[]',
+    bundle TEXT
+);
+CREATE INDEX IF NOT EXISTS plans_by_state ON plans (state, plan_id);
+CREATE TABLE IF NOT EXISTS archive_entries (
+    plan_id TEXT PRIMARY KEY,
+    bundle TEXT NOT NULL,
+    path TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS active (
+    branch_key TEXT PRIMARY KEY,
+    plan_path TEXT NOT NULL
+);
+"""
+
+# Full-text index; title hits are weighted above body hits when ranking
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS plan_text USING fts5(
+    plan_id UNINDEXED,
+    title,
+    body,
+    tokenize = 'porter unicode61'
+);
+"""
+_FTS_FALLBACK_SCHEMA = """
+CREATE TABLE IF NOT EXISTS plan_text (
+    plan_id TEXT PRIMARY KEY,
+    title TEXT,
+    body TEXT
+);
+"""
+_BM25_WEIGHTS = (0.0, 10.0, 1.0)
+_SNIPPET_TOKENS = 12
+_SNIPPET_CHARS = 80
+HIGHLIGHT_START = "["
+HIGHLIGHT_END = "]"
+
+_TITLE_RE = re.compile(r"^#[ \t]+(.+?)[ \t]*$", re.MULTILINE)
+_BRANCH_RE = re.compile(r"^[-*][ \t]+Branch:[ \t]*(\S+)", re.MULTILINE)
+_GENERATED_RE = re.compile(
+    r"Generated(?: at)?:[ \t]*(\d{4}-\d{2}-\d{2})(?:[ T](\d{2}:\d{2}(?::\d{2})?))?"
+)
+_ID_TIMESTAMP_RE = re.compile(r"(\d{4})(\d{2})(\d{2})(?:_(\d{2})(\d{2})(\d{2}))?")
+_QUERY_TERM_RE = re.compile(r"\w+\*?")
+_SC_RE = re.compile(r"^[\s>*#|\-\[\]xX✅]*\**(SC-\d+)\**[ \t]*[:|\-–]?[ \t]*(.*)$")
+
+# Preferred plan file names inside a plan directory
+_DIR_PLAN_FILES = ("plan.md",)
+
+
+@dataclass
+class PlanRecord:
+    """A single indexed plan."""
+
+    plan_id: str
+    state: str
+    path: str
+    title: str | None = None
+    branch: str | None = None
+    created_at: str | None = None
+    updated_at: float | None = None
+    success_criteria: list[dict[str, str]] = field(default_factory=list)
+    bundle: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return a JSON-serializable dictionary."""
+        return asdict(self)
+
+
+@dataclass
+class SearchHit:
+    """A ranked full-text search result."""
+
+    plan: PlanRecord
+    score: float
+    snippet: str
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return a JSON-serializable dictionary."""
+        data = self.plan.to_dict()
+        data["score"] = self.score
+        data["snippet"] = self.snippet
+        return data
+
+
+def parse_plan_metadata(plan_id: str, text: str) -> dict[str, Any]:
+    """
+    Extract indexable metadata from a plan's markdown.
+
+    Args:
+        plan_id: Plan identifier (file stem or directory name).
+        text: Plan markdown content.
+
+    Returns:
+        Dictionary with title, branch, created_at and success_criteria.
+    """
+    title_match = _TITLE_RE.search(text)
+    branch_match = _BRANCH_RE.search(text)
+
+    created_at = None
+    generated = _GENERATED_RE.search(text)
+    if generated:
+        created_at = generated.group(1)
+        if generated.group(2):
+            created_at += "T" + generated.group(2)
+    else:
+        stamp = _ID_TIMESTAMP_RE.search(plan_id)
+        if stamp:
+            year, month, day, hour, minute, second = stamp.groups()
+            created_at = f"{year}-{month}-{day}"
+            if hour:
+                created_at += f"T{hour}:{minute}:{second}"
+
+    criteria: list[dict[str, str]] = []
+    seen: set[str] = set()
+    for line in text.splitlines():
+        if "SC-" not in line:
+            continue
+        match = _SC_RE.match(line)
+        if not match or match.group(1) in seen:
+            continue
+        segments = [s.strip(" *") for s in match.group(2).split("|")]
+        description = next((s for s in segments if s), "")
+        if description:
+            seen.add(match.group(1))
+            criteria.append({"id": match.group(1), "description": description})
+
+    return {
+        "title": title_match.group(1) if title_match else None,
+        "branch": branch_match.group(1) if branch_match else None,
+        "created_at": created_at,
+        "success_criteria": criteria,
+    }
+
+
+def _query_terms(query: str) -> list[str]:
+    """Split a search query into word terms, keeping a trailing `*` for prefixes."""
+    return _QUERY_TERM_RE.findall(query)
+
+
+def _fts_query(terms: list[str]) -> str:
+    """
+    Build an FTS5 MATCH expression that requires every term.
+
+    Terms are quoted so punctuation in user input (e.g. "worktree-utils")
+    never turns into FTS5 operators or column filters.
+    """
+    parts = []
+    for term in terms:
+        prefix = term.endswith("*")
+        word = term.rstrip("*")
+        parts.append(f'"{word}"*' if prefix else f'"{word}"')
+    return " ".join(parts)
+
+
+def _like_snippet(body: str, terms: list[str]) -> str:
+    """Build a snippet around the first term occurrence (non-FTS5 fallback)."""
+    lowered = body.lower()
+    positions = [lowered.find(t.rstrip("*").lower()) for t in terms]
+    found = [p for p in positions if p >= 0]
+    if not found:
+        return " ".join(body[:_SNIPPET_CHARS].split())
+    start = max(min(found) - _SNIPPET_CHARS // 2, 0)
+    text = " ".join(body[start : start + _SNIPPET_CHARS].split())
+    return ("…" if start else "") + text + "…"
+
+
+def _plan_key(plan_id: str) -> str:
+    """Normalize a plan id, file name or path to the indexed plan id."""
+    key = Path(plan_id).name
+    return key[:-3] if key.endswith(".md") else key
+
+
+def _list_state_dir(state_dir: Path) -> dict[str, str]:
+    """
+    List plans in a state directory.
+
+    A plan is either `<id>.md` or a directory `<id>/` containing a markdown
+    file. When both exist, the `.md` file is the plan and the directory holds
+    its artifacts.
+
+    Returns:
+        Mapping of plan id to plan file path relative to the state directory.
+    """
+    plans: dict[str, str] = {}
+    directories: list[str] = []
+    try:
+        with os.scandir(state_dir) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                if entry.is_dir():
+                    directories.append(entry.name)
+                elif entry.name.endswith(".md"):
+                    plans[entry.name[:-3]] = entry.name
+    except OSError:
+        return {}
+
+    for name in directories:
+        if name in plans:
+            continue
+        plan_file = _find_dir_plan_file(state_dir / name)
+        if plan_file is not None:
+            plans[name] = f"{name}/{plan_file}"
+    return plans
+
+
+def _list_bundle(names: list[str]) -> dict[str, str]:
+    """
+    List plans in an archive bundle, mirroring _list_state_dir().
+
+    Returns:
+        Mapping of plan id to the plan file's entry name in the bundle.
+    """
+    plans: dict[str, str] = {}
+    directories: dict[str, set[str]] = {}
+    for name in names:
+        top, sep, rest = name.partition("/")
+        if top.startswith("."):
+            continue
+        if not sep:
+            if name.endswith(".md"):
+                plans[name[:-3]] = name
+        elif rest:
+            directories.setdefault(top, set()).add(rest)
+
+    for top, files in directories.items():
+        if top in plans:
+            continue
+        for candidate in _DIR_PLAN_FILES + (f"{top}.md",):
+            if candidate in files:
+                plans[top] = f"{top}/{candidate}"
+                break
+        else:
+            markdown = sorted(f for f in files if "/" not in f and f.endswith(".md"))
+            if markdown:
+                plans[top] = f"{top}/{markdown[0]}"
+    return plans
+
+
+def _entry_plan_id(name: str) -> str:
+    """Plan id owning a bundle entry ("<id>.md" or "<id>/...")."""
+    top, sep, _ = name.partition("/")
+    return top[:-3] if not sep and top.endswith(".md") else top
+
+
+def _bundle_name(record: PlanRecord) -> str:
+    """Monthly bundle file name for a plan, from its creation or modification date."""
+    created = record.created_at or ""
+    if re.match(r"\d{4}-\d{2}", created):
+        month = created[:7]
+    else:
+        month = time.strftime("%Y-%m", time.localtime(record.updated_at or 0))
+    return f"{month}.zip"
+
+
+def _find_dir_plan_file(directory: Path) -> str | None:
+    """Pick the plan markdown file inside a plan directory."""
+    for candidate in _DIR_PLAN_FILES + (f"{directory.name}.md",):
+        if (directory / candidate).is_file():
+            return candidate
+    try:
+        markdown = sorted(p.name for p in directory.iterdir() if p.suffix == ".md")
+    except OSError:
+        return None
+    return markdown[0] if markdown else None
+
+
+class PlanIndex:
+    """
+    SQLite-backed index of `.pilot/plan` plans.
+
+    Use as a context manager; every query refreshes the index incrementally
+    unless refresh=False is passed.
+    """
+
+    def __init__(self, target_dir: Path | None = None, index_path: Path | None = None) -> None:
+        """
+        Initialize the plan index.
+
+        Args:
+            target_dir: Project directory. Defaults to current working directory.
+            index_path: Optional index file path. Defaults to config.PLAN_INDEX_FILE.
+        """
+        if target_dir is None:
+            target_dir = config.get_target_dir()
+        self.target_dir = target_dir
+        self.plan_dir = target_dir / config.PLAN_DIR
+        self.index_path = index_path or target_dir / config.PLAN_INDEX_FILE
+        self.archive_dir = target_dir / config.PLAN_ARCHIVE_DIR
+        self._conn: sqlite3.Connection | None = None
+        self._fts_enabled = False
+
+    # -------------------------------------------------------------------------
+    # Connection management
+    # -------------------------------------------------------------------------
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Open (and migrate) the index database on first use."""
+        if self._conn is None:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.index_path), timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                self._drop_all(conn)
+            conn.executescript(_SCHEMA)
+            self._fts_enabled = self._create_text_table(conn)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    @property
+    def fts_enabled(self) -> bool:
+        """Whether plan search uses SQLite FTS5 (False means the LIKE fallback)."""
+        # Opening the connection detects (or creates) the text table
+        return self.conn is not None and self._fts_enabled
+
+    @staticmethod
+    def _create_text_table(conn: sqlite3.Connection) -> bool:
+        """
+        Create the full-text table.
+
+        Returns:
+            True if FTS5 is available, False if the LIKE fallback table is used.
+        """
+        row = conn.execute(
+            "SELECT sql FROM sqlite_master WHERE name = 'plan_text'"
+        ).fetchone()
+        if row is not None:
+            return "fts5" in (row["sql"] or "").lower()
+        try:
+            conn.executescript(_FTS_SCHEMA)
+            return True
+        except sqlite3.OperationalError:
+            conn.executescript(_FTS_FALLBACK_SCHEMA)
+            return False
+
+    def _drop_all(self, conn: sqlite3.Connection) -> None:
+        """Drop every table and view so the current schema can be recreated."""
+        # Virtual tables first: dropping one also drops its shadow tables
+        rows = conn.execute(
+            "SELECT type, name FROM sqlite_master "
+            "WHERE type IN ('table', 'view') AND name NOT LIKE 'sqlite_%' "
+            "ORDER BY sql NOT LIKE 'CREATE VIRTUAL%'"
+        ).fetchall()
+        for row in rows:
+            conn.execute(f'DROP {row["type"].upper()} IF EXISTS "{row["name"]}"')
+
+    def close(self) -> None:
+        """Close the database connection."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self) -> PlanIndex:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    # -------------------------------------------------------------------------
+    # Refresh
+    # -------------------------------------------------------------------------
+
+    def refresh(self, full: bool = False) -> int:
+        """
+        Bring the index up to date with the plan directories.
+
+        Args:
+            full: Relist every state directory and re-parse every plan.
+
+        Returns:
+            Number of plans inserted, updated or removed.
+        """
+        conn = self.conn
+        stored = {
+            row["state"]: row["mtime_ns"]
+            for row in conn.execute("SELECT state, mtime_ns FROM dirs")
+        }
+        changes = 0
+        removed: list[str] = []
+
+        with conn:
+            for state in config.PLAN_STATES:
+                state_dir = self.plan_dir / state
+                try:
+                    mtime_ns = state_dir.stat().st_mtime_ns
+                except OSError:
+                    removed += self._remove_missing(state, set())
+                    conn.execute("DELETE FROM dirs WHERE state = ?", (state,))
+                    continue
+
+                # Done plans are only relisted when entries are added or removed
+                if not full and state == "done" and stored.get(state) == mtime_ns:
+                    continue
+
+                listing = _list_state_dir(state_dir)
+                removed += self._remove_missing(state, set(listing))
+                for plan_id, rel_file in listing.items():
+                    changes += self._upsert(plan_id, state, rel_file, force=full)
+
+                conn.execute(
+                    "INSERT OR REPLACE INTO dirs (state, mtime_ns) VALUES (?, ?)",
+                    (state, mtime_ns),
+                )
+
+            changes += len(removed)
+            changes += self._refresh_archive(stored, full, removed)
+            self._refresh_active(stored, full)
+
+        return changes
+
+    def _remove_missing(self, state: str, present: set[str]) -> list[str]:
+        """Delete index rows of a state that are no longer on disk."""
+        rows = self.conn.execute(
+            "SELECT plan_id FROM plans WHERE state = ?", (state,)
+        ).fetchall()
+        missing = [row["plan_id"] for row in rows if row["plan_id"] not in present]
+        for plan_id in missing:
+            self._delete(plan_id)
+        return missing
+
+    def _delete(self, plan_id: str) -> None:
+        """Remove a plan from the index."""
+        self.conn.execute("DELETE FROM plans WHERE plan_id = ?", (plan_id,))
+        self.conn.execute("DELETE FROM plan_text WHERE plan_id = ?", (plan_id,))
+
+    def _upsert(self, plan_id: str, state: str, rel_file: str, force: bool = False) -> int:
+        """Index a plan if it is new, moved or modified. Returns 1 if changed."""
+        path = f"{state}/{rel_file}"
+        full_path = self.plan_dir / path
+        try:
+            st = full_path.stat()
+        except OSError:
+            return 0
+
+        row = self.conn.execute(
+            "SELECT state, path, mtime_ns, size FROM plans WHERE plan_id = ?", (plan_id,)
+        ).fetchone()
+        if (
+            not force
+            and row is not None
+            and (row["state"], row["path"], row["mtime_ns"], row["size"])
+            == (state, path, st.st_mtime_ns, st.st_size)
+        ):
+            return 0
+
+        try:
+            text = full_path.read_text(encoding="utf-8", errors="replace")
+        except OSError:
+            return 0
+
+        self._write_row(plan_id, state, path, text, st.st_mtime, st.st_mtime_ns, st.st_size)
+        return 1
+
+    def _write_row(
+        self,
+        plan_id: str,
+        state: str,
+        path: str,
+        text: str,
+        mtime: float,
+        mtime_ns: int,
+        size: int,
+        bundle: str | None = None,
+    ) -> None:
+        """Parse a plan and write its metadata and full-text rows."""
+        meta = parse_plan_metadata(plan_id, text)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO plans (plan_id, state, path, title, branch, "
+            "created_at, updated_at, mtime_ns, size, success_criteria, bundle) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                plan_id,
+                state,
+                path,
+                meta["title"],
+                meta["branch"],
+                meta["created_at"],
+                mtime,
+                mtime_ns,
+                size,
+                json.dumps(meta["success_criteria"], ensure_ascii=False),
+                bundle,
+            ),
+        )
+        self.conn.execute("DELETE FROM plan_text WHERE plan_id = ?", (plan_id,))
+        self.conn.execute(
+            "INSERT INTO plan_text (plan_id, title, body) VALUES (?, ?, ?)",
+            (plan_id, meta["title"] or "", text),
+        )
+
+    def _refresh_archive(self, stored: dict[str, int], full: bool, removed: list[str]) -> int:
+        """
+        Re-read archive bundles whose mtime changed.
+
+        Live plans take precedence over archived copies; plans that just left
+        the live directories fall back to their archived copy if one exists.
+
+        Returns:
+            Number of plans inserted, updated or removed.
+        """
+        bundles: dict[str, int] = {}
+        try:
+            with os.scandir(self.archive_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".zip") and not entry.name.startswith("."):
+                        bundles[entry.name] = entry.stat().st_mtime_ns
+        except OSError:
+            pass
+
+        changes = 0
+        known = {key[8:] for key in stored if key.startswith("archive/")}
+        for name in sorted(known - set(bundles)):
+            changes += self._drop_bundle(name)
+        for name, mtime_ns in sorted(bundles.items()):
+            if full or stored.get(f"archive/{name}") != mtime_ns:
+                changes += self._index_bundle(name, mtime_ns, force=full)
+
+        for plan_id in removed:
+            entry = self.conn.execute(
+                "SELECT bundle, path FROM archive_entries WHERE plan_id = ?", (plan_id,)
+            ).fetchone()
+            if entry is None or self._state_of(plan_id) is not None:
+                continue
+            try:
+                with zipfile.ZipFile(self.archive_dir / entry["bundle"]) as bundle:
+                    changes += self._index_archived(bundle, plan_id, entry["bundle"], entry["path"])
+            except (OSError, zipfile.BadZipFile, KeyError):
+                continue
+        return changes
+
+    def _state_of(self, plan_id: str) -> str | None:
+        """Indexed state of a plan, or None if it is not indexed."""
+        row = self.conn.execute(
+            "SELECT state FROM plans WHERE plan_id = ?", (plan_id,)
+        ).fetchone()
+        return row["state"] if row is not None else None
+
+    def _drop_bundle(self, name: str) -> int:
+        """Forget a bundle that no longer exists."""
+        rows = self.conn.execute(
+            "SELECT plan_id FROM plans WHERE state = ? AND bundle = ?",
+            (config.PLAN_ARCHIVED_STATE, name),
+        ).fetchall()
+        for row in rows:
+            self._delete(row["plan_id"])
+        self.conn.execute("DELETE FROM archive_entries WHERE bundle = ?", (name,))
+        self.conn.execute("DELETE FROM dirs WHERE state = ?", (f"archive/{name}",))
+        return len(rows)
+
+    def _index_bundle(self, name: str, mtime_ns: int, force: bool = False) -> int:
+        """Index every plan in a bundle. Unreadable bundles are retried next refresh."""
+        changes = 0
+        try:
+            with zipfile.ZipFile(self.archive_dir / name) as bundle:
+                listing = _list_bundle(bundle.namelist())
+                stale = self.conn.execute(
+                    "SELECT plan_id FROM plans WHERE state = ? AND bundle = ?",
+                    (config.PLAN_ARCHIVED_STATE, name),
+                ).fetchall()
+                for row in stale:
+                    if row["plan_id"] not in listing:
+                        self._delete(row["plan_id"])
+                        changes += 1
+
+                self.conn.execute("DELETE FROM archive_entries WHERE bundle = ?", (name,))
+                for plan_id, entry_name in listing.items():
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO archive_entries (plan_id, bundle, path) "
+                        "VALUES (?, ?, ?)",
+                        (plan_id, name, entry_name),
+                    )
+                    state = self._state_of(plan_id)
+                    if state is not None and state != config.PLAN_ARCHIVED_STATE:
+                        continue
+                    changes += self._index_archived(bundle, plan_id, name, entry_name, force)
+        except (OSError, zipfile.BadZipFile):
+            return changes
+
+        self.conn.execute(
+            "INSERT OR REPLACE INTO dirs (state, mtime_ns) VALUES (?, ?)",
+            (f"archive/{name}", mtime_ns),
+        )
+        return changes
+
+    def _index_archived(
+        self,
+        bundle: zipfile.ZipFile,
+        plan_id: str,
+        bundle_name: str,
+        entry_name: str,
+        force: bool = False,
+    ) -> int:
+        """Index one archived plan if new or changed. Returns 1 if changed."""
+        info = bundle.getinfo(entry_name)
+        mtime = time.mktime(info.date_time + (0, 0, -1))
+        mtime_ns = int(mtime) * 1_000_000_000
+        row = self.conn.execute(
+            "SELECT state, path, mtime_ns, size, bundle FROM plans WHERE plan_id = ?",
+            (plan_id,),
+        ).fetchone()
+        if (
+            not force
+            and row is not None
+            and (row["state"], row["path"], row["mtime_ns"], row["size"], row["bundle"])
+            == (config.PLAN_ARCHIVED_STATE, entry_name, mtime_ns, info.file_size, bundle_name)
+        ):
+            return 0
+
+        text = bundle.read(info).decode("utf-8", errors="replace")
+        self._write_row(
+            plan_id,
+            config.PLAN_ARCHIVED_STATE,
+            entry_name,
+            text,
+            mtime,
+            mtime_ns,
+            info.file_size,
+            bundle=bundle_name,
+        )
+        return 1
+
+    def _refresh_active(self, stored: dict[str, int], full: bool) -> None:
+        """Re-read active branch pointers if the active directory changed."""
+        active_dir = self.plan_dir / "active"
+        try:
+            mtime_ns = active_dir.stat().st_mtime_ns
+        except OSError:
+            self.conn.execute("DELETE FROM active")
+            self.conn.execute("DELETE FROM dirs WHERE state = 'active'")
+            return
+        if not full and stored.get("active") == mtime_ns:
+            return
+
+        self.conn.execute("DELETE FROM active")
+        for pointer in active_dir.glob("*.txt"):
+            try:
+                plan_path = pointer.read_text().strip()
+            except OSError:
+                continue
+            if plan_path:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO active (branch_key, plan_path) VALUES (?, ?)",
+                    (pointer.stem, plan_path),
+                )
+        self.conn.execute(
+            "INSERT OR REPLACE INTO dirs (state, mtime_ns) VALUES ('active', ?)",
+            (mtime_ns,),
+        )
+
+    # -------------------------------------------------------------------------
+    # Queries
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _record(row: sqlite3.Row) -> PlanRecord:
+        return PlanRecord(
+            plan_id=row["plan_id"],
+            state=row["state"],
+            path=row["path"],
+            title=row["title"],
+            branch=row["branch"],
+            created_at=row["created_at"],
+            updated_at=row["updated_at"],
+            success_criteria=json.loads(row["success_criteria"] or "[]"),
+            bundle=row["bundle"],
+        )
+
+    def list_plans(
+        self,
+        state: str | None = None,
+        limit: int | None = None,
+        refresh: bool = True,
+    ) -> list[PlanRecord]:
+        """
+        List indexed plans ordered by plan id (oldest first for timestamped ids).
+
+        Args:
+            state: Optional state filter.
+            limit: Optional maximum number of plans.
+            refresh: Refresh the index before querying.
+
+        Returns:
+            List of plan records.
+        """
+        if refresh:
+            self.refresh()
+        query = "SELECT * FROM plans"
+        params: list[Any] = []
+        if state:
+            query += " WHERE state = ?"
+            params.append(state)
+        query += " ORDER BY plan_id"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        return [self._record(row) for row in self.conn.execute(query, params)]
+
+    def count(self, refresh: bool = True) -> dict[str, int]:
+        """
+        Count live plans per state (archived plans are not counted).
+
+        Args:
+            refresh: Refresh the index before querying.
+
+        Returns:
+            Mapping of every plan state to its count.
+        """
+        if refresh:
+            self.refresh()
+        counts = {state: 0 for state in config.PLAN_STATES}
+        for row in self.conn.execute(
+            "SELECT state, COUNT(*) AS n FROM plans GROUP BY state"
+        ):
+            if row["state"] in counts:
+                counts[row["state"]] = row["n"]
+        return counts
+
+    def get(self, plan_id: str, refresh: bool = True) -> PlanRecord | None:
+        """
+        Look up a plan by id (file stem), file name or path.
+
+        Args:
+            plan_id: Plan id, e.g. "20260117_063116_worktree_close_flow_improvement".
+            refresh: Refresh the index before querying.
+
+        Returns:
+            The plan record, or None if not found.
+        """
+        if refresh:
+            self.refresh()
+        row = self.conn.execute(
+            "SELECT * FROM plans WHERE plan_id = ?", (_plan_key(plan_id),)
+        ).fetchone()
+        return self._record(row) if row is not None else None
+
+    def search(
+        self,
+        query: str,
+        state: str | None = None,
+        limit: int = 20,
+        refresh: bool = True,
+    ) -> list[SearchHit]:
+        """
+        Full-text search over plan titles and content.
+
+        Every word in the query must match; a trailing `*` matches a prefix
+        (e.g. "worktree clos*"). Results are ranked by BM25 with title matches
+        weighted above body matches.
+
+        Args:
+            query: Search words.
+            state: Optional state filter.
+            limit: Maximum number of hits.
+            refresh: Refresh the index before querying.
+
+        Returns:
+            Ranked search hits, best first.
+        """
+        if refresh:
+            self.refresh()
+        terms = _query_terms(query)
+        if not terms:
+            return []
+        if self.fts_enabled:
+            return self._search_fts(terms, state, limit)
+        return self._search_like(terms, state, limit)
+
+    def _search_fts(self, terms: list[str], state: str | None, limit: int) -> list[SearchHit]:
+        """Rank hits with FTS5 bm25() and build snippet() excerpts."""
+        weights = ", ".join(str(w) for w in _BM25_WEIGHTS)
+        query = (
+            f"SELECT p.*, bm25(plan_text, {weights}) AS score, "
+            "snippet(plan_text, -1, ?, ?, '…', ?) AS snippet "
+            "FROM plan_text JOIN plans p ON p.plan_id = plan_text.plan_id "
+            "WHERE plan_text MATCH ?"
+        )
+        params: list[Any] = [HIGHLIGHT_START, HIGHLIGHT_END, _SNIPPET_TOKENS, _fts_query(terms)]
+        if state:
+            query += " AND p.state = ?"
+            params.append(state)
+        query += " ORDER BY score LIMIT ?"
+        params.append(limit)
+        return [
+            # bm25() is negative with lower meaning better; report higher-is-better
+            SearchHit(plan=self._record(row), score=-row["score"], snippet=row["snippet"])
+            for row in self.conn.execute(query, params)
+        ]
+
+    def _search_like(self, terms: list[str], state: str | None, limit: int) -> list[SearchHit]:
+        """Substring search for SQLite builds without FTS5."""
+        query = (
+            "SELECT p.*, t.title AS text_title, t.body AS body "
+            "FROM plan_text t JOIN plans p ON p.plan_id = t.plan_id WHERE 1"
+        )
+        params: list[Any] = []
+        for term in terms:
+            query += " AND (t.title || ' ' || t.body) LIKE ?"
+            params.append(f"%{term.rstrip('*')}%")
+        if state:
+            query += " AND p.state = ?"
+            params.append(state)
+
+        hits = []
+        for row in self.conn.execute(query, params):
+            title = (row["text_title"] or "").lower()
+            title_hits = sum(1 for t in terms if t.rstrip("*").lower() in title)
+            score = float(title_hits * _BM25_WEIGHTS[1] + len(terms))
+            hits.append(
+                SearchHit(self._record(row), score, _like_snippet(row["body"], terms))
+            )
+        hits.sort(key=lambda hit: (-hit.score, hit.plan.plan_id))
+        return hits[:limit]
+
+    def active(self, refresh: bool = True) -> dict[str, str]:
+        """
+        Get active plan pointers.
+
+        Args:
+            refresh: Refresh the index before querying.
+
+        Returns:
+            Mapping of sanitized branch key to active plan path.
+        """
+        if refresh:
+            self.refresh()
+        return {
+            row["branch_key"]: row["plan_path"]
+            for row in self.conn.execute("SELECT branch_key, plan_path FROM active")
+        }
+
+    def read_plan(self, plan_id: str) -> str | None:
+        """
+        Read a plan's markdown content.
+
+        Args:
+            plan_id: Plan id, file name or path.
+
+        Returns:
+            The plan markdown, or None if the plan is unknown or unreadable.
+        """
+        record = self.get(plan_id)
+        if record is None:
+            return None
+        try:
+            if record.bundle is not None:
+                with zipfile.ZipFile(self.archive_dir / record.bundle) as bundle:
+                    return bundle.read(record.path).decode("utf-8", errors="replace")
+            return (self.plan_dir / record.path).read_text(encoding="utf-8")
+        except (OSError, zipfile.BadZipFile, KeyError):
+            return None
+
+    # -------------------------------------------------------------------------
+    # Archive
+    # -------------------------------------------------------------------------
+
+    def archive(
+        self,
+        older_than_days: int = config.PLAN_ARCHIVE_MIN_AGE_DAYS,
+        dry_run: bool = False,
+        now: float | None = None,
+    ) -> list[PlanRecord]:
+        """
+        Move done plans older than a cutoff into monthly zip bundles.
+
+        A plan's file and its artifact directory are written to
+        `archive/YYYY-MM.zip` (month of the plan's creation date), the bundle
+        is replaced atomically, and only then are the files removed from done/.
+
+        Args:
+            older_than_days: Archive plans last modified more than this many days ago.
+            dry_run: Only return the plans that would be archived.
+            now: Reference time (defaults to the current time).
+
+        Returns:
+            The plans that were (or would be) archived.
+        """
+        # Full refresh: done/ is otherwise only relisted when entries change,
+        # so in-place edits to done plans would leave stale modification times
+        self.refresh(full=True)
+        cutoff = (time.time() if now is None else now) - older_than_days * 86400
+        candidates = [
+            record
+            for record in self.list_plans(state="done", refresh=False)
+            if record.updated_at is not None and record.updated_at < cutoff
+        ]
+        if dry_run or not candidates:
+            return candidates
+
+        by_bundle: dict[str, list[str]] = {}
+        for record in candidates:
+            by_bundle.setdefault(_bundle_name(record), []).append(record.plan_id)
+
+        done_dir = self.plan_dir / "done"
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        for name, plan_ids in sorted(by_bundle.items()):
+            self._write_bundle(self.archive_dir / name, done_dir, plan_ids)
+            for plan_id in plan_ids:
+                for path in self._plan_paths(done_dir, plan_id):
+                    if path.is_dir():
+                        shutil.rmtree(path)
+                    else:
+                        path.unlink()
+
+        self.refresh()
+        return candidates
+
+    @staticmethod
+    def _plan_paths(state_dir: Path, plan_id: str) -> list[Path]:
+        """A plan's markdown file and/or directory within a state directory."""
+        paths = [state_dir / f"{plan_id}.md", state_dir / plan_id]
+        return [path for path in paths if path.exists()]
+
+    def _write_bundle(self, bundle_path: Path, done_dir: Path, plan_ids: list[str]) -> None:
+        """Rewrite a bundle with the given plans added (replacing older copies)."""
+        replaced = set(plan_ids)
+        temp_path = bundle_path.with_name(f".{bundle_path.name}.{os.getpid()}.tmp")
+        try:
+            with zipfile.ZipFile(temp_path, "w", compression=zipfile.ZIP_DEFLATED) as out:
+                if bundle_path.exists():
+                    with zipfile.ZipFile(bundle_path) as existing:
+                        for info in existing.infolist():
+                            if _entry_plan_id(info.filename) not in replaced:
+                                out.writestr(info, existing.read(info))
+                for plan_id in plan_ids:
+                    for path in self._plan_paths(done_dir, plan_id):
+                        files = [path] if path.is_file() else sorted(path.rglob("*"))
+                        for file in files:
+                            if file.is_file():
+                                out.write(file, file.relative_to(done_dir).as_posix())
+            os.replace(temp_path, bundle_path)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+
+    def extract(self, plan_id: str, dest: Path | None = None) -> list[Path] | None:
+        """
+        Extract an archived plan (file and artifacts) from its bundle.
+
+        Extracting into done/ (the default) restores the plan; the live copy
+        then takes precedence over the archived one until it is archived again.
+
+        Args:
+            plan_id: Plan id, file name or path.
+            dest: Destination directory. Defaults to `.pilot/plan/done`.
+
+        Returns:
+            Extracted file paths, or None if the plan is not archived.
+        """
+        self.refresh()
+        key = _plan_key(plan_id)
+        entry = self.conn.execute(
+            "SELECT bundle FROM archive_entries WHERE plan_id = ?", (key,)
+        ).fetchone()
+        if entry is None:
+            return None
+
+        dest = dest or self.plan_dir / "done"
+        root = dest.resolve()
+        written: list[Path] = []
+        with zipfile.ZipFile(self.archive_dir / entry["bundle"]) as bundle:
+            for info in bundle.infolist():
+                if info.is_dir() or _entry_plan_id(info.filename) != key:
+                    continue
+                target = (root / info.filename).resolve()
+                if root not in target.parents:
+                    continue
+                target.parent.mkdir(parents=True, exist_ok=True)
+                target.write_bytes(bundle.read(info))
+                mtime = time.mktime(info.date_time + (0, 0, -1))
+                os.utime(target, (mtime, mtime))
+                written.append(target)
+
+        self.refresh()
+        return written
@@ -0,0 +1,117 @@
+"""
+Cache warming for offline use (`claude-pilot prefetch`).
+
+Dev-container images bake claude-pilot in, but init and update would still
+reach PyPI and GitHub when a container starts. prefetch() fills the user
+cache directory with everything they can ask the network for:
+
+- the latest PyPI version (the update-check state);
+- for every external skills source, the commit SHA (ETag cache) and the
+  tarball for the pinned ref: the project's skills.lock ref if there is one,
+  otherwise the branch head;
+- the tool probe (codex, jq, git, ...).
+
+The cache directory can then be copied into an image layer. With
+CLAUDE_PILOT_CACHE_DIR pointing at it and CLAUDE_PILOT_OFFLINE=1 set, init
+runs without a single network request. Templates and asset digests ship
+inside the package, so there is nothing to fetch for them.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from claude_pilot import config
+
+
+@dataclass
+class PrefetchReport:
+    """What prefetch() stored in the cache directory."""
+
+    cache_dir: Path
+    latest_version: str | None = None
+    skills: dict[str, str] = field(default_factory=dict)
+    failed: list[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        """Whether every item was fetched."""
+        return self.latest_version is not None and not self.failed
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return a JSON-serializable dictionary."""
+        return {
+            "ok": self.ok,
+            "cache_dir": str(self.cache_dir),
+            "latest_version": self.latest_version,
+            "skills": self.skills,
+            "failed": self.failed,
+        }
+
+
+def _skill_ref(
+    name: str,
+    skill_config: dict[str, str],
+    lock: dict[str, dict[str, Any]],
+) -> str | None:
+    """Pick the ref to prefetch for a source: the locked commit, else the branch head."""
+    from claude_pilot.skills_lock import matches_config
+    from claude_pilot.updater import get_github_latest_sha
+
+    entry = lock.get(name)
+    if entry is not None and matches_config(entry, skill_config):
+        # Also warm the SHA check for `update --refresh-skills`
+        get_github_latest_sha(skill_config["repo"], skill_config["branch"])
+        return str(entry["ref"])
+    return get_github_latest_sha(skill_config["repo"], skill_config["branch"])
+
+
+def prefetch(target_dir: Path | None = None) -> PrefetchReport:
+    """
+    Download and cache everything init and update may fetch.
+
+    Args:
+        target_dir: Project whose skills.lock pins the skill refs (optional).
+
+    Returns:
+        PrefetchReport; failed lists the items that could not be fetched.
+    """
+    from claude_pilot import update_check
+    from claude_pilot.probe import get_capabilities
+    from claude_pilot.skills_lock import load_lock
+    from claude_pilot.updater import fetch_github_tarball
+
+    cache_dir = config.get_cache_dir()
+    report = PrefetchReport(cache_dir=cache_dir)
+
+    report.latest_version = update_check.refresh(cache_dir)
+    if report.latest_version is None:
+        report.failed.append("pypi")
+
+    lock = load_lock(target_dir) if target_dir is not None else {}
+    for name, skill_config in config.EXTERNAL_SKILLS.items():
+        ref = _skill_ref(name, skill_config, lock)
+        if ref is None or fetch_github_tarball(skill_config["repo"], ref) is None:
+            report.failed.append(name)
+            continue
+        report.skills[name] = ref
+
+    get_capabilities(refresh=True)
+
+    manifest = {
+        "version": config.VERSION,
+        "prefetched_at": time.time(),
+        "latest_version": report.latest_version,
+        "skills": report.skills,
+    }
+    manifest_path = cache_dir / config.PREFETCH_MANIFEST_FILE
+    temp_path = manifest_path.with_name(f"{manifest_path.name}.{os.getpid()}.tmp")
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    temp_path.write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+    os.replace(temp_path, manifest_path)
+    return report
@@ -0,0 +1,190 @@
+"""
+Memoized probe of external tools used by claude-pilot.
+
+Init, update and the shell scripts all need to know whether `codex`, `jq`,
+`git` and friends are installed, and whether Codex is authenticated. Probing
+means a PATH scan per tool plus a JSON parse of the Codex auth file, so the
+results are cached in the user cache directory (`probe.json`) and reused while
+the fingerprint is unchanged.
+
+The fingerprint is the PATH value, the mtime of every PATH directory
+(installing or removing a binary changes it) and the mtime/size of the Codex
+auth file, so validating the cache costs a handful of stat() calls.
+
+Shell consumers source `probe.env` from the same directory:
+
+    . "${XDG_CACHE_HOME:-$HOME/.cache}/claude-pilot/probe.env" 2>/dev/null
+    [ "$PILOT_PROBE_PATH" = "$PATH" ] && [ "$PILOT_HAS_JQ" = 1 ] && ...
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shlex
+import shutil
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from claude_pilot import config
+
+PROBE_STATE_FILE = "probe.json"
+PROBE_ENV_FILE = "probe.env"
+
+
+@dataclass
+class Capabilities:
+    """Detected external tools and Codex status."""
+
+    tools: dict[str, str | None] = field(default_factory=dict)
+    codex_cli: bool = False
+    codex_auth: bool = False
+    fingerprint: str = ""
+    probed_at: float = 0.0
+    cached: bool = False
+
+    @property
+    def codex_available(self) -> bool:
+        """Whether Codex is installed and authenticated."""
+        return self.codex_cli and self.codex_auth
+
+    def has(self, tool: str) -> bool:
+        """Whether a probed tool was found on PATH."""
+        return self.tools.get(tool) is not None
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return a JSON-serializable dictionary."""
+        data = asdict(self)
+        data.pop("cached")
+        return data
+
+    def to_env(self) -> str:
+        """Render the capabilities as POSIX shell assignments."""
+        lines = [
+            "# Generated by claude-pilot probe; do not edit",
+            f"PILOT_PROBE_PATH={shlex.quote(os.environ.get('PATH', ''))}",
+            f"PILOT_PROBE_KEY={self.fingerprint}",
+        ]
+        for tool, path in sorted(self.tools.items()):
+            var = tool.upper().replace("-", "_")
+            lines.append(f"PILOT_HAS_{var}={1 if path else 0}")
+            if path:
+                lines.append(f"PILOT_{var}={shlex.quote(path)}")
+        lines.append(f"PILOT_CODEX_AUTH={1 if self.codex_auth else 0}")
+        lines.append(f"PILOT_CODEX_AVAILABLE={1 if self.codex_available else 0}")
+        return "\n".join(lines) + "\n"
+
+
+def _stat_key(path: Path) -> str:
+    """Return "mtime_ns:size" for a path, or "-" if it does not exist."""
+    try:
+        st = path.stat()
+    except OSError:
+        return "-"
+    return f"{st.st_mtime_ns}:{st.st_size}"
+
+
+def fingerprint() -> str:
+    """
+    Compute the cache key for the current environment.
+
+    Returns:
+        Hex digest over PATH, PATH directory mtimes and the Codex auth file.
+    """
+    path_value = os.environ.get("PATH", "")
+    parts = [path_value, ",".join(config.PROBE_TOOLS)]
+    for entry in path_value.split(os.pathsep):
+        if entry:
+            parts.append(f"{entry}={_stat_key(Path(entry))}")
+    parts.append(f"auth={_stat_key(Path.home() / config.CODEX_AUTH_PATH)}")
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def probe(key: str | None = None) -> Capabilities:
+    """
+    Probe every tool in config.PROBE_TOOLS without consulting the cache.
+
+    Args:
+        key: Precomputed fingerprint (computed if omitted).
+
+    Returns:
+        Fresh Capabilities.
+    """
+    from claude_pilot import codex
+
+    return Capabilities(
+        tools={tool: shutil.which(tool) for tool in config.PROBE_TOOLS},
+        codex_cli=codex.detect_codex_cli(),
+        codex_auth=codex.check_codex_auth(),
+        fingerprint=key or fingerprint(),
+        probed_at=time.time(),
+    )
+
+
+def _load(state_path: Path, key: str) -> Capabilities | None:
+    """Load cached capabilities if they match the fingerprint."""
+    try:
+        data = json.loads(state_path.read_text(encoding="utf-8"))
+        if data.get("version") != 1 or data["fingerprint"] != key:
+            return None
+        tools = data["tools"]
+        if not isinstance(tools, dict) or set(tools) != set(config.PROBE_TOOLS):
+            return None
+        return Capabilities(
+            tools=tools,
+            codex_cli=bool(data["codex_cli"]),
+            codex_auth=bool(data["codex_auth"]),
+            fingerprint=key,
+            probed_at=float(data["probed_at"]),
+            cached=True,
+        )
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    """Write a file via a temporary sibling and rename."""
+    temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        temp_path.write_text(text, encoding="utf-8")
+        os.replace(temp_path, path)
+    finally:
+        temp_path.unlink(missing_ok=True)
+
+
+def _save(cache_dir: Path, caps: Capabilities) -> None:
+    """Persist capabilities as JSON and as a shell env file; failures are ignored."""
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        _write_atomic(
+            cache_dir / PROBE_STATE_FILE,
+            json.dumps({"version": 1, **caps.to_dict()}, indent=2),
+        )
+        _write_atomic(cache_dir / PROBE_ENV_FILE, caps.to_env())
+    except OSError:
+        pass
+
+
+def get_capabilities(refresh: bool = False, cache_dir: Path | None = None) -> Capabilities:
+    """
+    Get tool capabilities, probing only when the fingerprint changed.
+
+    Args:
+        refresh: Ignore the cached state and probe again.
+        cache_dir: Cache directory (defaults to config.get_cache_dir()).
+
+    Returns:
+        Capabilities (cached=True when served from the state file).
+    """
+    cache_dir = cache_dir or config.get_cache_dir()
+    key = fingerprint()
+    if not refresh:
+        caps = _load(cache_dir / PROBE_STATE_FILE, key)
+        if caps is not None:
+            return caps
+    caps = probe(key)
+    _save(cache_dir, caps)
+    return caps
@@ -0,0 +1,227 @@
+"""
+Rate-limit-aware scheduler for GitHub API traffic.
+
+GitHub reports the request quota of a token (or of an anonymous client IP)
+in the X-RateLimit-Limit/-Remaining/-Reset response headers. The scheduler
+keeps those numbers as a token bucket in the user cache directory
+(`github-ratelimit.json`, updated under an flock), so every thread and every
+claude-pilot process on the machine draws from the same budget:
+
+- each request takes a token; the X-RateLimit-Remaining header of its
+  response replaces the local count (so free 304s give their token back),
+  and the bucket refills when the window resets
+- a rate-limit rejection (429, or 403 with no quota left) empties the bucket
+  until the reset time, Retry-After, or a cooldown
+- when the bucket is empty a request is deferred until the reset if that is
+  within config.GITHUB_RATE_LIMIT_MAX_WAIT; otherwise RateLimitExceeded is
+  raised without touching the network, and callers answer from their cache
+- identical concurrent lookups (same key) are coalesced into one request
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, TypeVar
+
+import requests
+
+from claude_pilot import config, network
+from claude_pilot.locks import locked_json
+
+T = TypeVar("T")
+
+
+class RateLimitExceeded(requests.RequestException):
+    """No GitHub quota is left and the window does not reset soon enough."""
+
+    def __init__(self, reset_at: float) -> None:
+        self.reset_at = reset_at
+        wait = max(0, int(reset_at - time.time()))
+        super().__init__(f"GitHub API rate limit exhausted; resets in {wait}s")
+
+
+def _int_header(response: requests.Response, name: str) -> int | None:
+    value = response.headers.get(name)
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value.strip())
+    return None
+
+
+class GitHubScheduler:
+    """Token bucket shared across threads and processes, plus request coalescing."""
+
+    def __init__(
+        self,
+        state_path: Path | None = None,
+        max_wait: float = config.GITHUB_RATE_LIMIT_MAX_WAIT,
+    ) -> None:
+        """
+        Initialize the scheduler.
+
+        Args:
+            state_path: Bucket file (defaults to config.GITHUB_RATE_LIMIT_FILE in
+                the user cache dir, resolved on each use).
+            max_wait: Longest deferral in seconds before giving up.
+        """
+        self._state_path = state_path
+        self.max_wait = max_wait
+        self._inflight: dict[str, Future[Any]] = {}
+        self._inflight_lock = threading.Lock()
+
+    @property
+    def state_path(self) -> Path:
+        """The shared bucket file."""
+        return self._state_path or config.get_cache_dir() / config.GITHUB_RATE_LIMIT_FILE
+
+    def _locked_state(self) -> Any:
+        path = self.state_path
+        return locked_json(path, path.with_suffix(".lock"))
+
+    def state(self) -> dict[str, Any]:
+        """
+        Read the bucket.
+
+        Returns:
+            Dict with "limit", "remaining" and "reset" (epoch seconds), empty
+            before the first GitHub response was seen.
+        """
+        with self._locked_state() as state:
+            return dict(state)
+
+    def acquire(self) -> None:
+        """
+        Take one token, deferring until the window resets if that is soon.
+
+        Raises:
+            RateLimitExceeded: If no token is available within max_wait.
+        """
+        deadline = time.time() + self.max_wait
+        while True:
+            now = time.time()
+            with self._locked_state() as state:
+                remaining = state.get("remaining")
+                reset = float(state.get("reset", 0))
+                if not isinstance(remaining, int):
+                    return
+                if now >= reset:
+                    remaining = int(state.get("limit") or 1)
+                if remaining > 0:
+                    state["remaining"] = remaining - 1
+                    return
+            if reset > deadline:
+                raise RateLimitExceeded(reset)
+            time.sleep(max(0.0, reset - now))
+
+    def record(self, response: requests.Response) -> None:
+        """
+        Re-sync the bucket from a GitHub response.
+
+        Args:
+            response: Any response from the GitHub API.
+        """
+        remaining = _int_header(response, "X-RateLimit-Remaining")
+        limit = _int_header(response, "X-RateLimit-Limit")
+        reset = _int_header(response, "X-RateLimit-Reset")
+        limited = network.is_rate_limited(response)
+        if remaining is None and not limited:
+            return
+
+        now = time.time()
+        with self._locked_state() as state:
+            if remaining is not None and reset is not None:
+                # GitHub's count is authoritative: it gives back the token a
+                # request took locally when the request was free (a 304 to a
+                # conditional request does not count against the quota)
+                state.update(remaining=remaining, reset=reset)
+                if limit is not None:
+                    state["limit"] = limit
+            if limited:
+                retry_after = _int_header(response, "Retry-After")
+                if retry_after is not None:
+                    blocked_until = now + retry_after
+                elif reset is not None and reset > now:
+                    blocked_until = float(reset)
+                else:
+                    blocked_until = now + config.GITHUB_RATE_LIMIT_COOLDOWN
+                state["remaining"] = 0
+                state["reset"] = max(float(state.get("reset", 0)), blocked_until)
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        """
+        Send a GitHub API GET through the bucket.
+
+        A rate-limited response is retried once if the window resets within
+        max_wait.
+
+        Args:
+            url: Request URL.
+            **kwargs: Passed to network.get.
+
+        Returns:
+            The response.
+
+        Raises:
+            RateLimitExceeded: If the quota is exhausted for longer than max_wait.
+        """
+        for attempt in range(2):
+            self.acquire()
+            response = network.get(url, **kwargs)
+            self.record(response)
+            if attempt or not network.is_rate_limited(response):
+                break
+            response.close()
+        return response
+
+    def coalesce(self, key: str, fetch: Callable[[], T]) -> T:
+        """
+        Run fetch, sharing the result with identical calls already in flight.
+
+        Args:
+            key: Identity of the lookup, e.g. the request URL.
+            fetch: Function performing the lookup.
+
+        Returns:
+            The (possibly shared) result of fetch.
+        """
+        with self._inflight_lock:
+            leader = self._inflight.get(key)
+            if leader is None:
+                future: Future[Any] = Future()
+                self._inflight[key] = future
+        if leader is not None:
+            result: T = leader.result()
+            return result
+
+        try:
+            value = fetch()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+
+
+_scheduler: GitHubScheduler | None = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> GitHubScheduler:
+    """
+    Get the shared scheduler, creating it on first use.
+
+    Returns:
+        The process-wide GitHubScheduler.
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = GitHubScheduler()
+        return _scheduler
@@ -0,0 +1,535 @@
+"""
+Project inventory for 3-Tier documentation (`claude-pilot scan`).
+
+/92_init drafts Foundation, Component and Feature CONTEXT.md files for an
+existing project. Instead of exploring the tree with one tool call per
+directory, the agent starts from scan_project(), one pass over the project
+that yields:
+
+- totals and per-language files, lines and bytes;
+- every directory with its recursive file count, size and languages;
+- entry points (conventional names, `__main__` guards, Go `func main`,
+  package.json main/bin) and build manifests;
+- test locations;
+- a draft tier skeleton: CLAUDE.md plus a CONTEXT.md for every directory
+  with at least config.SCAN_DOC_MIN_FILES source files of its own (tier 2 up
+  to two levels deep, tier 3 below, as context_profile classifies them).
+
+Files come from `git ls-files --cached --others --exclude-standard`, so
+.gitignore, .git/info/exclude and the global excludes apply exactly as git
+sees them. Outside a git checkout the tree is walked and matched against
+its .gitignore files with GitIgnore. Reading the files (line counts, entry
+point detection) is spread over a process pool in chunks of
+config.SCAN_CHUNK_SIZE once a project has config.SCAN_PARALLEL_MIN_FILES files
+(map_chunks(), shared with the symbol index).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import stat
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from itertools import repeat
+from pathlib import Path
+from typing import Any, Callable, TypeVar
+
+from claude_pilot import config
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# File suffix -> language
+LANGUAGES: dict[str, str] = {
+    ".py": "Python",
+    ".pyi": "Python",
+    ".ts": "TypeScript",
+    ".tsx": "TypeScript",
+    ".mts": "TypeScript",
+    ".cts": "TypeScript",
+    ".js": "JavaScript",
+    ".jsx": "JavaScript",
+    ".mjs": "JavaScript",
+    ".cjs": "JavaScript",
+    ".go": "Go",
+    ".rs": "Rust",
+    ".java": "Java",
+    ".kt": "Kotlin",
+    ".kts": "Kotlin",
+    ".scala": "Scala",
+    ".swift": "Swift",
+    ".rb": "Ruby",
+    ".php": "PHP",
+    ".cs": "C#",
+    ".c": "C",
+    ".h": "C",
+    ".cc": "C++",
+    ".cpp": "C++",
+    ".cxx": "C++",
+    ".hpp": "C++",
+    ".dart": "Dart",
+    ".lua": "Lua",
+    ".ex": "Elixir",
+    ".exs": "Elixir",
+    ".sh": "Shell",
+    ".bash": "Shell",
+    ".vue": "Vue",
+    ".svelte": "Svelte",
+    ".sql": "SQL",
+    ".md": "Markdown",
+    ".html": "HTML",
+    ".css": "CSS",
+    ".scss": "CSS",
+    ".json": "JSON",
+    ".yaml": "YAML",
+    ".yml": "YAML",
+    ".toml": "TOML",
+}
+
+# Languages that are counted but do not make a directory a component
+NON_SOURCE_LANGUAGES = frozenset({"Markdown", "HTML", "CSS", "JSON", "YAML", "TOML"})
+
+MANIFEST_NAMES = frozenset({
+    "pyproject.toml",
+    "setup.py",
+    "setup.cfg",
+    "requirements.txt",
+    "package.json",
+    "Cargo.toml",
+    "go.mod",
+    "pom.xml",
+    "build.gradle",
+    "build.gradle.kts",
+    "Gemfile",
+    "composer.json",
+    "CMakeLists.txt",
+    "Makefile",
+    "Dockerfile",
+})
+
+ENTRY_POINT_NAMES = frozenset({
+    "__main__.py",
+    "main.py",
+    "manage.py",
+    "app.py",
+    "cli.py",
+    "wsgi.py",
+    "asgi.py",
+    "main.go",
+    "main.rs",
+    "index.ts",
+    "index.js",
+    "main.ts",
+    "main.js",
+    "server.ts",
+    "server.js",
+    "Program.cs",
+    "Main.java",
+})
+
+TEST_DIR_NAMES = frozenset({"tests", "test", "__tests__", "spec", "specs"})
+
+_TEST_FILE_RE = re.compile(
+    r"^test_.*\.py$|_test\.(?:py|go)$|\.(?:test|spec)\.[cm]?[jt]sx?$|Test\.java$|_spec\.rb$"
+)
+_MAIN_RES: dict[str, re.Pattern[bytes]] = {
+    "Python": re.compile(rb"^if\s+__name__\s*==\s*['\"]__main__['\"]\s*:", re.MULTILINE),
+    "Go": re.compile(rb"^func\s+main\s*\(", re.MULTILINE),
+}
+
+
+def _glob_to_regex(pattern: str) -> str:
+    """Translate a gitignore glob into a regular expression over '/'-separated paths."""
+    out: list[str] = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+            continue
+        char = pattern[i]
+        if char == "*":
+            out.append("[^/]*")
+        elif char == "?":
+            out.append("[^/]")
+        elif char == "[" and pattern.find("]", i + 2) != -1:
+            end = pattern.find("]", i + 2)
+            body = pattern[i + 1:end]
+            out.append(f"[^{body[1:]}]" if body.startswith("!") else f"[{body}]")
+            i = end + 1
+            continue
+        else:
+            out.append(re.escape(char))
+        i += 1
+    return "".join(out)
+
+
+class GitIgnore:
+    """
+    .gitignore matcher for trees that are not git checkouts.
+
+    Supports comments, negation, directory-only and anchored patterns and
+    the `*`, `?`, `[...]` and `**` wildcards. Patterns of a nested
+    .gitignore apply below its directory; the last matching pattern wins.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty matcher."""
+        # (base directory, regex, negate, directory only, anchored)
+        self._rules: list[tuple[str, re.Pattern[str], bool, bool, bool]] = []
+
+    def add(self, base: str, text: str) -> None:
+        """
+        Add the patterns of a .gitignore file.
+
+        Args:
+            base: Directory of the .gitignore, relative to the root ("" for the root).
+            text: File content.
+        """
+        for line in text.splitlines():
+            line = line.rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negate = line.startswith("!")
+            if negate or line.startswith("\\"):
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            if not line:
+                continue
+            anchored = "/" in line
+            regex = re.compile(_glob_to_regex(line.lstrip("/")))
+            self._rules.append((base, regex, negate, dir_only, anchored))
+
+    def ignored(self, rel_path: str, is_dir: bool) -> bool:
+        """
+        Check whether a path is ignored.
+
+        Args:
+            rel_path: POSIX path relative to the root.
+            is_dir: Whether the path is a directory.
+
+        Returns:
+            True if the last matching pattern ignores the path.
+        """
+        ignored = False
+        for base, regex, negate, dir_only, anchored in self._rules:
+            if dir_only and not is_dir:
+                continue
+            if base:
+                if not rel_path.startswith(f"{base}/"):
+                    continue
+                sub_path = rel_path[len(base) + 1:]
+            else:
+                sub_path = rel_path
+            if regex.fullmatch(sub_path if anchored else sub_path.rsplit("/", 1)[-1]):
+                ignored = not negate
+        return ignored
+
+
+def _git_files(root: Path) -> list[str] | None:
+    """List tracked and untracked, not ignored files; None outside a git checkout."""
+    from claude_pilot.worktree import run_git
+
+    try:
+        result = run_git(
+            ["ls-files", "-z", "--cached", "--others", "--exclude-standard"], root, check=False
+        )
+    except OSError:
+        return None
+    if result.returncode != 0:
+        return None
+    return [path for path in result.stdout.split("\0") if path]
+
+
+def _walk_files(root: Path) -> list[str]:
+    """List files below root that its .gitignore files do not ignore."""
+    ignore = GitIgnore()
+    files: list[str] = []
+    for dirpath, dirs, names in os.walk(root):
+        rel_dir = Path(dirpath).relative_to(root).as_posix()
+        prefix = "" if rel_dir == "." else f"{rel_dir}/"
+        if ".gitignore" in names:
+            try:
+                text = (Path(dirpath) / ".gitignore").read_text(encoding="utf-8", errors="replace")
+                ignore.add(prefix.rstrip("/"), text)
+            except OSError:
+                pass
+        dirs[:] = sorted(
+            d for d in dirs if d != ".git" and not ignore.ignored(prefix + d, is_dir=True)
+        )
+        files += [prefix + n for n in sorted(names) if not ignore.ignored(prefix + n, is_dir=False)]
+    return files
+
+
+def _scan_files(root: str, paths: list[str]) -> list[tuple[str, int, int, bool]]:
+    """
+    Stat and read a chunk of files (runs in worker processes).
+
+    Args:
+        root: Project root.
+        paths: POSIX paths relative to root.
+
+    Returns:
+        (path, size, lines, has main) for every regular file; lines and the
+        main check are only computed for source files up to
+        config.SCAN_MAX_READ_BYTES.
+    """
+    results: list[tuple[str, int, int, bool]] = []
+    for rel_path in paths:
+        path = os.path.join(root, rel_path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        if not stat.S_ISREG(st.st_mode):
+            continue
+        lines = 0
+        has_main = False
+        language = LANGUAGES.get(os.path.splitext(rel_path)[1].lower())
+        if language is not None and st.st_size <= config.SCAN_MAX_READ_BYTES:
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+            except OSError:
+                data = b""
+            lines = data.count(b"\n") + (1 if data and not data.endswith(b"\n") else 0)
+            main_re = _MAIN_RES.get(language)
+            has_main = main_re is not None and main_re.search(data) is not None
+        results.append((rel_path, st.st_size, lines, has_main))
+    return results
+
+
+def map_chunks(
+    func: Callable[[str, list[T]], list[R]],
+    root: Path,
+    items: list[T],
+    workers: int | None = None,
+) -> tuple[list[R], int]:
+    """
+    Apply a chunk function to items, in a process pool for large inputs.
+
+    Items are split into chunks of config.SCAN_CHUNK_SIZE. With fewer than
+    config.SCAN_PARALLEL_MIN_FILES items, one worker or no process support
+    (e.g. a sandbox without /dev/shm) the chunks run in-process.
+
+    Args:
+        func: Module-level function taking (root, chunk) and returning results.
+        root: Project root passed to every call.
+        items: Items to process.
+        workers: Worker processes (default: CPU count).
+
+    Returns:
+        Tuple of (concatenated results in item order, workers used).
+    """
+    size = config.SCAN_CHUNK_SIZE
+    chunks = [items[i:i + size] for i in range(0, len(items), size)]
+    results: list[R] = []
+    max_workers = min(workers or os.cpu_count() or 1, len(chunks))
+    if max_workers > 1 and len(items) >= config.SCAN_PARALLEL_MIN_FILES:
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                for chunk_results in pool.map(func, repeat(str(root)), chunks):
+                    results += chunk_results
+            return results, max_workers
+        except (OSError, BrokenProcessPool):
+            results = []
+    for chunk in chunks:
+        results += func(str(root), chunk)
+    return results, 1
+
+
+def list_project_files(target_dir: Path) -> tuple[list[str], str]:
+    """
+    List a project's files the way git sees them.
+
+    Uses git ls-files in a checkout and a .gitignore-filtered walk
+    otherwise; files below config.DEPGRAPH_SKIP_DIRS are left out.
+
+    Args:
+        target_dir: Project root.
+
+    Returns:
+        Tuple of (POSIX paths relative to the root, "git" or "walk").
+    """
+    paths = _git_files(target_dir)
+    source = "git"
+    if paths is None:
+        paths, source = _walk_files(target_dir), "walk"
+    paths = [
+        p for p in paths if not any(part in config.DEPGRAPH_SKIP_DIRS for part in p.split("/"))
+    ]
+    return paths, source
+
+
+def _is_test(rel_path: str) -> bool:
+    parts = rel_path.split("/")
+    return any(p in TEST_DIR_NAMES for p in parts[:-1]) or bool(_TEST_FILE_RE.search(parts[-1]))
+
+
+def _test_location(rel_path: str) -> str:
+    """The outermost test directory of a test file, else its directory."""
+    parts = rel_path.split("/")[:-1]
+    for i, part in enumerate(parts):
+        if part in TEST_DIR_NAMES:
+            return "/".join(parts[:i + 1])
+    return "/".join(parts) or "."
+
+
+def _package_json_entries(root: Path, rel_path: str) -> list[str]:
+    """Files named by a package.json "main" or "bin" field."""
+    try:
+        data = json.loads((root / rel_path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return []
+    if not isinstance(data, dict):
+        return []
+    targets = [data.get("main")]
+    bin_field = data.get("bin")
+    targets += list(bin_field.values()) if isinstance(bin_field, dict) else [bin_field]
+    base = Path(rel_path).parent
+    return [
+        (base / target).as_posix().removeprefix("./")
+        for target in targets
+        if isinstance(target, str) and target
+    ]
+
+
+def _summary(languages: dict[str, int], files: int) -> str:
+    top = sorted(languages.items(), key=lambda item: (-item[1], item[0]))[:3]
+    return f"{files} files" + (f" ({', '.join(name for name, _ in top)})" if top else "")
+
+
+@dataclass
+class ProjectInventory:
+    """Structured facts about a project for drafting its documentation."""
+
+    root: Path
+    source: str
+    workers: int = 1
+    files: int = 0
+    size: int = 0
+    lines: int = 0
+    languages: dict[str, dict[str, int]] = field(default_factory=dict)
+    directories: list[dict[str, Any]] = field(default_factory=list)
+    entry_points: list[dict[str, str]] = field(default_factory=list)
+    tests: list[dict[str, Any]] = field(default_factory=list)
+    manifests: list[str] = field(default_factory=list)
+    skeleton: list[dict[str, Any]] = field(default_factory=list)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return a JSON-serializable dictionary."""
+        return {
+            "root": str(self.root),
+            "source": self.source,
+            "workers": self.workers,
+            "files": self.files,
+            "size": self.size,
+            "lines": self.lines,
+            "languages": self.languages,
+            "directories": self.directories,
+            "entry_points": self.entry_points,
+            "tests": self.tests,
+            "manifests": self.manifests,
+            "skeleton": self.skeleton,
+        }
+
+
+def scan_project(target_dir: Path, workers: int | None = None) -> ProjectInventory:
+    """
+    Build the inventory and draft tier skeleton of a project.
+
+    Args:
+        target_dir: Project root.
+        workers: Worker processes (default: CPU count; 1 scans in-process).
+
+    Returns:
+        ProjectInventory; directories and the skeleton are ordered by path.
+    """
+    root = target_dir.resolve()
+    paths, source = list_project_files(root)
+    results, used_workers = map_chunks(_scan_files, root, paths, workers)
+    inventory = ProjectInventory(root=root, source=source, workers=used_workers)
+
+    directories: dict[str, dict[str, Any]] = {}
+    entry_points: dict[str, str] = {}
+    tests: dict[str, int] = {}
+    for rel_path, size, lines, has_main in sorted(results):
+        parent, _, name = rel_path.rpartition("/")
+        language = LANGUAGES.get(os.path.splitext(name)[1].lower())
+        inventory.files += 1
+        inventory.size += size
+        inventory.lines += lines
+        if language is not None:
+            totals = inventory.languages.setdefault(language, {"files": 0, "lines": 0, "size": 0})
+            totals["files"] += 1
+            totals["lines"] += lines
+            totals["size"] += size
+
+        parts = parent.split("/") if parent else []
+        for depth in range(len(parts) + 1):
+            path = "/".join(parts[:depth]) or "."
+            entry = directories.setdefault(
+                path, {"path": path, "files": 0, "size": 0, "source_files": 0, "languages": {}}
+            )
+            entry["files"] += 1
+            entry["size"] += size
+            if language is not None:
+                entry["languages"][language] = entry["languages"].get(language, 0) + 1
+        is_source = language is not None and language not in NON_SOURCE_LANGUAGES
+        if is_source:
+            directories[parent or "."]["source_files"] += 1
+
+        if name in MANIFEST_NAMES:
+            inventory.manifests.append(rel_path)
+            if name == "package.json":
+                for target in _package_json_entries(root, rel_path):
+                    entry_points.setdefault(target, "package.json")
+        if _is_test(rel_path):
+            location = _test_location(rel_path)
+            tests[location] = tests.get(location, 0) + 1
+        elif is_source and name in ENTRY_POINT_NAMES:
+            entry_points.setdefault(rel_path, "conventional")
+        elif has_main:
+            entry_points.setdefault(rel_path, "main")
+
+    inventory.languages = dict(
+        sorted(inventory.languages.items(), key=lambda item: (-item[1]["lines"], item[0]))
+    )
+    inventory.directories = [directories[path] for path in sorted(directories)]
+    inventory.entry_points = [
+        {"path": path, "kind": kind} for path, kind in sorted(entry_points.items())
+    ]
+    inventory.tests = [{"path": path, "files": n} for path, n in sorted(tests.items())]
+
+    top = directories.get(".", {"languages": {}})
+    inventory.skeleton.append({
+        "tier": 1,
+        "path": "CLAUDE.md",
+        "directory": ".",
+        "exists": (root / "CLAUDE.md").is_file(),
+        "summary": _summary(top["languages"], inventory.files),
+    })
+    for entry in inventory.directories:
+        path = entry["path"]
+        if path == "." or entry["source_files"] < config.SCAN_DOC_MIN_FILES:
+            continue
+        parts = path.split("/")
+        if any(p.startswith(".") or p in TEST_DIR_NAMES for p in parts):
+            continue
+        doc_path = f"{path}/CONTEXT.md"
+        inventory.skeleton.append({
+            "tier": 2 if len(parts) <= 2 else 3,
+            "path": doc_path,
+            "directory": path,
+            "exists": (root / doc_path).is_file(),
+            "summary": _summary(entry["languages"], entry["files"]),
+        })
+    return inventory
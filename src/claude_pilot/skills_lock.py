@@ -0,0 +1,269 @@
+"""
+Lockfile for external skills (`.claude/skills.lock`).
+
+Each external skills sync records, per source, the repository, branch and
+skills path, the commit the skills were extracted from, and the SHA-256
+digest and size of every extracted file plus a tree digest over all of them.
+With the lock in place:
+
+- verify_skills() checks the installed skills against the lock locally,
+  without a network call, so `update` and CI know in milliseconds whether
+  the skills are current;
+- GitHub is only asked for a newer commit on an explicit refresh;
+- a project with a committed lock (a fresh clone, another machine of the
+  fleet) installs exactly the locked commit, and the extracted files must
+  match the locked digests.
+
+The lock is meant to be committed: it is written with sorted keys and a
+stable layout so syncs that change nothing leave it byte-for-byte identical.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from claude_pilot import config
+from claude_pilot.assets import file_digest
+
+LOCK_FORMAT_VERSION = 1
+
+
+@dataclass
+class SkillsLockReport:
+    """Result of verifying installed external skills against skills.lock."""
+
+    modified: list[str] = field(default_factory=list)
+    missing: list[str] = field(default_factory=list)
+    extra: list[str] = field(default_factory=list)
+    unlocked: list[str] = field(default_factory=list)
+    checked: int = 0
+
+    @property
+    def ok(self) -> bool:
+        """Whether every configured source is locked and matches the lock exactly."""
+        return not (self.modified or self.missing or self.extra or self.unlocked)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return a JSON-serializable dictionary."""
+        return {
+            "ok": self.ok,
+            "modified": self.modified,
+            "missing": self.missing,
+            "extra": self.extra,
+            "unlocked": self.unlocked,
+            "checked": self.checked,
+        }
+
+
+def lock_path(target_dir: Path) -> Path:
+    """
+    Get the lockfile path for a project.
+
+    Args:
+        target_dir: Project root.
+
+    Returns:
+        Path to .claude/skills.lock.
+    """
+    return target_dir / config.EXTERNAL_SKILLS_LOCK_FILE
+
+
+def load_lock(target_dir: Path) -> dict[str, dict[str, Any]]:
+    """
+    Load the locked sources.
+
+    Args:
+        target_dir: Project root.
+
+    Returns:
+        Mapping of source name to lock entry; empty if there is no valid lock.
+    """
+    try:
+        data = json.loads(lock_path(target_dir).read_text(encoding="utf-8"))
+        sources = data["sources"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return {}
+    if not isinstance(sources, dict):
+        return {}
+    return {
+        name: entry
+        for name, entry in sources.items()
+        if isinstance(entry, dict) and isinstance(entry.get("files"), dict)
+    }
+
+
+def write_lock(target_dir: Path, sources: dict[str, dict[str, Any]]) -> None:
+    """
+    Write the lockfile atomically.
+
+    Args:
+        target_dir: Project root.
+        sources: Mapping of source name to lock entry.
+    """
+    path = lock_path(target_dir)
+    payload = {"version": LOCK_FORMAT_VERSION, "sources": sources}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    temp_path.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    os.replace(temp_path, path)
+
+
+def source_dir(target_dir: Path, name: str) -> Path:
+    """
+    Get the install directory of an external skills source.
+
+    Args:
+        target_dir: Project root.
+        name: Source name (key of config.EXTERNAL_SKILLS).
+
+    Returns:
+        Directory the source's skills are extracted into.
+    """
+    return target_dir / config.EXTERNAL_SKILLS_DIR / name
+
+
+def _list_files(directory: Path) -> list[str]:
+    """List regular files below directory as sorted POSIX relative paths."""
+    files: list[str] = []
+    for root, _dirs, names in os.walk(directory):
+        for name in names:
+            path = Path(root) / name
+            if path.is_file() and not path.is_symlink():
+                files.append(path.relative_to(directory).as_posix())
+    return sorted(files)
+
+
+def tree_digest(files: dict[str, dict[str, Any]]) -> str:
+    """
+    Compute one digest over a set of file digests.
+
+    Args:
+        files: Mapping of relative path to {"sha256", "size"}.
+
+    Returns:
+        Hex SHA-256 of the sorted "path digest" lines.
+    """
+    digest = hashlib.sha256()
+    for rel_path in sorted(files):
+        digest.update(f"{rel_path} {files[rel_path]['sha256']}\n".encode())
+    return digest.hexdigest()
+
+
+def build_entry(
+    directory: Path,
+    repo: str,
+    branch: str,
+    skills_path: str,
+    ref: str,
+) -> dict[str, Any]:
+    """
+    Build the lock entry for an extracted source.
+
+    Args:
+        directory: Directory holding the extracted skills.
+        repo: Repository in format "owner/repo".
+        branch: Tracked branch.
+        skills_path: Path of the skills directory within the repository.
+        ref: Commit SHA the skills were extracted from.
+
+    Returns:
+        Lock entry with per-file digests and the tree digest.
+    """
+    files = {
+        rel_path: {
+            "sha256": file_digest(directory / rel_path),
+            "size": (directory / rel_path).stat().st_size,
+        }
+        for rel_path in _list_files(directory)
+    }
+    return {
+        "repo": repo,
+        "branch": branch,
+        "skills_path": skills_path,
+        "ref": ref,
+        "tree": tree_digest(files),
+        "files": files,
+    }
+
+
+def matches_config(entry: dict[str, Any], skill_config: dict[str, str]) -> bool:
+    """
+    Check that a lock entry was made for the configured source.
+
+    Args:
+        entry: Lock entry.
+        skill_config: Source configuration from config.EXTERNAL_SKILLS.
+
+    Returns:
+        True if repo, branch and skills path match and a ref is recorded.
+    """
+    return (
+        isinstance(entry.get("ref"), str)
+        and entry.get("repo") == skill_config["repo"]
+        and entry.get("branch") == skill_config["branch"]
+        and entry.get("skills_path") == skill_config["skills_path"]
+    )
+
+
+def verify_source(
+    directory: Path,
+    entry: dict[str, Any],
+    report: SkillsLockReport,
+    prefix: str = "",
+) -> None:
+    """
+    Compare one installed source against its lock entry.
+
+    Files whose size differs from the lock are modified without hashing.
+
+    Args:
+        directory: Directory holding the installed skills.
+        entry: Lock entry.
+        report: Report to append findings to (paths prefixed with prefix).
+        prefix: Prefix for reported paths, e.g. "<source>/".
+    """
+    locked: dict[str, Any] = entry["files"]
+    for rel_path, expected in sorted(locked.items()):
+        report.checked += 1
+        path = directory / rel_path
+        try:
+            size = path.stat().st_size
+            same = size == expected.get("size") and file_digest(path) == expected.get("sha256")
+        except OSError:
+            report.missing.append(prefix + rel_path)
+            continue
+        if not same:
+            report.modified.append(prefix + rel_path)
+    if directory.is_dir():
+        report.extra += [prefix + p for p in _list_files(directory) if p not in locked]
+
+
+def verify_skills(
+    target_dir: Path,
+    sources: dict[str, dict[str, str]] | None = None,
+) -> SkillsLockReport:
+    """
+    Verify installed external skills against skills.lock, offline.
+
+    Args:
+        target_dir: Project root.
+        sources: Configured sources (defaults to config.EXTERNAL_SKILLS).
+
+    Returns:
+        SkillsLockReport; sources without a matching lock entry are "unlocked".
+    """
+    sources = config.EXTERNAL_SKILLS if sources is None else sources
+    lock = load_lock(target_dir)
+    report = SkillsLockReport()
+    for name, skill_config in sorted(sources.items()):
+        entry = lock.get(name)
+        if entry is None or not matches_config(entry, skill_config):
+            report.unlocked.append(name)
+            continue
+        verify_source(source_dir(target_dir, name), entry, report, prefix=f"{name}/")
+    return report
@@ -0,0 +1,153 @@
+"""
+Native statusline for Claude Code.
+
+Drop-in replacement for `.claude/scripts/statusline.sh` that parses the
+statusline JSON from stdin without forking `jq`, `find` or `wc`.
+
+Plan counts are cached in `.claude/local/statusline-cache.json` keyed on the
+mtime of each plan directory: adding or removing a plan changes the directory
+mtime, so an unchanged directory is answered with a single stat() call.
+
+This module intentionally imports only the standard library (and nothing else
+from claude_pilot) so that interpreter start-up dominates its run time.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+from typing import Any
+
+# Cache file (relative to the project directory)
+STATUSLINE_CACHE_FILE = os.path.join(".claude", "local", "statusline-cache.json")
+
+# Plan directories whose entry counts are displayed
+PLAN_STATES = ("pending", "in_progress")
+
+# Directories modified this recently are not cached (mtime granularity guard)
+_MTIME_SETTLE_NS = 2_000_000_000
+
+
+def _count_entries(path: str) -> int:
+    """Count plan entries (files or plan directories), ignoring dotfiles."""
+    try:
+        with os.scandir(path) as entries:
+            return sum(1 for entry in entries if not entry.name.startswith("."))
+    except OSError:
+        return 0
+
+
+def _load_cache(cache_path: str) -> dict[str, Any]:
+    """Load the count cache, returning an empty dict on any error."""
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _save_cache(cache_path: str, cache: dict[str, Any]) -> None:
+    """Write the count cache atomically; failures are ignored."""
+    temp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+
+
+def get_plan_counts(project_dir: str) -> dict[str, int]:
+    """
+    Get pending and in-progress plan counts for a project.
+
+    Args:
+        project_dir: Project root containing .pilot/plan/.
+
+    Returns:
+        Mapping of plan state to entry count.
+    """
+    plan_dir = os.path.join(project_dir, ".pilot", "plan")
+    cache_path = os.path.join(project_dir, STATUSLINE_CACHE_FILE)
+    cache: dict[str, Any] | None = None
+    changed = False
+    counts: dict[str, int] = {}
+
+    for state in PLAN_STATES:
+        state_dir = os.path.join(plan_dir, state)
+        try:
+            mtime_ns = os.stat(state_dir).st_mtime_ns
+        except OSError:
+            counts[state] = 0
+            continue
+
+        if cache is None:
+            cache = _load_cache(cache_path)
+        cached = cache.get(state)
+        if isinstance(cached, list) and len(cached) == 2 and cached[0] == mtime_ns:
+            counts[state] = int(cached[1])
+            continue
+
+        counts[state] = _count_entries(state_dir)
+        if time.time_ns() - mtime_ns > _MTIME_SETTLE_NS:
+            cache[state] = [mtime_ns, counts[state]]
+            changed = True
+
+    if changed and cache is not None and os.path.isdir(os.path.join(project_dir, ".claude")):
+        _save_cache(cache_path, cache)
+
+    return counts
+
+
+def render(payload: dict[str, Any], fallback_dir: str) -> str:
+    """
+    Render the statusline text.
+
+    Args:
+        payload: Statusline JSON sent by Claude Code.
+        fallback_dir: Directory to use when the payload has no workspace.
+
+    Returns:
+        Single-line statusline text.
+    """
+    workspace = payload.get("workspace")
+    cwd = workspace.get("current_dir") if isinstance(workspace, dict) else None
+    if not isinstance(cwd, str) or not cwd:
+        cwd = payload.get("cwd")
+    if not isinstance(cwd, str) or not cwd:
+        cwd = fallback_dir
+
+    model = payload.get("model")
+    model_name = model.get("display_name") if isinstance(model, dict) else None
+
+    counts = get_plan_counts(cwd)
+    parts = []
+    if isinstance(model_name, str) and model_name:
+        parts.append(f"🤖 {model_name}")
+    parts.append(f"📁 {os.path.basename(cwd.rstrip(os.sep)) or cwd}")
+    parts.append(f"📋 P:{counts['pending']}")
+    if counts["in_progress"]:
+        parts.append(f"🚧 I:{counts['in_progress']}")
+    return " | ".join(parts)
+
+
+def main() -> None:
+    """Read statusline JSON from stdin and print the statusline."""
+    try:
+        payload = json.loads(sys.stdin.read() or "{}")
+    except ValueError:
+        payload = {}
+    if not isinstance(payload, dict):
+        payload = {}
+    sys.stdout.write(render(payload, os.getcwd()) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,549 @@
+"""
+Persistent symbol index for definition lookups (`claude-pilot index`).
+
+Planning and review agents ask "where is X defined" all the time; answering
+it with a repo-wide grep costs seconds on large projects. This module keeps
+a ctags-like table of definitions (name, kind, file, line, enclosing scope)
+in a SQLite database under `.claude/local/`, so a lookup is one indexed
+query.
+
+Supported languages and what is recorded:
+
+- Python (parsed with `ast`): classes, functions, methods and module-level
+  variables;
+- TypeScript/JavaScript: functions, classes, interfaces, type aliases, enums
+  and top-level const/let/var (arrow functions count as functions);
+- Go: functions, methods (scoped by receiver type), types and top-level
+  const/var;
+- Rust: functions, structs, enums, traits, type aliases, modules, consts,
+  statics and macro_rules! macros;
+- Shell: functions.
+
+Updates are incremental. A file whose size/mtime is unchanged is skipped;
+otherwise it is read and hashed, and only re-parsed when its SHA-256
+differs from the stored digest. The initial build of a large project is
+spread over a process pool (scan.map_chunks). Hooks update single files
+with `claude-pilot index update --hook-input`.
+"""
+
+from __future__ import annotations
+
+import ast
+import bisect
+import hashlib
+import os
+import re
+import sqlite3
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+from claude_pilot import config
+from claude_pilot.scan import LANGUAGES, list_project_files, map_chunks
+
+# Bump when the schema or the parsers change; older indexes are dropped and rebuilt
+SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    digest TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS symbols (
+    name TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    path TEXT NOT NULL,
+    line INTEGER NOT NULL,
+    scope TEXT,
+    language TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS symbols_by_name ON symbols (name);
+CREATE INDEX IF NOT EXISTS symbols_by_name_nocase ON symbols (name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS symbols_by_path ON symbols (path);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+SYMBOL_LANGUAGES = frozenset({"Python", "TypeScript", "JavaScript", "Go", "Rust", "Shell"})
+
+_JS_IDENT = r"[A-Za-z_$][\w$]*"
+_JS_EXPORT = r"^[ \t]*(?:export[ \t]+(?:default[ \t]+)?)?(?:declare[ \t]+)?"
+_SCRIPT_RULES: list[tuple[re.Pattern[str], str]] = [
+    (
+        re.compile(
+            _JS_EXPORT + rf"(?:async[ \t]+)?function\*?[ \t]*\*?[ \t]*(?P<name>{_JS_IDENT})",
+            re.MULTILINE,
+        ),
+        "function",
+    ),
+    (
+        re.compile(_JS_EXPORT + rf"(?:abstract[ \t]+)?class[ \t]+(?P<name>{_JS_IDENT})",
+                   re.MULTILINE),
+        "class",
+    ),
+    (re.compile(_JS_EXPORT + rf"interface[ \t]+(?P<name>{_JS_IDENT})", re.MULTILINE), "interface"),
+    (
+        re.compile(_JS_EXPORT + rf"type[ \t]+(?P<name>{_JS_IDENT})[ \t]*(?:<[^=\n]*>)?[ \t]*=",
+                   re.MULTILINE),
+        "type",
+    ),
+    (
+        re.compile(_JS_EXPORT + rf"(?:const[ \t]+)?enum[ \t]+(?P<name>{_JS_IDENT})", re.MULTILINE),
+        "enum",
+    ),
+    (
+        re.compile(
+            rf"^(?:export[ \t]+)?(?:const|let|var)[ \t]+(?!enum\b)(?P<name>{_JS_IDENT})"
+            r"(?P<function>[ \t]*(?::[^=\n]+)?=[ \t]*(?:async[ \t]+)?"
+            rf"(?:function\b|\([^)\n]*\)[ \t]*(?::[^=\n]+)?=>|{_JS_IDENT}[ \t]*=>))?",
+            re.MULTILINE,
+        ),
+        "variable",
+    ),
+]
+
+_RUST_PREFIX = r"^[ \t]*(?:pub(?:\([^)\n]*\))?[ \t]+)?"
+_REGEX_RULES: dict[str, list[tuple[re.Pattern[str], str]]] = {
+    "TypeScript": _SCRIPT_RULES,
+    "JavaScript": _SCRIPT_RULES,
+    "Go": [
+        (
+            re.compile(
+                r"^func[ \t]*(?:\([ \t]*(?:\w+[ \t]+)?\*?[ \t]*(?P<scope>\w+)[^)\n]*\)[ \t]*)?"
+                r"(?P<name>\w+)[ \t]*[(\[]",
+                re.MULTILINE,
+            ),
+            "function",
+        ),
+        (re.compile(r"^type[ \t]+(?P<name>\w+)(?:\[[^\]\n]*\])?[ \t]+(?P<kind>struct|interface)?",
+                    re.MULTILINE), "type"),
+        (re.compile(r"^const[ \t]+(?P<name>\w+)", re.MULTILINE), "constant"),
+        (re.compile(r"^var[ \t]+(?P<name>\w+)", re.MULTILINE), "variable"),
+    ],
+    "Rust": [
+        (
+            re.compile(
+                _RUST_PREFIX + r"(?:const[ \t]+)?(?:async[ \t]+)?(?:unsafe[ \t]+)?"
+                r"(?:extern[ \t]+\"[^\"\n]*\"[ \t]+)?fn[ \t]+(?P<name>\w+)",
+                re.MULTILINE,
+            ),
+            "function",
+        ),
+        (
+            re.compile(
+                _RUST_PREFIX + r"(?P<kind>struct|enum|trait|type|mod|const|static)[ \t]+"
+                r"(?:mut[ \t]+)?(?P<name>\w+)",
+                re.MULTILINE,
+            ),
+            "type",
+        ),
+        (re.compile(r"^[ \t]*macro_rules![ \t]*(?P<name>\w+)", re.MULTILINE), "macro"),
+    ],
+    "Shell": [
+        (
+            re.compile(
+                r"^[ \t]*(?:function[ \t]+(?P<name>[\w.:-]+)[ \t]*(?:\(\))?"
+                r"|(?P<name2>[A-Za-z_][\w.:-]*)[ \t]*\(\))[ \t]*\{?",
+                re.MULTILINE,
+            ),
+            "function",
+        ),
+    ],
+}
+
+# (name, kind, line, scope)
+SymbolRow = Tuple[str, str, int, Optional[str]]
+
+
+@dataclass
+class Symbol:
+    """A definition found in the index."""
+
+    name: str
+    kind: str
+    path: str
+    line: int
+    scope: str | None = None
+    language: str = ""
+
+    @property
+    def qualified_name(self) -> str:
+        """Name prefixed with its enclosing scope (e.g. Class.method)."""
+        return f"{self.scope}.{self.name}" if self.scope else self.name
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return a JSON-serializable dictionary."""
+        return asdict(self)
+
+
+def symbol_language(path: str) -> str | None:
+    """
+    Get the indexed language of a file.
+
+    Args:
+        path: File path.
+
+    Returns:
+        Language name, or None if the file type is not indexed.
+    """
+    language = LANGUAGES.get(os.path.splitext(path)[1].lower())
+    return language if language in SYMBOL_LANGUAGES else None
+
+
+def _python_symbols(text: str) -> list[SymbolRow]:
+    """Classes, functions, methods and module-level variables of a Python module."""
+    try:
+        tree = ast.parse(text)
+    except (SyntaxError, ValueError):
+        return []
+    rows: list[SymbolRow] = []
+
+    def visit(body: list[ast.stmt], scope: str | None, in_class: bool) -> None:
+        for node in body:
+            if isinstance(node, ast.ClassDef):
+                rows.append((node.name, "class", node.lineno, scope))
+                visit(node.body, f"{scope}.{node.name}" if scope else node.name, True)
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                rows.append((node.name, "method" if in_class else "function", node.lineno, scope))
+            elif scope is None and isinstance(node, (ast.Assign, ast.AnnAssign)):
+                targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                for target in targets:
+                    for name_node in ast.walk(target):
+                        if isinstance(name_node, ast.Name):
+                            rows.append((name_node.id, "variable", node.lineno, None))
+            elif isinstance(node, (ast.If, ast.Try)):
+                # Definitions behind TYPE_CHECKING / try-except ImportError
+                branches = [node.body, node.orelse]
+                if isinstance(node, ast.Try):
+                    branches += [handler.body for handler in node.handlers]
+                for branch in branches:
+                    visit(branch, scope, in_class)
+
+    visit(tree.body, None, False)
+    return rows
+
+
+def parse_symbols(text: str, language: str) -> list[SymbolRow]:
+    """
+    Extract the definitions of a source file.
+
+    Args:
+        text: File content.
+        language: Language name (one of SYMBOL_LANGUAGES).
+
+    Returns:
+        (name, kind, line, scope) tuples ordered by line.
+    """
+    if language == "Python":
+        return sorted(_python_symbols(text), key=lambda row: row[2])
+
+    line_starts = [0] + [m.end() for m in re.finditer("\n", text)]
+    rows: dict[tuple[str, int], SymbolRow] = {}
+    for pattern, kind in _REGEX_RULES.get(language, []):
+        for match in pattern.finditer(text):
+            groups = match.groupdict()
+            name = groups.get("name") or groups.get("name2")
+            if not name:
+                continue
+            line = bisect.bisect_right(line_starts, match.start("name" if groups.get("name")
+                                                                else "name2"))
+            row_kind = groups.get("kind") or kind
+            if kind == "variable" and groups.get("function"):
+                row_kind = "function"
+            scope = groups.get("scope")
+            if language == "Go" and scope:
+                row_kind = "method"
+            rows.setdefault((name, line), (name, row_kind, line, scope))
+    return sorted(rows.values(), key=lambda row: (row[2], row[0]))
+
+
+def _index_files(
+    root: str,
+    items: list[tuple[str, str | None]],
+) -> list[tuple[str, int, int, str, list[SymbolRow] | None]]:
+    """
+    Hash and parse a chunk of files (runs in worker processes).
+
+    Args:
+        root: Project root.
+        items: (path, stored digest or None) pairs.
+
+    Returns:
+        (path, mtime_ns, size, digest, symbols) per readable file; symbols is
+        None when the digest matches the stored one.
+    """
+    results: list[tuple[str, int, int, str, list[SymbolRow] | None]] = []
+    for rel_path, stored_digest in items:
+        try:
+            with open(os.path.join(root, rel_path), "rb") as f:
+                st = os.fstat(f.fileno())
+                data = f.read(config.SCAN_MAX_READ_BYTES + 1)
+        except OSError:
+            continue
+        digest = hashlib.sha256(data).hexdigest()
+        symbols: list[SymbolRow] | None = None
+        if digest != stored_digest:
+            language = symbol_language(rel_path)
+            too_large = len(data) > config.SCAN_MAX_READ_BYTES
+            symbols = [] if too_large or language is None else parse_symbols(
+                data.decode("utf-8", errors="replace"), language
+            )
+        results.append((rel_path, st.st_mtime_ns, st.st_size, digest, symbols))
+    return results
+
+
+class SymbolIndex:
+    """
+    SQLite-backed index of symbol definitions in a project.
+
+    Use as a context manager. Queries do not refresh the index (lookups must
+    stay fast); call refresh() or update_files(), or pass refresh=True.
+    """
+
+    def __init__(self, target_dir: Path | None = None, index_path: Path | None = None) -> None:
+        """
+        Initialize the symbol index.
+
+        Args:
+            target_dir: Project directory. Defaults to current working directory.
+            index_path: Optional index file path. Defaults to config.SYMBOL_INDEX_FILE.
+        """
+        if target_dir is None:
+            target_dir = config.get_target_dir()
+        self.target_dir = target_dir.resolve()
+        self.index_path = index_path or self.target_dir / config.SYMBOL_INDEX_FILE
+        self._conn: sqlite3.Connection | None = None
+
+    # -------------------------------------------------------------------------
+    # Connection management
+    # -------------------------------------------------------------------------
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Open (and migrate) the index database on first use."""
+        if self._conn is None:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.index_path), timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                for table in ("files", "symbols", "meta"):
+                    conn.execute(f"DROP TABLE IF EXISTS {table}")
+            conn.executescript(_SCHEMA)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        """Close the database connection."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self) -> SymbolIndex:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    # -------------------------------------------------------------------------
+    # Refresh
+    # -------------------------------------------------------------------------
+
+    @property
+    def built(self) -> bool:
+        """Whether the index has been built at least once."""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'refreshed_at'").fetchone()
+        return row is not None
+
+    def refresh(self, full: bool = False, workers: int | None = None) -> int:
+        """
+        Bring the index up to date with the project's files.
+
+        Args:
+            full: Re-parse every file, ignoring stored stats and digests.
+            workers: Worker processes for re-parsing (default: CPU count).
+
+        Returns:
+            Number of files whose symbols were inserted, updated or removed.
+        """
+        paths, _source = list_project_files(self.target_dir)
+        stored = {
+            row["path"]: (row["mtime_ns"], row["size"], row["digest"])
+            for row in self.conn.execute("SELECT path, mtime_ns, size, digest FROM files")
+        }
+
+        present: set[str] = set()
+        candidates: list[tuple[str, str | None]] = []
+        for rel_path in paths:
+            if symbol_language(rel_path) is None:
+                continue
+            try:
+                st = os.stat(self.target_dir / rel_path)
+            except OSError:
+                continue
+            present.add(rel_path)
+            old = stored.get(rel_path)
+            if full or old is None:
+                candidates.append((rel_path, None))
+            elif (old[0], old[1]) != (st.st_mtime_ns, st.st_size):
+                candidates.append((rel_path, old[2]))
+
+        results, _workers = map_chunks(_index_files, self.target_dir, candidates, workers)
+        removed = [path for path in stored if path not in present]
+        with self.conn:
+            for rel_path in removed:
+                self._delete(rel_path)
+            changes = len(removed) + sum(self._write(*result) for result in results)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('refreshed_at', ?)",
+                (str(time.time()),),
+            )
+        return changes
+
+    def update_files(self, file_paths: list[str | Path]) -> int:
+        """
+        Re-index individual files (e.g. after an edit); missing files are removed.
+
+        Args:
+            file_paths: Absolute or root-relative paths.
+
+        Returns:
+            Number of files whose symbols changed.
+        """
+        candidates: list[tuple[str, str | None]] = []
+        removed: list[str] = []
+        for file_path in file_paths:
+            path = Path(file_path)
+            if not path.is_absolute():
+                path = self.target_dir / path
+            try:
+                rel_path = path.resolve().relative_to(self.target_dir).as_posix()
+            except ValueError:
+                continue
+            if symbol_language(rel_path) is None:
+                continue
+            if not path.is_file():
+                removed.append(rel_path)
+                continue
+            row = self.conn.execute(
+                "SELECT digest FROM files WHERE path = ?", (rel_path,)
+            ).fetchone()
+            candidates.append((rel_path, row["digest"] if row else None))
+
+        results = _index_files(str(self.target_dir), candidates)
+        with self.conn:
+            changes = sum(self._delete(rel_path) for rel_path in removed)
+            changes += sum(self._write(*result) for result in results)
+        return changes
+
+    def _delete(self, rel_path: str) -> int:
+        """Remove a file and its symbols. Returns 1 if the file was indexed."""
+        self.conn.execute("DELETE FROM symbols WHERE path = ?", (rel_path,))
+        return self.conn.execute("DELETE FROM files WHERE path = ?", (rel_path,)).rowcount
+
+    def _write(
+        self,
+        rel_path: str,
+        mtime_ns: int,
+        size: int,
+        digest: str,
+        symbols: list[SymbolRow] | None,
+    ) -> int:
+        """Store a file's stat, digest and symbols. Returns 1 if its symbols were replaced."""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO files (path, mtime_ns, size, digest) VALUES (?, ?, ?, ?)",
+            (rel_path, mtime_ns, size, digest),
+        )
+        if symbols is None:
+            return 0
+        language = symbol_language(rel_path) or ""
+        self.conn.execute("DELETE FROM symbols WHERE path = ?", (rel_path,))
+        self.conn.executemany(
+            "INSERT INTO symbols (name, kind, path, line, scope, language) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [(name, kind, rel_path, line, scope, language) for name, kind, line, scope in symbols],
+        )
+        return 1
+
+    # -------------------------------------------------------------------------
+    # Queries
+    # -------------------------------------------------------------------------
+
+    def find(
+        self,
+        name: str,
+        prefix: bool = False,
+        ignore_case: bool = False,
+        kind: str | None = None,
+        limit: int | None = None,
+        refresh: bool = False,
+    ) -> list[Symbol]:
+        """
+        Look up definitions by name.
+
+        A dotted name (`Class.method`) matches the last component within an
+        enclosing scope ending in the rest.
+
+        Args:
+            name: Symbol name, dotted name or prefix.
+            prefix: Match names starting with name.
+            ignore_case: Match case-insensitively.
+            kind: Optional kind filter (function, class, method, ...).
+            limit: Optional maximum number of results.
+            refresh: Refresh the index before querying (it is always built
+                if it does not exist yet).
+
+        Returns:
+            Matching symbols ordered by name, path and line.
+        """
+        if refresh or not self.built:
+            self.refresh()
+
+        scope = None
+        if "." in name and not prefix:
+            scope, _, name = name.rpartition(".")
+        collate = " COLLATE NOCASE" if ignore_case else ""
+        params: list[Any] = []
+        if prefix and ignore_case:
+            query = "SELECT * FROM symbols WHERE name LIKE ? ESCAPE '\\'"
+            params.append(re.sub(r"([%_\\])", r"\\\1", name) + "%")
+        elif prefix:
+            query = "SELECT * FROM symbols WHERE name >= ? AND name < ?"
+            params += [name, name + "\U0010ffff"]
+        else:
+            query = f"SELECT * FROM symbols WHERE name = ?{collate}"
+            params.append(name)
+        if scope:
+            query += f" AND (scope = ?{collate} OR scope LIKE ? ESCAPE '\\')"
+            params += [scope, "%." + re.sub(r"([%_\\])", r"\\\1", scope)]
+        if kind:
+            query += " AND kind = ?"
+            params.append(kind)
+        query += " ORDER BY name, path, line"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        return [
+            Symbol(row["name"], row["kind"], row["path"], row["line"], row["scope"],
+                   row["language"])
+            for row in self.conn.execute(query, params)
+        ]
+
+    def stats(self) -> dict[str, int]:
+        """
+        Count indexed files and symbols.
+
+        Returns:
+            Mapping with "files" and "symbols".
+        """
+        files = self.conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+        symbols = self.conn.execute("SELECT COUNT(*) FROM symbols").fetchone()[0]
+        return {"files": files, "symbols": symbols}
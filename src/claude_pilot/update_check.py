@@ -0,0 +1,160 @@
+"""
+Non-blocking update check.
+
+The latest PyPI version is cached in the user cache directory
+(`update-check.json`). Readers get the cached value immediately; when it is
+older than config.UPDATE_CHECK_INTERVAL a detached worker process
+(`python -m claude_pilot.update_check`) refreshes it for the next run, so
+interactive commands and hooks never wait on the network.
+
+Set CLAUDE_PILOT_NO_UPDATE_CHECK=1 (or CLAUDE_PILOT_OFFLINE=1) to disable
+background refreshes.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+from claude_pilot import config
+
+UPDATE_CHECK_FILE = "update-check.json"
+UPDATE_CHECK_LOCK_FILE = "update-check.lock"
+
+# A refresh that has not finished within this many seconds is considered dead
+_REFRESH_LOCK_STALE = 60
+
+
+def _state_path(cache_dir: Path | None = None) -> Path:
+    return (cache_dir or config.get_cache_dir()) / UPDATE_CHECK_FILE
+
+
+def load_state(cache_dir: Path | None = None) -> dict[str, Any]:
+    """
+    Load the cached update-check state.
+
+    Args:
+        cache_dir: Cache directory (defaults to config.get_cache_dir()).
+
+    Returns:
+        Dict with "latest" (str or None) and "checked_at" (epoch seconds).
+    """
+    try:
+        data = json.loads(_state_path(cache_dir).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        data = {}
+    if not isinstance(data, dict):
+        data = {}
+    latest = data.get("latest")
+    checked_at = data.get("checked_at")
+    return {
+        "latest": latest if isinstance(latest, str) else None,
+        "checked_at": float(checked_at) if isinstance(checked_at, (int, float)) else 0.0,
+    }
+
+
+def refresh(cache_dir: Path | None = None) -> str | None:
+    """
+    Query PyPI and store the result (blocking; run in the background worker).
+
+    A failed query keeps the previous latest version but still records the
+    check time, so an offline machine backs off for a full interval.
+
+    Args:
+        cache_dir: Cache directory (defaults to config.get_cache_dir()).
+
+    Returns:
+        The latest version, or None if unknown.
+    """
+    from claude_pilot.updater import get_pypi_version
+
+    cache_dir = cache_dir or config.get_cache_dir()
+    latest = get_pypi_version() or load_state(cache_dir)["latest"]
+    state_path = _state_path(cache_dir)
+    temp_path = state_path.with_name(f"{state_path.name}.{os.getpid()}.tmp")
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        temp_path.write_text(json.dumps({"latest": latest, "checked_at": time.time()}))
+        os.replace(temp_path, state_path)
+    except OSError:
+        temp_path.unlink(missing_ok=True)
+    finally:
+        (cache_dir / UPDATE_CHECK_LOCK_FILE).unlink(missing_ok=True)
+    return latest
+
+
+def spawn_refresh(cache_dir: Path | None = None) -> bool:
+    """
+    Start a detached worker that refreshes the cached latest version.
+
+    At most one worker runs at a time (lock file with a staleness timeout).
+
+    Args:
+        cache_dir: Cache directory (defaults to config.get_cache_dir()).
+
+    Returns:
+        True if a worker was started.
+    """
+    cache_dir = cache_dir or config.get_cache_dir()
+    lock_path = cache_dir / UPDATE_CHECK_LOCK_FILE
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            if time.time() - lock_path.stat().st_mtime < _REFRESH_LOCK_STALE:
+                return False
+            lock_path.touch()
+        else:
+            os.close(fd)
+        env = {**os.environ, config.CACHE_DIR_ENV: str(cache_dir)}
+        subprocess.Popen(
+            [sys.executable, "-m", "claude_pilot.update_check"],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            env=env,
+            start_new_session=True,
+            close_fds=True,
+        )
+    except OSError:
+        lock_path.unlink(missing_ok=True)
+        return False
+    return True
+
+
+def get_cached_latest_version(
+    cache_dir: Path | None = None,
+    max_age: float | None = None,
+) -> str | None:
+    """
+    Return the cached latest version immediately, refreshing it in the background if stale.
+
+    Args:
+        cache_dir: Cache directory (defaults to config.get_cache_dir()).
+        max_age: Refresh interval in seconds (defaults to config.UPDATE_CHECK_INTERVAL).
+
+    Returns:
+        The cached latest version, or None if no check has completed yet.
+    """
+    state = load_state(cache_dir)
+    max_age = config.UPDATE_CHECK_INTERVAL if max_age is None else max_age
+    stale = time.time() - state["checked_at"] > max_age
+    if stale and not os.environ.get(config.UPDATE_CHECK_DISABLE_ENV) and not config.is_offline():
+        spawn_refresh(cache_dir)
+    latest: str | None = state["latest"]
+    return latest
+
+
+def main() -> None:
+    """Background worker entry point."""
+    refresh()
+
+
+if __name__ == "__main__":
+    main()
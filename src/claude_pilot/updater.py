@@ -11,6 +11,8 @@ import importlib.resources  # noqa: F401
 import json
 import shutil
 import tempfile
+from collections.abc import Iterator
+from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
@@ -19,6 +21,8 @@ from typing import Any
 import click
 
 from claude_pilot import config
+from claude_pilot.assets import ASSET_HISTORY_DIGEST_LEN, ASSET_METADATA_FILES
+from claude_pilot.catalog import refresh_catalog
 
 
 class MergeStrategy(str, Enum):
@@ -26,6 +30,7 @@ class MergeStrategy(str, Enum):
 
     AUTO = "auto"
     MANUAL = "manual"
+    MERGE = "merge"
 
 
 class UpdateStatus(str, Enum):
@@ -36,6 +41,20 @@ class UpdateStatus(str, Enum):
     FAILED = "failed"
 
 
+@dataclass
+class UpgradePlan:
+    """Managed file changes between two versions, computed from shipped digests."""
+
+    from_version: str
+    to_version: str
+    added: list[str] = field(default_factory=list)
+    modified: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    unchanged: int = 0
+    known: bool = True
+    old_digests: dict[str, str] = field(default_factory=dict)
+
+
 def get_current_version(target_dir: Path | None = None) -> str:
     """
     Get the currently installed version.
@@ -100,15 +119,27 @@ def get_pypi_version() -> str | None:
     """
     Fetch the latest version from PyPI API.
 
+    In offline mode the version cached by the update check (or prefetch)
+    is returned instead.
+
     Returns:
         The latest version string from PyPI, or None if fetch fails.
     """
     import requests
 
+    from claude_pilot import network
+
+    if config.is_offline():
+        from claude_pilot.update_check import load_state
+
+        latest: str | None = load_state()["latest"]
+        return latest
+
     try:
-        response = requests.get(
+        response = network.get(
             config.PYPI_API_URL,
             timeout=config.PYPI_TIMEOUT,
+            retries=config.PYPI_RETRIES,
         )
         response.raise_for_status()
         data = response.json()
@@ -241,21 +272,19 @@ def copy_template_from_package(
         return False
 
 
-def copy_templates_from_package(
-    target_dir: Path,
-) -> tuple[int, int]:
+def iter_template_files(target_dir: Path) -> Iterator[tuple[Any, Path]]:
     """
-    Copy all template files from the bundled package.
+    Yield bundled template files and their destinations in the project.
+
+    User-owned files that already exist are skipped.
 
     Args:
         target_dir: Target directory for templates.
 
-    Returns:
-        Tuple of (success_count, fail_count).
+    Yields:
+        Tuples of (source Traversable, destination path).
     """
     templates_path = config.get_templates_path()
-    success_count = 0
-    fail_count = 0
 
     for src_path in templates_path.rglob("*"):
         if not src_path.is_file():
@@ -274,6 +303,9 @@ def copy_templates_from_package(
         if not rel_path.parts:
             continue
 
+        if rel_path.parts[0] in ASSET_METADATA_FILES:
+            continue
+
         if rel_path.parts[0] == "CLAUDE.md.template":
             dest_path = target_dir / "CLAUDE.md"
         else:
@@ -286,20 +318,166 @@ def copy_templates_from_package(
             if dest_path.exists():
                 continue
 
+        yield src_path, dest_path
+
+
+def copy_templates_from_package(
+    target_dir: Path,
+) -> tuple[int, int]:
+    """
+    Copy all template files from the bundled package.
+
+    The shipped content is recorded as the merge base for later
+    `update --strategy merge` runs.
+
+    Args:
+        target_dir: Target directory for templates.
+
+    Returns:
+        Tuple of (success_count, fail_count).
+    """
+    from claude_pilot.merge import BaseStore
+
+    store = BaseStore(target_dir)
+    success_count = 0
+    fail_count = 0
+
+    for src_path, dest_path in iter_template_files(target_dir):
         if copy_template_from_package(src_path, dest_path):
+            store.record(dest_path.relative_to(target_dir).as_posix(), src_path.read_bytes())
             success_count += 1
         else:
             fail_count += 1
 
+    if success_count:
+        try:
+            store.save()
+        except OSError:
+            pass
+
     return success_count, fail_count
 
 
-def perform_auto_update(target_dir: Path) -> UpdateStatus:
+def plan_upgrade(from_version: str, to_version: str | None = None) -> UpgradePlan:
+    """
+    Compute the add/modify/delete set between two versions.
+
+    Uses only the asset history shipped with the package; no project files
+    are read.
+
+    Args:
+        from_version: Version recorded in the project's .pilot-version.
+        to_version: Target version (defaults to the installed version).
+
+    Returns:
+        UpgradePlan (known=False if from_version is not in the history).
+    """
+    from claude_pilot.assets import load_asset_history, load_asset_index
+
+    to_version = to_version or config.VERSION
+    plan = UpgradePlan(from_version=from_version, to_version=to_version)
+    history = load_asset_history()
+    old = history.get(from_version)
+    new = history.get(to_version)
+    if new is None and to_version == config.VERSION:
+        new = {
+            rel_path: str(entry["sha256"])[:ASSET_HISTORY_DIGEST_LEN]
+            for rel_path, entry in load_asset_index().items()
+        }
+    if old is None or not new:
+        plan.known = False
+        return plan
+
+    for rel_path, digest in sorted(new.items()):
+        if rel_path not in old:
+            plan.added.append(rel_path)
+        elif old[rel_path] != digest:
+            plan.modified.append(rel_path)
+        else:
+            plan.unchanged += 1
+    plan.removed = sorted(set(old) - set(new))
+    plan.old_digests = old
+    return plan
+
+
+def remove_obsolete_files(target_dir: Path, plan: UpgradePlan) -> list[str]:
+    """
+    Delete files shipped by the old version but no longer by the new one.
+
+    User-owned paths are never touched, and a file is only deleted if it
+    still has the content the old version shipped (local edits are kept).
+
+    Args:
+        target_dir: Project root.
+        plan: Upgrade plan from plan_upgrade().
+
+    Returns:
+        List of removed relative paths.
+    """
+    from claude_pilot.assets import file_digest, get_asset_manifest
+
+    manifest = get_asset_manifest()
+    removed: list[str] = []
+    kept: list[str] = []
+    for rel_path in plan.removed:
+        if not rel_path.startswith(".claude/") or manifest.is_special_case(rel_path):
+            continue
+        if any(rel_path == f or rel_path.startswith(f"{f}/") for f in config.USER_FILES):
+            continue
+        path = target_dir / rel_path
+        try:
+            digest = file_digest(path)[:ASSET_HISTORY_DIGEST_LEN]
+        except OSError:
+            continue
+        if digest != plan.old_digests.get(rel_path):
+            kept.append(rel_path)
+            continue
+        path.unlink()
+        removed.append(rel_path)
+
+    if removed:
+        click.secho("i Removed files dropped since v" + plan.from_version + ":", fg="blue")
+        for rel_path in removed:
+            click.secho(f"  - {rel_path}")
+    if kept:
+        click.secho("! Kept locally modified files dropped upstream:", fg="yellow")
+        for rel_path in kept:
+            click.secho(f"  - {rel_path}", fg="yellow")
+    return removed
+
+
+def report_upgrade_plan(plan: UpgradePlan) -> None:
+    """
+    Print the managed file changes an update would apply.
+
+    Args:
+        plan: Upgrade plan from plan_upgrade().
+    """
+    if not plan.known:
+        click.secho(
+            f"i No file manifest for v{plan.from_version}; all managed files will be refreshed",
+            fg="blue",
+        )
+        return
+    click.secho(
+        f"i Managed files v{plan.from_version} → v{plan.to_version}: "
+        f"{len(plan.added)} added, {len(plan.modified)} modified, "
+        f"{len(plan.removed)} removed, {plan.unchanged} unchanged",
+        fg="yellow" if plan.added or plan.modified or plan.removed else "blue",
+    )
+    for label, paths in (("+", plan.added), ("~", plan.modified), ("-", plan.removed)):
+        for rel_path in paths:
+            click.secho(f"  {label} {rel_path}")
+
+
+def perform_auto_update(target_dir: Path, from_version: str | None = None) -> UpdateStatus:
     """
     Perform automatic update with merge.
 
     Args:
         target_dir: Target directory for update.
+        from_version: Previously installed version; files it shipped that
+            this version dropped are removed.
 
     Returns:
         UpdateStatus indicating result.
@@ -315,6 +493,10 @@ def perform_auto_update(target_dir: Path) -> UpdateStatus:
     if fail_count > 0:
         click.secho(f"! Failed: {fail_count} files", fg="yellow")
 
+    if from_version:
+        remove_obsolete_files(target_dir, plan_upgrade(from_version))
+    refresh_catalog(target_dir)
+
     # Apply settings.json updates (merge pattern - preserves user settings)
     click.secho("i Applying settings.json updates...", fg="blue")
     apply_hooks(target_dir)
@@ -341,6 +523,87 @@ def perform_auto_update(target_dir: Path) -> UpdateStatus:
     return UpdateStatus.UPDATED
 
 
+def perform_merge_update(target_dir: Path, from_version: str | None = None) -> UpdateStatus:
+    """
+    Perform update with a three-way merge of user-modified managed files.
+
+    Args:
+        target_dir: Target directory for update.
+        from_version: Previously installed version; files it shipped that
+            this version dropped are removed.
+
+    Returns:
+        UpdateStatus indicating result.
+    """
+    from claude_pilot.assets import load_asset_history
+    from claude_pilot.merge import BaseStore, MergeReport, merge_file
+
+    # Create backup
+    create_backup(target_dir)
+
+    # Without a recorded base, a file is unedited if it matches any earlier shipped version
+    shipped: dict[str, set[str]] = {}
+    for digests in load_asset_history().values():
+        for rel_path, digest in digests.items():
+            shipped.setdefault(rel_path, set()).add(digest)
+
+    click.secho("i Merging managed files...", fg="blue")
+    store = BaseStore(target_dir)
+    report = MergeReport()
+    for src_path, dest_path in iter_template_files(target_dir):
+        rel_path = dest_path.relative_to(target_dir).as_posix()
+        try:
+            theirs = src_path.read_bytes()
+        except OSError:
+            report.failed += 1
+            continue
+        merge_file(dest_path, rel_path, theirs, store, report, shipped.get(rel_path, set()))
+    try:
+        store.save()
+    except OSError:
+        click.secho("! Could not save merge base store", fg="yellow")
+
+    click.secho(
+        f"i Added: {len(report.added)}, updated: {len(report.updated)}, "
+        f"merged: {len(report.merged)}, kept local: {len(report.kept)}",
+        fg="blue",
+    )
+    if report.failed:
+        click.secho(f"! Failed: {report.failed} files", fg="yellow")
+    if report.conflicts:
+        click.secho(f"! Conflicts in {len(report.conflicts)} files (resolve the markers):", fg="yellow")
+        for rel_path in report.conflicts:
+            click.secho(f"  - {rel_path}", fg="yellow")
+    if report.diverged:
+        click.secho(
+            f"! Kept {len(report.diverged)} locally modified files with no merge base "
+            "(review them against the new templates):",
+            fg="yellow",
+        )
+        for rel_path in report.diverged:
+            click.secho(f"  - {rel_path}", fg="yellow")
+
+    if from_version:
+        remove_obsolete_files(target_dir, plan_upgrade(from_version))
+    refresh_catalog(target_dir)
+
+    # Apply settings.json updates (merge pattern - preserves user settings)
+    click.secho("i Applying settings.json updates...", fg="blue")
+    apply_hooks(target_dir)
+    apply_statusline(target_dir)
+
+    # Ensure .gitignore excludes .pilot/
+    ensure_gitignore(target_dir)
+
+    # Cleanup old backups (keep last 5)
+    cleanup_old_backups(target_dir, keep=5)
+
+    # Save version
+    save_version(config.VERSION, target_dir)
+
+    return UpdateStatus.UPDATED
+
+
 def generate_manual_merge_guide(target_dir: Path) -> Path:
     """
     Generate a manual merge guide for the user.
@@ -467,22 +730,32 @@ def save_version(
     version_file.write_text(version)
 
 
-def _create_default_settings(settings_path: Path) -> bool:
+def _statusline_config(native: bool = False) -> dict[str, str]:
+    """
+    Build the statusLine settings entry.
+
+    Args:
+        native: Use the native Python statusline instead of statusline.sh.
+
+    Returns:
+        statusLine configuration dictionary.
+    """
+    command = config.STATUSLINE_NATIVE_COMMAND if native else config.STATUSLINE_SCRIPT_COMMAND
+    return {"type": "command", "command": command}
+
+
+def _create_default_settings(settings_path: Path, native: bool = False) -> bool:
     """
     Create default settings.json with statusLine configuration.
 
     Args:
         settings_path: Path to settings.json file.
+        native: Use the native Python statusline instead of statusline.sh.
 
     Returns:
         True if successful, False otherwise.
     """
-    default_settings = {
-        "statusLine": {
-            "type": "command",
-            "command": '"$CLAUDE_PROJECT_DIR"/.claude/scripts/statusline.sh'
-        }
-    }
+    default_settings = {"statusLine": _statusline_config(native)}
     try:
         with settings_path.open("w") as f:
             json.dump(default_settings, f, indent=2)
@@ -554,16 +827,19 @@ def _write_settings_atomically(
         return False
 
 
-def apply_statusline(target_dir: Path | None = None) -> bool:
+def apply_statusline(target_dir: Path | None = None, native: bool = False) -> bool:
     """
     Apply statusline configuration to existing settings.json.
 
     This function adds the statusLine configuration to an existing
     settings.json file without overwriting other user settings.
-    If statusLine already exists, it will be preserved unchanged.
+    If statusLine already exists, it will be preserved unchanged, except
+    that with native=True the stock statusline.sh command is replaced by
+    the native Python statusline.
 
     Args:
         target_dir: Optional target directory. Defaults to current working directory.
+        native: Install the native Python statusline (claude-pilot-statusline).
 
     Returns:
         True if statusLine was added or already exists, False on error.
@@ -578,7 +854,7 @@ def apply_statusline(target_dir: Path | None = None) -> bool:
 
     # Create default settings.json if it doesn't exist
     if not settings_path.exists():
-        return _create_default_settings(settings_path)
+        return _create_default_settings(settings_path, native)
 
     # Read existing settings
     try:
@@ -590,15 +866,19 @@ def apply_statusline(target_dir: Path | None = None) -> bool:
 
     # Check if statusLine already exists
     if "statusLine" in settings:
-        click.secho("i statusLine already configured, preserving existing config", fg="blue")
-        return True
+        existing = settings["statusLine"]
+        is_stock_script = (
+            isinstance(existing, dict)
+            and existing.get("command") == config.STATUSLINE_SCRIPT_COMMAND
+        )
+        if not (native and is_stock_script):
+            click.secho("i statusLine already configured, preserving existing config", fg="blue")
+            return True
+        click.secho("i Replacing statusline.sh with native statusline", fg="blue")
 
     # Create backup, add statusLine, and write atomically
     backup_path = _create_settings_backup(settings_path, target_dir)
-    settings["statusLine"] = {
-        "type": "command",
-        "command": '"$CLAUDE_PROJECT_DIR"/.claude/scripts/statusline.sh'
-    }
+    settings["statusLine"] = _statusline_config(native)
     return _write_settings_atomically(settings, settings_path, backup_path)
 
 
@@ -864,6 +1144,14 @@ def get_github_latest_sha(repo: str, branch: str) -> str | None:
     """
     Fetch the latest commit SHA from a GitHub repository.
 
+    The request is conditional: the ETag of the last answer is sent as
+    If-None-Match, and a 304 (which does not count against the API rate
+    limit) returns the cached SHA. A token from GITHUB_TOKEN/GH_TOKEN is sent
+    when set. Requests go through the shared rate-limit scheduler; when the
+    quota is exhausted the last known SHA is returned without a request, and
+    concurrent checks of the same branch share one request. In offline mode
+    only the cached SHA is returned.
+
     Args:
         repo: Repository in format "owner/repo".
         branch: Branch name (default: "main").
@@ -873,23 +1161,125 @@ def get_github_latest_sha(repo: str, branch: str) -> str | None:
     """
     import requests
 
-    api_url = f"https://api.github.com/repos/{repo}/commits/{branch}"
-    try:
-        response = requests.get(api_url, timeout=config.REQUEST_TIMEOUT)
-        response.raise_for_status()
-        data = response.json()
-        # Validate response structure (Security: Warning #1)
-        if not isinstance(data, dict) or "sha" not in data:
+    from claude_pilot import network, ratelimit
+
+    api_url = f"{config.GITHUB_API_URL}/repos/{repo}/commits/{branch}"
+    etags = network.EtagCache()
+    cached = etags.get(api_url)
+    cached_sha = str(cached["value"]) if cached and isinstance(cached.get("value"), str) else None
+    if config.is_offline():
+        return cached_sha
+    scheduler = ratelimit.get_scheduler()
+
+    def _fetch() -> str | None:
+        headers = network.github_headers()
+        if cached_sha:
+            headers.update(etags.conditional_headers(api_url))
+        try:
+            response = scheduler.get(api_url, headers=headers)
+            if cached_sha and (response.status_code == 304 or network.is_rate_limited(response)):
+                return cached_sha
+            response.raise_for_status()
+            data = response.json()
+            # Validate response structure (Security: Warning #1)
+            if not isinstance(data, dict) or "sha" not in data:
+                return None
+            sha = str(data["sha"])
+            etags.put(api_url, response, sha)
+            return sha
+        except ratelimit.RateLimitExceeded:
+            return cached_sha
+        except (requests.RequestException, KeyError, TypeError, ValueError):
             return None
-        return str(data["sha"])
-    except (requests.RequestException, KeyError, TypeError, ValueError):
+
+    return scheduler.coalesce(api_url, _fetch)
+
+
+def cached_tarball_path(repo: str, ref: str) -> Path:
+    """
+    Get the user cache path of a GitHub repository tarball.
+
+    Args:
+        repo: Repository in format "owner/repo".
+        ref: Git reference (commit SHA, branch, tag).
+
+    Returns:
+        Path under the download cache directory.
+    """
+    cache_dir = config.get_cache_dir() / config.DOWNLOAD_CACHE_SUBDIR
+    return cache_dir / f"{repo.replace('/', '-')}-{ref}.tar.gz"
+
+
+def tarball_is_readable(tarball: Path) -> bool:
+    """
+    Check that a gzipped tarball can be read to the end.
+
+    Args:
+        tarball: Tarball path.
+
+    Returns:
+        False if the file is missing, truncated or corrupt.
+    """
+    import tarfile
+    import zlib
+
+    try:
+        with tarfile.open(tarball, "r:gz") as tar:
+            for _member in tar:
+                pass
+    except (tarfile.TarError, OSError, EOFError, zlib.error):
+        return False
+    return True
+
+
+def fetch_github_tarball(repo: str, ref: str) -> Path | None:
+    """
+    Make sure a GitHub repository tarball is in the user cache.
+
+    A tarball already in the cache (e.g. from `claude-pilot prefetch`) is
+    used if it reads to the end; a truncated or corrupt one is deleted and
+    downloaded again, resuming any partial download. Every request goes
+    through the GitHub rate-limit scheduler, which defers a rate-limited
+    download until the window resets (up to its max wait).
+
+    Args:
+        repo: Repository in format "owner/repo".
+        ref: Git reference (commit SHA, branch, tag).
+
+    Returns:
+        Path of the cached tarball, or None if it could not be downloaded.
+    """
+    import requests
+
+    from claude_pilot import network, ratelimit
+
+    cached = cached_tarball_path(repo, ref)
+    if cached.is_file():
+        if tarball_is_readable(cached):
+            return cached
+        cached.unlink(missing_ok=True)
+    download_url = f"{config.GITHUB_API_URL}/repos/{repo}/tarball/{ref}"
+    try:
+        network.prune_partials(cached.parent, config.DOWNLOAD_PARTIAL_MAX_AGE)
+        network.download(
+            download_url,
+            cached,
+            headers=network.github_headers(),
+            fetch=ratelimit.get_scheduler().get,
+        )
+    except (requests.RequestException, OSError):
         return None
+    return cached
 
 
 def download_github_tarball(repo: str, ref: str, dest: Path) -> bool:
     """
     Download a GitHub repository tarball.
 
+    The download is resumable: an interrupted transfer is kept in the user
+    cache directory and continued with a Range request on the next call.
+    Prefetched tarballs are copied from the cache without a request.
+
     Args:
         repo: Repository in format "owner/repo".
         ref: Git reference (commit SHA, branch, tag).
@@ -898,21 +1288,20 @@ def download_github_tarball(repo: str, ref: str, dest: Path) -> bool:
     Returns:
         True if successful, False otherwise.
     """
-    import requests
+    prefetched = cached_tarball_path(repo, ref).is_file()
+    cached = fetch_github_tarball(repo, ref)
+    if cached is None:
+        return False
 
-    download_url = f"https://api.github.com/repos/{repo}/tarball/{ref}"
+    tarball_path = dest / f"{repo.replace('/', '-')}-{ref[:7]}.tar.gz"
     try:
-        response = requests.get(download_url, timeout=config.REQUEST_TIMEOUT, stream=True)
-        response.raise_for_status()
-
-        tarball_path = dest / f"{repo.replace('/', '-')}-{ref[:7]}.tar.gz"
-        with tarball_path.open("wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-
-        return True
-    except requests.RequestException:
+        if prefetched:
+            shutil.copyfile(cached, tarball_path)
+        else:
+            shutil.move(str(cached), str(tarball_path))
+    except OSError:
         return False
+    return True
 
 
 def extract_skills_from_tarball(
@@ -994,17 +1383,30 @@ def extract_skills_from_tarball(
 def sync_external_skills(
     target_dir: Path | None = None,
     skip: bool = False,
+    refresh: bool = False,
 ) -> str:
     """
     Sync external skills from GitHub repositories.
 
+    With a `.claude/skills.lock` in place the installed skills are verified
+    against it locally and GitHub is only asked for a newer commit when
+    refresh is set. Skills that drifted from the lock are reinstalled from
+    the locked commit, so every checkout of a project gets the same files.
+
+    A source that fails is reported and skipped; the others are still
+    synced, and the lock and catalog are written for whatever succeeded.
+
     Args:
         target_dir: Target directory for skills. Defaults to current directory.
         skip: If True, skip syncing.
+        refresh: Check GitHub for a newer commit even if the lock verifies.
 
     Returns:
-        Status: "success", "already_current", "failed", "skipped".
+        Status: "success", "already_current", "failed" (any source failed),
+        "skipped".
     """
+    from claude_pilot import skills_lock
+
     if target_dir is None:
         target_dir = config.get_target_dir()
 
@@ -1018,33 +1420,69 @@ def sync_external_skills(
     if version_file.exists():
         current_sha = version_file.read_text().strip()
 
+    lock = skills_lock.load_lock(target_dir)
+    lock_before = json.dumps(lock, sort_keys=True)
+    updated = False
+    failed: list[str] = []
+
     # Sync each external skill source
     for skill_name, skill_config in config.EXTERNAL_SKILLS.items():
         repo = skill_config["repo"]
         branch = skill_config["branch"]
         skills_path = skill_config["skills_path"]
+        dest_dir = skills_lock.source_dir(target_dir, skill_name)
+
+        locked = lock.get(skill_name)
+        if locked is not None and not skills_lock.matches_config(locked, skill_config):
+            locked = None
+        verified = False
+        if locked is not None:
+            report = skills_lock.SkillsLockReport()
+            skills_lock.verify_source(dest_dir, locked, report)
+            verified = report.ok
+
+        if locked is not None and not refresh:
+            if verified:
+                click.secho(
+                    f"i {skill_name} matches skills.lock ({locked['ref'][:7]})", fg="blue"
+                )
+                continue
+            click.secho(f"i {skill_name} differs from skills.lock, reinstalling", fg="blue")
+            target_sha = str(locked["ref"])
+            pinned = locked
+        else:
+            # Fetch latest SHA
+            click.secho(f"i Checking {skill_name} for updates...", fg="blue")
+            latest_sha = get_github_latest_sha(repo, branch)
 
-        # Fetch latest SHA
-        click.secho(f"i Checking {skill_name} for updates...", fg="blue")
-        latest_sha = get_github_latest_sha(repo, branch)
-
-        if latest_sha is None:
-            click.secho(f"! Warning: Could not fetch {skill_name} version", fg="yellow")
-            return "failed"
+            if latest_sha is None:
+                click.secho(f"! Warning: Could not fetch {skill_name} version", fg="yellow")
+                failed.append(skill_name)
+                continue
 
-        # Check if already up to date
-        if current_sha == latest_sha:
-            click.secho(f"i {skill_name} already up to date", fg="blue")
-            return "already_current"
+            # Check if already up to date
+            installed_sha = current_sha if locked is None else (locked["ref"] if verified else None)
+            if installed_sha == latest_sha:
+                click.secho(f"i {skill_name} already up to date", fg="blue")
+                if locked is None and dest_dir.is_dir():
+                    # Adopt the installed skills into a new lock
+                    lock[skill_name] = skills_lock.build_entry(
+                        dest_dir, repo, branch, skills_path, latest_sha
+                    )
+                continue
+            target_sha = latest_sha
+            pinned = None
 
         # Download and extract
         click.secho(f"i Downloading {skill_name}...", fg="blue")
+        dest_dir.mkdir(parents=True, exist_ok=True)
         with tempfile.TemporaryDirectory() as temp_dir:
             temp_path = Path(temp_dir)
 
-            if not download_github_tarball(repo, latest_sha, temp_path):
+            if not download_github_tarball(repo, target_sha, temp_path):
                 click.secho(f"! Warning: Failed to download {skill_name}", fg="yellow")
-                return "failed"
+                failed.append(skill_name)
+                continue
 
             # Find the downloaded tarball
             tarball = None
@@ -1054,22 +1492,45 @@ def sync_external_skills(
 
             if tarball is None:
                 click.secho("! Warning: Could not find downloaded tarball", fg="yellow")
-                return "failed"
+                failed.append(skill_name)
+                continue
 
-            # Extract skills
-            dest_dir = target_dir / config.EXTERNAL_SKILLS_DIR / skill_name
-            if not extract_skills_from_tarball(tarball, skills_path, dest_dir):
+            # Extract skills into a staging directory, then swap it in
+            staging_dir = temp_path / "skills"
+            if not extract_skills_from_tarball(tarball, skills_path, staging_dir):
                 click.secho(f"! Warning: Failed to extract {skill_name}", fg="yellow")
-                return "failed"
+                # Never reuse a cached tarball that could not be extracted
+                cached_tarball_path(repo, target_sha).unlink(missing_ok=True)
+                failed.append(skill_name)
+                continue
 
+            entry = skills_lock.build_entry(staging_dir, repo, branch, skills_path, target_sha)
+            if pinned is not None and entry["tree"] != pinned.get("tree"):
+                click.secho(
+                    f"! Warning: {skill_name} at {target_sha[:7]} does not match skills.lock",
+                    fg="yellow",
+                )
+                failed.append(skill_name)
+                continue
+
+            shutil.rmtree(dest_dir, ignore_errors=True)
+            shutil.move(str(staging_dir), str(dest_dir))
             click.secho(f"i Extracted {skill_name} to {dest_dir}", fg="blue")
 
+        lock[skill_name] = entry
+        updated = True
+
         # Save version
         version_file.parent.mkdir(parents=True, exist_ok=True)
-        version_file.write_text(latest_sha)
-        click.secho(f"i Updated {skill_name} to {latest_sha[:7]}", fg="green")
+        version_file.write_text(target_sha)
+        click.secho(f"i Updated {skill_name} to {target_sha[:7]}", fg="green")
 
-    return "success"
+    if json.dumps(lock, sort_keys=True) != lock_before:
+        skills_lock.write_lock(target_dir, lock)
+    refresh_catalog(target_dir)
+    if failed:
+        return "failed"
+    return "success" if updated else "already_current"
 
 
 def perform_update(
@@ -1083,7 +1544,7 @@ def perform_update(
 
     Args:
         target_dir: Optional target directory. Defaults to current working directory.
-        strategy: Merge strategy to use (auto or manual).
+        strategy: Merge strategy to use (auto, manual or merge).
         skip_pip: If True, skip pip package upgrade.
         check_only: If True, only check for updates without applying them.
 
@@ -1114,6 +1575,9 @@ def perform_update(
             )
         else:
             click.secho("✓ Pip package is up to date", fg="green")
+        current_version = get_current_version(target_dir)
+        if current_version not in ("none", config.VERSION):
+            report_upgrade_plan(plan_upgrade(current_version))
         return UpdateStatus.ALREADY_CURRENT
 
     # Phase 2: Upgrade pip package if needed
@@ -1147,5 +1611,7 @@ def perform_update(
     # Perform update based on strategy
     if strategy == MergeStrategy.MANUAL:
         return perform_manual_update(target_dir)
+    if strategy == MergeStrategy.MERGE:
+        return perform_merge_update(target_dir, from_version=current_version)
 
-    return perform_auto_update(target_dir)
+    return perform_auto_update(target_dir, from_version=current_version)
@@ -0,0 +1,212 @@
+"""
+Integrity verification of managed files.
+
+Compares a project's managed `.claude/` files against the digests shipped in
+the package's asset index and reports modified, missing and extra files.
+
+Hashing is avoided wherever stat() can answer:
+
+- a size that differs from the shipped size is a modification;
+- a file whose (size, mtime_ns) matches the stat cache from the last verify
+  (`.claude/local/verify-cache.json`) reuses the cached digest.
+
+Only files that changed since the last run are hashed, so an unchanged
+project verifies with one stat() per managed file.
+
+The digests belong to the installed package version. A project whose
+`.pilot-version` records another version is reported as outdated instead of
+being compared: every file that changed between the two releases would show
+up as modified.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from claude_pilot import config
+from claude_pilot.assets import AssetManifest, file_digest, get_asset_manifest, load_asset_index
+
+# Files modified this recently are not cached (mtime granularity guard)
+_MTIME_SETTLE_NS = 2_000_000_000
+
+
+@dataclass
+class VerifyReport:
+    """Result of verifying a project's managed files."""
+
+    modified: list[str] = field(default_factory=list)
+    missing: list[str] = field(default_factory=list)
+    extra: list[str] = field(default_factory=list)
+    checked: int = 0
+    hashed: int = 0
+    project_version: str | None = None
+    package_version: str = config.VERSION
+
+    @property
+    def outdated(self) -> bool:
+        """Whether the project was installed by another version than the digests'."""
+        return self.project_version is not None and self.project_version != self.package_version
+
+    @property
+    def ok(self) -> bool:
+        """Whether the project is at the package version and every managed file matches."""
+        return not self.outdated and not self.modified and not self.missing
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return a JSON-serializable dictionary."""
+        return {
+            "ok": self.ok,
+            "project_version": self.project_version,
+            "package_version": self.package_version,
+            "outdated": self.outdated,
+            "modified": self.modified,
+            "missing": self.missing,
+            "extra": self.extra,
+            "checked": self.checked,
+            "hashed": self.hashed,
+        }
+
+
+def managed_digests(
+    index: dict[str, dict[str, Any]],
+    manifest: AssetManifest | None = None,
+) -> dict[str, dict[str, Any]]:
+    """
+    Select the index entries that verify should compare byte-for-byte.
+
+    Merge-only files (settings.json), the version file and anything outside
+    `.claude/` (CLAUDE.md template) are owned or rewritten by the user/updater.
+
+    Args:
+        index: Asset index from load_asset_index().
+        manifest: Asset manifest (defaults to the singleton).
+
+    Returns:
+        Filtered index.
+    """
+    manifest = manifest or get_asset_manifest()
+    return {
+        rel_path: entry
+        for rel_path, entry in index.items()
+        if rel_path.startswith(".claude/")
+        and rel_path != config.VERSION_FILE
+        and not manifest.is_special_case(rel_path)
+        and not any(rel_path.startswith(f"{user}/") for user in config.USER_FILES)
+    }
+
+
+def _load_cache(cache_path: Path) -> dict[str, list[Any]]:
+    """Load the stat cache, returning an empty dict on any error."""
+    try:
+        data = json.loads(cache_path.read_text(encoding="utf-8"))
+        files = data["files"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return {}
+    return files if isinstance(files, dict) else {}
+
+
+def _save_cache(cache_path: Path, files: dict[str, list[Any]]) -> None:
+    """Write the stat cache atomically; failures are ignored."""
+    temp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path.write_text(json.dumps({"version": 1, "files": files}), encoding="utf-8")
+        os.replace(temp_path, cache_path)
+    except OSError:
+        temp_path.unlink(missing_ok=True)
+
+
+def _find_extra(
+    target_dir: Path,
+    expected: dict[str, dict[str, Any]],
+    manifest: AssetManifest,
+) -> list[str]:
+    """List files under .claude/ that look managed but are not shipped."""
+    claude_dir = target_dir / ".claude"
+    skip = {claude_dir / "local", claude_dir / "skills" / "external"}
+    extra: list[str] = []
+    for root, dirs, files in os.walk(claude_dir):
+        root_path = Path(root)
+        dirs[:] = [d for d in dirs if root_path / d not in skip]
+        for name in files:
+            rel_path = (root_path / name).relative_to(target_dir).as_posix()
+            if rel_path in expected or manifest.is_special_case(rel_path):
+                continue
+            if rel_path != config.VERSION_FILE and manifest.should_include(rel_path):
+                extra.append(rel_path)
+    return sorted(extra)
+
+
+def verify_project(
+    target_dir: Path,
+    index: dict[str, dict[str, Any]] | None = None,
+    rehash: bool = False,
+    version: str = config.VERSION,
+) -> VerifyReport:
+    """
+    Verify managed files in a project against shipped digests.
+
+    Args:
+        target_dir: Project root containing .claude/.
+        index: Asset index (defaults to the packaged index).
+        rehash: Ignore the stat cache and hash every file.
+        version: Version the index was shipped with.
+
+    Returns:
+        VerifyReport listing modified, missing and extra files; only the
+        versions when the project records a different version (outdated).
+    """
+    report = VerifyReport(package_version=version)
+    try:
+        report.project_version = (
+            config.get_version_file_path(target_dir).read_text().strip() or None
+        )
+    except OSError:
+        pass
+    if report.outdated:
+        return report
+
+    manifest = get_asset_manifest()
+    expected = managed_digests(load_asset_index() if index is None else index, manifest)
+    cache_path = target_dir / config.VERIFY_CACHE_FILE
+    cache = {} if rehash else _load_cache(cache_path)
+    new_cache: dict[str, list[Any]] = {}
+    now_ns = time.time_ns()
+
+    for rel_path, entry in sorted(expected.items()):
+        report.checked += 1
+        path = target_dir / rel_path
+        try:
+            st = path.stat()
+        except OSError:
+            report.missing.append(rel_path)
+            continue
+        if st.st_size != entry.get("size", st.st_size):
+            report.modified.append(rel_path)
+            continue
+
+        cached = cache.get(rel_path)
+        if isinstance(cached, list) and cached[:2] == [st.st_size, st.st_mtime_ns]:
+            digest = str(cached[2])
+        else:
+            try:
+                digest = file_digest(path)
+            except OSError:
+                report.missing.append(rel_path)
+                continue
+            report.hashed += 1
+        if now_ns - st.st_mtime_ns > _MTIME_SETTLE_NS:
+            new_cache[rel_path] = [st.st_size, st.st_mtime_ns, digest]
+        if digest != entry["sha256"]:
+            report.modified.append(rel_path)
+
+    report.extra = _find_extra(target_dir, expected, manifest)
+
+    if new_cache != cache and (target_dir / ".claude").is_dir():
+        _save_cache(cache_path, new_cache)
+    return report
@@ -0,0 +1,992 @@
+"""
+Git worktree management for parallel plan execution.
+
+WorktreeManager creates and cleans up one worktree per plan, replacing the
+grep/sed metadata handling of `worktree-utils.sh`. Worktree metadata is kept
+in a structured store (`.pilot/worktrees.json`, updated under an flock) and
+mirrored into the plan's "## Worktree Info" section for humans and agents;
+plans that only have the markdown section are still read. Plan locks keep the
+mkdir-based `.pilot/plan/.locks/<plan>.lock` format so shell callers and
+Python callers exclude each other, and git state is read with batched
+plumbing calls (`for-each-ref`, `worktree list --porcelain`).
+
+A plan worktree can be a sparse (cone mode) checkout of just the
+directories the plan touches, given explicitly or derived from the plan's
+Scope section, and dependency caches (node_modules/) are hardlinked from the
+main checkout instead of being reinstalled. Python virtualenvs are not
+shared, because they point back at the main checkout by absolute path.
+
+Creating a worktree per plan (`git worktree add` plus a dependency install)
+dominates start-up on large repositories. WorktreePool keeps a set of
+pre-created, pre-installed worktrees ("slots") checked out at the main
+branch in a sibling `{repo}-wt-pool/` directory. A plan leases a slot, which
+is switched to the plan's branch, and releasing it recycles the slot with
+`git reset --hard` / `git clean -fd` instead of deleting it. Ignored files
+(node_modules/, .venv/, build caches) survive recycling, so the next plan
+starts with dependencies already installed.
+
+Pool state lives in the main project's `.pilot/worktree-pool.json` and is
+only read and written under an exclusive lock on `.pilot/worktree-pool.lock`,
+so concurrent sessions never lease the same slot.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import shutil
+import subprocess
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Any
+
+from claude_pilot import config
+from claude_pilot.locks import locked_json
+
+# Slot states
+SLOT_READY = "ready"
+SLOT_LEASED = "leased"
+SLOT_CREATING = "creating"
+
+
+# Plan markdown section mirroring the worktree metadata
+WORKTREE_SECTION = "## Worktree Info"
+_SECTION_LABELS = {
+    "branch": "Branch",
+    "worktree_path": "Worktree Path",
+    "main_branch": "Main Branch",
+    "main_project": "Main Project",
+    "lock_file": "Lock File",
+    "created_at": "Created At",
+    "sparse_paths": "Sparse Paths",
+}
+# Labels only rendered when set
+_OPTIONAL_LABELS = ("sparse_paths",)
+_SECTION_LINE_RE = re.compile(r"^[-*][ \t]+([^:]+?):[ \t]*(.*?)[ \t]*$")
+_SCOPE_HEADING_RE = re.compile(r"^#{2,}[ \t]+.*\bscope\b", re.IGNORECASE)
+_SCOPE_PATH_RE = re.compile(r"`([^`\s]+)`|^[ \t]*[-*][ \t]+([\w./-]+/[\w./-]*)", re.MULTILINE)
+
+# Plan states searched when resolving a plan name, most likely first
+_PLAN_SEARCH_STATES = ("in_progress", "pending", "done")
+
+
+class WorktreeError(RuntimeError):
+    """Raised when a git worktree operation fails."""
+
+
+@dataclass
+class WorktreeMetadata:
+    """Worktree information recorded for a plan."""
+
+    branch: str
+    worktree_path: str
+    main_branch: str
+    main_project: str
+    lock_file: str = ""
+    created_at: str = ""
+    sparse_paths: str = ""
+
+    def to_dict(self) -> dict[str, str]:
+        """Return a JSON-serializable dictionary."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> WorktreeMetadata:
+        """Build metadata from a stored dictionary, ignoring unknown keys."""
+        return cls(**{f.name: str(data.get(f.name) or "") for f in fields(cls)})
+
+
+def run_git(args: list[str], cwd: Path, check: bool = True) -> subprocess.CompletedProcess[str]:
+    """
+    Run a git command and capture its output.
+
+    Args:
+        args: Arguments after `git`.
+        cwd: Working directory.
+        check: Raise WorktreeError on a non-zero exit status.
+
+    Returns:
+        The completed process.
+    """
+    result = subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True)
+    if check and result.returncode != 0:
+        message = result.stderr.strip() or result.stdout.strip()
+        raise WorktreeError(f"git {' '.join(args)} failed: {message}")
+    return result
+
+
+def plan_to_branch(plan: str) -> str:
+    """
+    Derive the feature branch name for a plan.
+
+    Args:
+        plan: Plan file name, path or id, e.g. "20260117_120000_test.md".
+
+    Returns:
+        Branch name, e.g. "feature/20260117-120000-test".
+    """
+    name = Path(plan).name
+    if name.endswith(".md"):
+        name = name[:-3]
+    return "feature/" + name.replace("_", "-")
+
+
+def branch_key(branch: str) -> str:
+    """
+    Sanitize a branch name for use as an active pointer file name.
+
+    Args:
+        branch: Branch name, e.g. "feature/20260117-120000-test".
+
+    Returns:
+        File-name-safe key, e.g. "feature_20260117-120000-test".
+    """
+    return branch.replace("/", "_")
+
+
+def parse_worktree_section(text: str) -> WorktreeMetadata | None:
+    """
+    Parse the "## Worktree Info" section of a plan.
+
+    Args:
+        text: Plan markdown.
+
+    Returns:
+        The metadata, or None if the plan has no section with a branch.
+    """
+    by_label = {label.lower(): name for name, label in _SECTION_LABELS.items()}
+    values: dict[str, str] = {}
+    in_section = False
+    for line in text.splitlines():
+        if line.startswith("## "):
+            in_section = line.strip() == WORKTREE_SECTION
+            continue
+        if in_section:
+            match = _SECTION_LINE_RE.match(line)
+            if match and match.group(1).lower() in by_label:
+                values[by_label[match.group(1).lower()]] = match.group(2)
+    if not values.get("branch"):
+        return None
+    return WorktreeMetadata.from_dict(values)
+
+
+def render_worktree_section(metadata: WorktreeMetadata) -> str:
+    """Render metadata as a "## Worktree Info" markdown section."""
+    data = metadata.to_dict()
+    lines = [WORKTREE_SECTION, ""]
+    lines += [
+        f"- {label}: {data[name]}"
+        for name, label in _SECTION_LABELS.items()
+        if data[name] or name not in _OPTIONAL_LABELS
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def write_worktree_section(plan_path: Path, metadata: WorktreeMetadata | None) -> None:
+    """
+    Add, replace or remove the "## Worktree Info" section of a plan file (atomically).
+
+    Args:
+        plan_path: Plan markdown file.
+        metadata: Metadata to record, or None to remove the section.
+    """
+    text = plan_path.read_text(encoding="utf-8")
+    section = render_worktree_section(metadata) if metadata is not None else ""
+    lines = text.splitlines(keepends=True)
+    start = next((i for i, line in enumerate(lines) if line.strip() == WORKTREE_SECTION), None)
+    if start is None:
+        if not section:
+            return
+        text = text.rstrip("\n") + "\n\n" + section
+    else:
+        end = next(
+            (i for i in range(start + 1, len(lines)) if lines[i].startswith("## ")),
+            len(lines),
+        )
+        tail = "".join(lines[end:])
+        if section:
+            text = "".join(lines[:start]) + section + ("\n" + tail if tail else "")
+        else:
+            text = "".join(lines[:start]).rstrip("\n") + "\n" + ("\n" + tail if tail else "")
+
+    temp_path = plan_path.with_name(f".{plan_path.name}.{os.getpid()}.tmp")
+    temp_path.write_text(text, encoding="utf-8")
+    os.replace(temp_path, plan_path)
+
+
+def parse_scope_paths(text: str, root: Path) -> list[str]:
+    """
+    Derive sparse-checkout directories from a plan's Scope section(s).
+
+    Backticked paths and list items that look like paths are collected from
+    every "## ... Scope ..." section. Paths that do not exist under `root` are
+    ignored, files are widened to their directory, and nested directories
+    collapse into their parent.
+
+    Args:
+        text: Plan markdown.
+        root: Main project directory the paths are relative to.
+
+    Returns:
+        Sorted directory paths relative to root (empty if none were found).
+    """
+    scope_lines: list[str] = []
+    in_scope = False
+    for line in text.splitlines():
+        if line.startswith("#"):
+            in_scope = bool(_SCOPE_HEADING_RE.match(line))
+        elif in_scope:
+            scope_lines.append(line)
+
+    directories: set[str] = set()
+    for match in _SCOPE_PATH_RE.finditer("\n".join(scope_lines)):
+        rel = (match.group(1) or match.group(2)).strip("/").removeprefix("./")
+        if not rel or rel.startswith("..") or any(c in rel for c in "*?["):
+            continue
+        path = root / rel
+        if path.is_file():
+            rel = Path(rel).parent.as_posix()
+        elif not path.is_dir():
+            continue
+        if rel and rel != ".":
+            directories.add(rel)
+
+    return sorted(
+        d for d in directories
+        if not any(d.startswith(other + "/") for other in directories)
+    )
+
+
+def hardlink_tree(source: Path, dest: Path) -> int:
+    """
+    Recreate a directory tree at `dest` with files hardlinked to `source`.
+
+    Symlinks are recreated as symlinks. Files that cannot be linked (e.g. on
+    another filesystem) are copied. Tools that rewrite files by replacing
+    them (npm, pip) break the link and leave the source untouched; in-place
+    writes would be shared.
+
+    Args:
+        source: Existing directory.
+        dest: Destination directory (must not exist).
+
+    Returns:
+        Number of files linked or copied.
+    """
+    count = 0
+    for dirpath, dirnames, filenames in os.walk(source):
+        rel = Path(dirpath).relative_to(source)
+        target_dir = dest / rel
+        target_dir.mkdir(parents=True, exist_ok=True)
+        for name in list(dirnames):
+            src = Path(dirpath) / name
+            if src.is_symlink():
+                (target_dir / name).symlink_to(os.readlink(src))
+                dirnames.remove(name)
+        for name in filenames:
+            src = Path(dirpath) / name
+            dst = target_dir / name
+            if src.is_symlink():
+                dst.symlink_to(os.readlink(src))
+                continue
+            try:
+                os.link(src, dst)
+            except OSError:
+                shutil.copy2(src, dst)
+            count += 1
+    return count
+
+
+def get_main_project(target_dir: Path) -> Path:
+    """
+    Resolve the main project directory, also when called from inside a worktree.
+
+    Args:
+        target_dir: Any directory within the repository or one of its worktrees.
+
+    Returns:
+        The main working tree directory.
+    """
+    result = run_git(["rev-parse", "--git-common-dir"], target_dir, check=False)
+    if result.returncode != 0:
+        return target_dir.resolve()
+    common_dir = (target_dir / result.stdout.strip()).resolve()
+    return common_dir.parent if common_dir.name == ".git" else target_dir.resolve()
+
+
+class WorktreePool:
+    """Pool of pre-warmed git worktrees leased to plans."""
+
+    def __init__(self, target_dir: Path | None = None) -> None:
+        """
+        Initialize the worktree pool.
+
+        Args:
+            target_dir: Project directory (or a worktree of it). Defaults to
+                current working directory.
+        """
+        if target_dir is None:
+            target_dir = config.get_target_dir()
+        self.main_project = get_main_project(target_dir)
+        self.pool_dir = self.main_project.parent / (
+            self.main_project.name + config.WORKTREE_POOL_DIR_SUFFIX
+        )
+        self.state_path = self.main_project / config.WORKTREE_POOL_STATE_FILE
+        self.lock_path = self.main_project / config.WORKTREE_POOL_LOCK_FILE
+
+    # -------------------------------------------------------------------------
+    # State
+    # -------------------------------------------------------------------------
+
+    @contextmanager
+    def _locked_state(self) -> Iterator[dict[str, Any]]:
+        """Hold the pool lock and yield the state; changes are saved on exit."""
+        with locked_json(self.state_path, self.lock_path) as state:
+            if not isinstance(state.get("slots"), list):
+                state.clear()
+                state["slots"] = []
+            yield state
+
+    def status(self) -> dict[str, Any]:
+        """
+        Get the pool configuration and slots.
+
+        Slots whose directory has disappeared are dropped.
+
+        Returns:
+            Pool state with "main_branch", "setup", "size" and "slots".
+        """
+        with self._locked_state() as state:
+            self._prune(state)
+            snapshot: dict[str, Any] = json.loads(json.dumps(state))
+        return snapshot
+
+    def _prune(self, state: dict[str, Any]) -> None:
+        """
+        Drop slots whose worktree directory no longer exists (except ones being created).
+
+        Slots left "creating" for longer than config.WORKTREE_POOL_CREATING_TIMEOUT
+        were abandoned by a crashed fill or lease; their worktree is removed.
+        """
+        slots = state["slots"]
+        deadline = time.time() - config.WORKTREE_POOL_CREATING_TIMEOUT
+        alive = []
+        for slot in slots:
+            if slot["state"] == SLOT_CREATING:
+                if float(slot.get("creating_at") or 0) >= deadline:
+                    alive.append(slot)
+                elif Path(slot["path"]).exists():
+                    self._remove_slot(Path(slot["path"]))
+            elif Path(slot["path"]).is_dir():
+                alive.append(slot)
+        if len(alive) != len(slots):
+            state["slots"] = alive
+            run_git(["worktree", "prune"], self.main_project, check=False)
+
+    # -------------------------------------------------------------------------
+    # Slot lifecycle
+    # -------------------------------------------------------------------------
+
+    def _main_branch(self, state: dict[str, Any], main_branch: str | None) -> str:
+        if main_branch:
+            state["main_branch"] = main_branch
+        if not state.get("main_branch"):
+            current = run_git(["rev-parse", "--abbrev-ref", "HEAD"], self.main_project)
+            state["main_branch"] = current.stdout.strip()
+        return str(state["main_branch"])
+
+    def _next_slot_name(self, state: dict[str, Any]) -> str:
+        used = {slot["name"] for slot in state["slots"]}
+        index = 1
+        while f"slot-{index}" in used or (self.pool_dir / f"slot-{index}").exists():
+            index += 1
+        return f"slot-{index}"
+
+    def _create_slot(self, path: Path, main_branch: str, setup: str | None) -> None:
+        """Create a detached worktree at the main branch and run the setup command."""
+        self.pool_dir.mkdir(parents=True, exist_ok=True)
+        run_git(["worktree", "add", "--detach", str(path), main_branch], self.main_project)
+        if setup:
+            result = subprocess.run(setup, shell=True, cwd=path, capture_output=True, text=True)
+            if result.returncode != 0:
+                self._remove_slot(path)
+                raise WorktreeError(f"Setup command failed in {path}: {result.stderr.strip()}")
+
+    def _remove_slot(self, path: Path) -> None:
+        run_git(["worktree", "remove", "--force", str(path)], self.main_project, check=False)
+        if path.exists():
+            shutil.rmtree(path, ignore_errors=True)
+        run_git(["worktree", "prune"], self.main_project, check=False)
+
+    def _reset_slot(self, path: Path, main_branch: str) -> None:
+        """Discard changes and untracked files (keeping ignored caches), then detach at main."""
+        run_git(["reset", "--hard", "--quiet"], path)
+        run_git(["clean", "-fd", "--quiet"], path)
+        run_git(["checkout", "--quiet", "--detach", main_branch], path)
+
+    def fill(
+        self,
+        size: int | None = None,
+        main_branch: str | None = None,
+        setup: str | None = None,
+    ) -> list[str]:
+        """
+        Create slots until the pool holds `size` worktrees and reset idle slots to main.
+
+        Args:
+            size: Target number of slots (stored for later fills).
+            main_branch: Branch slots are reset to (default: stored, else current branch).
+            setup: Shell command run in each new slot, e.g. "npm ci" (stored).
+
+        Returns:
+            Paths of the slots created.
+        """
+        with self._locked_state() as state:
+            self._prune(state)
+            if size is not None:
+                state["size"] = size
+            if setup is not None:
+                state["setup"] = setup
+            target = int(state.get("size") or config.WORKTREE_POOL_DEFAULT_SIZE)
+            branch = self._main_branch(state, main_branch)
+            setup_cmd = state.get("setup") or None
+
+            now = time.time()
+            idle = [slot for slot in state["slots"] if slot["state"] == SLOT_READY]
+            for slot in idle:
+                slot.update(state=SLOT_CREATING, creating_at=now)
+            reserved = []
+            for _ in range(max(target - len(state["slots"]), 0)):
+                name = self._next_slot_name(state)
+                slot = {
+                    "name": name,
+                    "path": str(self.pool_dir / name),
+                    "state": SLOT_CREATING,
+                    "creating_at": now,
+                }
+                state["slots"].append(slot)
+                reserved.append(slot)
+
+        # Slow git and setup work happens outside the lock
+        created: list[str] = []
+        failed: list[str] = []
+        for slot in reserved:
+            try:
+                self._create_slot(Path(slot["path"]), branch, setup_cmd)
+                created.append(slot["path"])
+            except WorktreeError:
+                failed.append(slot["name"])
+        for slot in idle:
+            try:
+                self._reset_slot(Path(slot["path"]), branch)
+            except WorktreeError:
+                self._remove_slot(Path(slot["path"]))
+                failed.append(slot["name"])
+
+        prepared = {slot["name"] for slot in reserved + idle}
+        with self._locked_state() as state:
+            state["slots"] = [s for s in state["slots"] if s["name"] not in failed]
+            for slot in state["slots"]:
+                if slot["state"] == SLOT_CREATING and slot["name"] in prepared:
+                    slot["state"] = SLOT_READY
+                    slot.pop("creating_at", None)
+
+        if failed:
+            raise WorktreeError(f"Failed to prepare pool slots: {', '.join(failed)}")
+        return created
+
+    def lease(self, plan: str, branch: str | None = None) -> Path:
+        """
+        Lease a ready slot for a plan and check out the plan's branch in it.
+
+        When no slot is ready a new one is created (and added to the pool).
+
+        Args:
+            plan: Plan file name, path or id.
+            branch: Branch name (default: plan_to_branch(plan)).
+
+        Returns:
+            Absolute path of the leased worktree.
+        """
+        plan_name = Path(plan).name
+        branch = branch or plan_to_branch(plan_name)
+
+        with self._locked_state() as state:
+            self._prune(state)
+            for slot in state["slots"]:
+                if slot["state"] == SLOT_LEASED and slot.get("plan") == plan_name:
+                    return Path(slot["path"])
+            main_branch = self._main_branch(state, None)
+            slot = next((s for s in state["slots"] if s["state"] == SLOT_READY), None)
+            created = slot is None
+            if slot is None:
+                name = self._next_slot_name(state)
+                slot = {"name": name, "path": str(self.pool_dir / name)}
+                state["slots"].append(slot)
+            slot.update(
+                state=SLOT_CREATING if created else SLOT_LEASED,
+                plan=plan_name,
+                branch=branch,
+                leased_at=time.strftime("%Y-%m-%dT%H:%M:%S"),
+            )
+            if created:
+                slot["creating_at"] = time.time()
+            setup_cmd = state.get("setup") or None
+
+        path = Path(slot["path"])
+        try:
+            if created:
+                self._create_slot(path, main_branch, setup_cmd)
+                with self._locked_state() as state:
+                    for entry in state["slots"]:
+                        if entry["name"] == slot["name"]:
+                            entry["state"] = SLOT_LEASED
+                            entry.pop("creating_at", None)
+            exists = run_git(
+                ["rev-parse", "--verify", "--quiet", f"refs/heads/{branch}"], path, check=False
+            )
+            if exists.returncode == 0:
+                run_git(["checkout", "--quiet", branch], path)
+            else:
+                run_git(["checkout", "--quiet", "-b", branch, main_branch], path)
+        except WorktreeError:
+            with self._locked_state() as state:
+                for entry in state["slots"]:
+                    if entry["name"] == slot["name"]:
+                        entry.update(state=SLOT_READY, plan=None, branch=None, leased_at=None)
+                if created:
+                    state["slots"] = [s for s in state["slots"] if s["name"] != slot["name"]]
+            raise
+        return path
+
+    def release(self, plan_or_path: str, delete_branch: bool = False) -> Path | None:
+        """
+        Recycle a leased slot back into the pool.
+
+        The plan branch is kept (its commits are what the close flow merges)
+        unless delete_branch is set. Slots beyond the pool size are removed.
+
+        Args:
+            plan_or_path: Plan file name/id or the leased worktree path.
+            delete_branch: Also delete the plan branch.
+
+        Returns:
+            The released slot path, or None if nothing was leased to it.
+        """
+        key = Path(plan_or_path).name
+        with self._locked_state() as state:
+            slot = next(
+                (
+                    s for s in state["slots"]
+                    if s["state"] == SLOT_LEASED
+                    and (
+                        s.get("plan") in (key, f"{key}.md")
+                        or Path(s["path"]) == Path(plan_or_path).resolve()
+                    )
+                ),
+                None,
+            )
+            if slot is None:
+                return None
+            main_branch = self._main_branch(state, None)
+            target = int(state.get("size") or config.WORKTREE_POOL_DEFAULT_SIZE)
+            surplus = len(state["slots"]) > target
+
+        path = Path(slot["path"])
+        branch = slot.get("branch")
+        if surplus:
+            self._remove_slot(path)
+        else:
+            self._reset_slot(path, main_branch)
+        if delete_branch and branch:
+            run_git(["branch", "-D", branch], self.main_project, check=False)
+
+        with self._locked_state() as state:
+            for entry in list(state["slots"]):
+                if entry["name"] != slot["name"]:
+                    continue
+                if surplus:
+                    state["slots"].remove(entry)
+                else:
+                    entry.update(state=SLOT_READY, plan=None, branch=None, leased_at=None)
+        return path
+
+
+class WorktreeManager:
+    """Create, describe and clean up per-plan worktrees."""
+
+    def __init__(self, target_dir: Path | None = None) -> None:
+        """
+        Initialize the worktree manager.
+
+        Args:
+            target_dir: Project directory (or a worktree of it). Defaults to
+                current working directory.
+        """
+        if target_dir is None:
+            target_dir = config.get_target_dir()
+        self.main_project = get_main_project(target_dir)
+        self.plan_dir = self.main_project / config.PLAN_DIR
+        self.lock_dir = self.main_project / config.PLAN_LOCK_DIR
+        self.metadata_path = self.main_project / config.WORKTREE_METADATA_FILE
+        self.metadata_lock_path = self.main_project / config.WORKTREE_METADATA_LOCK_FILE
+
+    # -------------------------------------------------------------------------
+    # Plans and locks
+    # -------------------------------------------------------------------------
+
+    def find_plan(self, plan: str) -> Path | None:
+        """
+        Resolve a plan path, file name or id to its plan file.
+
+        Args:
+            plan: Plan path, file name ("<id>.md") or id.
+
+        Returns:
+            Absolute plan file path, or None if not found.
+        """
+        candidate = Path(plan)
+        if candidate.is_file():
+            return candidate.resolve()
+        name = candidate.name if candidate.name.endswith(".md") else f"{candidate.name}.md"
+        for state in _PLAN_SEARCH_STATES:
+            path = self.plan_dir / state / name
+            if path.is_file():
+                return path
+        return None
+
+    def lock_path_for(self, plan_name: str) -> Path:
+        """Lock directory path for a plan file name."""
+        return self.lock_dir / f"{plan_name}.lock"
+
+    def acquire_lock(self, plan_name: str) -> Path | None:
+        """
+        Take a plan's lock (atomic mkdir).
+
+        Args:
+            plan_name: Plan file name.
+
+        Returns:
+            The lock path, or None if the plan is already locked.
+        """
+        lock = self.lock_path_for(plan_name)
+        lock.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            lock.mkdir()
+        except FileExistsError:
+            return None
+        return lock
+
+    def release_lock(self, plan_name: str) -> bool:
+        """
+        Release a plan's lock.
+
+        Returns:
+            True if a lock was removed.
+        """
+        try:
+            self.lock_path_for(plan_name).rmdir()
+        except OSError:
+            return False
+        return True
+
+    def select_and_lock_pending(self) -> Path | None:
+        """
+        Lock the oldest pending plan that no other session has locked.
+
+        Returns:
+            The locked plan file, or None if every pending plan is taken.
+        """
+        try:
+            pending = sorted((self.plan_dir / "pending").glob("*.md"))
+        except OSError:
+            return None
+        for plan_path in pending:
+            if self.acquire_lock(plan_path.name) is not None:
+                return plan_path
+        return None
+
+    # -------------------------------------------------------------------------
+    # Metadata and active pointers
+    # -------------------------------------------------------------------------
+
+    def get_metadata(self, plan: str) -> WorktreeMetadata | None:
+        """
+        Read a plan's worktree metadata.
+
+        The structured store is authoritative; plans recorded only in their
+        markdown section (e.g. by older shell scripts) are parsed instead.
+
+        Args:
+            plan: Plan path, file name or id.
+
+        Returns:
+            The metadata, or None if the plan has no worktree.
+        """
+        name = Path(plan).name
+        name = name if name.endswith(".md") else f"{name}.md"
+        with locked_json(self.metadata_path, self.metadata_lock_path) as store:
+            entry = store.get(name)
+        if isinstance(entry, dict):
+            return WorktreeMetadata.from_dict(entry)
+
+        plan_path = self.find_plan(plan)
+        if plan_path is None:
+            return None
+        try:
+            return parse_worktree_section(plan_path.read_text(encoding="utf-8"))
+        except OSError:
+            return None
+
+    def set_metadata(self, plan_path: Path, metadata: WorktreeMetadata) -> None:
+        """Record metadata in the store and the plan's markdown section."""
+        with locked_json(self.metadata_path, self.metadata_lock_path) as store:
+            store[plan_path.name] = metadata.to_dict()
+        write_worktree_section(plan_path, metadata)
+
+    def remove_metadata(self, plan_name: str) -> None:
+        """Forget a plan's metadata (store entry and markdown section)."""
+        with locked_json(self.metadata_path, self.metadata_lock_path) as store:
+            store.pop(plan_name, None)
+        plan_path = self.find_plan(plan_name)
+        if plan_path is not None:
+            write_worktree_section(plan_path, None)
+
+    def set_active_pointers(self, plan_path: Path, branches: list[str]) -> None:
+        """
+        Point each branch's active pointer at the plan.
+
+        Both the main branch and the worktree branch get a pointer so the plan
+        is found from either checkout.
+        """
+        active_dir = self.plan_dir / "active"
+        active_dir.mkdir(parents=True, exist_ok=True)
+        for branch in dict.fromkeys(branches):
+            pointer = active_dir / f"{branch_key(branch)}.txt"
+            temp_path = pointer.with_name(f".{pointer.name}.{os.getpid()}.tmp")
+            temp_path.write_text(str(plan_path))
+            os.replace(temp_path, pointer)
+
+    def clear_active_pointers(self, plan_name: str) -> list[str]:
+        """
+        Remove active pointers that reference a plan (in any state directory).
+
+        Returns:
+            Branch keys whose pointers were removed.
+        """
+        removed = []
+        for pointer in (self.plan_dir / "active").glob("*.txt"):
+            try:
+                target = pointer.read_text().strip()
+            except OSError:
+                continue
+            if Path(target).name == plan_name:
+                pointer.unlink(missing_ok=True)
+                removed.append(pointer.stem)
+        return removed
+
+    # -------------------------------------------------------------------------
+    # Git plumbing (one call per query)
+    # -------------------------------------------------------------------------
+
+    def local_branches(self) -> set[str]:
+        """All local branch names, from a single for-each-ref call."""
+        result = run_git(
+            ["for-each-ref", "--format=%(refname:short)", "refs/heads/"], self.main_project
+        )
+        return set(result.stdout.split())
+
+    def list_worktrees(self) -> dict[str, str]:
+        """
+        List worktrees from a single `git worktree list --porcelain` call.
+
+        Returns:
+            Mapping of worktree path to branch name ("" when detached).
+        """
+        result = run_git(["worktree", "list", "--porcelain"], self.main_project)
+        worktrees: dict[str, str] = {}
+        path = None
+        for line in result.stdout.splitlines():
+            if line.startswith("worktree "):
+                path = line[len("worktree "):]
+                worktrees[path] = ""
+            elif line.startswith("branch ") and path is not None:
+                worktrees[path] = line[len("branch "):].removeprefix("refs/heads/")
+        return worktrees
+
+    def current_branch(self) -> str:
+        """Branch checked out in the main project."""
+        result = run_git(["rev-parse", "--abbrev-ref", "HEAD"], self.main_project)
+        return result.stdout.strip()
+
+    def worktree_path_for(self, branch: str) -> Path:
+        """Sibling worktree directory for a branch: {repo}-wt-{branch leaf}."""
+        leaf = branch.rsplit("/", 1)[-1]
+        return self.main_project.parent / (
+            self.main_project.name + config.WORKTREE_DIR_INFIX + leaf
+        )
+
+    # -------------------------------------------------------------------------
+    # Lifecycle
+    # -------------------------------------------------------------------------
+
+    def create(
+        self,
+        plan: str,
+        main_branch: str | None = None,
+        use_pool: bool = False,
+        locked: bool = False,
+        sparse: list[str] | None = None,
+        share_caches: bool = True,
+    ) -> WorktreeMetadata:
+        """
+        Create (or return the existing) worktree for a plan.
+
+        Takes the plan lock, creates the worktree on the plan branch, records
+        metadata and writes active pointers for both branches.
+
+        Args:
+            plan: Plan path, file name or id.
+            main_branch: Base branch (default: the main project's current branch).
+            use_pool: Lease a pre-warmed slot from the WorktreePool.
+            locked: The caller already holds the plan lock
+                (e.g. from select_and_lock_pending()).
+            sparse: Directories for a cone-mode sparse checkout. None derives
+                them from the plan's Scope section; an empty list (or a plan
+                without a usable scope) checks out the full tree. Ignored for
+                pool slots, which are full checkouts.
+            share_caches: Hardlink node_modules from the main checkout
+                into the new worktree (top level and sparse directories).
+
+        Returns:
+            The plan's worktree metadata.
+        """
+        plan_path = self.find_plan(plan)
+        if plan_path is None:
+            raise WorktreeError(f"Plan not found: {plan}")
+
+        existing = self.get_metadata(plan_path.name)
+        if existing is not None and Path(existing.worktree_path).is_dir():
+            return existing
+
+        lock = self.lock_path_for(plan_path.name)
+        if not locked and self.acquire_lock(plan_path.name) is None:
+            raise WorktreeError(f"Plan is locked by another session: {lock}")
+
+        try:
+            main_branch = main_branch or self.current_branch()
+            branch = plan_to_branch(plan_path.name)
+            sparse_dirs: list[str] = []
+            if use_pool:
+                path = WorktreePool(self.main_project).lease(plan_path.name, branch=branch)
+            else:
+                if sparse is None:
+                    sparse = parse_scope_paths(
+                        plan_path.read_text(encoding="utf-8"), self.main_project
+                    )
+                sparse_dirs = sorted({p.strip("/") for p in sparse if p.strip("/")})
+                path = self.worktree_path_for(branch)
+                self._add_worktree(path, branch, main_branch, sparse_dirs)
+                if share_caches:
+                    self.share_caches(path, sparse_dirs)
+        except WorktreeError:
+            if not locked:
+                self.release_lock(plan_path.name)
+            raise
+
+        metadata = WorktreeMetadata(
+            branch=branch,
+            worktree_path=str(path.resolve()),
+            main_branch=main_branch,
+            main_project=str(self.main_project),
+            lock_file=str(lock),
+            created_at=time.strftime("%Y-%m-%dT%H:%M:%S"),
+            sparse_paths=" ".join(sparse_dirs),
+        )
+        self.set_metadata(plan_path, metadata)
+        self.set_active_pointers(plan_path, [main_branch, branch])
+        return metadata
+
+    def _add_worktree(self, path: Path, branch: str, main_branch: str, sparse: list[str]) -> None:
+        """Add the worktree; sparse checkouts populate only the cone directories."""
+        args = ["worktree", "add"]
+        if sparse:
+            args.append("--no-checkout")
+        if branch in self.local_branches():
+            args += [str(path), branch]
+        else:
+            args += ["-b", branch, str(path), main_branch]
+        run_git(args, self.main_project)
+        if sparse:
+            run_git(["sparse-checkout", "set", "--cone", "--", *sparse], path)
+            run_git(["read-tree", "-mu", "HEAD"], path)
+
+    def share_caches(self, worktree_path: Path, sparse: list[str] | None = None) -> list[str]:
+        """
+        Hardlink dependency caches from the main checkout into a worktree.
+
+        Directories containing a pyvenv.cfg are skipped even if listed in
+        config.WORKTREE_SHARED_CACHE_DIRS: a shared virtualenv would run the
+        main checkout's code.
+
+        Args:
+            worktree_path: Worktree directory.
+            sparse: Sparse directories whose own caches are shared as well.
+
+        Returns:
+            Cache directories shared (relative paths).
+        """
+        shared = []
+        for base in ["", *(sparse or [])]:
+            for name in config.WORKTREE_SHARED_CACHE_DIRS:
+                rel = f"{base}/{name}" if base else name
+                source = self.main_project / rel
+                dest = worktree_path / rel
+                if (
+                    source.is_dir()
+                    and not source.is_symlink()
+                    and not dest.exists()
+                    and not (source / "pyvenv.cfg").exists()
+                ):
+                    hardlink_tree(source, dest)
+                    shared.append(rel)
+        return shared
+
+    def cleanup(self, plan: str, delete_branch: bool = True) -> WorktreeMetadata | None:
+        """
+        Remove a plan's worktree (even when dirty), branch, lock and pointers.
+
+        Pool slots are recycled into the pool instead of being removed.
+
+        Args:
+            plan: Plan path, file name or id.
+            delete_branch: Delete the plan branch.
+
+        Returns:
+            The removed worktree's metadata, or None if the plan had none.
+        """
+        plan_name = Path(plan).name
+        plan_name = plan_name if plan_name.endswith(".md") else f"{plan_name}.md"
+        metadata = self.get_metadata(plan_name)
+        if metadata is None:
+            return None
+
+        pool = WorktreePool(self.main_project)
+        if pool.release(plan_name, delete_branch=delete_branch) is None:
+            path = Path(metadata.worktree_path)
+            if path.is_dir():
+                run_git(["worktree", "remove", "--force", str(path)], self.main_project, check=False)
+                if path.exists():
+                    shutil.rmtree(path, ignore_errors=True)
+            run_git(["worktree", "prune"], self.main_project, check=False)
+            if delete_branch and metadata.branch:
+                run_git(["branch", "-D", metadata.branch], self.main_project, check=False)
+
+        self.remove_metadata(plan_name)
+        self.release_lock(plan_name)
+        self.clear_active_pointers(plan_name)
+        return metadata
@@ -12,6 +12,17 @@ from unittest.mock import MagicMock, patch
 import pytest
 
 
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(
+    tmp_path_factory: pytest.TempPathFactory, monkeypatch: pytest.MonkeyPatch
+) -> Path:
+    """Point the per-user cache at a fresh directory; no background update checks."""
+    cache_dir = tmp_path_factory.mktemp("pilot-cache")
+    monkeypatch.setenv("CLAUDE_PILOT_CACHE_DIR", str(cache_dir))
+    monkeypatch.setenv("CLAUDE_PILOT_NO_UPDATE_CHECK", "1")
+    return cache_dir
+
+
 @pytest.fixture
 def mock_target_dir(tmp_path: Path) -> Path:
     """Create a mock target directory for testing."""
@@ -31,7 +42,7 @@ def mock_requests_get(monkeypatch: pytest.MonkeyPatch) -> None:
         }
         return mock_response
 
-    monkeypatch.setattr("requests.get", _mock_get)
+    monkeypatch.setattr("claude_pilot.network.get", _mock_get)
 
 
 @pytest.fixture
@@ -42,7 +53,7 @@ def mock_requests_timeout(monkeypatch: pytest.MonkeyPatch) -> None:
         import requests
         raise requests.exceptions.Timeout("PyPI request timed out")
 
-    monkeypatch.setattr("requests.get", _mock_get_timeout)
+    monkeypatch.setattr("claude_pilot.network.get", _mock_get_timeout)
 
 
 @pytest.fixture
@@ -53,7 +64,7 @@ def mock_requests_connection_error(monkeypatch: pytest.MonkeyPatch) -> None:
         import requests
         raise requests.exceptions.ConnectionError("Network unreachable")
 
-    monkeypatch.setattr("requests.get", _mock_get_error)
+    monkeypatch.setattr("claude_pilot.network.get", _mock_get_error)
 
 
 @pytest.fixture
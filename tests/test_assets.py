@@ -171,3 +171,48 @@ class TestAssetGeneration:
         # Check executable bit is preserved
         st = dest_script.stat()
         assert st.st_mode & stat.S_IXUSR
+
+
+class TestAssetHistory:
+    """Test the per-version asset history shipped for upgrades."""
+
+    def test_update_keeps_newest_versions(self) -> None:
+        """Versions are appended in order, rebuilt versions replaced, old ones trimmed."""
+        from claude_pilot.assets import update_asset_history
+
+        index = {".claude/a.md": {"sha256": "f" * 64, "size": 1}}
+        history: dict[str, dict[str, str]] = {}
+        for version in ("1.0", "1.1", "1.0", "1.2"):
+            history = update_asset_history(history, version, index, keep=2)
+
+        assert list(history) == ["1.0", "1.2"]
+        assert history["1.2"] == {".claude/a.md": "f" * 16}
+
+    def test_build_hook_reads_source_history(self, tmp_path: Path) -> None:
+        """The build ships source history plus this version without rewriting the source."""
+        import json
+
+        from claude_pilot import config
+        from claude_pilot.assets import ASSET_HISTORY_FILE, load_asset_history
+        from claude_pilot.build_hook import generate_packaged_assets, record_release_history
+
+        project_dir = tmp_path / "project"
+        (project_dir / ".claude" / "commands").mkdir(parents=True)
+        (project_dir / ".claude" / "commands" / "00_plan.md").write_text("# Plan")
+        source = project_dir / config.ASSET_HISTORY_SOURCE
+        checked_in = json.dumps({"version": 1, "versions": {"0.9": {".claude/old.md": "0" * 16}}})
+        source.write_text(checked_in)
+
+        assets_dir = tmp_path / "assets"
+        generate_packaged_assets(str(project_dir), str(assets_dir))
+
+        history = load_asset_history(assets_dir)
+        assert list(history) == ["0.9", config.VERSION]
+        assert ".claude/commands/00_plan.md" in history[config.VERSION]
+        assert ASSET_HISTORY_FILE not in str(history[config.VERSION])
+        assert source.read_text() == checked_in
+
+        # The release step records the version in the checked-in file
+        assert record_release_history(project_dir, "1.0") == source
+        assert list(json.loads(source.read_text())["versions"]) == ["0.9", "1.0"]
+        assert json.loads(source.read_text())["versions"]["1.0"] == history[config.VERSION]
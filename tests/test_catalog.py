@@ -0,0 +1,149 @@
+"""
+Tests for the compiled skills/agents/commands catalog.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from claude_pilot import config
+from claude_pilot.assets import ASSET_CATALOG_FILE, generate_assets
+from claude_pilot.catalog import (
+    build_catalog,
+    load_catalog,
+    load_shipped_catalog,
+    parse_frontmatter,
+    refresh_catalog,
+)
+from claude_pilot.context_profile import estimate_tokens
+
+TDD = (
+    "---\nname: tdd\ndescription: Red, green, refactor. Use when writing tests, "
+    "fixing bugs or adding features.\n---\n\n# TDD\n"
+)
+AGENT = "---\nname: coder\ndescription: >\n  Writes code\n  from a plan.\ntriggers:\n" \
+    "  - implement\n  - 'build feature'\nmodel: sonnet\n---\n\nYou write code.\n"
+
+
+@pytest.fixture
+def source(tmp_path: Path) -> Path:
+    """A source tree with a skill, an agent, commands and an external skill."""
+    files = {
+        ".claude/skills/tdd/SKILL.md": TDD,
+        ".claude/skills/tdd/REFERENCE.md": "# Reference\n",
+        ".claude/agents/coder.md": AGENT,
+        ".claude/agents/CONTEXT.md": "# Agents\n",
+        ".claude/commands/00_plan.md": "---\ndescription: Plan\n---\n\nMake a plan.\n",
+        ".claude/commands/999_publish.md": "---\ndescription: Publish\n---\n",
+        ".claude/skills/external/vercel/react/SKILL.md": "---\nname: react\n---\n",
+    }
+    root = tmp_path / "source"
+    for rel_path, content in files.items():
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    return root
+
+
+class TestParseFrontmatter:
+    """Test the frontmatter subset parser."""
+
+    def test_scalars_blocks_and_lists(self) -> None:
+        """Quoted scalars, folded blocks, inline and dash lists are parsed."""
+        meta = parse_frontmatter(AGENT)
+        assert meta["description"] == "Writes code from a plan."
+        assert meta["triggers"] == ["implement", "build feature"]
+        assert meta["model"] == "sonnet"
+        assert parse_frontmatter("---\ntools: [Read, 'Grep']\n---\n") == {
+            "tools": ["Read", "Grep"]
+        }
+        assert parse_frontmatter("# No frontmatter\n") == {}
+
+
+class TestBuildCatalog:
+    """Test build_catalog() and the build-time catalog."""
+
+    def test_entries(self, source: Path) -> None:
+        """Skills, agents and commands get name, description, triggers, tokens and path."""
+        entries = {e["path"]: e for e in build_catalog(source)}
+
+        assert set(entries) == {
+            ".claude/skills/tdd/SKILL.md",
+            ".claude/agents/coder.md",
+            ".claude/commands/00_plan.md",
+            ".claude/commands/999_publish.md",
+        }
+        tdd = entries[".claude/skills/tdd/SKILL.md"]
+        assert tdd["kind"] == "skill"
+        assert tdd["triggers"] == ["writing tests", "fixing bugs or adding features"]
+        assert tdd["tokens"] == estimate_tokens(TDD)
+        assert entries[".claude/agents/coder.md"]["triggers"] == ["implement", "build feature"]
+        assert entries[".claude/commands/00_plan.md"]["name"] == "00_plan"
+
+        external = build_catalog(source, external=True)
+        assert [e["name"] for e in external] == ["react"]
+
+    def test_generate_assets_compiles_catalog(self, source: Path, tmp_path: Path) -> None:
+        """The generated assets carry a catalog of the shipped files only."""
+        assets_dir = tmp_path / "assets"
+        generate_assets(source, assets_dir)
+
+        shipped = load_shipped_catalog(assets_dir)
+        assert shipped is not None
+        assert [e["path"] for e in shipped] == [
+            ".claude/skills/tdd/SKILL.md",
+            ".claude/agents/coder.md",
+            ".claude/commands/00_plan.md",
+        ]
+        assert not (assets_dir / ".claude" / ASSET_CATALOG_FILE).exists()
+
+
+class TestRefreshCatalog:
+    """Test refresh_catalog()."""
+
+    def test_compiles_installed_files(self, source: Path, tmp_path: Path) -> None:
+        """Installed, project-owned and external files end up in the project catalog."""
+        assets_dir = tmp_path / "assets"
+        generate_assets(source, assets_dir)
+        (source / ".claude/commands/00_plan.md").unlink()
+
+        assert refresh_catalog(source, assets_dir) is True
+        paths = [e["path"] for e in load_catalog(source)]
+        assert paths == [
+            ".claude/skills/tdd/SKILL.md",
+            ".claude/agents/coder.md",
+            ".claude/commands/999_publish.md",
+            ".claude/skills/external/vercel/react/SKILL.md",
+        ]
+        assert refresh_catalog(source, assets_dir) is False
+
+        data = json.loads((source / config.CATALOG_FILE).read_text())
+        assert data["version"] == 1
+
+    def test_local_edits_and_project_skills(self, source: Path, tmp_path: Path) -> None:
+        """Edited shipped files are recompiled; the project's own skills are listed."""
+        assets_dir = tmp_path / "assets"
+        generate_assets(source, assets_dir)
+        (source / ".claude/skills/tdd/SKILL.md").write_text(
+            TDD.replace("Red, green, refactor.", "Our TDD flow.")
+        )
+        mine = source / ".claude/skills/deploy/SKILL.md"
+        mine.parent.mkdir()
+        mine.write_text("---\nname: deploy\ndescription: Ship it\n---\n")
+
+        refresh_catalog(source, assets_dir)
+        entries = {e["name"]: e for e in load_catalog(source)}
+        assert entries["tdd"]["description"].startswith("Our TDD flow.")
+        assert entries["deploy"]["path"] == ".claude/skills/deploy/SKILL.md"
+        assert entries["coder"] == next(
+            e for e in load_shipped_catalog(assets_dir) or [] if e["name"] == "coder"
+        )
+
+    def test_without_shipped_catalog(self, source: Path, tmp_path: Path) -> None:
+        """Editable installs without a shipped catalog compile the project's files."""
+        assert refresh_catalog(source, tmp_path / "no-assets") is True
+        assert len(load_catalog(source)) == 5
+        assert load_catalog(tmp_path) == []
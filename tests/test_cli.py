@@ -7,6 +7,7 @@ from __future__ import annotations
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
+import pytest
 from click.testing import CliRunner
 
 from claude_pilot.cli import main
@@ -15,8 +16,11 @@ from claude_pilot.cli import main
 class TestUpdateCommand:
     """Test the update command with new options."""
 
-    def test_update_with_skip_pip_flag(self, mock_subprocess_run: MagicMock) -> None:
+    def test_update_with_skip_pip_flag(
+        self, mock_subprocess_run: MagicMock, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
         """Test that --skip-pip flag skips pip upgrade."""
+        monkeypatch.chdir(tmp_path)
         runner = CliRunner()
         with patch("claude_pilot.updater.get_pypi_version", return_value="2.1.5"):
             with patch("claude_pilot.updater.get_installed_version", return_value="2.1.4"):
@@ -50,7 +54,7 @@ class TestVersionCommand:
         """Test that version command shows version information."""
         runner = CliRunner()
         with patch("claude_pilot.cli.get_current_version", return_value="2.1.4"):
-            with patch("claude_pilot.cli.get_latest_version", return_value="2.1.5"):
+            with patch("claude_pilot.cli.get_cached_latest_version", return_value="2.1.5"):
                 result = runner.invoke(main, ["version"])
                 assert result.exit_code == 0
                 assert "claude-pilot version information" in result.output
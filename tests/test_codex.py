@@ -7,11 +7,24 @@ and availability for GPT expert delegation via codex exec.
 
 from __future__ import annotations
 
+import json
+import os
+import subprocess
+import time
 from pathlib import Path
 
 import pytest
+from click.testing import CliRunner
 
-from claude_pilot.codex import check_codex_auth, detect_codex_cli, is_codex_available
+from claude_pilot.cli import main
+from claude_pilot.codex import (
+    CodexBroker,
+    DelegationCache,
+    DelegationRequest,
+    check_codex_auth,
+    detect_codex_cli,
+    is_codex_available,
+)
 
 
 class TestDetectCodexCli:
@@ -234,3 +247,239 @@ class TestDelegatorTemplates:
         for prompt_file in expected_prompts:
             prompt_path = prompts_path / prompt_file
             assert prompt_path.is_file(), f"Prompt file {prompt_file} not found"
+
+
+FAKE_CODEX = """#!/usr/bin/env python3
+import json, sys, time
+prompt = sys.stdin.read()
+time.sleep(float(__import__("os").environ.get("FAKE_CODEX_SLEEP", "0")))
+if "FAIL" in prompt:
+    sys.stderr.write("boom\\n")
+    sys.exit(2)
+print(json.dumps({"argv": sys.argv[1:], "prompt": prompt}))
+"""
+
+
+@pytest.fixture
+def fake_codex(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Put a fake `codex` executable first on PATH."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    script = bin_dir / "codex"
+    script.write_text(FAKE_CODEX)
+    script.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.delenv("CODEX_MODEL", raising=False)
+    monkeypatch.delenv("CODEX_TIMEOUT", raising=False)
+    monkeypatch.chdir(tmp_path)
+    return script
+
+
+class TestCodexBroker:
+    """Test concurrent delegation through CodexBroker."""
+
+    def test_prompt_command_and_latency(self, tmp_path: Path, fake_codex: Path) -> None:
+        """The expert prompt file and task go to codex on stdin with mode and model flags."""
+        prompts = tmp_path / ".claude" / "rules" / "delegator" / "prompts"
+        prompts.mkdir(parents=True)
+        (prompts / "architect.md").write_text("You are a software architect.\n")
+
+        with CodexBroker(tmp_path) as broker:
+            result = broker.run_all([DelegationRequest("architect", "Review the design")])[0]
+
+        payload = json.loads(result.output)
+        assert result.ok
+        assert payload["prompt"] == "You are a software architect.\n\nReview the design\n"
+        assert payload["argv"] == [
+            "exec", "--sandbox", "read-only", "--model", "gpt-5.2", "--skip-git-repo-check", "-",
+        ]
+        assert result.latency > 0
+        assert result.to_dict()["expert"] == "architect"
+
+    def test_requests_run_concurrently_up_to_limit(
+        self, tmp_path: Path, fake_codex: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Three requests with three workers overlap; with one worker they queue."""
+        monkeypatch.setenv("FAKE_CODEX_SLEEP", "0.5")
+        requests = [DelegationRequest(e, "task") for e in ("a", "b", "c")]
+
+        started = time.monotonic()
+        with CodexBroker(tmp_path, max_workers=3) as broker:
+            results = broker.run_all(requests)
+        assert time.monotonic() - started < 1.4
+        assert [r.request.expert for r in results] == ["a", "b", "c"]
+
+        with CodexBroker(tmp_path, max_workers=1) as broker:
+            queued = broker.run_all(requests)
+        assert max(r.queue_wait for r in queued) >= 0.9
+
+    def test_failures_and_timeouts_are_reported(
+        self, tmp_path: Path, fake_codex: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Non-zero exits and timeouts become failed results, not exceptions."""
+        with CodexBroker(tmp_path) as broker:
+            failed = broker.submit(DelegationRequest("x", "FAIL")).result()
+            monkeypatch.setenv("FAKE_CODEX_SLEEP", "2")
+            slow = broker.submit(DelegationRequest("x", "slow", timeout=0.3)).result()
+
+        assert not failed.ok and failed.returncode == 2 and failed.error == "boom"
+        assert not slow.ok and "Timed out" in (slow.error or "")
+
+    def test_invalid_mode_rejected(self) -> None:
+        """Only codex sandbox modes are accepted."""
+        with pytest.raises(ValueError):
+            DelegationRequest("architect", "task", mode="danger")
+
+
+class TestDelegationCache:
+    """Test the delegation result cache."""
+
+    def test_key_ignores_cosmetic_task_differences(self) -> None:
+        """Whitespace/line-ending noise shares a key; template and model do not."""
+        key = DelegationCache.make_key("tpl", "gpt-5.2", "diff\n+x  \n")
+        assert key == DelegationCache.make_key("tpl", "gpt-5.2", "\r\ndiff\r\n+x\n\n")
+        assert key != DelegationCache.make_key("tpl2", "gpt-5.2", "diff\n+x")
+        assert key != DelegationCache.make_key("tpl", "other", "diff\n+x")
+
+    def test_ttl_expiry(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Entries older than the TTL are misses and are removed."""
+        cache = DelegationCache(tmp_path, ttl=60)
+        cache.put("k", "out")
+        assert cache.get("k") == "out"
+
+        real_time = time.time
+        monkeypatch.setattr("time.time", lambda: real_time() + 120)
+        assert cache.get("k") is None
+        assert not (tmp_path / "k.json").exists()
+
+    def test_size_eviction_is_lru(self, tmp_path: Path) -> None:
+        """Over the size cap, least-recently-used entries go first."""
+        base = time.time() - 100
+        for i, key in enumerate(("a", "b", "c")):
+            DelegationCache(tmp_path).put(key, "x" * 4000)
+            os.utime(tmp_path / f"{key}.json", (base + i, base + i))
+        cache = DelegationCache(tmp_path, max_bytes=10_000)
+        cache.get("a")
+        cache.put("d", "x" * 4000)
+
+        assert sorted(p.stem for p in tmp_path.glob("*.json")) == ["a", "d"]
+
+    def test_broker_serves_repeats_from_cache(
+        self, tmp_path: Path, fake_codex: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Repeat read-only delegations skip codex; workspace-write never caches."""
+        cache = DelegationCache(tmp_path / "cache")
+        with CodexBroker(tmp_path, cache=cache) as broker:
+            first = broker.submit(DelegationRequest("architect", "same diff")).result()
+            fake_codex.write_text("#!/bin/sh\nexit 3\n")
+            second = broker.submit(DelegationRequest("architect", "same diff  \n")).result()
+            write = broker.submit(
+                DelegationRequest("architect", "same diff", mode="workspace-write")
+            ).result()
+
+        assert first.ok and not first.cached
+        assert second.cached and second.output == first.output
+        assert not write.ok
+
+    def test_key_follows_the_working_tree(self, tmp_path: Path) -> None:
+        """Committing, editing or adding files after a review invalidates its cache entry."""
+        def git(*args: str) -> None:
+            subprocess.run(
+                ["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+                cwd=tmp_path, check=True, capture_output=True,
+            )
+
+        git("init", "-q")
+        (tmp_path / "app.py").write_text("x = 1\n")
+        git("add", "app.py")
+        git("commit", "-q", "-m", "init")
+        request = DelegationRequest("architect", "review")
+        with CodexBroker(tmp_path, cache=DelegationCache(tmp_path / ".git" / "cache")) as broker:
+            keys = [broker._cache_key(request)]
+            (tmp_path / "app.py").write_text("x = 2\n")
+            keys.append(broker._cache_key(request))
+            (tmp_path / "new.py").write_text("y = 1\n")
+            keys.append(broker._cache_key(request))
+            git("commit", "-q", "-am", "edit")
+            keys.append(broker._cache_key(request))
+            keys.append(broker._cache_key(request))
+
+        assert len(set(keys[:4])) == 4
+        assert keys[4] == keys[3]
+
+    def test_leader_error_reaches_followers(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """A coalesced request fails with the leader's exception instead of hanging."""
+
+        def _boom(self: CodexBroker, *args: object) -> None:
+            time.sleep(0.2)
+            raise RuntimeError("broker bug")
+
+        monkeypatch.setattr(CodexBroker, "_run", _boom)
+        with CodexBroker(tmp_path, cache=DelegationCache(tmp_path / "cache")) as broker:
+            leader = broker.submit(DelegationRequest("architect", "q"))
+            follower = broker.submit(DelegationRequest("architect", "q"))
+            with pytest.raises(RuntimeError, match="broker bug"):
+                follower.result(timeout=5)
+            with pytest.raises(RuntimeError):
+                leader.result()
+
+    def test_identical_inflight_requests_coalesce(
+        self, tmp_path: Path, fake_codex: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Concurrent identical requests start a single codex process."""
+        monkeypatch.setenv("FAKE_CODEX_SLEEP", "0.3")
+        counter = tmp_path / "calls"
+        fake_codex.write_text(
+            FAKE_CODEX.replace("prompt = sys.stdin.read()",
+                               f"prompt = sys.stdin.read(); open({str(counter)!r}, 'a').write('x')")
+        )
+        with CodexBroker(tmp_path, cache=DelegationCache(tmp_path / "cache")) as broker:
+            results = broker.run_all([DelegationRequest("scope-analyst", "q")] * 3)
+
+        assert counter.read_text() == "x"
+        assert [r.cached for r in results] == [False, True, True]
+
+    def test_batch_fingerprints_the_workspace_once(
+        self, tmp_path: Path, fake_codex: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """run_all() takes one git fingerprint for all its cacheable requests."""
+        calls: list[Path] = []
+
+        def _state(target_dir: Path) -> str:
+            calls.append(target_dir)
+            return "tree-1"
+
+        monkeypatch.setattr("claude_pilot.codex.workspace_state", _state)
+        requests = [DelegationRequest(expert, "q") for expert in ("architect", "x", "y")]
+        with CodexBroker(tmp_path, cache=DelegationCache(tmp_path / "cache")) as broker:
+            broker.run_all(requests)
+            assert len(calls) == 1
+            broker.run_all([DelegationRequest("x", "w", mode="workspace-write")])
+            assert len(calls) == 1
+            assert broker.run_all(requests[:1])[0].cached
+
+
+class TestDelegateCommand:
+    """Test the `delegate` CLI command."""
+
+    def test_delegate_json(self, tmp_path: Path, fake_codex: Path) -> None:
+        """`delegate --json` runs each expert and reports latency."""
+        runner = CliRunner()
+        result = runner.invoke(
+            main,
+            ["delegate", "Check auth", "-e", "architect", "-e", "security-analyst",
+             "--model", "test-model", "--json"],
+        )
+
+        assert result.exit_code == 0, result.output
+        results = json.loads(result.output)
+        assert [r["expert"] for r in results] == ["architect", "security-analyst"]
+        assert all(r["ok"] and r["latency"] >= 0 for r in results)
+        assert "test-model" in json.loads(results[0]["output"])["argv"]
+
+    def test_delegate_requires_expert(self, fake_codex: Path) -> None:
+        """A task without --expert is a usage error."""
+        result = CliRunner().invoke(main, ["delegate", "Check auth"])
+        assert result.exit_code == 2
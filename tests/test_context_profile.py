@@ -0,0 +1,144 @@
+"""
+Tests for the context token-budget profiler.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from claude_pilot.cli import main
+from claude_pilot.context_profile import (
+    ON_DEMAND,
+    STARTUP,
+    estimate_tokens,
+    profile_context,
+    split_frontmatter,
+)
+
+SKILL = "---\nname: tdd\ndescription: Red, green, refactor.\n---\n\n# TDD\n\n" + "Write tests. " * 50
+
+
+@pytest.fixture
+def project(tmp_path: Path) -> Path:
+    """A project with memory files, rules, skills, agents and CONTEXT.md tiers."""
+    files = {
+        "CLAUDE.md": "# Project\n\nSee @docs/standards.md for details.\n",
+        "docs/standards.md": "# Standards\n\nUse ruff.\n",
+        ".claude/rules/core/workflow.md": "# Workflow\n\nPlan first.\n",
+        ".claude/rules/python.md": "---\npaths:\n  - '**/*.py'\n---\n\n# Python\n",
+        ".claude/skills/tdd/SKILL.md": SKILL,
+        ".claude/skills/tdd/REFERENCE.md": "# Reference\n",
+        ".claude/skills/CONTEXT.md": "# Skills\n> Tier: 2\n",
+        ".claude/agents/coder.md": "---\nname: coder\n---\n\nYou write code.\n",
+        ".claude/commands/00_plan.md": "---\ndescription: Plan\n---\n\nMake a plan.\n",
+        "src/app/CONTEXT.md": "# App\n",
+        "src/app/feature/deep/CONTEXT.md": "# Feature\n",
+        "node_modules/pkg/CONTEXT.md": "# Ignored\n",
+        ".claude/local/CONTEXT.md": "# Ignored\n",
+    }
+    for rel_path, content in files.items():
+        path = tmp_path / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    return tmp_path
+
+
+class TestEstimate:
+    """Test the tokenizer approximation."""
+
+    def test_estimate_tokens(self) -> None:
+        """Words, long words, digit groups and punctuation runs are counted."""
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("Hello, world!") == 4
+        assert estimate_tokens("internationalization") == 3
+        assert estimate_tokens("1234567") == 3
+        assert estimate_tokens("---") == 1
+
+    def test_split_frontmatter(self) -> None:
+        """Frontmatter is split off; documents without it are all body."""
+        assert split_frontmatter("---\na: 1\n---\nbody\n") == ("a: 1", "body\n")
+        assert split_frontmatter("# Title\n") == ("", "# Title\n")
+
+
+class TestProfileContext:
+    """Test profile_context()."""
+
+    def test_categories_and_load(self, project: Path) -> None:
+        """Files are classified and split into session-start and on-demand tokens."""
+        files = {f.path: f for f in profile_context(project).files}
+
+        assert set(files) == {
+            "CLAUDE.md",
+            "docs/standards.md",
+            ".claude/rules/core/workflow.md",
+            ".claude/rules/python.md",
+            ".claude/skills/tdd/SKILL.md",
+            ".claude/skills/tdd/REFERENCE.md",
+            ".claude/skills/CONTEXT.md",
+            ".claude/agents/coder.md",
+            ".claude/commands/00_plan.md",
+            "src/app/CONTEXT.md",
+            "src/app/feature/deep/CONTEXT.md",
+        }
+        assert files["docs/standards.md"].category == "import"
+        assert files["docs/standards.md"].load == STARTUP
+        assert files[".claude/rules/core/workflow.md"].load == STARTUP
+        assert files[".claude/rules/python.md"].load == ON_DEMAND
+        assert files[".claude/skills/CONTEXT.md"].category == "tier2"
+        assert files["src/app/feature/deep/CONTEXT.md"].category == "tier3"
+
+        skill = files[".claude/skills/tdd/SKILL.md"]
+        assert 0 < skill.startup_tokens < skill.tokens
+        assert skill.startup_tokens == estimate_tokens(split_frontmatter(SKILL)[0])
+
+    def test_budgets_and_totals(self, project: Path) -> None:
+        """Files over their category budget and an oversized session start are flagged."""
+        profile = profile_context(project, budgets={"skill": 50}, startup_budget=10_000)
+        assert [f.path for f in profile.over_budget] == [".claude/skills/tdd/SKILL.md"]
+        assert profile.files[0].path == ".claude/skills/tdd/SKILL.md"
+        assert not profile.ok
+
+        totals = profile.by_category()
+        assert totals["tier1"]["files"] == 1
+        assert sum(t["tokens"] for t in totals.values()) == (
+            profile.startup_tokens + profile.on_demand_tokens
+        )
+
+        assert profile_context(project, budgets={}, startup_budget=1).ok is False
+        assert profile_context(project, budgets={}).ok
+
+    def test_symlinks_outside_the_project(
+        self, project: Path, tmp_path_factory: pytest.TempPathFactory
+    ) -> None:
+        """Rules linked from a shared dotfiles directory are reported at their project path."""
+        shared = tmp_path_factory.mktemp("dotfiles") / "shared.md"
+        shared.write_text("# Shared rule\n")
+        (project / ".claude/rules/shared.md").symlink_to(shared)
+        (project / ".claude/rules/alias.md").symlink_to(shared)
+
+        paths = [f.path for f in profile_context(project).files]
+        assert ".claude/rules/alias.md" in paths
+        assert ".claude/rules/shared.md" not in paths
+
+
+class TestContextCommand:
+    """Test `claude-pilot context profile`."""
+
+    def test_json_and_strict(self, project: Path) -> None:
+        """--json prints the profile; --strict exits 1 when over budget."""
+        runner = CliRunner()
+        args = ["context", "--target-dir", str(project), "profile"]
+
+        result = runner.invoke(main, [*args, "--json"])
+        assert result.exit_code == 0
+        data = json.loads(result.output)
+        assert data["ok"] is True
+        assert data["startup_tokens"] > 0
+
+        result = runner.invoke(main, [*args, "--strict", "--startup-budget", "1"])
+        assert result.exit_code == 1
+        assert "Session start:" in result.output
@@ -0,0 +1,175 @@
+"""
+Tests for the import graph used by changed-file-scoped hooks.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from claude_pilot import config
+from claude_pilot.cli import main
+from claude_pilot.depgraph import ImportGraph, affected_files, read_hook_file_path
+
+
+def _write(root: Path, rel: str, content: str) -> Path:
+    path = root / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+    return path
+
+
+def _bump(path: Path) -> None:
+    """Advance mtime so size/mtime validation sees the edit."""
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+class TestPythonImports:
+    """Test Python import resolution and reverse dependencies."""
+
+    def test_reverse_dependencies_src_layout(self, tmp_path: Path) -> None:
+        """Absolute imports under src/ and relative imports both resolve."""
+        _write(tmp_path, "src/pkg/__init__.py", "")
+        _write(tmp_path, "src/pkg/core.py", "X = 1\n")
+        _write(tmp_path, "src/pkg/service.py", "from pkg.core import X\n")
+        _write(tmp_path, "src/pkg/api.py", "from . import service\n")
+        _write(tmp_path, "src/pkg/unrelated.py", "import os\n")
+        _write(tmp_path, "tests/test_api.py", "import pkg.api\n")
+
+        result = affected_files(tmp_path, "src/pkg/core.py")
+
+        assert result[0] == "src/pkg/core.py"
+        assert set(result[1:]) == {
+            "src/pkg/service.py",
+            "src/pkg/api.py",
+            "tests/test_api.py",
+        }
+
+    def test_cache_persisted_under_claude_local(self, tmp_path: Path) -> None:
+        """The graph is written to .claude/local/import-graph.json."""
+        _write(tmp_path, "a.py", "import b\n")
+        _write(tmp_path, "b.py", "")
+
+        affected_files(tmp_path, "b.py")
+
+        cache = tmp_path / config.IMPORT_GRAPH_FILE
+        data = json.loads(cache.read_text())
+        assert data["files"]["a.py"]["imports"] == ["b.py"]
+        assert data["dependents"]["b.py"] == ["a.py"]
+
+    def test_edit_updates_edges_incrementally(self, tmp_path: Path) -> None:
+        """Removing an import drops the reverse edge on the next query."""
+        _write(tmp_path, "a.py", "import b\n")
+        b = _write(tmp_path, "b.py", "")
+        assert affected_files(tmp_path, "b.py") == ["b.py", "a.py"]
+
+        a = _write(tmp_path, "a.py", "import os\n")
+        _bump(a)
+        _bump(b)
+
+        assert affected_files(tmp_path, "a.py") == ["a.py"]
+        assert affected_files(tmp_path, "b.py") == ["b.py"]
+
+    def test_new_file_added_without_rebuild(self, tmp_path: Path) -> None:
+        """A file created after the initial build is indexed on first edit."""
+        _write(tmp_path, "b.py", "")
+        affected_files(tmp_path, "b.py")
+
+        _write(tmp_path, "c.py", "import b\n")
+        assert affected_files(tmp_path, "c.py") == ["c.py"]
+        assert affected_files(tmp_path, "b.py") == ["b.py", "c.py"]
+
+    def test_module_created_after_its_importer(self, tmp_path: Path) -> None:
+        """Imports that did not resolve are re-resolved when the module appears or goes."""
+        _write(tmp_path, "pkg/__init__.py", "")
+        _write(tmp_path, "pkg/a.py", "import pkg.b\n")
+        _write(tmp_path, "web/app.ts", "import { b } from './b';\n")
+        assert affected_files(tmp_path, "pkg/a.py") == ["pkg/a.py"]
+
+        _write(tmp_path, "pkg/b.py", "")
+        assert affected_files(tmp_path, "pkg/b.py") == ["pkg/b.py", "pkg/a.py"]
+        _write(tmp_path, "web/b.ts", "")
+        assert affected_files(tmp_path, "web/b.ts") == ["web/b.ts", "web/app.ts"]
+
+        (tmp_path / "pkg/b.py").unlink()
+        affected_files(tmp_path, "pkg/b.py")
+        assert affected_files(tmp_path, "pkg/__init__.py") == ["pkg/__init__.py", "pkg/a.py"]
+        _write(tmp_path, "pkg/b.py", "")
+        assert affected_files(tmp_path, "pkg/b.py") == ["pkg/b.py", "pkg/a.py"]
+
+
+class TestScriptImports:
+    """Test TypeScript/JavaScript import resolution."""
+
+    def test_relative_imports_with_index_and_extension(self, tmp_path: Path) -> None:
+        """Relative specifiers resolve to .ts files and index modules."""
+        _write(tmp_path, "src/util/index.ts", "export const x = 1;\n")
+        _write(tmp_path, "src/model.ts", "import { x } from './util';\n")
+        _write(tmp_path, "src/view.tsx", "import { M } from './model.js';\n")
+        _write(tmp_path, "src/lazy.js", "const v = require('./view');\n")
+        _write(tmp_path, "src/other.ts", "import React from 'react';\n")
+
+        graph = ImportGraph(tmp_path)
+        graph.build()
+
+        assert graph.affected_files("src/util/index.ts") == [
+            "src/util/index.ts",
+            "src/lazy.js",
+            "src/model.ts",
+            "src/view.tsx",
+        ]
+
+    def test_skip_dirs_are_not_indexed(self, tmp_path: Path) -> None:
+        """node_modules and hidden directories are never scanned."""
+        _write(tmp_path, "node_modules/lib/index.js", "")
+        _write(tmp_path, ".venv/x.py", "")
+        _write(tmp_path, "main.ts", "")
+
+        graph = ImportGraph(tmp_path)
+        assert graph.iter_source_files() == ["main.ts"]
+
+
+class TestHookInput:
+    """Test hook payload handling and the scope command."""
+
+    def test_read_hook_file_path(self) -> None:
+        """file_path is read from tool_input."""
+        payload = {"tool_name": "Edit", "tool_input": {"file_path": "/p/a.py"}}
+        assert read_hook_file_path(payload) == "/p/a.py"
+        assert read_hook_file_path({"tool_input": {"command": "ls"}}) is None
+
+    def test_scope_command_reads_hook_json(self, tmp_path: Path) -> None:
+        """`scope --hook-input` prints the edited file and its dependents."""
+        _write(tmp_path, "a.py", "import b\n")
+        _write(tmp_path, "b.py", "")
+        _write(tmp_path, "c.ts", "")
+        payload = {
+            "cwd": str(tmp_path),
+            "tool_input": {"file_path": str(tmp_path / "b.py")},
+        }
+
+        runner = CliRunner()
+        result = runner.invoke(
+            main,
+            ["scope", "--hook-input", "--suffix", ".py"],
+            input=json.dumps(payload),
+        )
+
+        assert result.exit_code == 0
+        assert result.output.splitlines() == ["b.py", "a.py"]
+
+    def test_scope_command_non_source_file_prints_nothing(self, tmp_path: Path) -> None:
+        """Edits to files outside the graph produce no output."""
+        _write(tmp_path, "README.md", "# hi\n")
+
+        runner = CliRunner()
+        result = runner.invoke(
+            main, ["scope", "README.md", "--target-dir", str(tmp_path), "--json"]
+        )
+
+        assert result.exit_code == 0
+        assert json.loads(result.output) == []
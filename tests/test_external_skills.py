@@ -35,7 +35,7 @@ class TestGetGithubLatestSha:
             mock_response.raise_for_status = MagicMock()
             return mock_response
 
-        monkeypatch.setattr("requests.get", _mock_get)
+        monkeypatch.setattr("claude_pilot.network.get", _mock_get)
 
         result = get_github_latest_sha("vercel-labs/agent-skills", "main")
         assert result == "abc123def456"
@@ -47,7 +47,7 @@ class TestGetGithubLatestSha:
             import requests
             raise requests.exceptions.Timeout("Request timed out")
 
-        monkeypatch.setattr("requests.get", _mock_get_timeout)
+        monkeypatch.setattr("claude_pilot.network.get", _mock_get_timeout)
 
         result = get_github_latest_sha("vercel-labs/agent-skills", "main")
         assert result is None
@@ -61,7 +61,7 @@ class TestGetGithubLatestSha:
             import requests
             raise requests.exceptions.ConnectionError("Network unreachable")
 
-        monkeypatch.setattr("requests.get", _mock_get_error)
+        monkeypatch.setattr("claude_pilot.network.get", _mock_get_error)
 
         result = get_github_latest_sha("vercel-labs/agent-skills", "main")
         assert result is None
@@ -77,7 +77,7 @@ class TestGetGithubLatestSha:
             )
             return mock_response
 
-        monkeypatch.setattr("requests.get", _mock_get_http_error)
+        monkeypatch.setattr("claude_pilot.network.get", _mock_get_http_error)
 
         result = get_github_latest_sha("vercel-labs/agent-skills", "main")
         assert result is None
@@ -96,7 +96,7 @@ class TestGetGithubLatestSha:
             )
             return mock_response
 
-        monkeypatch.setattr("requests.get", _mock_get_rate_limit)
+        monkeypatch.setattr("claude_pilot.network.get", _mock_get_rate_limit)
 
         result = get_github_latest_sha("vercel-labs/agent-skills", "main")
         assert result is None
@@ -113,7 +113,7 @@ class TestGetGithubLatestSha:
             mock_response.raise_for_status = MagicMock()
             return mock_response
 
-        monkeypatch.setattr("requests.get", _mock_get_invalid)
+        monkeypatch.setattr("claude_pilot.network.get", _mock_get_invalid)
 
         result = get_github_latest_sha("vercel-labs/agent-skills", "main")
         assert result is None
@@ -130,7 +130,7 @@ class TestGetGithubLatestSha:
             mock_response.raise_for_status = MagicMock()
             return mock_response
 
-        monkeypatch.setattr("requests.get", _mock_get_list)
+        monkeypatch.setattr("claude_pilot.network.get", _mock_get_list)
 
         result = get_github_latest_sha("vercel-labs/agent-skills", "main")
         assert result is None
@@ -151,7 +151,7 @@ class TestDownloadGithubTarball:
             mock_response.iter_content = MagicMock(return_value=[b"fake tarball content"])
             return mock_response
 
-        monkeypatch.setattr("requests.get", _mock_get)
+        monkeypatch.setattr("claude_pilot.network.get", _mock_get)
 
         result = download_github_tarball("vercel-labs/agent-skills", "abc123", tmp_path)
         assert result is True
@@ -169,7 +169,7 @@ class TestDownloadGithubTarball:
             import requests
             raise requests.exceptions.ConnectionError("Network unreachable")
 
-        monkeypatch.setattr("requests.get", _mock_get_error)
+        monkeypatch.setattr("claude_pilot.network.get", _mock_get_error)
 
         result = download_github_tarball("vercel-labs/agent-skills", "abc123", tmp_path)
         assert result is False
@@ -183,7 +183,7 @@ class TestDownloadGithubTarball:
             import requests
             raise requests.exceptions.Timeout("Download timed out")
 
-        monkeypatch.setattr("requests.get", _mock_get_timeout)
+        monkeypatch.setattr("claude_pilot.network.get", _mock_get_timeout)
 
         result = download_github_tarball("vercel-labs/agent-skills", "abc123", tmp_path)
         assert result is False
@@ -355,7 +355,7 @@ class TestSyncExternalSkills:
 
             return True
 
-        monkeypatch.setattr("requests.get", _mock_get_sha)
+        monkeypatch.setattr("claude_pilot.network.get", _mock_get_sha)
         monkeypatch.setattr("claude_pilot.updater.download_github_tarball", _mock_download)
 
         result = sync_external_skills(tmp_path, skip=False)
@@ -384,7 +384,7 @@ class TestSyncExternalSkills:
             mock_response.raise_for_status = MagicMock()
             return mock_response
 
-        monkeypatch.setattr("requests.get", _mock_get_sha)
+        monkeypatch.setattr("claude_pilot.network.get", _mock_get_sha)
 
         result = sync_external_skills(tmp_path, skip=False)
         assert result == "already_current"
@@ -398,7 +398,7 @@ class TestSyncExternalSkills:
             import requests
             raise requests.exceptions.ConnectionError("Network unreachable")
 
-        monkeypatch.setattr("requests.get", _mock_get_error)
+        monkeypatch.setattr("claude_pilot.network.get", _mock_get_error)
 
         result = sync_external_skills(tmp_path, skip=False)
         assert result == "failed"
@@ -420,7 +420,7 @@ class TestSyncExternalSkills:
         def _mock_download_fail(repo: str, ref: str, dest: Path) -> bool:
             return False
 
-        monkeypatch.setattr("requests.get", _mock_get_sha)
+        monkeypatch.setattr("claude_pilot.network.get", _mock_get_sha)
         monkeypatch.setattr("claude_pilot.updater.download_github_tarball", _mock_download_fail)
 
         result = sync_external_skills(tmp_path, skip=False)
@@ -457,7 +457,7 @@ class TestSyncExternalSkills:
 
             return True
 
-        monkeypatch.setattr("requests.get", _mock_get_sha)
+        monkeypatch.setattr("claude_pilot.network.get", _mock_get_sha)
         monkeypatch.setattr("claude_pilot.updater.download_github_tarball", _mock_download)
 
         sync_external_skills(tmp_path, skip=False)
@@ -0,0 +1,205 @@
+"""
+Tests for three-way merge of managed files.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+
+import pytest
+
+from claude_pilot import config
+from claude_pilot.assets import ASSET_HISTORY_DIGEST_LEN
+from claude_pilot.merge import (
+    CONFLICT_START,
+    BaseStore,
+    MergeReport,
+    merge3,
+    merge_file,
+)
+from claude_pilot.updater import (
+    MergeStrategy,
+    UpdateStatus,
+    copy_templates_from_package,
+    perform_merge_update,
+)
+
+BASE = "# Plan\n\nStep one\nStep two\nStep three\n"
+
+
+class TestMerge3:
+    """Test the line-based diff3 merge."""
+
+    def test_non_overlapping_edits_merge_cleanly(self) -> None:
+        """A local edit and an upstream edit in different places both survive."""
+        local = BASE.replace("Step one", "Step one (ours)")
+        theirs = BASE.replace("Step three", "Step three (new)")
+
+        merged, conflicts = merge3(BASE, local, theirs)
+        assert conflicts == 0
+        assert merged == "# Plan\n\nStep one (ours)\nStep two\nStep three (new)\n"
+
+    def test_one_sided_changes(self) -> None:
+        """Changes on only one side are taken as-is."""
+        changed = BASE + "Step four\n"
+        assert merge3(BASE, BASE, changed) == (changed, 0)
+        assert merge3(BASE, changed, BASE) == (changed, 0)
+        assert merge3(BASE, changed, changed) == (changed, 0)
+
+    def test_overlapping_edits_conflict(self) -> None:
+        """The same line edited differently produces one conflict hunk."""
+        local = BASE.replace("Step two", "Step 2 (ours)")
+        theirs = BASE.replace("Step two", "Step 2 (theirs)")
+
+        merged, conflicts = merge3(BASE, local, theirs)
+        assert conflicts == 1
+        assert merged.startswith("# Plan\n\nStep one\n<<<<<<< local\nStep 2 (ours)\n")
+        assert "||||||| base\nStep two\n=======\nStep 2 (theirs)\n>>>>>>> claude-pilot" in merged
+        assert merged.endswith("Step three\n")
+
+    def test_missing_final_newline(self) -> None:
+        """Files without a trailing newline stay that way."""
+        merged, conflicts = merge3("a\nb", "a\nb\nc", "z\nb")
+        assert (merged, conflicts) == ("z\nb\nc", 0)
+
+
+class TestBaseStore:
+    """Test the content-addressed base store."""
+
+    def test_roundtrip_and_prune(self, tmp_path: Path) -> None:
+        """Bases persist across instances; replaced objects are pruned."""
+        store = BaseStore(tmp_path)
+        store.record("a.md", b"one")
+        store.record("b.md", b"one")
+        store.save()
+        assert BaseStore(tmp_path).get("a.md") == b"one"
+        assert len(list((store.root / "objects").glob("*/*"))) == 1
+
+        store.record("a.md", b"two")
+        store.record("b.md", b"two")
+        store.save()
+        assert BaseStore(tmp_path).get("b.md") == b"two"
+        assert len(list((store.root / "objects").glob("*/*"))) == 1
+        assert BaseStore(tmp_path).get("missing.md") is None
+
+
+class TestMergeFile:
+    """Test per-file merge outcomes."""
+
+    @pytest.fixture
+    def store(self, tmp_path: Path) -> BaseStore:
+        store = BaseStore(tmp_path)
+        store.record("f.md", BASE.encode())
+        return store
+
+    def test_outcomes(self, tmp_path: Path, store: BaseStore) -> None:
+        """Added, fast-forwarded, kept, merged and conflicting files are reported."""
+        report = MergeReport()
+        new = (BASE + "Step four\n").encode()
+
+        merge_file(tmp_path / "new.md", "new.md", b"x\n", store, report)
+        (tmp_path / "f.md").write_text(BASE)
+        merge_file(tmp_path / "f.md", "f.md", new, store, report)
+        assert report.added == ["new.md"]
+        assert report.updated == ["f.md"]
+        assert (tmp_path / "f.md").read_bytes() == new
+
+        (tmp_path / "f.md").write_text(BASE.replace("# Plan", "# My plan") + "Step four\n")
+        merge_file(tmp_path / "f.md", "f.md", new, store, report)
+        assert report.kept == ["f.md"]
+
+        merge_file(tmp_path / "f.md", "f.md", new + b"Step five\n", store, report)
+        assert report.merged == ["f.md"]
+        assert (tmp_path / "f.md").read_text().startswith("# My plan\n")
+        assert (tmp_path / "f.md").read_text().endswith("Step four\nStep five\n")
+
+        (tmp_path / "f.md").write_text("# Rewritten\n")
+        merge_file(tmp_path / "f.md", "f.md", b"# Upstream\n", store, report)
+        assert report.conflicts == ["f.md"]
+        assert CONFLICT_START in (tmp_path / "f.md").read_text()
+        assert store.get("f.md") == b"# Upstream\n"
+
+    def test_no_base_uses_shipped_digests(self, tmp_path: Path) -> None:
+        """Without a base, shipped content is fast-forwarded and edits are left alone."""
+        store = BaseStore(tmp_path)
+        report = MergeReport()
+        shipped = {hashlib.sha256(b"echo v1\n").hexdigest()[:ASSET_HISTORY_DIGEST_LEN]}
+
+        (tmp_path / "hook.sh").write_text("echo v1\n")
+        merge_file(tmp_path / "hook.sh", "hook.sh", b"echo v2\n", store, report, shipped)
+        assert report.updated == ["hook.sh"]
+        assert (tmp_path / "hook.sh").read_text() == "echo v2\n"
+
+        (tmp_path / "edited.sh").write_text("echo mine\n")
+        merge_file(tmp_path / "edited.sh", "edited.sh", b"echo v2\n", store, report, shipped)
+        assert report.diverged == ["edited.sh"]
+        assert report.conflicts == []
+        assert (tmp_path / "edited.sh").read_text() == "echo mine\n"
+        assert store.get("edited.sh") is None
+
+    def test_binary_conflict_keeps_base(self, tmp_path: Path) -> None:
+        """An unmergeable binary file stays in conflict until the user resolves it."""
+        store = BaseStore(tmp_path)
+        store.record("logo.png", b"\x89v1\xff")
+        (tmp_path / "logo.png").write_bytes(b"\x89mine\xff")
+
+        for theirs in (b"\x89v2\xff", b"\x89v2\xff"):
+            report = MergeReport()
+            merge_file(tmp_path / "logo.png", "logo.png", theirs, store, report)
+            assert report.conflicts == ["logo.png"]
+            assert store.get("logo.png") == b"\x89v1\xff"
+        assert (tmp_path / "logo.png").read_bytes() == b"\x89mine\xff"
+
+
+class TestPerformMergeUpdate:
+    """Test `update --strategy merge` end to end."""
+
+    def test_merge_update_preserves_local_edits(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Files copied by an earlier update are merged against their recorded base."""
+        assets = tmp_path / "assets"
+        (assets / ".claude" / "commands").mkdir(parents=True)
+        plan = assets / ".claude" / "commands" / "00_plan.md"
+        plan.write_text(BASE)
+        monkeypatch.setattr("claude_pilot.config.get_templates_path", lambda: assets)
+        for name in ("apply_hooks", "apply_statusline", "ensure_gitignore"):
+            monkeypatch.setattr(f"claude_pilot.updater.{name}", lambda *a, **k: True)
+
+        project = tmp_path / "project"
+        project.mkdir()
+        assert copy_templates_from_package(project) == (1, 0)
+
+        installed = project / ".claude" / "commands" / "00_plan.md"
+        installed.write_text(BASE.replace("Step one", "Step one (ours)"))
+        plan.write_text(BASE.replace("Step three", "Step three (new)"))
+
+        assert MergeStrategy("merge") is MergeStrategy.MERGE
+        assert perform_merge_update(project) == UpdateStatus.UPDATED
+        assert installed.read_text() == "# Plan\n\nStep one (ours)\nStep two\nStep three (new)\n"
+        assert BaseStore(project).get(".claude/commands/00_plan.md") == plan.read_bytes()
+        assert (project / config.CATALOG_FILE).is_file()
+
+    def test_diverged_file_survives_consecutive_updates(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """A file kept for lack of a base is not merged against a later release."""
+        assets = tmp_path / "assets"
+        (assets / ".claude" / "commands").mkdir(parents=True)
+        plan = assets / ".claude" / "commands" / "00_plan.md"
+        monkeypatch.setattr("claude_pilot.config.get_templates_path", lambda: assets)
+        for name in ("apply_hooks", "apply_statusline", "ensure_gitignore", "create_backup"):
+            monkeypatch.setattr(f"claude_pilot.updater.{name}", lambda *a, **k: True)
+
+        project = tmp_path / "project"
+        installed = project / ".claude" / "commands" / "00_plan.md"
+        installed.parent.mkdir(parents=True)
+        mine = "# My plan\n\nStep one\nStep two\n"
+        installed.write_text(mine)
+
+        for release in (BASE, BASE.replace("Step three", "Step three (new)")):
+            plan.write_text(release)
+            assert perform_merge_update(project) == UpdateStatus.UPDATED
+            assert installed.read_text() == mine
+            assert BaseStore(project).get(".claude/commands/00_plan.md") is None
@@ -0,0 +1,440 @@
+"""
+Tests for the shared pooled HTTP client.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import threading
+import time
+from collections.abc import Generator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+import pytest
+import requests
+
+from claude_pilot import network
+from claude_pilot.locks import file_lock
+from claude_pilot.network import HttpClient, JitteredRetry
+
+
+class StubServer:
+    """Local HTTP server that fails the first N requests with a given status."""
+
+    def __init__(self) -> None:
+        self.fail_first = 0
+        self.fail_status = 503
+        self.retry_after: str | None = None
+        self.body: dict[str, Any] = {"info": {"version": "9.0.0"}}
+        self.requests = 0
+        self.etag: str | None = None
+        self.not_modified = 0
+        self.last_headers: dict[str, str] = {}
+        self.client_ports: set[int] = set()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:  # noqa: N802
+                stub.requests += 1
+                stub.client_ports.add(self.client_address[1])
+                stub.last_headers = dict(self.headers)
+                failing = stub.requests <= stub.fail_first
+                if not failing and stub.etag and self.headers["If-None-Match"] == stub.etag:
+                    stub.not_modified += 1
+                    self.send_response(304)
+                    self.send_header("ETag", stub.etag)
+                    self.end_headers()
+                    return
+                payload = b"{}" if failing else json.dumps(stub.body).encode()
+                self.send_response(stub.fail_status if failing else 200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                if stub.etag and not failing:
+                    self.send_header("ETag", stub.etag)
+                if stub.retry_after and failing:
+                    self.send_header("Retry-After", stub.retry_after)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self.thread.start()
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub() -> Generator[StubServer, None, None]:
+    server = StubServer()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def client() -> Generator[HttpClient, None, None]:
+    """A fast-retrying client installed as the shared client."""
+    http = HttpClient(retries=2, backoff_factor=0, connect_timeout=2, read_timeout=2)
+    previous = network.set_client(http)
+    yield http
+    http.close()
+    network.set_client(previous)
+
+
+class TestHttpClient:
+    """Test retries, pooling and injection."""
+
+    def test_retries_transient_errors(self, stub: StubServer, client: HttpClient) -> None:
+        """5xx responses are retried until one succeeds."""
+        stub.fail_first = 2
+        response = network.get(f"{stub.url}/pypi")
+
+        assert response.status_code == 200
+        assert stub.requests == 3
+
+    def test_gives_up_after_retries(self, stub: StubServer, client: HttpClient) -> None:
+        """When retries are exhausted the last response is returned, not raised."""
+        stub.fail_first = 10
+        response = network.get(f"{stub.url}/pypi")
+
+        assert response.status_code == 503
+        assert stub.requests == 3
+        with pytest.raises(requests.HTTPError):
+            response.raise_for_status()
+
+    def test_long_retry_after_is_not_slept_on(
+        self, stub: StubServer, client: HttpClient, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """A short Retry-After is honoured; a long one returns the response at once."""
+        delays: list[float] = []
+        monkeypatch.setattr("time.sleep", delays.append)
+        stub.fail_first, stub.fail_status, stub.retry_after = 1, 429, "2"
+        assert network.get(f"{stub.url}/pypi").status_code == 200
+        assert delays == [2.0]
+
+        stub.requests, stub.retry_after = 0, "3600"
+        assert network.get(f"{stub.url}/pypi").status_code == 429
+        assert stub.requests == 1
+        assert delays == [2.0]
+
+    def test_per_request_retries(self, stub: StubServer, client: HttpClient) -> None:
+        """A request can ask for fewer retries than the client default."""
+        stub.fail_first = 10
+        assert network.get(f"{stub.url}/pypi", retries=0).status_code == 503
+        assert stub.requests == 1
+
+    def test_client_errors_are_not_retried(self, stub: StubServer, client: HttpClient) -> None:
+        """A 404 is final."""
+        stub.fail_first, stub.fail_status = 10, 404
+        assert network.get(f"{stub.url}/missing").status_code == 404
+        assert stub.requests == 1
+
+    def test_connections_are_reused(self, stub: StubServer, client: HttpClient) -> None:
+        """Sequential requests share one keep-alive connection."""
+        for _ in range(5):
+            assert network.get(f"{stub.url}/pypi").ok
+        assert stub.requests == 5
+        assert len(stub.client_ports) == 1
+
+    def test_updater_uses_injected_client(
+        self, stub: StubServer, client: HttpClient, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Updater calls go through the shared client and configurable URLs."""
+        from claude_pilot.updater import get_github_latest_sha, get_pypi_version
+
+        monkeypatch.setattr("claude_pilot.config.PYPI_API_URL", f"{stub.url}/pypi")
+        monkeypatch.setattr("claude_pilot.config.GITHUB_API_URL", stub.url)
+        stub.fail_first = 1
+        assert get_pypi_version() is None
+        assert get_pypi_version() == "9.0.0"
+        assert stub.requests == 2
+
+        stub.body = {"sha": "abc123"}
+        assert get_github_latest_sha("owner/repo", "main") == "abc123"
+
+    def test_timeouts_are_split(self) -> None:
+        """A scalar timeout caps the connect timeout and sets the read timeout."""
+        http = HttpClient(connect_timeout=5, read_timeout=30)
+        seen: dict[str, Any] = {}
+
+        def _get(url: str, **kwargs: Any) -> None:
+            seen.update(kwargs)
+
+        http.session.get = _get  # type: ignore[method-assign]
+        http.get("http://example.invalid")
+        assert seen["timeout"] == (5, 30)
+        http.get("http://example.invalid", timeout=2)
+        assert seen["timeout"] == (2, 2)
+
+
+class TestConditionalRequests:
+    """Test ETag revalidation and token auth for GitHub SHA checks."""
+
+    @pytest.fixture(autouse=True)
+    def github(
+        self, stub: StubServer, client: HttpClient, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr("claude_pilot.config.GITHUB_API_URL", stub.url)
+        for name in ("CLAUDE_PILOT_GITHUB_TOKEN", "GITHUB_TOKEN", "GH_TOKEN"):
+            monkeypatch.delenv(name, raising=False)
+        stub.body = {"sha": "abc123"}
+        stub.etag = '"v1"'
+
+    def test_unchanged_branch_is_revalidated(self, stub: StubServer) -> None:
+        """The second check sends If-None-Match and is answered from the cache on 304."""
+        from claude_pilot.updater import get_github_latest_sha
+
+        assert get_github_latest_sha("owner/repo", "main") == "abc123"
+        assert "If-None-Match" not in stub.last_headers
+        assert get_github_latest_sha("owner/repo", "main") == "abc123"
+        assert stub.last_headers["If-None-Match"] == '"v1"'
+        assert stub.not_modified == 1
+
+        stub.body, stub.etag = {"sha": "def456"}, '"v2"'
+        assert get_github_latest_sha("owner/repo", "main") == "def456"
+        assert network.EtagCache().get(f"{stub.url}/repos/owner/repo/commits/main") == {
+            "etag": '"v2"',
+            "value": "def456",
+            "stored_at": pytest.approx(time.time(), abs=60),
+        }
+
+    def test_rate_limited_check_uses_last_known_sha(self, stub: StubServer) -> None:
+        """An exhausted rate limit falls back to the cached SHA instead of failing."""
+        from claude_pilot.updater import get_github_latest_sha
+
+        assert get_github_latest_sha("owner/repo", "main") == "abc123"
+        stub.fail_first, stub.fail_status = 100, 429
+        assert get_github_latest_sha("owner/repo", "main") == "abc123"
+        assert get_github_latest_sha("owner/other", "main") is None
+
+    def test_token_from_environment(
+        self, stub: StubServer, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """A token is sent as a bearer Authorization header when set."""
+        from claude_pilot.updater import get_github_latest_sha
+
+        get_github_latest_sha("owner/repo", "main")
+        assert "Authorization" not in stub.last_headers
+        monkeypatch.setenv("GH_TOKEN", "ghp_test")
+        get_github_latest_sha("owner/repo", "main")
+        assert stub.last_headers["Authorization"] == "Bearer ghp_test"
+
+
+def test_backoff_is_jittered(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Backoff delays are drawn uniformly below the exponential bound."""
+    retry = JitteredRetry(total=5, backoff_factor=1)
+    for _ in range(3):
+        retry = retry.increment(method="GET", url="/")
+    bounds: list[float] = []
+
+    def _uniform(low: float, high: float) -> float:
+        bounds.append(high)
+        return high / 2
+
+    monkeypatch.setattr("random.uniform", _uniform)
+    assert retry.get_backoff_time() == bounds[0] / 2
+    assert bounds[0] == 4
+
+
+class RangeServer:
+    """Local server for a single file that honours Range/If-Range and can drop connections."""
+
+    def __init__(self, content: bytes, etag: str = '"v1"') -> None:
+        self.content = content
+        self.etag = etag
+        self.cut_after: list[int] = []
+        self.ranges: list[str | None] = []
+        self.accept_encodings: list[str | None] = []
+        self.force_gzip = False
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:  # noqa: N802
+                range_header = self.headers.get("Range")
+                server.ranges.append(range_header)
+                server.accept_encodings.append(self.headers.get("Accept-Encoding"))
+                start = 0
+                if server.force_gzip:
+                    # A proxy that compresses regardless of Accept-Encoding
+                    body = gzip.compress(server.content)
+                    self.send_response(200)
+                    self.send_header("Content-Encoding", "gzip")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+                if range_header and self.headers.get("If-Range") in (None, server.etag):
+                    start = int(range_header.removeprefix("bytes=").rstrip("-"))
+                body = server.content[start:]
+                if start:
+                    self.send_response(206)
+                    self.send_header(
+                        "Content-Range",
+                        f"bytes {start}-{len(server.content) - 1}/{len(server.content)}",
+                    )
+                else:
+                    self.send_response(200)
+                self.send_header("ETag", server.etag)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if server.cut_after:
+                    self.wfile.write(body[: server.cut_after.pop(0)])
+                    self.wfile.flush()
+                    self.close_connection = True
+                    return
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(
+            target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        ).start()
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def range_server() -> Generator[RangeServer, None, None]:
+    server = RangeServer(bytes(range(256)) * 256)
+    yield server
+    server.close()
+
+
+class TestResumableDownload:
+    """Test network.download() resume behaviour."""
+
+    def test_interrupted_download_resumes(
+        self, range_server: RangeServer, client: HttpClient, tmp_path: Path
+    ) -> None:
+        """A dropped transfer keeps its bytes and the next call asks only for the rest."""
+        dest = tmp_path / "skills.tar.gz"
+        range_server.cut_after = [3 * 8192 + 100]
+
+        with pytest.raises(requests.RequestException):
+            network.download(f"{range_server.url}/t", dest, attempts=1)
+        part = tmp_path / "skills.tar.gz.part"
+        assert part.stat().st_size == 3 * 8192 + 100
+        assert not dest.exists()
+
+        network.download(f"{range_server.url}/t", dest, attempts=1)
+        assert dest.read_bytes() == range_server.content
+        assert range_server.ranges[-1] == "bytes=24676-"
+        assert not part.exists()
+
+    def test_retries_within_one_call(
+        self,
+        range_server: RangeServer,
+        client: HttpClient,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Several interruptions in one call each resume, after a jittered backoff."""
+        delays: list[float] = []
+        monkeypatch.setattr("claude_pilot.network.time.sleep", delays.append)
+        monkeypatch.setattr("random.uniform", lambda low, high: high)
+        range_server.cut_after = [8192, 2 * 8192]
+        dest = network.download(
+            f"{range_server.url}/t", tmp_path / "f", attempts=3, backoff_factor=0.5
+        )
+
+        assert dest.read_bytes() == range_server.content
+        assert range_server.ranges == [None, "bytes=8192-", "bytes=24576-"]
+        assert delays == [0.5, 1.0]
+
+    def test_concurrent_downloads_share_the_partial(
+        self, range_server: RangeServer, client: HttpClient, tmp_path: Path
+    ) -> None:
+        """A second download waits for the lock and reuses the file the first one finished."""
+        dest = tmp_path / "f"
+        results: list[Path] = []
+        with file_lock(tmp_path / "f.lock"):
+            worker = threading.Thread(
+                target=lambda: results.append(network.download(f"{range_server.url}/t", dest))
+            )
+            worker.start()
+            worker.join(0.2)
+            assert worker.is_alive()
+            dest.write_bytes(b"finished elsewhere")
+        worker.join()
+
+        assert results == [dest]
+        assert range_server.ranges == []
+        assert dest.read_bytes() == b"finished elsewhere"
+
+    def test_bytes_are_stored_unencoded(
+        self, range_server: RangeServer, client: HttpClient, tmp_path: Path
+    ) -> None:
+        """Downloads ask for identity; a gzip-encoded reply is decoded and never resumed."""
+        dest = network.download(f"{range_server.url}/t", tmp_path / "f", attempts=1)
+        assert dest.read_bytes() == range_server.content
+        assert range_server.accept_encodings == ["identity"]
+
+        range_server.force_gzip = True
+        dest.unlink()
+        network.download(f"{range_server.url}/t", dest, attempts=1)
+        assert dest.read_bytes() == range_server.content
+        assert not (tmp_path / "f.part.json").exists()
+
+    def test_prune_skips_locked_partials(self, tmp_path: Path) -> None:
+        """Stale partials are removed unless a download holds their lock."""
+        for name in ("idle", "busy"):
+            (tmp_path / f"{name}.part").write_bytes(b"x")
+            (tmp_path / f"{name}.part.json").write_text("{}")
+            os.utime(tmp_path / f"{name}.part", (1, 1))
+
+        with file_lock(tmp_path / "busy.lock"):
+            assert network.prune_partials(tmp_path, max_age=60) == 1
+        assert not (tmp_path / "idle.part").exists()
+        assert not (tmp_path / "idle.part.json").exists()
+        assert (tmp_path / "busy.part").exists()
+
+    def test_changed_etag_restarts(
+        self, range_server: RangeServer, client: HttpClient, tmp_path: Path
+    ) -> None:
+        """If the remote file changed, If-Range makes the server send it whole."""
+        dest = tmp_path / "f"
+        range_server.cut_after = [8192]
+        with pytest.raises(requests.RequestException):
+            network.download(f"{range_server.url}/t", dest, attempts=1)
+
+        range_server.content = b"new content" * 100
+        range_server.etag = '"v2"'
+        network.download(f"{range_server.url}/t", dest, attempts=1)
+        assert dest.read_bytes() == range_server.content
+
+    def test_github_tarball_download_resumes(
+        self,
+        range_server: RangeServer,
+        client: HttpClient,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """download_github_tarball() survives a dropped connection without refetching."""
+        from claude_pilot.updater import download_github_tarball
+
+        monkeypatch.setattr("claude_pilot.config.GITHUB_API_URL", range_server.url)
+        range_server.cut_after = [4 * 8192]
+
+        assert download_github_tarball("owner/repo", "abc1234def", tmp_path)
+        assert (tmp_path / "owner-repo-abc1234.tar.gz").read_bytes() == range_server.content
+        assert range_server.ranges == [None, "bytes=32768-"]
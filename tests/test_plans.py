@@ -0,0 +1,334 @@
+"""
+Tests for the persistent plan index (claude_pilot.plans).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+import zipfile
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from claude_pilot import config
+from claude_pilot.cli import main
+from claude_pilot.plans import PlanIndex, parse_plan_metadata
+
+PLAN_TEXT = """# Worktree Close Flow
+
+- Generated: 2026-01-17 06:31:16 | Work: worktree_close_flow
+
+## Success Criteria
+
+| SC | Description | Verify |
+|----|-------------|--------|
+| SC-1 | Close removes worktree | `git worktree list` |
+- [ ] SC-2: Lock released
+
+## Worktree Info
+
+- Branch: feature/20260117-063116-worktree
+- Worktree Path: /tmp/wt
+"""
+
+
+@pytest.fixture
+def plan_project(tmp_path: Path) -> Path:
+    """Create a project with plans in every state."""
+    plan_dir = tmp_path / ".pilot" / "plan"
+    for state in ("pending", "in_progress", "done", "active"):
+        (plan_dir / state).mkdir(parents=True)
+    (plan_dir / "pending" / ".gitkeep").write_text("")
+    (plan_dir / "pending" / "20260118_100000_next.md").write_text("# Next\n")
+    (plan_dir / "in_progress" / "20260117_063116_worktree.md").write_text(PLAN_TEXT)
+
+    done_dir = plan_dir / "done" / "20260113_171250_guard"
+    done_dir.mkdir()
+    (done_dir / "plan.md").write_text("# Guard\n\nSC-1: No rush\n")
+    (plan_dir / "done" / "20260115_234419_statusline.md").write_text("# Statusline\n")
+    artifacts = plan_dir / "done" / "20260115_234419_statusline"
+    artifacts.mkdir()
+    (artifacts / "test-scenarios.md").write_text("# Scenarios\n")
+
+    (plan_dir / "active" / "main.txt").write_text(
+        str(plan_dir / "in_progress" / "20260117_063116_worktree.md")
+    )
+    return tmp_path
+
+
+class TestParsePlanMetadata:
+    """Test markdown metadata extraction."""
+
+    def test_extracts_title_branch_timestamp_and_criteria(self) -> None:
+        """Title, branch, generated timestamp and SC rows are parsed."""
+        meta = parse_plan_metadata("20260117_063116_worktree", PLAN_TEXT)
+
+        assert meta["title"] == "Worktree Close Flow"
+        assert meta["branch"] == "feature/20260117-063116-worktree"
+        assert meta["created_at"] == "2026-01-17T06:31:16"
+        assert meta["success_criteria"] == [
+            {"id": "SC-1", "description": "Close removes worktree"},
+            {"id": "SC-2", "description": "Lock released"},
+        ]
+
+    def test_timestamp_falls_back_to_plan_id(self) -> None:
+        """Plans without a Generated line use the id timestamp."""
+        meta = parse_plan_metadata("20260113_171250_guard", "# Guard\n")
+        assert meta["created_at"] == "2026-01-13T17:12:50"
+
+
+class TestPlanIndex:
+    """Test index refresh and queries."""
+
+    def test_counts_and_listing(self, plan_project: Path) -> None:
+        """Plans are counted per state; artifact directories are not plans."""
+        with PlanIndex(plan_project) as index:
+            assert index.count() == {"pending": 1, "in_progress": 1, "done": 2}
+            done = index.list_plans(state="done")
+
+        assert [p.plan_id for p in done] == [
+            "20260113_171250_guard",
+            "20260115_234419_statusline",
+        ]
+        assert done[0].path == "done/20260113_171250_guard/plan.md"
+        assert done[1].path == "done/20260115_234419_statusline.md"
+
+    def test_lookup_and_active_pointers(self, plan_project: Path) -> None:
+        """Plans can be looked up by id or file name; active pointers are indexed."""
+        with PlanIndex(plan_project) as index:
+            record = index.get("20260117_063116_worktree.md")
+            active = index.active()
+
+        assert record is not None
+        assert record.state == "in_progress"
+        assert record.branch == "feature/20260117-063116-worktree"
+        assert active["main"].endswith("20260117_063116_worktree.md")
+
+    def test_incremental_state_move(self, plan_project: Path) -> None:
+        """Moving a plan between states updates its row without a rebuild."""
+        plan_dir = plan_project / ".pilot" / "plan"
+        with PlanIndex(plan_project) as index:
+            index.refresh()
+            os.rename(
+                plan_dir / "in_progress" / "20260117_063116_worktree.md",
+                plan_dir / "done" / "20260117_063116_worktree.md",
+            )
+            assert index.refresh() > 0
+            record = index.get("20260117_063116_worktree")
+            counts = index.count()
+
+        assert record is not None and record.state == "done"
+        assert counts == {"pending": 1, "in_progress": 0, "done": 3}
+
+    def test_unchanged_done_directory_is_not_relisted(self, plan_project: Path) -> None:
+        """Done plans are served from the index while the directory mtime is unchanged."""
+        done_dir = plan_project / ".pilot" / "plan" / "done"
+        with PlanIndex(plan_project) as index:
+            index.refresh()
+            st = done_dir.stat()
+            (done_dir / "20260120_000000_late.md").write_text("# Late\n")
+            os.utime(done_dir, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+            assert index.count()["done"] == 2
+            assert index.refresh(full=True) >= 1
+            assert index.count(refresh=False)["done"] == 3
+
+    def test_index_stored_under_plan_dir(self, plan_project: Path) -> None:
+        """The index lives at config.PLAN_INDEX_FILE."""
+        with PlanIndex(plan_project) as index:
+            index.refresh()
+        assert (plan_project / config.PLAN_INDEX_FILE).exists()
+
+
+class TestPlansCommand:
+    """Test the `plans` CLI group."""
+
+    def test_plans_count_json(self, plan_project: Path) -> None:
+        """`plans count --json` prints per-state counts."""
+        runner = CliRunner()
+        result = runner.invoke(
+            main, ["plans", "--target-dir", str(plan_project), "count", "--json"]
+        )
+        assert result.exit_code == 0
+        assert json.loads(result.output) == {"pending": 1, "in_progress": 1, "done": 2}
+
+    def test_plans_show_missing_plan_fails(self, plan_project: Path) -> None:
+        """`plans show` exits non-zero for unknown plans."""
+        runner = CliRunner()
+        result = runner.invoke(
+            main, ["plans", "--target-dir", str(plan_project), "show", "nope"]
+        )
+        assert result.exit_code != 0
+        assert "Plan not found" in result.output
+
+
+class TestPlanSearch:
+    """Test full-text search over plans."""
+
+    def test_ranked_hits_with_snippets(self, plan_project: Path) -> None:
+        """Title matches rank above body-only matches and snippets highlight terms."""
+        pending = plan_project / ".pilot" / "plan" / "pending"
+        (pending / "20260119_090000_notes.md").write_text(
+            "# Notes\n\nMention the worktree once in passing.\n"
+        )
+        with PlanIndex(plan_project) as index:
+            hits = index.search("worktree")
+
+        assert [h.plan.plan_id for h in hits][:2] == [
+            "20260117_063116_worktree",
+            "20260119_090000_notes",
+        ]
+        assert hits[0].score > hits[1].score
+        assert "[worktree]" in hits[1].snippet.lower()
+
+    def test_search_follows_state_moves_and_edits(self, plan_project: Path) -> None:
+        """Search results track moved, edited and deleted plans."""
+        plan_dir = plan_project / ".pilot" / "plan"
+        with PlanIndex(plan_project) as index:
+            assert index.search("statusline", state="done")
+            os.rename(
+                plan_dir / "pending" / "20260118_100000_next.md",
+                plan_dir / "done" / "20260118_100000_next.md",
+            )
+            (plan_dir / "done" / "20260118_100000_next.md").write_text(
+                "# Next\n\nCache invalidation\n"
+            )
+            (plan_dir / "done" / "20260115_234419_statusline.md").unlink()
+
+            assert index.search("statusline") == []
+            hits = index.search("invalid*")
+        assert [(h.plan.plan_id, h.plan.state) for h in hits] == [
+            ("20260118_100000_next", "done")
+        ]
+
+    def test_punctuation_is_not_query_syntax(self, plan_project: Path) -> None:
+        """Hyphens and quotes in queries are treated as word separators."""
+        with PlanIndex(plan_project) as index:
+            assert index.search('git-worktree "list') != []
+            assert index.search("  --  ") == []
+
+    def test_like_fallback_without_fts5(
+        self, plan_project: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """SQLite builds without FTS5 fall back to substring search."""
+        monkeypatch.setattr(
+            "claude_pilot.plans._FTS_SCHEMA", "CREATE VIRTUAL TABLE plan_text USING nope(x);"
+        )
+        with PlanIndex(plan_project) as index:
+            hits = index.search("lock")
+            assert not index.fts_enabled
+
+        assert [h.plan.plan_id for h in hits] == ["20260117_063116_worktree"]
+        assert "Lock" in hits[0].snippet
+
+    def test_plans_search_command_json(self, plan_project: Path) -> None:
+        """`plans search --json` prints ranked hits with snippets."""
+        runner = CliRunner()
+        result = runner.invoke(
+            main, ["plans", "--target-dir", str(plan_project), "search", "lock", "--json"]
+        )
+        assert result.exit_code == 0
+        hits = json.loads(result.output)
+        assert hits[0]["plan_id"] == "20260117_063116_worktree"
+        assert "snippet" in hits[0] and "score" in hits[0]
+
+
+class TestPlanArchive:
+    """Test archive compaction of done plans."""
+
+    @staticmethod
+    def _age(path: Path, days: int) -> None:
+        """Backdate a file's mtime."""
+        old = time.time() - days * 86400
+        os.utime(path, (old, old))
+
+    @pytest.fixture
+    def aged_project(self, plan_project: Path) -> Path:
+        """Backdate the done plans so they are archive candidates."""
+        done_dir = plan_project / ".pilot" / "plan" / "done"
+        self._age(done_dir / "20260113_171250_guard" / "plan.md", 90)
+        self._age(done_dir / "20260115_234419_statusline.md", 90)
+        (done_dir / "20260118_000000_recent.md").write_text("# Recent\n")
+        return plan_project
+
+    def test_archive_packs_old_plans_into_monthly_bundle(self, aged_project: Path) -> None:
+        """Old plans and their artifacts move into YYYY-MM.zip; recent ones stay."""
+        plan_dir = aged_project / ".pilot" / "plan"
+        with PlanIndex(aged_project) as index:
+            archived = index.archive(older_than_days=30)
+            counts = index.count()
+            record = index.get("20260115_234419_statusline")
+
+        assert sorted(r.plan_id for r in archived) == [
+            "20260113_171250_guard",
+            "20260115_234419_statusline",
+        ]
+        assert sorted(p.name for p in (plan_dir / "done").iterdir()) == [
+            "20260118_000000_recent.md"
+        ]
+        with zipfile.ZipFile(plan_dir / "archive" / "2026-01.zip") as bundle:
+            assert sorted(bundle.namelist()) == [
+                "20260113_171250_guard/plan.md",
+                "20260115_234419_statusline.md",
+                "20260115_234419_statusline/test-scenarios.md",
+            ]
+        assert counts["done"] == 1
+        assert record is not None
+        assert record.state == "archived"
+        assert record.bundle == "2026-01.zip"
+
+    def test_archived_plans_stay_searchable_and_readable(self, aged_project: Path) -> None:
+        """Search and read_plan read through to the bundle."""
+        with PlanIndex(aged_project) as index:
+            index.archive(older_than_days=30)
+            hits = index.search("guard")
+            content = index.read_plan("20260113_171250_guard")
+
+        assert [(h.plan.plan_id, h.plan.state) for h in hits] == [
+            ("20260113_171250_guard", "archived")
+        ]
+        assert content == "# Guard\n\nSC-1: No rush\n"
+
+    def test_extract_restores_plan_to_done(self, aged_project: Path) -> None:
+        """Extracting restores files and the live copy takes precedence."""
+        plan_dir = aged_project / ".pilot" / "plan"
+        with PlanIndex(aged_project) as index:
+            index.archive(older_than_days=30)
+            written = index.extract("20260115_234419_statusline.md")
+            record = index.get("20260115_234419_statusline")
+            assert index.extract("20260118_000000_recent") is None
+
+        assert written is not None and len(written) == 2
+        assert (plan_dir / "done" / "20260115_234419_statusline" / "test-scenarios.md").exists()
+        assert record is not None and record.state == "done" and record.bundle is None
+
+    def test_rearchive_replaces_bundle_entry(self, aged_project: Path) -> None:
+        """Archiving a restored plan again replaces its entry instead of duplicating it."""
+        plan_dir = aged_project / ".pilot" / "plan"
+        with PlanIndex(aged_project) as index:
+            index.archive(older_than_days=30)
+            index.extract("20260113_171250_guard")
+            plan_file = plan_dir / "done" / "20260113_171250_guard" / "plan.md"
+            plan_file.write_text("# Guard v2\n")
+            self._age(plan_file, 60)
+            index.archive(older_than_days=30)
+            record = index.get("20260113_171250_guard")
+
+        with zipfile.ZipFile(plan_dir / "archive" / "2026-01.zip") as bundle:
+            names = bundle.namelist()
+        assert names.count("20260113_171250_guard/plan.md") == 1
+        assert record is not None and record.title == "Guard v2"
+
+    def test_plans_archive_command_dry_run(self, aged_project: Path) -> None:
+        """`plans archive --dry-run` lists candidates without moving them."""
+        runner = CliRunner()
+        result = runner.invoke(
+            main,
+            ["plans", "--target-dir", str(aged_project), "archive", "--dry-run"],
+        )
+        assert result.exit_code == 0
+        assert "20260113_171250_guard" in result.output
+        assert not (aged_project / ".pilot" / "plan" / "archive").exists()
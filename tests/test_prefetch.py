@@ -0,0 +1,148 @@
+"""
+Tests for cache prefetching and offline mode.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import tarfile
+from pathlib import Path
+from typing import Any
+
+import pytest
+import requests
+import urllib3
+from click.testing import CliRunner
+
+from claude_pilot import config, network
+from claude_pilot.cli import main
+from claude_pilot.prefetch import prefetch
+from claude_pilot.skills_lock import build_entry, source_dir, write_lock
+from claude_pilot.updater import cached_tarball_path, get_pypi_version, sync_external_skills
+
+REPO = config.EXTERNAL_SKILLS["vercel-agent-skills"]["repo"]
+
+
+def _tarball(ref: str) -> bytes:
+    buffer = io.BytesIO()
+    root = f"{REPO.replace('/', '-')}-{ref}"
+    with tarfile.open(fileobj=buffer, mode="w:gz") as tar:
+        content = f"# Skill at {ref}\n".encode()
+        info = tarfile.TarInfo(name=f"{root}/skills/react/SKILL.md")
+        info.size = len(content)
+        tar.addfile(info, io.BytesIO(content))
+    return buffer.getvalue()
+
+
+class FakeRemote:
+    """Answers PyPI, GitHub commit and tarball requests; counts them."""
+
+    def __init__(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        self.head = "head111"
+        self.urls: list[str] = []
+        monkeypatch.setattr("claude_pilot.network.get", self.get)
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        self.urls.append(url)
+        response = requests.Response()
+        response.status_code = 200
+        if url == config.PYPI_API_URL:
+            body = json.dumps({"info": {"version": "9.9.9"}}).encode()
+        elif "/commits/" in url:
+            body = json.dumps({"sha": self.head}).encode()
+            response.headers["ETag"] = f'"{self.head}"'
+        else:
+            body = _tarball(url.rsplit("/", 1)[1])
+        response.headers["Content-Length"] = str(len(body))
+        response.raw = urllib3.HTTPResponse(body=io.BytesIO(body), preload_content=False)
+        return response
+
+
+@pytest.fixture
+def remote(monkeypatch: pytest.MonkeyPatch) -> FakeRemote:
+    monkeypatch.setattr("claude_pilot.probe.get_capabilities", lambda refresh=False: None)
+    return FakeRemote(monkeypatch)
+
+
+def _go_offline(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv(config.OFFLINE_ENV, "1")
+    monkeypatch.setattr("claude_pilot.network.get", pytest.fail)
+
+
+class TestPrefetch:
+    """Test prefetch() and offline use of its cache."""
+
+    def test_prefetch_fills_cache(self, remote: FakeRemote, isolated_cache_dir: Path) -> None:
+        """Latest version, skill SHA and tarball end up in the cache directory."""
+        report = prefetch()
+
+        assert report.ok
+        assert report.latest_version == "9.9.9"
+        assert report.skills == {"vercel-agent-skills": "head111"}
+        assert cached_tarball_path(REPO, "head111").is_file()
+        manifest = json.loads((isolated_cache_dir / config.PREFETCH_MANIFEST_FILE).read_text())
+        assert manifest["skills"] == report.skills
+
+    def test_offline_init_uses_prefetched_cache(
+        self, remote: FakeRemote, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """After prefetch, skills sync and version checks need no network."""
+        prefetch()
+        _go_offline(monkeypatch)
+
+        assert sync_external_skills(tmp_path) == "success"
+        skill = source_dir(tmp_path, "vercel-agent-skills") / "react/SKILL.md"
+        assert skill.read_text() == "# Skill at head111\n"
+        assert get_pypi_version() == "9.9.9"
+        assert cached_tarball_path(REPO, "head111").is_file()
+
+    def test_corrupt_cached_tarball_is_replaced(self, remote: FakeRemote, tmp_path: Path) -> None:
+        """A truncated tarball in the cache is dropped and downloaded again."""
+        prefetch()
+        cached = cached_tarball_path(REPO, "head111")
+        cached.write_bytes(cached.read_bytes()[:20])
+        remote.urls.clear()
+
+        assert sync_external_skills(tmp_path) == "success"
+        assert any(url.endswith("/tarball/head111") for url in remote.urls)
+        skill = source_dir(tmp_path, "vercel-agent-skills") / "react/SKILL.md"
+        assert skill.read_text() == "# Skill at head111\n"
+
+    def test_locked_ref_is_prefetched(self, remote: FakeRemote, tmp_path: Path) -> None:
+        """A project's skills.lock pins the tarball ref instead of the branch head."""
+        skills_dir = tmp_path / "staging"
+        (skills_dir / "react").mkdir(parents=True)
+        (skills_dir / "react/SKILL.md").write_text("# Skill at old2222\n")
+        skill_config = config.EXTERNAL_SKILLS["vercel-agent-skills"]
+        entry = build_entry(
+            skills_dir, REPO, skill_config["branch"], skill_config["skills_path"], "old2222"
+        )
+        write_lock(tmp_path, {"vercel-agent-skills": entry})
+
+        assert prefetch(tmp_path).skills == {"vercel-agent-skills": "old2222"}
+        assert cached_tarball_path(REPO, "old2222").is_file()
+        assert not cached_tarball_path(REPO, "head111").exists()
+
+    def test_offline_mode_blocks_requests(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Requests fail fast in offline mode and the SHA check has no answer."""
+        from claude_pilot.updater import get_github_latest_sha
+
+        monkeypatch.setenv(config.OFFLINE_ENV, "1")
+        with pytest.raises(network.OfflineError):
+            network.get("http://example.invalid")
+        assert get_github_latest_sha(REPO, "main") is None
+
+
+class TestPrefetchCommand:
+    """Test `claude-pilot prefetch`."""
+
+    def test_cache_dir_and_json(self, remote: FakeRemote, tmp_path: Path) -> None:
+        """--cache-dir selects the directory that is filled."""
+        cache_dir = tmp_path / "image-cache"
+        result = CliRunner().invoke(main, ["prefetch", "--cache-dir", str(cache_dir), "--json"])
+
+        assert result.exit_code == 0, result.output
+        assert json.loads(result.output)["cache_dir"] == str(cache_dir)
+        assert (cache_dir / config.PREFETCH_MANIFEST_FILE).is_file()
+        assert (cache_dir / config.DOWNLOAD_CACHE_SUBDIR).is_dir()
@@ -0,0 +1,123 @@
+"""
+Tests for the memoized environment probe.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from claude_pilot.cli import main
+from claude_pilot.codex import is_codex_available
+from claude_pilot.probe import PROBE_ENV_FILE, PROBE_STATE_FILE, get_capabilities
+
+
+@pytest.fixture
+def fake_env(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """PATH with a single bin dir holding `jq`, and an empty home directory."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    jq = bin_dir / "jq"
+    jq.write_text("#!/bin/sh\n")
+    jq.chmod(0o755)
+    home = tmp_path / "home"
+    home.mkdir()
+    monkeypatch.setenv("PATH", str(bin_dir))
+    monkeypatch.setattr("pathlib.Path.home", lambda: home)
+    return bin_dir
+
+
+def _add_tool(bin_dir: Path, name: str) -> None:
+    tool = bin_dir / name
+    tool.write_text("#!/bin/sh\n")
+    tool.chmod(0o755)
+    # Directory mtime granularity can hide back-to-back changes
+    st = bin_dir.stat()
+    os.utime(bin_dir, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+class TestGetCapabilities:
+    """Test probing and cache validation."""
+
+    def test_probe_then_cache_hit(self, fake_env: Path, isolated_cache_dir: Path) -> None:
+        """The second call is served from the state file."""
+        first = get_capabilities()
+        second = get_capabilities()
+
+        assert not first.cached and second.cached
+        assert first.has("jq") and not first.has("codex")
+        assert second.tools == first.tools
+        assert (isolated_cache_dir / PROBE_STATE_FILE).exists()
+
+    def test_cache_hit_skips_probing(
+        self, fake_env: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """A valid cache never calls shutil.which."""
+        get_capabilities()
+
+        def _fail(_tool: str) -> None:
+            raise AssertionError("probed despite valid cache")
+
+        monkeypatch.setattr("shutil.which", _fail)
+        assert get_capabilities().cached
+
+    def test_installing_a_tool_invalidates(self, fake_env: Path) -> None:
+        """A changed PATH directory triggers a re-probe."""
+        assert not get_capabilities().has("codex")
+        _add_tool(fake_env, "codex")
+
+        caps = get_capabilities()
+        assert not caps.cached
+        assert caps.has("codex")
+
+    def test_path_change_invalidates(
+        self, fake_env: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """A different PATH value is a different fingerprint."""
+        get_capabilities()
+        monkeypatch.setenv("PATH", f"{fake_env}{os.pathsep}{tmp_path}")
+        assert not get_capabilities().cached
+
+    def test_codex_auth_change_invalidates(self, fake_env: Path, tmp_path: Path) -> None:
+        """Logging in to Codex is picked up without --refresh."""
+        _add_tool(fake_env, "codex")
+        assert not is_codex_available()
+
+        auth = tmp_path / "home" / ".codex" / "auth.json"
+        auth.parent.mkdir()
+        auth.write_text('{"tokens": {"access_token": "t"}}')
+
+        assert is_codex_available()
+        assert get_capabilities().cached
+
+    def test_env_file_is_sourceable(self, fake_env: Path, isolated_cache_dir: Path) -> None:
+        """probe.env exports PILOT_HAS_<TOOL> flags for shell scripts."""
+        get_capabilities()
+        env_file = isolated_cache_dir / PROBE_ENV_FILE
+
+        result = subprocess.run(
+            ["/bin/sh", "-c", f'. "{env_file}"; echo "$PILOT_HAS_JQ $PILOT_HAS_CODEX $PILOT_JQ"'],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        assert result.stdout.split() == ["1", "0", str(fake_env / "jq")]
+
+
+class TestProbeCommand:
+    """Test the `claude-pilot probe` command."""
+
+    def test_json_output(self, fake_env: Path) -> None:
+        """--json reports tools and whether the result was cached."""
+        runner = CliRunner()
+        first = json.loads(runner.invoke(main, ["probe", "--json"]).output)
+        second = json.loads(runner.invoke(main, ["probe", "--json"]).output)
+        refreshed = json.loads(runner.invoke(main, ["probe", "--json", "--refresh"]).output)
+
+        assert first["tools"]["jq"] == str(fake_env / "jq")
+        assert [first["cached"], second["cached"], refreshed["cached"]] == [False, True, False]
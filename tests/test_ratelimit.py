@@ -0,0 +1,184 @@
+"""
+Tests for the shared GitHub rate-limit scheduler.
+"""
+
+from __future__ import annotations
+
+import io
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+import requests
+
+from claude_pilot.ratelimit import GitHubScheduler, RateLimitExceeded
+
+
+def _response(status: int = 200, **headers: Any) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response.raw = io.BytesIO(b"")
+    response.headers.update({k.replace("_", "-"): str(v) for k, v in headers.items()})
+    return response
+
+
+def _limits(remaining: int, reset: float, limit: int = 60) -> dict[str, Any]:
+    return {
+        "X_RateLimit_Limit": limit,
+        "X_RateLimit_Remaining": remaining,
+        "X_RateLimit_Reset": int(reset),
+    }
+
+
+@pytest.fixture
+def scheduler(tmp_path: Path) -> GitHubScheduler:
+    return GitHubScheduler(tmp_path / "bucket.json", max_wait=2)
+
+
+class TestBucket:
+    """Test the header-fed token bucket."""
+
+    def test_unknown_quota_is_not_throttled(self, scheduler: GitHubScheduler) -> None:
+        """Before the first GitHub response every request may go."""
+        for _ in range(3):
+            scheduler.acquire()
+        assert scheduler.state() == {}
+
+    def test_headers_sync_and_tokens_are_taken(self, scheduler: GitHubScheduler) -> None:
+        """Headers set the bucket and acquire() draws from it."""
+        reset = time.time() + 3600
+        scheduler.record(_response(**_limits(2, reset)))
+        scheduler.acquire()
+        assert scheduler.state()["remaining"] == 1
+
+        scheduler.acquire()
+        with pytest.raises(RateLimitExceeded):
+            scheduler.acquire()
+
+    def test_free_responses_give_the_token_back(self, scheduler: GitHubScheduler) -> None:
+        """Conditional requests answered 304 do not drain the local bucket."""
+        reset = time.time() + 3600
+        scheduler.record(_response(**_limits(55, reset)))
+        for _ in range(5):
+            scheduler.acquire()
+            scheduler.record(_response(304, **_limits(55, reset)))
+        assert scheduler.state()["remaining"] == 55
+
+    def test_bucket_is_shared_between_processes(self, tmp_path: Path) -> None:
+        """Schedulers on the same state file (one per process) share the quota."""
+        first = GitHubScheduler(tmp_path / "bucket.json", max_wait=0)
+        second = GitHubScheduler(tmp_path / "bucket.json", max_wait=0)
+        first.record(_response(**_limits(1, time.time() + 3600)))
+
+        second.acquire()
+        with pytest.raises(RateLimitExceeded):
+            first.acquire()
+
+    def test_short_wait_is_deferred(self, scheduler: GitHubScheduler) -> None:
+        """An empty bucket that refills within max_wait delays instead of failing."""
+        reset = time.time() + 1
+        scheduler.record(_response(**_limits(0, reset)))
+
+        scheduler.acquire()
+        assert time.time() >= int(reset)
+        assert scheduler.state()["remaining"] == 59
+
+    def test_rejection_without_headers_cools_down(self, scheduler: GitHubScheduler) -> None:
+        """A bare 429 blocks the bucket for the Retry-After time."""
+        scheduler.record(_response(429, Retry_After=120))
+        with pytest.raises(RateLimitExceeded) as excinfo:
+            scheduler.acquire()
+        assert excinfo.value.reset_at == pytest.approx(time.time() + 120, abs=5)
+
+
+class TestScheduledRequests:
+    """Test get() and coalesce()."""
+
+    def test_exhausted_quota_skips_the_network(
+        self, scheduler: GitHubScheduler, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """A rejection with a distant reset raises; later calls stay off the network."""
+        calls: list[str] = []
+
+        def _get(url: str, **kwargs: Any) -> requests.Response:
+            calls.append(url)
+            return _response(403, **_limits(0, time.time() + 3600))
+
+        monkeypatch.setattr("claude_pilot.network.get", _get)
+        for _ in range(2):
+            with pytest.raises(RateLimitExceeded):
+                scheduler.get("https://api.github.com/x")
+        assert calls == ["https://api.github.com/x"]
+
+    def test_concurrent_lookups_are_coalesced(self, scheduler: GitHubScheduler) -> None:
+        """Threads asking for the same key share one fetch."""
+        release = threading.Event()
+        calls: list[int] = []
+        results: list[str] = []
+
+        def _fetch() -> str:
+            calls.append(1)
+            release.wait(5)
+            return "abc123"
+
+        threads = [
+            threading.Thread(target=lambda: results.append(scheduler.coalesce("k", _fetch)))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert calls == [1]
+        assert results == ["abc123"] * 4
+        assert scheduler.coalesce("k", lambda: "fresh") == "fresh"
+
+    def test_sha_check_served_from_cache_when_exhausted(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """get_github_latest_sha() answers from the ETag cache instead of failing."""
+        from claude_pilot import ratelimit
+        from claude_pilot.updater import get_github_latest_sha
+
+        def _get(url: str, **kwargs: Any) -> requests.Response:
+            response = _response(200, ETag='"v1"', **_limits(0, time.time() + 3600))
+            response._content = b'{"sha": "abc123"}'
+            return response
+
+        monkeypatch.setattr("claude_pilot.network.get", _get)
+        monkeypatch.setattr(ratelimit, "_scheduler", GitHubScheduler(max_wait=0))
+        assert get_github_latest_sha("owner/repo", "main") == "abc123"
+
+        monkeypatch.setattr("claude_pilot.network.get", pytest.fail)
+        assert get_github_latest_sha("owner/repo", "main") == "abc123"
+        assert get_github_latest_sha("owner/other", "main") is None
+
+    def test_tarball_downloads_use_the_bucket(
+        self, monkeypatch: pytest.MonkeyPatch, isolated_cache_dir: Path
+    ) -> None:
+        """Tarball responses re-sync the bucket; a 429 is deferred and retried."""
+        import urllib3
+
+        from claude_pilot import ratelimit
+        from claude_pilot.updater import fetch_github_tarball
+
+        reset = time.time() + 3600
+        replies = [
+            _response(429, Retry_After=0, **_limits(0, time.time())),
+            _response(200, Content_Length=7, **_limits(41, reset)),
+        ]
+        replies[1].raw = urllib3.HTTPResponse(body=io.BytesIO(b"tarball"), preload_content=False)
+        monkeypatch.setattr("claude_pilot.network.get", lambda url, **kwargs: replies.pop(0))
+        scheduler = GitHubScheduler(isolated_cache_dir / "bucket.json", max_wait=2)
+        monkeypatch.setattr(ratelimit, "_scheduler", scheduler)
+
+        cached = fetch_github_tarball("owner/repo", "abc1234")
+        assert cached is not None
+        assert cached.read_bytes() == b"tarball"
+        assert replies == []
+        assert scheduler.state()["remaining"] == 41
@@ -0,0 +1,147 @@
+"""
+Tests for the project scanner behind /92_init.
+"""
+
+from __future__ import annotations
+
+import json
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from claude_pilot import config
+from claude_pilot.cli import main
+from claude_pilot.scan import GitIgnore, scan_project
+
+
+@pytest.fixture
+def project(tmp_path: Path) -> Path:
+    """A small multi-language project with ignored files and tests."""
+    files = {
+        ".gitignore": "*.log\nbuild/\n/secret.txt\n!keep.log\n",
+        "pyproject.toml": "[project]\nname = 'app'\n",
+        "CLAUDE.md": "# App\n",
+        "src/app/__init__.py": "",
+        "src/app/cli.py": "def main():\n    pass\n",
+        "src/app/models.py": "class A:\n    pass\n",
+        "src/app/tool.py": "if __name__ == '__main__':\n    print('x')",
+        "src/app/core/deep/a.py": "a = 1\n",
+        "src/app/core/deep/b.py": "b = 1\n",
+        "src/app/core/deep/c.py": "c = 1\n",
+        "web/package.json": '{"main": "./server.js", "bin": {"web": "bin/web.js"}}',
+        "web/server.js": "console.log(1)\n",
+        "tests/test_models.py": "def test_a():\n    pass\n",
+        "tests/fixtures/data.json": "{}\n",
+        "web/app.test.ts": "it('works', () => {})\n",
+        "debug.log": "ignored\n",
+        "keep.log": "kept\n",
+        "secret.txt": "ignored\n",
+        "nested/secret.txt": "kept\n",
+        "build/out.py": "ignored = True\n",
+        "node_modules/pkg/index.js": "skipped\n",
+    }
+    for rel_path, content in files.items():
+        path = tmp_path / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    return tmp_path
+
+
+class TestGitIgnore:
+    """Test the .gitignore matcher used outside git checkouts."""
+
+    def test_patterns(self) -> None:
+        """Basename, anchored, directory-only, ** and negated patterns."""
+        ignore = GitIgnore()
+        ignore.add("", "*.log\n!keep.log\n/dist\nout/\ndocs/**/*.tmp\n# comment\n")
+        ignore.add("pkg", "local.cfg\n")
+
+        assert ignore.ignored("a/b/debug.log", is_dir=False)
+        assert not ignore.ignored("keep.log", is_dir=False)
+        assert ignore.ignored("dist", is_dir=True)
+        assert not ignore.ignored("src/dist", is_dir=True)
+        assert ignore.ignored("src/out", is_dir=True)
+        assert not ignore.ignored("src/out", is_dir=False)
+        assert ignore.ignored("docs/a/b/x.tmp", is_dir=False)
+        assert ignore.ignored("docs/x.tmp", is_dir=False)
+        assert ignore.ignored("pkg/sub/local.cfg", is_dir=False)
+        assert not ignore.ignored("local.cfg", is_dir=False)
+
+
+class TestScanProject:
+    """Test scan_project()."""
+
+    def test_inventory_without_git(self, project: Path) -> None:
+        """Ignored and skipped files are left out; facts and skeleton are derived."""
+        inventory = scan_project(project, workers=1)
+
+        assert inventory.source == "walk"
+        dirs = {d["path"]: d for d in inventory.directories}
+        assert "build" not in dirs
+        assert not any(p.startswith("node_modules") for p in dirs)
+        assert dirs["."]["files"] == inventory.files == 17
+        assert dirs["src/app"]["source_files"] == 4
+        assert inventory.languages["Python"]["files"] == 8
+        assert inventory.languages["Python"]["lines"] == 11
+
+        assert inventory.entry_points == [
+            {"path": "src/app/cli.py", "kind": "conventional"},
+            {"path": "src/app/tool.py", "kind": "main"},
+            {"path": "web/bin/web.js", "kind": "package.json"},
+            {"path": "web/server.js", "kind": "package.json"},
+        ]
+        assert inventory.tests == [
+            {"path": "tests", "files": 2},
+            {"path": "web", "files": 1},
+        ]
+        assert inventory.manifests == ["pyproject.toml", "web/package.json"]
+        assert [(d["tier"], d["path"], d["exists"]) for d in inventory.skeleton] == [
+            (1, "CLAUDE.md", True),
+            (2, "src/app/CONTEXT.md", False),
+            (3, "src/app/core/deep/CONTEXT.md", False),
+        ]
+
+    @pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+    def test_git_checkout_uses_git_excludes(self, project: Path) -> None:
+        """In a git checkout the file list comes from git and matches the walk."""
+        walked = scan_project(project, workers=1)
+        subprocess.run(["git", "init", "-q"], cwd=project, check=True)
+        (project / ".git/info/exclude").write_text("web/\n")
+
+        inventory = scan_project(project, workers=1)
+        assert inventory.source == "git"
+        assert inventory.files == walked.files - 3
+        assert not any(d["path"].startswith("web") for d in inventory.directories)
+
+    def test_process_pool_matches_inline(
+        self, project: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Chunks scanned by worker processes give the same inventory."""
+        inline = scan_project(project, workers=1).to_dict()
+        monkeypatch.setattr(config, "SCAN_PARALLEL_MIN_FILES", 1)
+        monkeypatch.setattr(config, "SCAN_CHUNK_SIZE", 4)
+
+        pooled = scan_project(project, workers=2).to_dict()
+        assert pooled.pop("workers") in (1, 2)
+        inline.pop("workers")
+        assert pooled == inline
+
+
+class TestScanCommand:
+    """Test `claude-pilot scan`."""
+
+    def test_json_and_output(self, project: Path, tmp_path: Path) -> None:
+        """--json prints the inventory; --output also writes it to a file."""
+        output = tmp_path / "out" / "inventory.json"
+        args = ["scan", "--target-dir", str(project), "--workers", "1"]
+
+        result = CliRunner().invoke(main, [*args, "--json", "--output", str(output)])
+        assert result.exit_code == 0, result.output
+        assert json.loads(result.output) == json.loads(output.read_text())
+
+        result = CliRunner().invoke(main, args)
+        assert result.exit_code == 0
+        assert "Tier 2  draft   src/app/CONTEXT.md" in result.output
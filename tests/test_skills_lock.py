@@ -0,0 +1,190 @@
+"""
+Tests for the external skills lockfile.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import tarfile
+from pathlib import Path
+from typing import Any
+
+import pytest
+from click.testing import CliRunner
+
+from claude_pilot import config
+from claude_pilot.cli import main
+from claude_pilot.skills_lock import (
+    build_entry,
+    load_lock,
+    lock_path,
+    source_dir,
+    verify_skills,
+    write_lock,
+)
+from claude_pilot.updater import sync_external_skills
+
+SOURCE = "vercel-agent-skills"
+SKILLS = {"react/SKILL.md": "# React\n", "next/SKILL.md": "# Next\n"}
+
+
+class FakeGitHub:
+    """Serves a fixed latest SHA and tarballs built from per-ref file sets."""
+
+    def __init__(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        self.latest = "aaa1111"
+        self.refs: dict[str, dict[str, str]] = {"aaa1111": dict(SKILLS)}
+        self.downloads: list[str] = []
+        self.sha_checks = 0
+        self.unavailable: set[str] = set()
+        monkeypatch.setattr("claude_pilot.updater.get_github_latest_sha", self._latest_sha)
+        monkeypatch.setattr("claude_pilot.updater.download_github_tarball", self._download)
+
+    def _latest_sha(self, repo: str, branch: str) -> str | None:
+        self.sha_checks += 1
+        return None if repo in self.unavailable else self.latest
+
+    def _download(self, repo: str, ref: str, dest: Path) -> bool:
+        self.downloads.append(ref)
+        root = f"{repo.replace('/', '-')}-{ref}"
+        with tarfile.open(dest / f"{root}.tar.gz", "w:gz") as tar:
+            for rel_path, content in self.refs[ref].items():
+                info = tarfile.TarInfo(name=f"{root}/skills/{rel_path}")
+                info.size = len(content)
+                tar.addfile(info, io.BytesIO(content.encode()))
+        return True
+
+
+@pytest.fixture
+def github(monkeypatch: pytest.MonkeyPatch) -> FakeGitHub:
+    return FakeGitHub(monkeypatch)
+
+
+@pytest.fixture
+def project(tmp_path: Path, github: FakeGitHub) -> Path:
+    """A project synced (and locked) at the fake latest commit."""
+    assert sync_external_skills(tmp_path) == "success"
+    github.downloads.clear()
+    github.sha_checks = 0
+    return tmp_path
+
+
+class TestLockfile:
+    """Test lock entries and offline verification."""
+
+    def test_entry_roundtrip(self, tmp_path: Path) -> None:
+        """Entries carry per-file digests and a tree digest and survive a roundtrip."""
+        skills_dir = tmp_path / "skills"
+        for rel_path, content in SKILLS.items():
+            (skills_dir / rel_path).parent.mkdir(parents=True, exist_ok=True)
+            (skills_dir / rel_path).write_text(content)
+
+        entry = build_entry(skills_dir, "o/r", "main", "skills", "abc")
+        assert set(entry["files"]) == set(SKILLS)
+        assert entry["files"]["react/SKILL.md"]["size"] == len("# React\n")
+        write_lock(tmp_path, {SOURCE: entry})
+        assert load_lock(tmp_path) == {SOURCE: entry}
+        assert lock_path(tmp_path).read_text().endswith("}\n")
+
+    def test_verify_reports_drift(self, project: Path) -> None:
+        """Modified, missing, extra and unlocked sources are all reported."""
+        assert verify_skills(project).ok
+        installed = source_dir(project, SOURCE)
+        (installed / "react/SKILL.md").write_text("# Reakt\n")
+        (installed / "next/SKILL.md").unlink()
+        (installed / "mine.md").write_text("x")
+
+        report = verify_skills(project)
+        assert report.modified == [f"{SOURCE}/react/SKILL.md"]
+        assert report.missing == [f"{SOURCE}/next/SKILL.md"]
+        assert report.extra == [f"{SOURCE}/mine.md"]
+
+        lock_path(project).unlink()
+        assert verify_skills(project).unlocked == [SOURCE]
+
+
+class TestLockedSync:
+    """Test sync_external_skills() with a lock in place."""
+
+    def test_verified_lock_skips_network(self, project: Path, github: FakeGitHub) -> None:
+        """A matching lock answers the update check without GitHub."""
+        before = lock_path(project).read_bytes()
+        assert sync_external_skills(project) == "already_current"
+        assert github.sha_checks == 0
+        assert lock_path(project).read_bytes() == before
+
+    def test_drift_reinstalls_locked_commit(self, project: Path, github: FakeGitHub) -> None:
+        """Drifted skills are restored from the locked commit, not the latest one."""
+        github.latest = "bbb2222"
+        installed = source_dir(project, SOURCE)
+        (installed / "react/SKILL.md").write_text("# Reakt\n")
+        (installed / "stray.md").write_text("x")
+
+        assert sync_external_skills(project) == "success"
+        assert github.downloads == ["aaa1111"]
+        assert github.sha_checks == 0
+        assert verify_skills(project).ok
+
+    def test_locked_commit_with_other_contents_fails(
+        self, project: Path, github: FakeGitHub
+    ) -> None:
+        """A download that does not match the locked digests is not installed."""
+        (source_dir(project, SOURCE) / "next/SKILL.md").unlink()
+        github.refs["aaa1111"]["react/SKILL.md"] = "# Tampered\n"
+
+        assert sync_external_skills(project) == "failed"
+        assert (source_dir(project, SOURCE) / "react/SKILL.md").read_text() == "# React\n"
+
+    def test_refresh_relocks_latest(self, project: Path, github: FakeGitHub) -> None:
+        """--refresh checks GitHub and locks the new commit's contents."""
+        github.latest = "bbb2222"
+        github.refs["bbb2222"] = {"react/SKILL.md": "# React 2\n"}
+
+        assert sync_external_skills(project, refresh=True) == "success"
+        entry = load_lock(project)[SOURCE]
+        assert entry["ref"] == "bbb2222"
+        assert set(entry["files"]) == {"react/SKILL.md"}
+        assert not (source_dir(project, SOURCE) / "next").exists()
+        assert (project / config.EXTERNAL_SKILLS_VERSION_FILE).read_text() == "bbb2222"
+
+    def test_failed_source_does_not_stop_the_others(
+        self, tmp_path: Path, github: FakeGitHub, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """The remaining sources are installed, locked and cataloged; the result is failed."""
+        monkeypatch.setattr(config, "EXTERNAL_SKILLS", {
+            "broken": {"repo": "acme/broken", "branch": "main", "skills_path": "skills"},
+            **config.EXTERNAL_SKILLS,
+        })
+        github.unavailable.add("acme/broken")
+
+        assert sync_external_skills(tmp_path) == "failed"
+        assert set(load_lock(tmp_path)) == {SOURCE}
+        assert verify_skills(tmp_path).unlocked == ["broken"]
+        catalog = json.loads((tmp_path / config.CATALOG_FILE).read_text())
+        assert {e["name"] for e in catalog["entries"]} == {"react", "next"}
+
+    def test_unlocked_install_is_adopted(self, project: Path, github: FakeGitHub) -> None:
+        """A pre-lock install at the latest commit gets a lock without downloading."""
+        lock_path(project).unlink()
+
+        assert sync_external_skills(project) == "already_current"
+        assert github.downloads == []
+        assert load_lock(project)[SOURCE]["ref"] == "aaa1111"
+
+
+class TestSkillsCommand:
+    """Test `claude-pilot skills verify`."""
+
+    def test_verify_exit_code(self, project: Path) -> None:
+        """Exit 0 when the lock matches, 1 with a JSON report otherwise."""
+        runner = CliRunner()
+        result = runner.invoke(main, ["skills", "--target-dir", str(project), "verify"])
+        assert result.exit_code == 0
+        assert "2 skill files match skills.lock" in result.output
+
+        (source_dir(project, SOURCE) / "react/SKILL.md").write_text("changed\n")
+        result = runner.invoke(main, ["skills", "--target-dir", str(project), "verify", "--json"])
+        assert result.exit_code == 1
+        report: dict[str, Any] = json.loads(result.output)
+        assert report["modified"] == [f"{SOURCE}/react/SKILL.md"]
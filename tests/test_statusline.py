@@ -6,15 +6,20 @@ Tests the statusline.sh script behavior including:
 - Pending count display (always shown, even when 0)
 - Error handling (invalid JSON, missing jq)
 - Edge cases (.gitkeep only, empty pending/)
+- Native Python statusline (claude_pilot.statusline)
 """
 
 from __future__ import annotations
 
+import json
 import subprocess
+import sys
 from pathlib import Path
 
 import pytest
 
+from claude_pilot.statusline import STATUSLINE_CACHE_FILE, get_plan_counts
+
 
 class TestStatuslineScript:
     """Test statusline.sh script functionality."""
@@ -229,3 +234,87 @@ class TestStatuslineScript:
         # In fallback mode (no global hook), should show model name
         # Note: If global hook exists, it might format differently
         assert "Opus" in stdout or "opus" in stdout.lower(), "Expected model name in output"
+
+
+class TestNativeStatusline:
+    """Test the native Python statusline (claude_pilot.statusline)."""
+
+    def run_native(self, cwd: Path, model: str = "Sonnet 4") -> subprocess.CompletedProcess[str]:
+        """Run the native statusline as a module with mock input."""
+        json_input = json.dumps(
+            {"workspace": {"current_dir": str(cwd)}, "model": {"display_name": model}}
+        )
+        src_dir = Path(__file__).parent.parent / "src"
+        return subprocess.run(
+            [sys.executable, "-m", "claude_pilot.statusline"],
+            input=json_input,
+            capture_output=True,
+            text=True,
+            cwd=cwd,
+            env={"PYTHONPATH": str(src_dir), "PATH": "/usr/bin:/bin"},
+        )
+
+    def test_pending_count_without_jq(self, tmp_path: Path) -> None:
+        """Counts pending plans (ignoring .gitkeep) with no jq on PATH."""
+        pending_dir = tmp_path / "my-project" / ".pilot" / "plan" / "pending"
+        pending_dir.mkdir(parents=True)
+        (pending_dir / ".gitkeep").write_text("")
+        (pending_dir / "plan_1.md").write_text("Plan 1")
+        (pending_dir / "plan_2").mkdir()
+
+        result = self.run_native(tmp_path / "my-project", model="Opus")
+
+        assert result.returncode == 0, result.stderr
+        assert "📁 my-project" in result.stdout
+        assert "📋 P:2" in result.stdout
+        assert "Opus" in result.stdout
+
+    def test_missing_pending_directory_shows_p0(self, tmp_path: Path) -> None:
+        """A project without .pilot/ shows P:0."""
+        result = self.run_native(tmp_path)
+
+        assert result.returncode == 0
+        assert "📋 P:0" in result.stdout
+
+    def test_invalid_json_falls_back_to_cwd(self, tmp_path: Path) -> None:
+        """Invalid JSON still prints a statusline for the working directory."""
+        src_dir = Path(__file__).parent.parent / "src"
+        result = subprocess.run(
+            [sys.executable, "-m", "claude_pilot.statusline"],
+            input="invalid json{{{",
+            capture_output=True,
+            text=True,
+            cwd=tmp_path,
+            env={"PYTHONPATH": str(src_dir)},
+        )
+
+        assert result.returncode == 0
+        assert f"📁 {tmp_path.name}" in result.stdout
+
+    def test_counts_cached_by_directory_mtime(self, tmp_path: Path) -> None:
+        """Counts are served from the cache while the directory mtime is unchanged."""
+        import os
+
+        (tmp_path / ".claude").mkdir()
+        pending_dir = tmp_path / ".pilot" / "plan" / "pending"
+        in_progress_dir = tmp_path / ".pilot" / "plan" / "in_progress"
+        pending_dir.mkdir(parents=True)
+        in_progress_dir.mkdir(parents=True)
+        (pending_dir / "a.md").write_text("a")
+        (in_progress_dir / "b.md").write_text("b")
+        old = 1_600_000_000_000_000_000
+        os.utime(pending_dir, ns=(old, old))
+        os.utime(in_progress_dir, ns=(old, old))
+
+        assert get_plan_counts(str(tmp_path)) == {"pending": 1, "in_progress": 1}
+        cache = json.loads((tmp_path / STATUSLINE_CACHE_FILE).read_text())
+        assert cache["pending"] == [old, 1]
+
+        # Stale cache entry with matching mtime is trusted (no directory listing)
+        cache["pending"] = [old, 5]
+        (tmp_path / STATUSLINE_CACHE_FILE).write_text(json.dumps(cache))
+        assert get_plan_counts(str(tmp_path))["pending"] == 5
+
+        # Adding a plan changes the mtime and invalidates the entry
+        (pending_dir / "c.md").write_text("c")
+        assert get_plan_counts(str(tmp_path))["pending"] == 2
@@ -0,0 +1,198 @@
+"""
+Tests for the persistent symbol index.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from claude_pilot import config
+from claude_pilot.cli import main
+from claude_pilot.symbols import SymbolIndex, parse_symbols
+
+PYTHON = '''\
+import os
+
+LIMIT = 10
+
+
+class Store:
+    """A store."""
+
+    class Meta:
+        pass
+
+    def get(self, key):
+        return key
+
+
+async def fetch(url):
+    return url
+
+if os.name == "nt":
+    def windows_only():
+        pass
+'''
+
+
+@pytest.fixture
+def project(tmp_path: Path) -> Path:
+    """A project with Python, TypeScript and Go sources."""
+    files = {
+        "app/store.py": PYTHON,
+        "web/api.ts": "export function getUser(id: string) {}\nexport class Client {}\n",
+        "cmd/main.go": "package main\n\nfunc (s *Server) Start() {}\n\nfunc main() {}\n",
+        "README.md": "# Store\n",
+    }
+    for rel_path, content in files.items():
+        path = tmp_path / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    return tmp_path
+
+
+class TestParseSymbols:
+    """Test the per-language definition parsers."""
+
+    def test_python(self) -> None:
+        """Classes, nested classes, methods, functions and module variables."""
+        assert parse_symbols(PYTHON, "Python") == [
+            ("LIMIT", "variable", 3, None),
+            ("Store", "class", 6, None),
+            ("Meta", "class", 9, "Store"),
+            ("get", "method", 12, "Store"),
+            ("fetch", "function", 16, None),
+            ("windows_only", "function", 20, None),
+        ]
+        assert parse_symbols("def broken(:\n", "Python") == []
+
+    def test_typescript(self) -> None:
+        """Functions, arrow functions, classes, interfaces, types, enums and constants."""
+        text = (
+            "export async function load() {}\n"
+            "export const handler = async (event) => event\n"
+            "const LIMIT = 3\n"
+            "export interface User {}\n"
+            "export type Id<T> = string\n"
+            "export default class App {}\n"
+            "export const enum Color { Red }\n"
+        )
+        assert [(name, kind, line) for name, kind, line, _ in parse_symbols(text, "TypeScript")] == [
+            ("load", "function", 1),
+            ("handler", "function", 2),
+            ("LIMIT", "variable", 3),
+            ("User", "interface", 4),
+            ("Id", "type", 5),
+            ("App", "class", 6),
+            ("Color", "enum", 7),
+        ]
+
+    def test_go_rust_shell(self) -> None:
+        """Go methods are scoped by receiver; Rust items and shell functions are found."""
+        go = (
+            "func (s *Server) Start() {}\ntype Server struct {}\nconst Port = 80\n"
+            "func (Server) Stop() {}\nfunc (*Server) Wait() {}\nfunc (c Cache[K]) Get() {}\n"
+        )
+        assert parse_symbols(go, "Go") == [
+            ("Start", "method", 1, "Server"),
+            ("Server", "struct", 2, None),
+            ("Port", "constant", 3, None),
+            ("Stop", "method", 4, "Server"),
+            ("Wait", "method", 5, "Server"),
+            ("Get", "method", 6, "Cache"),
+        ]
+        rust = "pub async fn run() {}\npub(crate) enum Mode {}\nmacro_rules! log {}\n"
+        assert [row[:2] for row in parse_symbols(rust, "Rust")] == [
+            ("run", "function"), ("Mode", "enum"), ("log", "macro"),
+        ]
+        shell = "setup() {\n}\nfunction cleanup {\n}\n"
+        assert [row[0] for row in parse_symbols(shell, "Shell")] == ["setup", "cleanup"]
+
+
+class TestSymbolIndex:
+    """Test SymbolIndex refresh, incremental updates and lookups."""
+
+    def test_find(self, project: Path) -> None:
+        """Exact, dotted, prefix, case-insensitive and kind-filtered lookups."""
+        with SymbolIndex(project) as index:
+            [get] = index.find("Store.get")
+            assert (get.path, get.line, get.kind) == ("app/store.py", 12, "method")
+            assert [s.path for s in index.find("Server.Start")] == ["cmd/main.go"]
+            assert [s.name for s in index.find("get", prefix=True)] == ["get", "getUser"]
+            assert [s.name for s in index.find("client", ignore_case=True)] == ["Client"]
+            assert index.find("Store", kind="function") == []
+            assert index.stats() == {"files": 3, "symbols": 10}
+
+    def test_incremental_by_content_hash(self, project: Path) -> None:
+        """Touched files are not re-parsed; edited files are; deleted files are dropped."""
+        with SymbolIndex(project) as index:
+            assert index.refresh() == 3
+            assert index.refresh() == 0
+
+            api = project / "web/api.ts"
+            os.utime(api, ns=(1, 1))
+            assert index.refresh() == 0
+
+            api.write_text("export function getAccount() {}\n")
+            (project / "cmd/main.go").unlink()
+            assert index.refresh() == 2
+            assert index.find("getUser") == []
+            assert index.find("Server.Start") == []
+            assert [s.line for s in index.find("getAccount")] == [1]
+
+    def test_update_files(self, project: Path) -> None:
+        """Single files are re-indexed from absolute or relative paths."""
+        with SymbolIndex(project) as index:
+            index.refresh()
+            (project / "app/new.py").write_text("def added():\n    pass\n")
+
+            assert index.update_files([project / "app/new.py", "README.md"]) == 1
+            assert index.update_files(["app/new.py"]) == 0
+            assert [s.path for s in index.find("added")] == ["app/new.py"]
+
+            (project / "app/new.py").unlink()
+            assert index.update_files(["app/new.py"]) == 1
+            assert index.find("added") == []
+
+    def test_process_pool_build(self, project: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Chunks parsed by worker processes give the same index."""
+        monkeypatch.setattr(config, "SCAN_PARALLEL_MIN_FILES", 1)
+        monkeypatch.setattr(config, "SCAN_CHUNK_SIZE", 1)
+        with SymbolIndex(project) as index:
+            assert index.refresh(workers=2) == 3
+            assert index.stats() == {"files": 3, "symbols": 10}
+
+
+class TestIndexCommand:
+    """Test `claude-pilot index`."""
+
+    def test_find_and_hook_update(self, project: Path) -> None:
+        """find builds the index on first use; the hook updates the edited file."""
+        runner = CliRunner()
+        base = ["index", "--target-dir", str(project)]
+
+        # Before the first build the hook does not index the whole project
+        payload = json.dumps({"tool_input": {"file_path": str(project / "web/api.ts")}})
+        result = runner.invoke(main, [*base, "update", "--hook-input", "--json"], input=payload)
+        assert result.exit_code == 0, result.output
+        assert json.loads(result.output) == {"changed": 0, "files": 0, "symbols": 0}
+
+        result = runner.invoke(main, [*base, "find", "Store.get"])
+        assert result.exit_code == 0, result.output
+        assert result.output.strip() == "app/store.py:12  method    Store.get"
+
+        (project / "app/store.py").write_text("def get_store():\n    pass\n")
+        payload = json.dumps({"tool_input": {"file_path": str(project / "app/store.py")}})
+        result = runner.invoke(main, [*base, "update", "--hook-input", "--json"], input=payload)
+        assert result.exit_code == 0, result.output
+        assert json.loads(result.output)["changed"] == 1
+
+        result = runner.invoke(main, [*base, "find", "get_store", "--json"])
+        assert [s["line"] for s in json.loads(result.output)] == [1]
+        result = runner.invoke(main, [*base, "find", "Store"])
+        assert result.exit_code == 1
@@ -0,0 +1,129 @@
+"""
+Tests for the non-blocking background update check.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from claude_pilot.cli import main
+from claude_pilot.update_check import (
+    UPDATE_CHECK_FILE,
+    UPDATE_CHECK_LOCK_FILE,
+    get_cached_latest_version,
+    refresh,
+    spawn_refresh,
+)
+
+
+@pytest.fixture
+def spawned(monkeypatch: pytest.MonkeyPatch) -> list[list[str]]:
+    """Enable background checks and record spawned worker commands."""
+    calls: list[list[str]] = []
+
+    def _popen(args: list[str], **kwargs: Any) -> None:
+        assert kwargs["start_new_session"] is True
+        calls.append(args)
+
+    monkeypatch.delenv("CLAUDE_PILOT_NO_UPDATE_CHECK")
+    monkeypatch.setattr("subprocess.Popen", _popen)
+    return calls
+
+
+def _write_state(cache_dir: Path, latest: str, age: float) -> None:
+    (cache_dir / UPDATE_CHECK_FILE).write_text(
+        json.dumps({"latest": latest, "checked_at": time.time() - age})
+    )
+
+
+class TestCachedLatestVersion:
+    """Test get_cached_latest_version()."""
+
+    def test_no_cache_returns_none_and_spawns(
+        self, spawned: list[list[str]], isolated_cache_dir: Path
+    ) -> None:
+        """The first call answers immediately and starts one worker."""
+        assert get_cached_latest_version() is None
+        assert get_cached_latest_version() is None
+        assert len(spawned) == 1
+        assert spawned[0][1:] == ["-m", "claude_pilot.update_check"]
+
+    def test_fresh_cache_does_not_spawn(
+        self, spawned: list[list[str]], isolated_cache_dir: Path
+    ) -> None:
+        """A recent check is reused without any process or network call."""
+        _write_state(isolated_cache_dir, "9.9.9", age=60)
+        assert get_cached_latest_version() == "9.9.9"
+        assert spawned == []
+
+    def test_stale_cache_returns_old_value_and_spawns(
+        self, spawned: list[list[str]], isolated_cache_dir: Path
+    ) -> None:
+        """A stale value is still returned while the refresh runs."""
+        _write_state(isolated_cache_dir, "9.9.8", age=2 * 86400)
+        assert get_cached_latest_version() == "9.9.8"
+        assert len(spawned) == 1
+
+    def test_disabled_by_env(self, isolated_cache_dir: Path) -> None:
+        """CLAUDE_PILOT_NO_UPDATE_CHECK suppresses the worker."""
+        with patch("subprocess.Popen") as popen:
+            assert get_cached_latest_version() is None
+        assert not popen.called
+
+    def test_stale_lock_is_taken_over(
+        self, spawned: list[list[str]], isolated_cache_dir: Path
+    ) -> None:
+        """A worker that died without removing its lock does not block forever."""
+        lock = isolated_cache_dir / UPDATE_CHECK_LOCK_FILE
+        lock.touch()
+        assert not spawn_refresh()
+        old = time.time() - 3600
+        os.utime(lock, (old, old))
+        assert spawn_refresh()
+
+
+class TestRefresh:
+    """Test the worker body."""
+
+    def test_refresh_stores_latest_and_releases_lock(self, isolated_cache_dir: Path) -> None:
+        """A successful query is stored and the lock removed."""
+        (isolated_cache_dir / UPDATE_CHECK_LOCK_FILE).touch()
+        with patch("claude_pilot.updater.get_pypi_version", return_value="5.0.0"):
+            assert refresh() == "5.0.0"
+        assert not (isolated_cache_dir / UPDATE_CHECK_LOCK_FILE).exists()
+        assert get_cached_latest_version() == "5.0.0"
+
+    def test_failed_query_keeps_previous_value(self, isolated_cache_dir: Path) -> None:
+        """Offline refreshes keep the old answer but reset the interval."""
+        _write_state(isolated_cache_dir, "4.9.0", age=2 * 86400)
+        with patch("claude_pilot.updater.get_pypi_version", return_value=None):
+            assert refresh() == "4.9.0"
+        state = json.loads((isolated_cache_dir / UPDATE_CHECK_FILE).read_text())
+        assert time.time() - state["checked_at"] < 60
+
+
+class TestVersionCommand:
+    """Test that `claude-pilot version` never queries PyPI."""
+
+    def test_version_uses_cache(self, isolated_cache_dir: Path) -> None:
+        """The cached latest version is shown without a network call."""
+        _write_state(isolated_cache_dir, "9.9.9", age=60)
+        with patch("claude_pilot.updater.get_pypi_version", side_effect=AssertionError):
+            result = CliRunner().invoke(main, ["version"])
+        assert result.exit_code == 0
+        assert "Latest:  9.9.9" in result.output
+
+    def test_version_without_cache(self, isolated_cache_dir: Path) -> None:
+        """Before the first check the latest version is reported as unknown."""
+        with patch("claude_pilot.updater.get_pypi_version", side_effect=AssertionError):
+            result = CliRunner().invoke(main, ["version"])
+        assert result.exit_code == 0
+        assert "Latest:  unknown (checking in background)" in result.output
@@ -253,7 +253,7 @@ class TestGetPypiVersionEdgeCases:
             import requests
             raise requests.exceptions.HTTPError("404 Not Found")
 
-        monkeypatch.setattr("requests.get", _mock_get_http_error)
+        monkeypatch.setattr("claude_pilot.network.get", _mock_get_http_error)
 
         from claude_pilot.updater import get_pypi_version
 
@@ -514,6 +514,43 @@ class TestApplyStatusline:
         assert "statusLine" in settings
 
 
+class TestApplyNativeStatusline:
+    """Test apply_statusline(native=True)."""
+
+    def test_native_replaces_stock_script(self, tmp_path: Path) -> None:
+        """The stock statusline.sh command is swapped for the native entry point."""
+        import json
+
+        from claude_pilot.updater import apply_statusline
+
+        settings_path = tmp_path / ".claude" / "settings.json"
+        settings_path.parent.mkdir(parents=True)
+        settings_path.write_text(json.dumps({
+            "language": "en",
+            "statusLine": {"type": "command", "command": config.STATUSLINE_SCRIPT_COMMAND},
+        }))
+
+        assert apply_statusline(tmp_path, native=True) is True
+
+        settings = json.loads(settings_path.read_text())
+        assert settings["statusLine"]["command"] == config.STATUSLINE_NATIVE_COMMAND
+        assert settings["language"] == "en"
+
+    def test_native_preserves_custom_statusline(self, tmp_path: Path) -> None:
+        """A user-defined statusLine command is never replaced."""
+        import json
+
+        from claude_pilot.updater import apply_statusline
+
+        settings_path = tmp_path / ".claude" / "settings.json"
+        settings_path.parent.mkdir(parents=True)
+        custom = {"type": "command", "command": "my-statusline"}
+        settings_path.write_text(json.dumps({"statusLine": custom}))
+
+        assert apply_statusline(tmp_path, native=True) is True
+        assert json.loads(settings_path.read_text())["statusLine"] == custom
+
+
 class TestApplyHooks:
     """Test apply_hooks() function."""
 
@@ -718,3 +755,83 @@ class TestApplyHooks:
 
         result = apply_hooks(tmp_path)
         assert result is False, "Should return False for invalid JSON"
+
+
+class TestUpgradePlan:
+    """Test version-to-version diffs computed from the shipped asset history."""
+
+    @pytest.fixture
+    def assets(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+        """Packaged assets whose history knows v1.0 and the current version."""
+        import json
+
+        from claude_pilot.assets import file_digest, write_asset_index
+
+        assets_dir = tmp_path / "assets"
+        (assets_dir / ".claude" / "commands").mkdir(parents=True)
+        (assets_dir / ".claude" / "commands" / "00_plan.md").write_text("# Plan v2\n")
+        (assets_dir / ".claude" / "commands" / "01_new.md").write_text("# New\n")
+        (assets_dir / ".claude" / "commands" / "keep.md").write_text("# Keep\n")
+        write_asset_index(assets_dir)
+
+        old_file = tmp_path / "old.md"
+        old_file.write_text("# Old\n")
+        (assets_dir / ".asset-history.json").write_text(json.dumps({
+            "version": 1,
+            "versions": {
+                "1.0": {
+                    ".claude/commands/00_plan.md": "1" * 16,
+                    ".claude/commands/keep.md": file_digest(
+                        assets_dir / ".claude" / "commands" / "keep.md"
+                    )[:16],
+                    ".claude/commands/old.md": file_digest(old_file)[:16],
+                    ".claude/commands/edited.md": file_digest(old_file)[:16],
+                },
+            },
+        }))
+        monkeypatch.setattr("claude_pilot.config.get_templates_path", lambda: assets_dir)
+        return assets_dir
+
+    def test_plan_from_known_version(self, assets: Path) -> None:
+        """Added, modified and removed files come from manifests alone."""
+        from claude_pilot.updater import plan_upgrade
+
+        plan = plan_upgrade("1.0")
+        assert plan.known
+        assert plan.added == [".claude/commands/01_new.md"]
+        assert plan.modified == [".claude/commands/00_plan.md"]
+        assert plan.removed == [".claude/commands/edited.md", ".claude/commands/old.md"]
+        assert plan.unchanged == 1
+
+    def test_plan_from_unknown_version(self, assets: Path) -> None:
+        """Versions older than the history are reported as unknown."""
+        from claude_pilot.updater import plan_upgrade
+
+        assert not plan_upgrade("0.1").known
+
+    def test_remove_obsolete_files_keeps_local_edits(self, assets: Path, tmp_path: Path) -> None:
+        """Dropped files are deleted only if they still match the old version."""
+        from claude_pilot.updater import plan_upgrade, remove_obsolete_files
+
+        commands = tmp_path / "project" / ".claude" / "commands"
+        commands.mkdir(parents=True)
+        (commands / "old.md").write_text("# Old\n")
+        (commands / "edited.md").write_text("# Old, edited\n")
+
+        removed = remove_obsolete_files(tmp_path / "project", plan_upgrade("1.0"))
+        assert removed == [".claude/commands/old.md"]
+        assert (commands / "edited.md").exists()
+
+    def test_check_only_reports_file_changes(
+        self, assets: Path, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        """--check-only lists the managed file changes without touching the project."""
+        from claude_pilot.updater import perform_update
+
+        with patch("claude_pilot.updater.get_pypi_version", return_value=None):
+            with patch("claude_pilot.updater.get_current_version", return_value="1.0"):
+                perform_update(check_only=True)
+
+        output = capsys.readouterr().out
+        assert "1 added, 1 modified, 2 removed, 1 unchanged" in output
+        assert "- .claude/commands/old.md" in output
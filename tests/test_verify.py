@@ -0,0 +1,170 @@
+"""
+Tests for managed file integrity verification.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+from click.testing import CliRunner
+
+from claude_pilot import config
+from claude_pilot.assets import ASSET_INDEX_FILE, load_asset_index, write_asset_index
+from claude_pilot.cli import main
+from claude_pilot.verify import verify_project
+
+ASSETS = {
+    ".claude/commands/00_plan.md": "# Plan\n",
+    ".claude/agents/coder.md": "# Coder\n",
+    ".claude/rules/core/workflow.md": "# Workflow\n",
+    ".claude/settings.json": "{}\n",
+    ".claude/.pilot-version": config.VERSION,
+}
+
+
+@pytest.fixture
+def index(tmp_path: Path) -> dict[str, dict[str, Any]]:
+    """Build an assets directory and return its digest index."""
+    assets_dir = tmp_path / "assets"
+    for rel_path, content in ASSETS.items():
+        path = assets_dir / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    write_asset_index(assets_dir)
+    return load_asset_index(assets_dir)
+
+
+@pytest.fixture
+def project(tmp_path: Path) -> Path:
+    """A project with every asset installed and settled (old mtimes)."""
+    project_dir = tmp_path / "project"
+    for rel_path, content in ASSETS.items():
+        path = project_dir / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    _age(project_dir)
+    return project_dir
+
+
+def _age(project_dir: Path) -> None:
+    old = time.time() - 60
+    for path in (project_dir / ".claude").rglob("*"):
+        if path.is_file():
+            os.utime(path, (old, old))
+
+
+class TestAssetIndex:
+    """Test asset digest index generation."""
+
+    def test_index_written_and_loaded(self, tmp_path: Path, index: dict[str, Any]) -> None:
+        """The index covers every asset but not itself."""
+        assert set(index) == set(ASSETS)
+        assert index[".claude/commands/00_plan.md"]["size"] == len("# Plan\n")
+        assert ASSET_INDEX_FILE not in index
+
+    def test_load_computes_without_index_file(self, tmp_path: Path, index: dict[str, Any]) -> None:
+        """A tree built without the index (editable install) is hashed on demand."""
+        (tmp_path / "assets" / ASSET_INDEX_FILE).unlink()
+        assert load_asset_index(tmp_path / "assets") == index
+
+
+class TestVerifyProject:
+    """Test verify_project()."""
+
+    def test_clean_project(self, project: Path, index: dict[str, Any]) -> None:
+        """Unchanged files verify, skipping merge-only and version files."""
+        report = verify_project(project, index)
+
+        assert report.ok
+        assert report.checked == 3
+        assert report.modified == report.missing == report.extra == []
+
+    def test_second_run_hashes_nothing(self, project: Path, index: dict[str, Any]) -> None:
+        """The stat cache answers unchanged files without hashing."""
+        assert verify_project(project, index).hashed == 3
+        assert verify_project(project, index).hashed == 0
+        assert verify_project(project, index, rehash=True).hashed == 3
+
+    def test_same_size_edit_detected(self, project: Path, index: dict[str, Any]) -> None:
+        """An edit that keeps the size is caught through the mtime change."""
+        verify_project(project, index)
+        (project / ".claude/commands/00_plan.md").write_text("# Plom\n")
+
+        report = verify_project(project, index)
+        assert report.modified == [".claude/commands/00_plan.md"]
+        assert report.hashed == 1
+
+    def test_size_change_detected_without_hashing(
+        self, project: Path, index: dict[str, Any]
+    ) -> None:
+        """A size mismatch is a modification without reading the file."""
+        (project / ".claude/agents/coder.md").write_text("# Coder, customized\n")
+
+        report = verify_project(project, index)
+        assert report.modified == [".claude/agents/coder.md"]
+        assert report.hashed == 2
+
+    def test_missing_and_extra(self, project: Path, index: dict[str, Any]) -> None:
+        """Deleted managed files are missing; unshipped managed-looking files are extra."""
+        (project / ".claude/rules/core/workflow.md").unlink()
+        (project / ".claude/agents/mine.md").write_text("# Mine\n")
+        (project / ".claude/local").mkdir()
+        (project / ".claude/local/notes.md").write_text("ignored")
+        shutil.rmtree(project / ".claude/commands")
+
+        report = verify_project(project, index)
+        assert not report.ok
+        assert report.missing == [
+            ".claude/commands/00_plan.md",
+            ".claude/rules/core/workflow.md",
+        ]
+        assert report.extra == [".claude/agents/mine.md"]
+
+
+class TestVerifyCommand:
+    """Test the `claude-pilot verify` command."""
+
+    def test_json_and_exit_code(
+        self, project: Path, index: dict[str, Any], monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Exit 0 when clean, 1 with a JSON report when a file is modified."""
+        monkeypatch.setattr("claude_pilot.verify.load_asset_index", lambda: index)
+        runner = CliRunner()
+
+        result = runner.invoke(main, ["verify", "--target-dir", str(project)])
+        assert result.exit_code == 0
+        assert "3 managed files checked" in result.output
+
+        (project / ".claude/agents/coder.md").write_text("changed\n")
+        result = runner.invoke(main, ["verify", "--target-dir", str(project), "--json"])
+        assert result.exit_code == 1
+        assert json.loads(result.output)["modified"] == [".claude/agents/coder.md"]
+
+    def test_outdated_project_is_not_compared(
+        self, project: Path, index: dict[str, Any], monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """A project installed by another release fails with a version message, not diffs."""
+        monkeypatch.setattr("claude_pilot.verify.load_asset_index", lambda: index)
+        (project / ".claude/.pilot-version").write_text("0.9.0\n")
+        (project / ".claude/agents/coder.md").write_text("# Coder (0.9.0)\n")
+        runner = CliRunner()
+
+        result = runner.invoke(main, ["verify", "--target-dir", str(project)])
+        assert result.exit_code == 1
+        assert (
+            f"Project is at version 0.9.0, installed claude-pilot is {config.VERSION}"
+            in result.output
+        )
+        assert "coder.md" not in result.output
+
+        result = runner.invoke(main, ["verify", "--target-dir", str(project), "--json"])
+        report = json.loads(result.output)
+        assert report["outdated"] is True
+        assert (report["project_version"], report["package_version"]) == ("0.9.0", config.VERSION)
+        assert report["modified"] == []
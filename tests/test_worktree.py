@@ -0,0 +1,363 @@
+"""
+Tests for the pre-warmed worktree pool (claude_pilot.worktree).
+"""
+
+from __future__ import annotations
+
+import json
+import subprocess
+import time
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from claude_pilot import config
+from claude_pilot.cli import main
+from claude_pilot.worktree import (
+    WorktreeError,
+    WorktreeManager,
+    WorktreeMetadata,
+    WorktreePool,
+    parse_scope_paths,
+    parse_worktree_section,
+    plan_to_branch,
+    write_worktree_section,
+)
+
+
+def _git(repo: Path, *args: str) -> str:
+    result = subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True, text=True)
+    return result.stdout.strip()
+
+
+@pytest.fixture
+def git_repo(tmp_path: Path) -> Path:
+    """Create a git repository on branch main with an ignored dependency dir."""
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    _git(repo, "init", "-b", "main")
+    _git(repo, "config", "user.email", "test@example.com")
+    _git(repo, "config", "user.name", "Test User")
+    (repo / "README.md").write_text("# Test Repo\n")
+    (repo / ".gitignore").write_text(".pilot/\nnode_modules/\n")
+    _git(repo, "add", ".")
+    _git(repo, "commit", "-m", "Initial commit")
+    return repo
+
+
+def test_plan_to_branch() -> None:
+    """Plan file names map to feature branches."""
+    assert plan_to_branch("20260117_120000_test.md") == "feature/20260117-120000-test"
+    assert plan_to_branch("/p/.pilot/plan/pending/20260117_120000_a_b.md") == (
+        "feature/20260117-120000-a-b"
+    )
+
+
+class TestWorktreePool:
+    """Test pool fill, lease and release."""
+
+    def test_fill_creates_detached_slots_with_setup(self, git_repo: Path) -> None:
+        """Slots are sibling worktrees with the setup command already run."""
+        pool = WorktreePool(git_repo)
+        created = pool.fill(size=2, setup="mkdir -p node_modules && touch node_modules/dep")
+
+        assert len(created) == 2
+        for path in map(Path, created):
+            assert path.parent == git_repo.parent / "repo-wt-pool"
+            assert (path / "node_modules" / "dep").exists()
+        assert [s["state"] for s in pool.status()["slots"]] == ["ready", "ready"]
+        assert pool.status()["main_branch"] == "main"
+
+    def test_lease_and_release_recycles_slot(self, git_repo: Path) -> None:
+        """Release resets tracked/untracked changes but keeps ignored installs."""
+        pool = WorktreePool(git_repo)
+        pool.fill(size=1, setup="mkdir -p node_modules && touch node_modules/dep")
+
+        path = pool.lease("20260117_120000_test.md")
+        assert _git(path, "rev-parse", "--abbrev-ref", "HEAD") == "feature/20260117-120000-test"
+        (path / "README.md").write_text("changed\n")
+        (path / "scratch.txt").write_text("untracked\n")
+
+        assert pool.release("20260117_120000_test.md") == path
+        assert (path / "README.md").read_text() == "# Test Repo\n"
+        assert not (path / "scratch.txt").exists()
+        assert (path / "node_modules" / "dep").exists()
+        assert _git(git_repo, "branch", "--list", "feature/20260117-120000-test")
+        assert pool.status()["slots"][0]["state"] == "ready"
+
+    def test_leases_are_exclusive_and_pool_grows_on_demand(self, git_repo: Path) -> None:
+        """Each plan gets its own slot; extra slots are removed on release."""
+        pool = WorktreePool(git_repo)
+        pool.fill(size=1)
+
+        first = pool.lease("20260117_120000_a.md")
+        second = pool.lease("20260117_120000_b.md")
+        assert first != second
+        assert pool.lease("20260117_120000_a.md") == first
+
+        pool.release(str(second), delete_branch=True)
+        assert not second.exists()
+        assert not _git(git_repo, "branch", "--list", "feature/20260117-120000-b")
+        assert len(pool.status()["slots"]) == 1
+
+    def test_abandoned_creating_slots_are_reclaimed(
+        self, git_repo: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """A slot stuck in "creating" past the timeout is removed; a fresh one is kept."""
+        pool = WorktreePool(git_repo)
+        stale, fresh = map(Path, pool.fill(size=2))
+        state = json.loads(pool.state_path.read_text())
+        state["slots"][0].update(state="creating", creating_at=1.0)
+        state["slots"][1].update(state="creating", creating_at=time.time())
+        pool.state_path.write_text(json.dumps(state))
+
+        assert [s["path"] for s in pool.status()["slots"]] == [str(fresh)]
+        assert not stale.exists()
+        assert fresh.is_dir()
+
+        monkeypatch.setattr(config, "WORKTREE_POOL_CREATING_TIMEOUT", 0)
+        pool.fill()
+        assert [s["state"] for s in pool.status()["slots"]] == ["ready", "ready"]
+
+    def test_release_unknown_plan_returns_none(self, git_repo: Path) -> None:
+        """Releasing a plan without a lease is a no-op."""
+        assert WorktreePool(git_repo).release("nothing.md") is None
+
+
+class TestPoolCommand:
+    """Test the `worktree pool` CLI."""
+
+    def test_pool_lease_prints_path(self, git_repo: Path) -> None:
+        """`worktree pool lease` prints only the worktree path."""
+        runner = CliRunner()
+        base = ["worktree", "--target-dir", str(git_repo), "pool"]
+        assert runner.invoke(main, [*base, "fill", "--size", "1"]).exit_code == 0
+
+        result = runner.invoke(main, [*base, "lease", "20260117_120000_test.md"])
+        assert result.exit_code == 0
+        assert Path(result.output.strip()).is_dir()
+
+        status = runner.invoke(main, [*base, "status", "--json"])
+        slots = json.loads(status.output)["slots"]
+        assert slots[0]["plan"] == "20260117_120000_test.md"
+
+
+PLAN_WITH_SECTION = """# Test Plan
+
+## Worktree Info
+
+- Branch: feature/20260117-120000-test
+- Worktree Path: /absolute/path/to/worktree
+- Main Branch: main
+- Main Project: /absolute/path/to/main/project
+- Lock File: /absolute/path/to/.locks/test.md.lock
+- Created At: 2026-01-17T12:00:00
+
+## Notes
+
+Keep me.
+"""
+
+
+@pytest.fixture
+def plan_repo(git_repo: Path) -> Path:
+    """Add plan directories with two pending plans."""
+    plan_dir = git_repo / ".pilot" / "plan"
+    for state in ("pending", "in_progress", "done", "active"):
+        (plan_dir / state).mkdir(parents=True)
+    (plan_dir / "pending" / "20260117_120000_test.md").write_text("# Test\n")
+    (plan_dir / "pending" / "20260118_090000_other.md").write_text("# Other\n")
+    return git_repo
+
+
+class TestWorktreeMetadata:
+    """Test metadata parsing and rendering."""
+
+    def test_parse_worktree_section(self) -> None:
+        """All fields of a multi-line section are parsed."""
+        metadata = parse_worktree_section(PLAN_WITH_SECTION)
+
+        assert metadata is not None
+        assert metadata.branch == "feature/20260117-120000-test"
+        assert metadata.main_project == "/absolute/path/to/main/project"
+        assert metadata.lock_file == "/absolute/path/to/.locks/test.md.lock"
+        assert parse_worktree_section("# Plan\n\n## Notes\n- Branch: x\n") is None
+
+    def test_write_section_replaces_in_place(self, tmp_path: Path) -> None:
+        """Rewriting keeps following sections and does not duplicate the section."""
+        plan = tmp_path / "plan.md"
+        plan.write_text(PLAN_WITH_SECTION)
+        metadata = WorktreeMetadata("feature/x", "/wt", "main", "/main", "/lock", "now")
+
+        write_worktree_section(plan, metadata)
+
+        text = plan.read_text()
+        assert text.count("## Worktree Info") == 1
+        assert "- Worktree Path: /wt" in text
+        assert text.endswith("## Notes\n\nKeep me.\n")
+        assert parse_worktree_section(text) == metadata
+
+        write_worktree_section(plan, None)
+        assert plan.read_text() == "# Test Plan\n\n## Notes\n\nKeep me.\n"
+
+
+class TestWorktreeManager:
+    """Test the per-plan worktree lifecycle."""
+
+    def test_create_records_metadata_lock_and_pointers(self, plan_repo: Path) -> None:
+        """create() makes the worktree and records everything the close flow needs."""
+        manager = WorktreeManager(plan_repo)
+        metadata = manager.create("20260117_120000_test.md")
+
+        path = Path(metadata.worktree_path)
+        assert path == (plan_repo.parent / "repo-wt-20260117-120000-test").resolve()
+        assert _git(path, "rev-parse", "--abbrev-ref", "HEAD") == "feature/20260117-120000-test"
+        assert metadata.main_branch == "main"
+        assert Path(metadata.lock_file).is_dir()
+
+        plan_path = plan_repo / ".pilot" / "plan" / "pending" / "20260117_120000_test.md"
+        assert parse_worktree_section(plan_path.read_text()) == metadata
+        active = plan_repo / ".pilot" / "plan" / "active"
+        assert sorted(p.name for p in active.iterdir()) == [
+            "feature_20260117-120000-test.txt",
+            "main.txt",
+        ]
+        assert manager.get_metadata("20260117_120000_test") == metadata
+        assert manager.list_worktrees()[str(path)] == "feature/20260117-120000-test"
+
+    def test_locked_plan_is_refused(self, plan_repo: Path) -> None:
+        """Another session's lock prevents creating the worktree."""
+        manager = WorktreeManager(plan_repo)
+        assert manager.acquire_lock("20260117_120000_test.md") is not None
+
+        with pytest.raises(WorktreeError, match="locked"):
+            manager.create("20260117_120000_test.md")
+        assert manager.select_and_lock_pending() == (
+            plan_repo / ".pilot" / "plan" / "pending" / "20260118_090000_other.md"
+        )
+        assert manager.select_and_lock_pending() is None
+
+    def test_cleanup_removes_dirty_worktree(self, plan_repo: Path) -> None:
+        """cleanup() force-removes the worktree and clears branch, lock and pointers."""
+        manager = WorktreeManager(plan_repo)
+        metadata = manager.create("20260117_120000_test.md")
+        (Path(metadata.worktree_path) / "dirty.txt").write_text("uncommitted\n")
+
+        assert manager.cleanup("20260117_120000_test.md") == metadata
+        assert not Path(metadata.worktree_path).exists()
+        assert not Path(metadata.lock_file).exists()
+        assert "feature/20260117-120000-test" not in manager.local_branches()
+        assert list((plan_repo / ".pilot" / "plan" / "active").iterdir()) == []
+        assert manager.get_metadata("20260117_120000_test.md") is None
+
+    def test_markdown_only_metadata_is_read(self, plan_repo: Path) -> None:
+        """Plans written by the shell scripts (section only) are still understood."""
+        plan = plan_repo / ".pilot" / "plan" / "in_progress" / "20260117_120000_legacy.md"
+        plan.write_text(PLAN_WITH_SECTION)
+
+        metadata = WorktreeManager(plan_repo).get_metadata("20260117_120000_legacy.md")
+        assert metadata is not None
+        assert metadata.worktree_path == "/absolute/path/to/worktree"
+
+    def test_create_with_pool_leases_slot(self, plan_repo: Path) -> None:
+        """--pool leases a pre-warmed slot and cleanup returns it to the pool."""
+        WorktreePool(plan_repo).fill(size=1)
+        manager = WorktreeManager(plan_repo)
+
+        metadata = manager.create("20260117_120000_test.md", use_pool=True)
+        assert Path(metadata.worktree_path).parent.name == "repo-wt-pool"
+
+        manager.cleanup("20260117_120000_test.md")
+        assert Path(metadata.worktree_path).is_dir()
+        assert WorktreePool(plan_repo).status()["slots"][0]["state"] == "ready"
+
+
+class TestWorktreeCommand:
+    """Test the `worktree create|info|cleanup` commands."""
+
+    def test_create_next_and_info(self, plan_repo: Path) -> None:
+        """`worktree create --next` uses the oldest pending plan."""
+        runner = CliRunner()
+        base = ["worktree", "--target-dir", str(plan_repo)]
+        result = runner.invoke(main, [*base, "create", "--next"])
+        assert result.exit_code == 0, result.output
+        assert result.output.strip().endswith("repo-wt-20260117-120000-test")
+
+        info = runner.invoke(main, [*base, "info", "20260117_120000_test", "--json"])
+        assert json.loads(info.output)["branch"] == "feature/20260117-120000-test"
+
+        assert runner.invoke(main, [*base, "cleanup", "20260117_120000_test"]).exit_code == 0
+        assert runner.invoke(main, [*base, "info", "20260117_120000_test"]).exit_code != 0
+
+    def test_cleanup_reports_git_errors(
+        self, plan_repo: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """A failing git command is reported as an error, not a traceback."""
+
+        def _fail(self: WorktreeManager, plan: str, delete_branch: bool = True) -> None:
+            raise WorktreeError("git worktree prune failed")
+
+        monkeypatch.setattr(WorktreeManager, "cleanup", _fail)
+        result = CliRunner().invoke(
+            main, ["worktree", "--target-dir", str(plan_repo), "cleanup", "20260117_120000_test"]
+        )
+        assert result.exit_code == 1
+        assert "Error: git worktree prune failed" in result.output
+        assert not isinstance(result.exception, WorktreeError)
+
+
+class TestSparseWorktrees:
+    """Test sparse checkout and shared dependency caches."""
+
+    @pytest.fixture
+    def monorepo(self, plan_repo: Path) -> Path:
+        """Commit two packages and install an (ignored) node_modules in the main checkout."""
+        for package in ("web", "api"):
+            (plan_repo / "packages" / package / "src").mkdir(parents=True)
+            (plan_repo / "packages" / package / "src" / "index.ts").write_text("export {};\n")
+        _git(plan_repo, "add", ".")
+        _git(plan_repo, "commit", "-m", "Add packages")
+        (plan_repo / "node_modules" / "dep").mkdir(parents=True)
+        (plan_repo / "node_modules" / "dep" / "index.js").write_text("module.exports = 1;\n")
+        return plan_repo
+
+    def test_parse_scope_paths(self, monorepo: Path) -> None:
+        """Existing scope paths become directories; nested ones collapse."""
+        text = (
+            "# Plan\n\n## Scope\n\n"
+            "- `packages/web/src/index.ts`\n"
+            "- packages/web/\n"
+            "- `does/not/exist`\n\n"
+            "## Other\n\n- `packages/api`\n"
+        )
+        assert parse_scope_paths(text, monorepo) == ["packages/web"]
+        assert parse_scope_paths("# Plan\n", monorepo) == []
+
+    def test_create_checks_out_plan_scope_only(self, monorepo: Path) -> None:
+        """Only the scoped package (plus root files) is checked out."""
+        plan = monorepo / ".pilot" / "plan" / "pending" / "20260117_120000_test.md"
+        plan.write_text("# Test\n\n## Scope\n\n- `packages/web/src/index.ts`\n")
+
+        metadata = WorktreeManager(monorepo).create(plan.name)
+
+        path = Path(metadata.worktree_path)
+        assert metadata.sparse_paths == "packages/web/src"
+        assert (path / "packages" / "web" / "src" / "index.ts").exists()
+        assert (path / "README.md").exists()
+        assert not (path / "packages" / "api").exists()
+
+    def test_caches_are_hardlinked(
+        self, monorepo: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """node_modules files share inodes with the main checkout; virtualenvs are skipped."""
+        (monorepo / "venv").mkdir()
+        (monorepo / "venv" / "pyvenv.cfg").write_text(f"home = {monorepo}\n")
+        monkeypatch.setattr(config, "WORKTREE_SHARED_CACHE_DIRS", ("node_modules", "venv"))
+        metadata = WorktreeManager(monorepo).create("20260117_120000_test.md", sparse=[])
+
+        source = monorepo / "node_modules" / "dep" / "index.js"
+        linked = Path(metadata.worktree_path) / "node_modules" / "dep" / "index.js"
+        assert linked.stat().st_ino == source.stat().st_ino
+        assert not (Path(metadata.worktree_path) / "venv").exists()
+        assert (Path(metadata.worktree_path) / "packages" / "api").exists()